@@ -16,10 +16,16 @@ if config.config_file_name is not None:
 
 # add your model's MetaData object here
 # for 'autogenerate' support
-from app.core.database import Base
-from app.models.card import TechCard
+from app.core.config import settings
+from app.core.database import Base, import_all_models
+
+# 注册所有模型，autogenerate 才能看到完整的表结构
+import_all_models()
 target_metadata = Base.metadata
 
+# 数据库地址以应用配置（DATABASE_URL）为准，SQLite 和 PostgreSQL 共用同一套迁移
+config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -65,7 +71,10 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite 不支持大部分 ALTER TABLE，用批量模式（重建表）执行
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
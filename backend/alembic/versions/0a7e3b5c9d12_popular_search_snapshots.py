@@ -0,0 +1,61 @@
+"""Popular search snapshots
+
+内存中按天的热门搜索词草图的持久化快照，见 app/services/popular_searches.py。
+建表后从已有的 search_history 回填。
+
+本迁移之前由 init_db 的 create_all 建库的数据库已经有这张表，跳过建表；表为空时仍然回填。
+
+Revision ID: 0a7e3b5c9d12
+Revises: f1c6d84b2a95
+Create Date: 2026-10-20 09:48:55.630917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7e3b5c9d12'
+down_revision: Union[str, Sequence[str], None] = 'f1c6d84b2a95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('popular_search_snapshots'):
+        _create_table()
+
+    # 回填：汇总已有的搜索历史
+    from app.services import popular_searches
+    session = Session(bind=bind)
+    if session.query(popular_searches.PopularSearchSnapshot).first() is None:
+        popular_searches.backfill(session)
+
+
+def _create_table() -> None:
+    op.create_table(
+        'popular_search_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('bucket_date', sa.Date(), nullable=False),
+        sa.Column('query', sa.String(length=255), nullable=False),
+        sa.Column('display', sa.String(length=255), nullable=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('bucket_date', 'query', name='uq_popular_search_snapshot')
+    )
+    op.create_index(op.f('ix_popular_search_snapshots_id'), 'popular_search_snapshots', ['id'], unique=False)
+    op.create_index('idx_popular_search_snapshot_date', 'popular_search_snapshots', ['bucket_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_popular_search_snapshot_date', table_name='popular_search_snapshots')
+    op.drop_index(op.f('ix_popular_search_snapshots_id'), table_name='popular_search_snapshots')
+    op.drop_table('popular_search_snapshots')
@@ -0,0 +1,37 @@
+"""Cross-process cache versions
+
+卡片语料的版本号，写入卡片时在同一事务内递增，各进程的搜索结果缓存据此失效，
+见 app/services/query_cache.py。
+
+Revision ID: 1b9d4f6a2c83
+Revises: 0a7e3b5c9d12
+Create Date: 2026-10-20 10:21:44.905372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b9d4f6a2c83'
+down_revision: Union[str, Sequence[str], None] = '0a7e3b5c9d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    cache_versions = op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(cache_versions, [{'name': 'tech_cards', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('cache_versions')
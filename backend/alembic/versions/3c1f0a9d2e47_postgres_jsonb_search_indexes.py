@@ -0,0 +1,80 @@
+"""PostgreSQL JSONB columns and search indexes
+
+tech_cards 的标签列改为 JSONB 并建立 GIN 索引，另建全文检索（tsvector）
+和三元组（pg_trgm）索引。只对 PostgreSQL 生效，SQLite 上为空操作。
+
+新建的 PostgreSQL 数据库由 create_all 直接建出相同结构，之后执行
+``alembic stamp head`` 即可。
+
+Revision ID: 3c1f0a9d2e47
+Revises: 872586777ad8
+Create Date: 2026-10-19 14:02:11.512364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f0a9d2e47'
+down_revision: Union[str, Sequence[str], None] = '872586777ad8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSONB_COLUMNS = ("chinese_tags", "ai_category", "tech_stack")
+TRGM_COLUMNS = ("title", "summary")
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _is_postgresql():
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for column in JSONB_COLUMNS:
+        op.alter_column(
+            "tech_cards", column,
+            type_=postgresql.JSONB(),
+            postgresql_using=f"{column}::jsonb"
+        )
+        op.create_index(
+            f"idx_tech_cards_{column}_gin", "tech_cards", [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "jsonb_path_ops"}
+        )
+
+    # 表达式必须与 app.models.card.card_search_vector 一致
+    op.execute(
+        "CREATE INDEX idx_tech_cards_search_tsv ON tech_cards USING gin "
+        "(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(summary, '')))"
+    )
+    for column in TRGM_COLUMNS:
+        op.execute(
+            f"CREATE INDEX idx_tech_cards_{column}_trgm ON tech_cards "
+            f"USING gin (lower({column}) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _is_postgresql():
+        return
+
+    for column in TRGM_COLUMNS:
+        op.drop_index(f"idx_tech_cards_{column}_trgm", table_name="tech_cards")
+    op.drop_index("idx_tech_cards_search_tsv", table_name="tech_cards")
+
+    for column in JSONB_COLUMNS:
+        op.drop_index(f"idx_tech_cards_{column}_gin", table_name="tech_cards")
+        op.alter_column(
+            "tech_cards", column,
+            type_=postgresql.JSON(),
+            postgresql_using=f"{column}::json"
+        )
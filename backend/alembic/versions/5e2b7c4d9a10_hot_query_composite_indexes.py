@@ -0,0 +1,44 @@
+"""Composite indexes for hot queries
+
+- tech_cards(created_at, quality_score)：/cards 按时间倒序分页、推荐候选的时间+质量过滤
+- tech_cards(source, created_at)：/cards?source=... 与按来源统计
+- user_behaviors(user_id, created_at)：用户最近行为
+- data_source_health(source_name, check_time)：单个数据源的健康历史
+
+查询计划回归检查见 tests/integration/test_query_plans.py。
+
+Revision ID: 5e2b7c4d9a10
+Revises: 3c1f0a9d2e47
+Create Date: 2026-10-19 16:40:27.208913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b7c4d9a10'
+down_revision: Union[str, Sequence[str], None] = '3c1f0a9d2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (索引名, 表名, 列)，与模型 __table_args__ 中的定义一致
+INDEXES = (
+    ("idx_tech_cards_created_quality", "tech_cards", ["created_at", "quality_score"]),
+    ("idx_tech_cards_source_created", "tech_cards", ["source", "created_at"]),
+    ("idx_user_behaviors_user_created", "user_behaviors", ["user_id", "created_at"]),
+    ("idx_data_source_health_source_time", "data_source_health", ["source_name", "check_time"]),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,38 @@
+"""Scheduler leader lease table
+
+多进程/多主机部署时通过 scheduler_leases 的一行租约选出唯一运行调度器的进程，
+见 app/services/leader_lease.py。
+
+Revision ID: 7a4d2f1c8b93
+Revises: 5e2b7c4d9a10
+Create Date: 2026-10-19 18:21:40.117342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4d2f1c8b93'
+down_revision: Union[str, Sequence[str], None] = '5e2b7c4d9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'scheduler_leases',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('holder_id', sa.String(length=255), nullable=False),
+        sa.Column('acquired_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('scheduler_leases')
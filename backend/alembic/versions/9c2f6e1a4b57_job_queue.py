@@ -0,0 +1,54 @@
+"""Persistent job queue table
+
+API 进程入队、独立 worker 进程认领执行的后台任务，见 app/services/job_queue.py。
+
+Revision ID: 9c2f6e1a4b57
+Revises: 7a4d2f1c8b93
+Create Date: 2026-10-19 20:05:12.553810
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2f6e1a4b57'
+down_revision: Union[str, Sequence[str], None] = '7a4d2f1c8b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'job_queue',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('dedup_key', sa.String(length=255), nullable=True),
+        sa.Column('active_dedup_key', sa.String(length=255), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('locked_by', sa.String(length=255), nullable=True),
+        sa.Column('locked_until', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('active_dedup_key')
+    )
+    op.create_index(op.f('ix_job_queue_id'), 'job_queue', ['id'], unique=False)
+    op.create_index('idx_job_queue_claim', 'job_queue', ['status', 'priority', 'available_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_job_queue_claim', table_name='job_queue')
+    op.drop_index(op.f('ix_job_queue_id'), table_name='job_queue')
+    op.drop_table('job_queue')
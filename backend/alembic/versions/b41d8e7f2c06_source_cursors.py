@@ -0,0 +1,36 @@
+"""Per-source incremental collection cursors
+
+各数据源查询的 high-water mark，采集器只请求更新的内容，见 app/services/source_cursors.py。
+
+Revision ID: b41d8e7f2c06
+Revises: 9c2f6e1a4b57
+Create Date: 2026-10-19 21:12:48.904126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41d8e7f2c06'
+down_revision: Union[str, Sequence[str], None] = '9c2f6e1a4b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'source_cursors',
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('position', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('source_cursors')
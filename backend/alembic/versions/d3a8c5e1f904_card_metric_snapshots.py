@@ -0,0 +1,59 @@
+"""Card metric snapshots and growth rates
+
+卡片指标（star、fork、下载量、点赞数）的时间序列快照，以及由快照增量计算的日增速，
+见 app/services/card_metrics.py。
+
+Revision ID: d3a8c5e1f904
+Revises: b41d8e7f2c06
+Create Date: 2026-10-19 22:40:17.215630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a8c5e1f904'
+down_revision: Union[str, Sequence[str], None] = 'b41d8e7f2c06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'card_metric_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('card_id', sa.Integer(), nullable=False),
+        sa.Column('captured_at', sa.DateTime(), nullable=False),
+        sa.Column('stars', sa.Integer(), nullable=True),
+        sa.Column('forks', sa.Integer(), nullable=True),
+        sa.Column('downloads', sa.Integer(), nullable=True),
+        sa.Column('likes', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['card_id'], ['tech_cards.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_card_metric_snapshots_id'), 'card_metric_snapshots', ['id'], unique=False)
+    op.create_index('idx_card_metric_snapshots_card_captured', 'card_metric_snapshots',
+                    ['card_id', 'captured_at'], unique=False)
+    op.create_index('idx_card_metric_snapshots_captured', 'card_metric_snapshots', ['captured_at'], unique=False)
+
+    with op.batch_alter_table('tech_cards') as batch_op:
+        batch_op.add_column(sa.Column('growth_rate', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('metrics_updated_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_tech_cards_growth_rate'), ['growth_rate'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tech_cards') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tech_cards_growth_rate'))
+        batch_op.drop_column('metrics_updated_at')
+        batch_op.drop_column('growth_rate')
+
+    op.drop_index('idx_card_metric_snapshots_captured', table_name='card_metric_snapshots')
+    op.drop_index('idx_card_metric_snapshots_card_captured', table_name='card_metric_snapshots')
+    op.drop_index(op.f('ix_card_metric_snapshots_id'), table_name='card_metric_snapshots')
+    op.drop_table('card_metric_snapshots')
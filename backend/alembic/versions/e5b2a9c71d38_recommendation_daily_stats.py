@@ -0,0 +1,76 @@
+"""Recommendation daily stats rollups
+
+/recommendations/stats 读取的按天汇总表，由 user_recommendations 增量维护，
+见 app/services/recommendation_stats.py。建表后从已有的推荐记录回填。
+
+之前由 scripts/create_recommendation_stats_tables.py 建过表的数据库跳过建表和回填。
+
+Revision ID: e5b2a9c71d38
+Revises: d3a8c5e1f904
+Create Date: 2026-10-20 09:12:36.408215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b2a9c71d38'
+down_revision: Union[str, Sequence[str], None] = 'd3a8c5e1f904'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table('recommendation_daily_stats'):
+        return
+
+    op.create_table(
+        'recommendation_daily_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('stat_date', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(length=20), nullable=False),
+        sa.Column('source', sa.String(length=20), nullable=False),
+        sa.Column('impressions', sa.Integer(), nullable=False),
+        sa.Column('clicks', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('stat_date', 'user_id', 'reason', 'source', name='uq_rec_daily_stats')
+    )
+    op.create_index(op.f('ix_recommendation_daily_stats_id'), 'recommendation_daily_stats', ['id'], unique=False)
+    op.create_index('idx_rec_daily_stats_user', 'recommendation_daily_stats', ['user_id', 'stat_date'], unique=False)
+
+    op.create_table(
+        'recommendation_tag_daily_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('stat_date', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('tag', sa.String(length=100), nullable=False),
+        sa.Column('impressions', sa.Integer(), nullable=False),
+        sa.Column('clicks', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('stat_date', 'user_id', 'tag', name='uq_rec_tag_daily_stats')
+    )
+    op.create_index(op.f('ix_recommendation_tag_daily_stats_id'), 'recommendation_tag_daily_stats', ['id'],
+                    unique=False)
+    op.create_index('idx_rec_tag_daily_stats_user', 'recommendation_tag_daily_stats', ['user_id', 'stat_date'],
+                    unique=False)
+
+    # 回填：汇总已有的推荐记录
+    from app.services import recommendation_stats
+    recommendation_stats.rebuild(Session(bind=bind))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_rec_tag_daily_stats_user', table_name='recommendation_tag_daily_stats')
+    op.drop_index(op.f('ix_recommendation_tag_daily_stats_id'), table_name='recommendation_tag_daily_stats')
+    op.drop_table('recommendation_tag_daily_stats')
+    op.drop_index('idx_rec_daily_stats_user', table_name='recommendation_daily_stats')
+    op.drop_index(op.f('ix_recommendation_daily_stats_id'), table_name='recommendation_daily_stats')
+    op.drop_table('recommendation_daily_stats')
@@ -0,0 +1,77 @@
+"""Behavior hourly/daily rollups
+
+统计与推荐特征读取的用户行为汇总表，由 user_behaviors 增量维护，
+见 app/services/behavior_rollup.py。建表后从已有的行为记录回填。
+
+之前由 scripts/create_behavior_rollup_tables.py 建过表的数据库跳过建表和回填。
+
+Revision ID: f1c6d84b2a95
+Revises: e5b2a9c71d38
+Create Date: 2026-10-20 09:31:02.117460
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6d84b2a95'
+down_revision: Union[str, Sequence[str], None] = 'e5b2a9c71d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table('behavior_hourly_rollups'):
+        return
+
+    op.create_table(
+        'behavior_hourly_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('card_id', sa.Integer(), nullable=False),
+        sa.Column('action', sa.String(length=20), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('total_duration', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('bucket_start', 'user_id', 'card_id', 'action', name='uq_behavior_hourly_rollup')
+    )
+    op.create_index(op.f('ix_behavior_hourly_rollups_id'), 'behavior_hourly_rollups', ['id'], unique=False)
+    op.create_index('idx_behavior_hourly_user', 'behavior_hourly_rollups', ['user_id', 'bucket_start'], unique=False)
+
+    op.create_table(
+        'behavior_daily_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('bucket_date', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('card_id', sa.Integer(), nullable=False),
+        sa.Column('action', sa.String(length=20), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('total_duration', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('bucket_date', 'user_id', 'card_id', 'action', name='uq_behavior_daily_rollup')
+    )
+    op.create_index(op.f('ix_behavior_daily_rollups_id'), 'behavior_daily_rollups', ['id'], unique=False)
+    op.create_index('idx_behavior_daily_user', 'behavior_daily_rollups', ['user_id', 'bucket_date'], unique=False)
+    op.create_index('idx_behavior_daily_card', 'behavior_daily_rollups', ['card_id', 'bucket_date'], unique=False)
+
+    # 回填：汇总保留期内的原始行为记录（归档由定时任务 compact 负责）
+    from app.services import behavior_rollup
+    behavior_rollup.rebuild(Session(bind=bind))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_behavior_daily_card', table_name='behavior_daily_rollups')
+    op.drop_index('idx_behavior_daily_user', table_name='behavior_daily_rollups')
+    op.drop_index(op.f('ix_behavior_daily_rollups_id'), table_name='behavior_daily_rollups')
+    op.drop_table('behavior_daily_rollups')
+    op.drop_index('idx_behavior_hourly_user', table_name='behavior_hourly_rollups')
+    op.drop_index(op.f('ix_behavior_hourly_rollups_id'), table_name='behavior_hourly_rollups')
+    op.drop_table('behavior_hourly_rollups')
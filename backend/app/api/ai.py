@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..core.database import get_db
 from ..models.card import TechCard
 from ..services.ai.summarizer import AISummarizer
+from ..services import enrichment_backlog
+from ..services.job_handlers import PRIORITY_USER_REQUEST
+from ..services.job_queue import job_queue
 from pydantic import BaseModel
 from typing import Optional
 import logging
@@ -64,99 +67,36 @@ async def generate_summary(request: GenerateSummaryRequest):
 @router.post("/enhance-card/{card_id}")
 async def enhance_card_with_ai(
     card_id: int, 
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
-    使用AI增强指定卡片的内容
+    使用AI增强指定卡片的内容（加入任务队列，由 worker 执行）
     """
     card = db.query(TechCard).filter(TechCard.id == card_id).first()
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
     
-    background_tasks.add_task(enhance_card_task, card_id)
+    queued = job_queue.enqueue(
+        db, enrichment_backlog.ENRICH_KIND, enrichment_backlog.explicit_payload(card_id),
+        priority=PRIORITY_USER_REQUEST, dedup_key=enrichment_backlog.enrich_dedup_key(card_id)
+    )
     
-    return {"message": "AI enhancement started in background"}
+    return {"message": "AI enhancement queued", **queued}
 
 
 @router.post("/enhance-all")
 async def enhance_all_cards(
-    background_tasks: BackgroundTasks,
     limit: int = 50,
     db: Session = Depends(get_db)
 ):
     """
-    使用AI增强所有未处理的卡片
+    把未处理的卡片按优先级加入 AI 增强积压（已在队列中的只提升优先级）
     """
-    cards = db.query(TechCard).filter(
-        TechCard.summary.is_(None) | (TechCard.summary == "")
-    ).limit(limit).all()
-    
-    for card in cards:
-        background_tasks.add_task(enhance_card_task, card.id)
+    result = enrichment_backlog.refill(db, limit)
     
     return {
-        "message": f"AI enhancement started for {len(cards)} cards",
-        "card_count": len(cards)
+        "message": f"AI enhancement queued for {result['candidates']} cards",
+        "card_count": result["candidates"],
+        "new_jobs": result["created"],
+        "raised_jobs": result["raised"]
     }
-
-
-async def enhance_card_task(card_id: int):
-    """
-    后台任务：增强单个卡片
-    """
-    try:
-        from ..core.database import SessionLocal
-        
-        db = SessionLocal()
-        card = db.query(TechCard).filter(TechCard.id == card_id).first()
-        
-        if not card:
-            logger.error(f"Card {card_id} not found")
-            return
-        
-        summarizer = AISummarizer()
-        
-        description = ""
-        if card.raw_data:
-            if card.source.value == "github":
-                description = card.raw_data.get("description", "")
-            elif card.source.value == "arxiv":
-                description = card.raw_data.get("summary", "")
-            elif card.source.value == "huggingface":
-                description = f"Downloads: {card.raw_data.get('downloads', 0)}"
-        
-        if not card.summary:
-            summary = await summarizer.generate_summary(
-                card.title,
-                description,
-                card.source.value
-            )
-            if summary:
-                card.summary = summary
-        
-        if not card.chinese_tags:
-            tags = await summarizer.extract_tags(
-                card.title,
-                description,
-                card.source.value
-            )
-            if tags:
-                card.chinese_tags = tags
-        
-        if not card.trial_suggestion:
-            trial_suggestion = await summarizer.generate_trial_suggestion(
-                card.title,
-                description,
-                card.chinese_tags or []
-            )
-            if trial_suggestion:
-                card.trial_suggestion = trial_suggestion
-        
-        db.commit()
-        db.close()
-        
-        logger.info(f"Enhanced card {card_id}")
-        
-    except Exception as e:
-        logger.error(f"Error enhancing card {card_id}: {e}")
\ No newline at end of file
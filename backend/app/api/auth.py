@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from ..core.database import get_db
+from ..core.database import get_async_db
 from ..core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     create_refresh_token,
     get_current_user,
-    get_current_active_user
+    get_current_active_user,
+    get_current_active_user_async
 )
 from ..models.user import User
 from ..models.auth_log import AuthLog
@@ -25,14 +26,14 @@ router = APIRouter(prefix="/auth", tags=["认证"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, request: Request, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     用户注册
     """
     error_msg = None
     try:
         # 检查用户名是否已存在
-        existing_user = db.query(User).filter(User.username == user_data.username).first()
+        existing_user = await db.scalar(select(User).where(User.username == user_data.username))
         if existing_user:
             error_msg = "用户名已存在"
             raise HTTPException(
@@ -41,7 +42,7 @@ async def register(user_data: UserCreate, request: Request, db: Session = Depend
             )
 
         # 检查邮箱是否已存在
-        existing_email = db.query(User).filter(User.email == user_data.email).first()
+        existing_email = await db.scalar(select(User).where(User.email == user_data.email))
         if existing_email:
             error_msg = "邮箱已被注册"
             raise HTTPException(
@@ -50,7 +51,7 @@ async def register(user_data: UserCreate, request: Request, db: Session = Depend
             )
 
         # 创建新用户
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         new_user = User(
             username=user_data.username,
             email=user_data.email,
@@ -59,8 +60,8 @@ async def register(user_data: UserCreate, request: Request, db: Session = Depend
         )
 
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
 
         # 记录成功日志
         auth_log = AuthLog(
@@ -71,7 +72,7 @@ async def register(user_data: UserCreate, request: Request, db: Session = Depend
             user_agent=request.headers.get("user-agent")
         )
         db.add(auth_log)
-        db.commit()
+        await db.commit()
 
         return new_user
     except HTTPException:
@@ -85,12 +86,12 @@ async def register(user_data: UserCreate, request: Request, db: Session = Depend
             error_message=error_msg
         )
         db.add(auth_log)
-        db.commit()
+        await db.commit()
         raise
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(user_credentials: UserLogin, request: Request, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     用户登录
     """
@@ -99,10 +100,10 @@ async def login(user_credentials: UserLogin, request: Request, db: Session = Dep
 
     try:
         # 查找用户（支持用户名或邮箱登录）
-        user = db.query(User).filter(
+        user = await db.scalar(select(User).where(
             (User.username == user_credentials.username) |
             (User.email == user_credentials.username)
-        ).first()
+        ))
 
         if not user:
             error_msg = "用户名或密码错误"
@@ -113,7 +114,7 @@ async def login(user_credentials: UserLogin, request: Request, db: Session = Dep
             )
 
         # 验证密码
-        if not verify_password(user_credentials.password, user.hashed_password):
+        if not await verify_password_async(user_credentials.password, user.hashed_password):
             error_msg = "用户名或密码错误"
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -131,7 +132,7 @@ async def login(user_credentials: UserLogin, request: Request, db: Session = Dep
 
         # 更新最后登录时间
         user.last_login = datetime.utcnow()
-        db.commit()
+        await db.commit()
 
         # 生成 JWT Token
         access_token = create_access_token(
@@ -150,7 +151,7 @@ async def login(user_credentials: UserLogin, request: Request, db: Session = Dep
             user_agent=request.headers.get("user-agent")
         )
         db.add(auth_log)
-        db.commit()
+        await db.commit()
 
         return LoginResponse(
             access_token=access_token,
@@ -169,12 +170,12 @@ async def login(user_credentials: UserLogin, request: Request, db: Session = Dep
             error_message=error_msg
         )
         db.add(auth_log)
-        db.commit()
+        await db.commit()
         raise
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_active_user)):
+async def get_me(current_user: User = Depends(get_current_active_user_async)):
     """
     获取当前用户信息
     """
@@ -184,15 +185,15 @@ async def get_me(current_user: User = Depends(get_current_active_user)):
 @router.put("/me", response_model=UserResponse)
 async def update_me(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     更新当前用户信息
     """
     # 如果更新邮箱，检查是否已被使用
     if user_update.email and user_update.email != current_user.email:
-        existing_email = db.query(User).filter(User.email == user_update.email).first()
+        existing_email = await db.scalar(select(User).where(User.email == user_update.email))
         if existing_email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -208,14 +209,14 @@ async def update_me(
         current_user.avatar_url = user_update.avatar_url
 
     current_user.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
 
     return current_user
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_active_user)):
+async def logout(current_user: User = Depends(get_current_active_user_async)):
     """
     用户登出（主要在前端处理，这里只是一个端点）
     """
@@ -223,7 +224,7 @@ async def logout(current_user: User = Depends(get_current_active_user)):
 
 
 @router.get("/check")
-async def check_auth(current_user: User = Depends(get_current_active_user)):
+async def check_auth(current_user: User = Depends(get_current_active_user_async)):
     """
     检查认证状态
     """
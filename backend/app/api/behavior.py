@@ -1,15 +1,23 @@
 """
 用户行为日志API
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import delete, desc, select
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from typing import List, Optional
 from datetime import datetime, timedelta
+from collections import Counter
+from urllib.parse import parse_qs
+import json
 
-from ..core.database import get_db
+from ..core.database import get_async_db
+from ..core.read_replica import get_read_db
 from ..models.behavior import UserBehavior, SearchHistory, ActionType
+from ..models.card import TechCard
+from ..services.write_buffer import behavior_log_writer
+from ..services import behavior_rollup
+from ..services.popular_searches import popular_searches
 
 router = APIRouter(tags=["behavior"])
 
@@ -25,6 +33,10 @@ class BehaviorLog(BaseModel):
     metadata: Optional[str] = None
 
 
+class BatchBehaviorEvent(BehaviorLog):
+    timestamp: Optional[datetime] = None  # 客户端发生时间（批量上报会延迟发送）
+
+
 class SearchHistoryCreate(BaseModel):
     user_id: int
     query: str
@@ -33,6 +45,12 @@ class SearchHistoryCreate(BaseModel):
     intent: Optional[str] = None
 
 
+MAX_BATCH_EVENTS = 1000
+FAVORITE_TAG_CARDS = 50  # 计算常用标签时最多取的卡片数
+VALID_ACTIONS = {a.value: a for a in ActionType}
+_batch_event_adapter = TypeAdapter(BatchBehaviorEvent)
+
+
 class BehaviorStats(BaseModel):
     user_id: int
     total_clicks: int
@@ -45,7 +63,7 @@ class BehaviorStats(BaseModel):
 @router.post("/behavior/log")
 async def log_user_behavior(
     behavior: BehaviorLog,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     记录用户行为
@@ -71,12 +89,11 @@ async def log_user_behavior(
             query=behavior.query,
             duration=behavior.duration,
             search_mode=behavior.search_mode,
-            metadata=behavior.metadata
+            extra_data=behavior.metadata
         )
 
         db.add(log_entry)
-        db.commit()
-        db.refresh(log_entry)
+        await db.commit()
 
         return {
             "success": True,
@@ -85,14 +102,100 @@ async def log_user_behavior(
         }
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _parse_batch_body(body: bytes, content_type: str) -> list:
+    """
+    解析批量上报的请求体
+
+    支持：
+    - application/json: {"events": [...]} 或 [...]
+    - text/plain（navigator.sendBeacon 发送字符串时的默认类型）: 同上
+    - application/x-www-form-urlencoded: events=<JSON数组>
+    """
+    text = body.decode("utf-8")
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        text = parse_qs(text).get("events", ["[]"])[0]
+
+    payload = json.loads(text) if text.strip() else []
+    if isinstance(payload, dict):
+        payload = payload.get("events", [])
+    if not isinstance(payload, list):
+        raise ValueError("events must be a list")
+    return payload
+
+
+@router.post("/behavior/log/batch", status_code=202)
+async def log_user_behavior_batch(request: Request):
+    """
+    批量记录用户行为
+
+    请求体为事件数组（或 {"events": [...]}），字段同 /behavior/log，
+    可额外带 timestamp（事件发生时间）。兼容 navigator.sendBeacon。
+
+    合法事件进入写缓冲队列后立即返回，由后台批量写入；
+    不合法的事件跳过并在 rejected 中返回其下标和原因。
+    """
+    try:
+        payload = _parse_batch_body(await request.body(), request.headers.get("content-type", ""))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch payload: {e}")
+
+    if len(payload) > MAX_BATCH_EVENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many events in one batch (max {MAX_BATCH_EVENTS})"
+        )
+
+    now = datetime.now()
+    rows = []
+    rejected = []
+    for index, raw in enumerate(payload):
+        try:
+            event = _batch_event_adapter.validate_python(raw)
+        except ValidationError as e:
+            rejected.append({"index": index, "error": e.errors()[0]["msg"]})
+            continue
+
+        action = VALID_ACTIONS.get(event.action)
+        if action is None:
+            rejected.append({"index": index, "error": f"Invalid action type: {event.action}"})
+            continue
+
+        created_at = now
+        if event.timestamp:
+            # 统一为本地时间（与服务端 datetime.now() 一致），且不晚于当前时间
+            timestamp = event.timestamp
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone().replace(tzinfo=None)
+            created_at = min(timestamp, now)
+
+        rows.append({
+            "user_id": event.user_id,
+            "action": action,
+            "card_id": event.card_id,
+            "query": event.query,
+            "duration": event.duration,
+            "search_mode": event.search_mode,
+            "extra_data": event.metadata,
+            "created_at": created_at
+        })
+
+    behavior_log_writer.add_many(rows)
+
+    return {
+        "success": True,
+        "accepted": len(rows),
+        "rejected": rejected
+    }
+
+
 @router.post("/behavior/search-history")
 async def create_search_history(
     search: SearchHistoryCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """记录搜索历史"""
     try:
@@ -105,8 +208,7 @@ async def create_search_history(
         )
 
         db.add(history)
-        db.commit()
-        db.refresh(history)
+        await db.commit()
 
         return {
             "success": True,
@@ -115,7 +217,7 @@ async def create_search_history(
         }
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -123,7 +225,7 @@ async def create_search_history(
 async def get_user_behavior_stats(
     user_id: int,
     days: int = 30,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取用户行为统计
@@ -134,30 +236,19 @@ async def get_user_behavior_stats(
     """
     cutoff_date = datetime.now() - timedelta(days=days)
 
-    # 统计各类行为次数
-    total_clicks = db.query(func.count(UserBehavior.id)).filter(
-        UserBehavior.user_id == user_id,
-        UserBehavior.action == ActionType.CLICK,
-        UserBehavior.created_at >= cutoff_date
-    ).scalar() or 0
-
-    total_favorites = db.query(func.count(UserBehavior.id)).filter(
-        UserBehavior.user_id == user_id,
-        UserBehavior.action == ActionType.FAVORITE,
-        UserBehavior.created_at >= cutoff_date
-    ).scalar() or 0
-
-    total_searches = db.query(func.count(UserBehavior.id)).filter(
-        UserBehavior.user_id == user_id,
-        UserBehavior.action == ActionType.SEARCH,
-        UserBehavior.created_at >= cutoff_date
-    ).scalar() or 0
-
-    # 获取最近活动
-    recent_activities = db.query(UserBehavior).filter(
-        UserBehavior.user_id == user_id,
-        UserBehavior.created_at >= cutoff_date
-    ).order_by(desc(UserBehavior.created_at)).limit(10).all()
+    # 统计各类行为次数（读按天汇总表，窗口按自然日对齐）
+    counts = await db.run_sync(behavior_rollup.count_actions, user_id, cutoff_date.date())
+    total_clicks = counts.get(ActionType.CLICK.value, 0)
+    total_favorites = counts.get(ActionType.FAVORITE.value, 0)
+    total_searches = counts.get(ActionType.SEARCH.value, 0)
+
+    # 获取最近活动（原始记录，只取最近10条）
+    recent_activities = await db.scalars(
+        select(UserBehavior).where(
+            UserBehavior.user_id == user_id,
+            UserBehavior.created_at >= cutoff_date
+        ).order_by(desc(UserBehavior.created_at)).limit(10)
+    )
 
     activities_list = [
         {
@@ -170,8 +261,25 @@ async def get_user_behavior_stats(
         for a in recent_activities
     ]
 
-    # TODO: 计算favorite_tags（需要关联tech_cards表）
-    favorite_tags = []
+    # 常用标签：按点击/收藏次数最多的卡片统计标签
+    card_actions = await db.run_sync(
+        behavior_rollup.get_card_actions, user_id, cutoff_date.date(),
+        actions=[ActionType.CLICK, ActionType.FAVORITE],
+        limit=FAVORITE_TAG_CARDS
+    )
+    card_weights = {}
+    for row in card_actions:
+        card_weights[row["card_id"]] = card_weights.get(row["card_id"], 0) + row["count"]
+
+    tag_counter = Counter()
+    if card_weights:
+        cards = await db.execute(
+            select(TechCard.id, TechCard.chinese_tags).where(TechCard.id.in_(card_weights.keys()))
+        )
+        for card_id, tags in cards:
+            for tag in tags or []:
+                tag_counter[tag] += card_weights[card_id]
+    favorite_tags = [tag for tag, _ in tag_counter.most_common(10)]
 
     return BehaviorStats(
         user_id=user_id,
@@ -187,12 +295,14 @@ async def get_user_behavior_stats(
 async def get_search_history(
     user_id: int,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取用户搜索历史"""
-    history = db.query(SearchHistory).filter(
-        SearchHistory.user_id == user_id
-    ).order_by(desc(SearchHistory.created_at)).limit(limit).all()
+    history = await db.scalars(
+        select(SearchHistory).where(
+            SearchHistory.user_id == user_id
+        ).order_by(desc(SearchHistory.created_at)).limit(limit)
+    )
 
     return [
         {
@@ -210,14 +320,15 @@ async def get_search_history(
 @router.delete("/behavior/search-history/{user_id}")
 async def clear_search_history(
     user_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """清除用户搜索历史"""
-    deleted = db.query(SearchHistory).filter(
-        SearchHistory.user_id == user_id
-    ).delete()
+    result = await db.execute(
+        delete(SearchHistory).where(SearchHistory.user_id == user_id)
+    )
+    deleted = result.rowcount
 
-    db.commit()
+    await db.commit()
 
     return {
         "success": True,
@@ -230,22 +341,12 @@ async def clear_search_history(
 async def get_popular_searches(
     limit: int = 10,
     days: int = 7,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取热门搜索词"""
-    cutoff_date = datetime.now() - timedelta(days=days)
-
-    # 统计搜索词频率
-    popular = db.query(
-        SearchHistory.query,
-        func.count(SearchHistory.id).label('count')
-    ).filter(
-        SearchHistory.created_at >= cutoff_date
-    ).group_by(SearchHistory.query).order_by(
-        desc('count')
-    ).limit(limit).all()
+    """
+    获取热门搜索词
 
-    return [
-        {"query": q, "count": c}
-        for q, c in popular
-    ]
+    由内存中的按天热词草图合并得出（计数为估计值），不扫描搜索历史表。
+    days 最大为 settings.popular_search_max_days。
+    """
+    return await db.run_sync(popular_searches.top, days=days, limit=limit)
@@ -1,105 +1,100 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import case, func, select
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-from ..core.database import get_db
+from ..core.database import get_async_db
+from ..core.read_replica import get_read_db
 from ..models.card import TechCard, SourceType, TrialStatus
+from ..models.card_metric import CardMetricSnapshot
 from ..models.schemas import TechCard as TechCardSchema, TechCardCreate, TechCardUpdate
 
 router = APIRouter(prefix="/cards", tags=["cards"])
 
 
 @router.get("/", response_model=List[TechCardSchema])
-def get_cards(
+async def get_cards(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     source: Optional[SourceType] = None,
     status: Optional[TrialStatus] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(TechCard)
+    query = select(TechCard)
     
     if source:
-        query = query.filter(TechCard.source == source)
+        query = query.where(TechCard.source == source)
     if status:
-        query = query.filter(TechCard.status == status)
+        query = query.where(TechCard.status == status)
     if search:
-        query = query.filter(TechCard.title.contains(search))
+        query = query.where(TechCard.title.contains(search))
     
-    cards = query.order_by(TechCard.created_at.desc()).offset(skip).limit(limit).all()
-    return cards
+    cards = await db.scalars(query.order_by(TechCard.created_at.desc()).offset(skip).limit(limit))
+    return cards.all()
+
+
+async def _count_by_source(db: AsyncSession, today: datetime) -> Dict[SourceType, tuple]:
+    """按数据源一次性统计 (总数, 今日新增, 最后入库时间)"""
+    rows = await db.execute(
+        select(
+            TechCard.source,
+            func.count(TechCard.id),
+            func.sum(case((TechCard.created_at >= today, 1), else_=0)),
+            func.max(TechCard.created_at)
+        ).group_by(TechCard.source)
+    )
+    return {source: (total, int(today_count or 0), last) for source, total, today_count, last in rows}
 
 
 @router.get("/stats")
-def get_cards_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def get_cards_stats(db: AsyncSession = Depends(get_read_db)) -> Dict[str, Any]:
     """
     获取卡片统计信息（用于数据源管理页面）
     """
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
     
-    # 基础统计
-    total_cards = db.query(TechCard).count()
-    today_cards = db.query(TechCard).filter(TechCard.created_at >= today).count()
-    
-    # 按数据源统计
+    # 按数据源统计（单条 GROUP BY 查询）
+    counts = await _count_by_source(db, today)
     sources_stats = {}
     for source in SourceType:
-        total_count = db.query(TechCard).filter(TechCard.source == source).count()
-        today_count = db.query(TechCard).filter(
-            TechCard.source == source, 
-            TechCard.created_at >= today
-        ).count()
-        
-        # 获取最后更新时间
-        last_updated = db.query(TechCard).filter(TechCard.source == source).order_by(
-            desc(TechCard.created_at)
-        ).first()
-        
+        total_count, today_count, last_updated = counts.get(source, (0, 0, None))
         sources_stats[source.value] = {
             "total": total_count,
             "today": today_count,
-            "last_update": last_updated.created_at.isoformat() if last_updated else None
+            "last_update": last_updated.isoformat() if last_updated else None
         }
     
     return {
-        "total_cards": total_cards,
-        "today_cards": today_cards,
+        "total_cards": sum(c[0] for c in counts.values()),
+        "today_cards": sum(c[1] for c in counts.values()),
         "sources_stats": sources_stats
     }
 
 
 @router.get("/overview-stats")
-def get_overview_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def get_overview_stats(db: AsyncSession = Depends(get_read_db)) -> Dict[str, Any]:
     """
     获取概览页面统计信息
     """
     today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
     
-    # 基础统计
-    total_cards = db.query(TechCard).count()
-    today_cards = db.query(TechCard).filter(TechCard.created_at >= today).count()
-    
     # 按数据源统计
-    sources_stats = {}
-    for source in SourceType:
-        count = db.query(TechCard).filter(TechCard.source == source).count()
-        sources_stats[source.value] = count
+    counts = await _count_by_source(db, today)
+    sources_stats = {source.value: counts.get(source, (0,))[0] for source in SourceType}
     
-    # 热门标签统计 (从chinese_tags字段提取)
+    # 热门标签统计 (从chinese_tags字段提取，只读取标签列)
     trending_tags = []
     try:
-        # 获取所有包含标签的卡片
-        cards_with_tags = db.query(TechCard).filter(
-            TechCard.chinese_tags.isnot(None)
-        ).all()
+        tag_rows = await db.scalars(
+            select(TechCard.chinese_tags).where(TechCard.chinese_tags.isnot(None))
+        )
         
         # 统计标签频次
         tag_counts = {}
-        for card in cards_with_tags:
-            if card.chinese_tags:
-                for tag in card.chinese_tags:
+        for tags in tag_rows:
+            if tags:
+                for tag in tags:
                     if isinstance(tag, str) and len(tag.strip()) > 0:
                         clean_tag = tag.strip()
                         tag_counts[clean_tag] = tag_counts.get(clean_tag, 0) + 1
@@ -114,50 +109,102 @@ def get_overview_stats(db: Session = Depends(get_db)) -> Dict[str, Any]:
         trending_tags = []
     
     return {
-        "total_cards": total_cards,
-        "today_cards": today_cards, 
+        "total_cards": sum(c[0] for c in counts.values()),
+        "today_cards": sum(c[1] for c in counts.values()), 
         "sources_stats": sources_stats,
         "trending_tags": trending_tags
     }
 
 
+@router.get("/trending", response_model=List[TechCardSchema])
+async def get_trending_cards(
+    limit: int = Query(20, ge=1, le=100),
+    source: Optional[SourceType] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    按指标日增速（GitHub star / HuggingFace 下载量）排序的卡片
+    """
+    query = select(TechCard).where(TechCard.growth_rate > 0)
+    if source:
+        query = query.where(TechCard.source == source)
+    cards = await db.scalars(query.order_by(TechCard.growth_rate.desc()).limit(limit))
+    return cards.all()
+
+
+@router.get("/{card_id}/metrics")
+async def get_card_metrics(
+    card_id: int,
+    days: int = Query(30, ge=1, le=365),
+    db: AsyncSession = Depends(get_read_db)
+) -> Dict[str, Any]:
+    """
+    获取卡片的指标快照（star、fork、下载量、点赞数）和当前增速
+    """
+    card = await db.get(TechCard, card_id)
+    if not card:
+        raise HTTPException(status_code=404, detail="Card not found")
+    
+    snapshots = await db.scalars(
+        select(CardMetricSnapshot).where(
+            CardMetricSnapshot.card_id == card_id,
+            CardMetricSnapshot.captured_at >= datetime.utcnow() - timedelta(days=days)
+        ).order_by(CardMetricSnapshot.captured_at)
+    )
+    return {
+        "card_id": card_id,
+        "growth_rate": card.growth_rate,
+        "metrics_updated_at": card.metrics_updated_at.isoformat() if card.metrics_updated_at else None,
+        "snapshots": [
+            {
+                "captured_at": snapshot.captured_at.isoformat(),
+                "stars": snapshot.stars,
+                "forks": snapshot.forks,
+                "downloads": snapshot.downloads,
+                "likes": snapshot.likes,
+            }
+            for snapshot in snapshots
+        ]
+    }
+
+
 @router.get("/{card_id}", response_model=TechCardSchema)
-def get_card(card_id: int, db: Session = Depends(get_db)):
-    card = db.query(TechCard).filter(TechCard.id == card_id).first()
+async def get_card(card_id: int, db: AsyncSession = Depends(get_read_db)):
+    card = await db.get(TechCard, card_id)
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
     return card
 
 
 @router.post("/", response_model=TechCardSchema)
-def create_card(card: TechCardCreate, db: Session = Depends(get_db)):
+async def create_card(card: TechCardCreate, db: AsyncSession = Depends(get_async_db)):
     db_card = TechCard(**card.dict())
     db.add(db_card)
-    db.commit()
-    db.refresh(db_card)
+    await db.commit()
+    await db.refresh(db_card)
     return db_card
 
 
 @router.put("/{card_id}", response_model=TechCardSchema)
-def update_card(card_id: int, card_update: TechCardUpdate, db: Session = Depends(get_db)):
-    db_card = db.query(TechCard).filter(TechCard.id == card_id).first()
+async def update_card(card_id: int, card_update: TechCardUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_card = await db.get(TechCard, card_id)
     if not db_card:
         raise HTTPException(status_code=404, detail="Card not found")
     
     for field, value in card_update.dict(exclude_unset=True).items():
         setattr(db_card, field, value)
     
-    db.commit()
-    db.refresh(db_card)
+    await db.commit()
+    await db.refresh(db_card)
     return db_card
 
 
 @router.delete("/{card_id}")
-def delete_card(card_id: int, db: Session = Depends(get_db)):
-    db_card = db.query(TechCard).filter(TechCard.id == card_id).first()
+async def delete_card(card_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_card = await db.get(TechCard, card_id)
     if not db_card:
         raise HTTPException(status_code=404, detail="Card not found")
     
-    db.delete(db_card)
-    db.commit()
+    await db.delete(db_card)
+    await db.commit()
     return {"message": "Card deleted successfully"}
\ No newline at end of file
@@ -2,13 +2,15 @@
 数据源健康检查API
 """
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, select
 from typing import List, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
 from ..core.database import get_db
+from ..core.read_replica import get_read_db
 from ..models.config import DataSourceHealth, HealthStatus
 from ..services.data_collector import DataCollector
 
@@ -54,7 +56,7 @@ class SourceHealthStats(BaseModel):
 @router.get("/health/sources", response_model=List[SourceHealthStats])
 async def get_sources_health(
     hours: int = 24,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取所有数据源的健康状态概览
@@ -69,10 +71,10 @@ async def get_sources_health(
 
     for source in sources:
         # 查询该数据源的健康记录
-        records = db.query(DataSourceHealth).filter(
+        records = (await db.scalars(select(DataSourceHealth).where(
             DataSourceHealth.source_name == source,
             DataSourceHealth.check_time >= cutoff_time
-        ).all()
+        ))).all()
 
         if not records:
             stats.append(SourceHealthStats(
@@ -113,7 +115,7 @@ async def get_sources_health(
 async def get_source_health_detail(
     source_name: str,
     days: int = 7,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取指定数据源的详细健康统计
@@ -124,10 +126,10 @@ async def get_source_health_detail(
     """
     cutoff_time = datetime.now() - timedelta(days=days)
 
-    records = db.query(DataSourceHealth).filter(
+    records = (await db.scalars(select(DataSourceHealth).where(
         DataSourceHealth.source_name == source_name,
         DataSourceHealth.check_time >= cutoff_time
-    ).all()
+    ))).all()
 
     if not records:
         raise HTTPException(status_code=404, detail=f"No health records found for {source_name}")
@@ -163,7 +165,7 @@ async def get_source_health_detail(
 async def get_source_health_history(
     source_name: str,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取数据源的历史健康记录
@@ -172,9 +174,9 @@ async def get_source_health_history(
         source_name: 数据源名称
         limit: 返回记录数量（默认50条）
     """
-    records = db.query(DataSourceHealth).filter(
+    records = await db.scalars(select(DataSourceHealth).where(
         DataSourceHealth.source_name == source_name
-    ).order_by(desc(DataSourceHealth.check_time)).limit(limit).all()
+    ).order_by(desc(DataSourceHealth.check_time)).limit(limit))
 
     return [HealthRecord(
         id=r.id,
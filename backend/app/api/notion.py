@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from ..core.database import get_db
 from ..models.card import TechCard
 from ..services.notion import NotionService
+from ..services.job_handlers import PRIORITY_BULK, PRIORITY_USER_REQUEST
+from ..services.job_queue import job_queue
 from pydantic import BaseModel
 from typing import Optional
 import logging
@@ -40,7 +42,6 @@ async def test_notion_connection():
 @router.post("/save-card")
 async def save_card_to_notion(
     request_data: dict,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -54,15 +55,14 @@ async def save_card_to_notion(
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
     
-    background_tasks.add_task(sync_single_card_task, card_id)
+    queued = _enqueue_card_sync(db, card_id)
     
-    return {"message": f"Card {card_id} save to Notion started in background", "success": True}
+    return {"message": f"Card {card_id} save to Notion queued", "success": True, **queued}
 
 
 @router.post("/sync-card/{card_id}")
 async def sync_card_to_notion(
     card_id: int,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -72,14 +72,13 @@ async def sync_card_to_notion(
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
     
-    background_tasks.add_task(sync_single_card_task, card_id)
+    queued = _enqueue_card_sync(db, card_id)
     
-    return {"message": f"Card {card_id} sync to Notion started in background"}
+    return {"message": f"Card {card_id} sync to Notion queued", **queued}
 
 
 @router.post("/sync-all", response_model=NotionSyncResponse)
 async def sync_all_cards_to_notion(
-    background_tasks: BackgroundTasks,
     limit: int = 50,
     db: Session = Depends(get_db)
 ):
@@ -94,10 +93,13 @@ async def sync_all_cards_to_notion(
             results={"total": 0, "success": 0, "failed": 0}
         )
     
-    background_tasks.add_task(sync_all_cards_task, limit)
+    queued = job_queue.enqueue(
+        db, "notion_sync_all", {"limit": limit}, priority=PRIORITY_BULK, dedup_key="notion_sync_all"
+    )
     
     return NotionSyncResponse(
-        message=f"Syncing {min(cards_count, limit)} cards to Notion in background"
+        message=f"Syncing {min(cards_count, limit)} cards to Notion queued",
+        results=queued
     )
 
 
@@ -121,52 +123,11 @@ async def sync_all_cards_immediate(
     )
 
 
-async def sync_single_card_task(card_id: int):
-    """
-    后台任务：同步单个卡片
-    """
-    try:
-        from ..core.database import SessionLocal
-        
-        db = SessionLocal()
-        card = db.query(TechCard).filter(TechCard.id == card_id).first()
-        
-        if not card:
-            logger.error(f"Card {card_id} not found")
-            return
-        
-        notion_service = NotionService()
-        success = await notion_service.sync_card_to_notion(card, db)
-        
-        if success:
-            logger.info(f"Successfully synced card {card_id} to Notion")
-        else:
-            logger.error(f"Failed to sync card {card_id} to Notion")
-        
-        db.close()
-        
-    except Exception as e:
-        logger.error(f"Error in sync_single_card_task for card {card_id}: {e}")
-
-
-async def sync_all_cards_task(limit: int):
-    """
-    后台任务：同步所有卡片
-    """
-    try:
-        from ..core.database import SessionLocal
-        
-        db = SessionLocal()
-        notion_service = NotionService()
-        
-        results = await notion_service.sync_all_cards(db, limit)
-        
-        logger.info(f"Notion sync completed: {results}")
-        
-        db.close()
-        
-    except Exception as e:
-        logger.error(f"Error in sync_all_cards_task: {e}")
+def _enqueue_card_sync(db: Session, card_id: int) -> dict:
+    return job_queue.enqueue(
+        db, "notion_sync_card", {"card_id": card_id},
+        priority=PRIORITY_USER_REQUEST, dedup_key=f"notion_sync_card:{card_id}"
+    )
 
 
 @router.get("/status")
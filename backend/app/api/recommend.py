@@ -2,16 +2,24 @@
 推荐系统API
 """
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, select
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
 
-from ..core.database import get_db
+from ..core.database import get_async_db
+from ..core.read_replica import get_read_db
 from ..models.card import TechCard
 from ..models.behavior import UserBehavior, ActionType, UserRecommendation
 from ..models.user_preference import UserPreference
+from ..services.collaborative_filter import cf_model
+from ..services import behavior_rollup
+from ..services.write_buffer import recommendation_log_writer
+from ..services.recommendation_sessions import recommendation_sessions
+from ..models.recommendation_stats import RecommendationDailyStats, RecommendationTagDailyStats
+from ..core.config import settings
 
 router = APIRouter(tags=["recommendations"])
 
@@ -88,13 +96,117 @@ class RecommendationEngine:
 
         return score, matched_tags, reason
 
+    @staticmethod
+    def blend_cf_score(
+        score: float,
+        reason: str,
+        matched_tags: List[str],
+        cf_score: Optional[float]
+    ) -> tuple[float, str]:
+        """
+        融合协同过滤分数
+
+        Args:
+            score: 内容推荐分数
+            reason: 内容推荐理由
+            matched_tags: 匹配的标签
+            cf_score: 协同过滤点积分数（0-1），None 表示模型未覆盖
+
+        Returns:
+            (score, reason)
+        """
+        if cf_score is None:
+            return score, reason
+
+        weight = settings.cf_weight
+        blended = score * (1 - weight) + cf_score * weight
+
+        # 没有标签匹配但相似用户强烈偏好时，给出协同过滤理由
+        if not matched_tags and cf_score >= 0.5:
+            reason = "兴趣相似的用户也喜欢"
+
+        return blended, reason
+
+    @staticmethod
+    def rank_candidates(
+        db: Session,
+        user_id: int,
+        interest_tags: List[str],
+        min_score: float
+    ) -> List[tuple]:
+        """
+        对候选卡片打分并排序
+
+        候选：最近60天、质量分>=5.0；行为只取最近30天的点击。
+        同分按卡片ID倒序，保证排序结果稳定（翻页依赖该顺序）。
+
+        Returns:
+            [(card, score, matched_tags, reason), ...]
+        """
+        # 点击过的卡片取自行为汇总表，转成不入库的 UserBehavior 供打分使用
+        clicked = behavior_rollup.get_card_actions(
+            db, user_id, (datetime.now() - timedelta(days=30)).date(), actions=[ActionType.CLICK]
+        )
+        user_behaviors = [
+            UserBehavior(user_id=user_id, card_id=row["card_id"], action=ActionType.CLICK)
+            for row in clicked
+        ]
+
+        candidate_cards = db.query(TechCard).filter(
+            TechCard.created_at >= datetime.now() - timedelta(days=60),
+            TechCard.quality_score >= 5.0
+        ).all()
+
+        # 内容分 + 协同过滤分
+        cf_scores = cf_model.score(user_id, [card.id for card in candidate_cards])
+
+        recommendations = []
+        for card in candidate_cards:
+            score, matched_tags, reason = RecommendationEngine.calculate_recommendation_score(
+                card,
+                interest_tags,
+                user_behaviors
+            )
+            score, reason = RecommendationEngine.blend_cf_score(
+                score, reason, matched_tags, cf_scores.get(card.id)
+            )
+
+            if score >= min_score:
+                recommendations.append((card, score, matched_tags, reason))
+
+        recommendations.sort(key=lambda x: (x[1], x[0].id), reverse=True)
+        return recommendations
+
+
+def _card_to_dict(card: TechCard) -> dict:
+    return {
+        "id": card.id,
+        "title": card.title,
+        "source": card.source.value,
+        "original_url": card.original_url,
+        "summary": card.summary,
+        "chinese_tags": card.chinese_tags,
+        "quality_score": card.quality_score,
+        "created_at": card.created_at.isoformat()
+    }
+
+
+async def _get_interest_tags(db: AsyncSession, user_id: int) -> List[str]:
+    values = await db.scalars(
+        select(UserPreference.preference_value).where(
+            UserPreference.user_id == user_id,
+            UserPreference.preference_type == 'tag'
+        )
+    )
+    return values.all()
+
 
 @router.get("/recommendations")
 async def get_recommendations(
     user_id: int = Query(..., description="用户ID"),
     limit: int = Query(10, le=50),
     min_score: float = Query(0.3, description="最低推荐分数"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取个性化推荐
@@ -107,32 +219,19 @@ async def get_recommendations(
     """
 
     # 1. 获取用户偏好标签
-    user_prefs = db.query(UserPreference).filter(
-        UserPreference.user_id == user_id,
-        UserPreference.preference_type == 'tag'
-    ).all()
-
-    # 提取标签列表
-    interest_tags = [pref.preference_value for pref in user_prefs] if user_prefs else []
+    interest_tags = await _get_interest_tags(db, user_id)
 
     if not interest_tags:
         # 如果用户没有设置偏好，返回高质量内容
-        cards = db.query(TechCard).filter(
-            TechCard.quality_score >= 7.0
-        ).order_by(desc(TechCard.created_at)).limit(limit).all()
+        cards = await db.scalars(
+            select(TechCard).where(
+                TechCard.quality_score >= 7.0
+            ).order_by(desc(TechCard.created_at)).limit(limit)
+        )
 
         results = [
             RecommendationItem(
-                card={
-                    "id": c.id,
-                    "title": c.title,
-                    "source": c.source.value,
-                    "original_url": c.original_url,
-                    "summary": c.summary,
-                    "chinese_tags": c.chinese_tags,
-                    "quality_score": c.quality_score,
-                    "created_at": c.created_at.isoformat()
-                },
+                card=_card_to_dict(c),
                 score=c.quality_score / 10.0,
                 reason=f"高质量内容 (⭐ {c.quality_score:.1f}分)",
                 matched_tags=[]
@@ -146,64 +245,35 @@ async def get_recommendations(
             "message": "请先设置兴趣标签以获得个性化推荐"
         }
 
-    # 2. 获取用户历史行为（最近30天）
-    cutoff_date = datetime.now() - timedelta(days=30)
-    user_behaviors = db.query(UserBehavior).filter(
-        UserBehavior.user_id == user_id,
-        UserBehavior.created_at >= cutoff_date
-    ).all()
-
-    # 3. 获取候选卡片（最近60天，质量分>=5.0）
-    candidate_cards = db.query(TechCard).filter(
-        TechCard.created_at >= datetime.now() - timedelta(days=60),
-        TechCard.quality_score >= 5.0
-    ).all()
-
-    # 4. 计算推荐分数
-    recommendations = []
-    for card in candidate_cards:
-        score, matched_tags, reason = RecommendationEngine.calculate_recommendation_score(
-            card,
-            interest_tags,
-            user_behaviors
-        )
-
-        if score >= min_score:
-            recommendations.append((card, score, matched_tags, reason))
-
-    # 5. 按分数排序
-    recommendations.sort(key=lambda x: x[1], reverse=True)
+    # 2-5. 结合历史行为、质量分数、发布时间打分并排序
+    recommendations = await db.run_sync(
+        RecommendationEngine.rank_candidates, user_id, interest_tags, min_score
+    )
 
     # 6. 构建结果
     results = []
+    served_records = []
+    served_at = datetime.now()
     for card, score, matched_tags, reason in recommendations[:limit]:
         results.append(RecommendationItem(
-            card={
-                "id": card.id,
-                "title": card.title,
-                "source": card.source.value,
-                "original_url": card.original_url,
-                "summary": card.summary,
-                "chinese_tags": card.chinese_tags,
-                "quality_score": card.quality_score,
-                "created_at": card.created_at.isoformat()
-            },
+            card=_card_to_dict(card),
             score=round(score, 2),
             reason=reason,
             matched_tags=matched_tags
         ))
 
-        # 7. 记录推荐（用于后续分析）
-        rec_record = UserRecommendation(
-            user_id=user_id,
-            card_id=card.id,
-            score=int(score * 100),
-            reason=reason,
-            matched_tags=",".join(matched_tags) if matched_tags else None
-        )
-        db.add(rec_record)
+        served_records.append({
+            "user_id": user_id,
+            "card_id": card.id,
+            "score": int(score * 100),
+            "reason": reason,
+            "matched_tags": ",".join(matched_tags) if matched_tags else None,
+            "is_clicked": 0,
+            "created_at": served_at
+        })
 
-    db.commit()
+    # 7. 记录推荐（用于后续分析）- 写入缓冲队列，由后台批量插入，不阻塞响应
+    recommendation_log_writer.add_many(served_records)
 
     return {
         "recommendations": results,
@@ -216,68 +286,53 @@ async def get_recommendations(
 async def refresh_recommendations(
     user_id: int = Query(...),
     exclude_ids: List[int] = Query(default=[]),
-    limit: int = Query(default=10),
-    db: Session = Depends(get_db)
+    limit: int = Query(default=10, le=50),
+    cursor: Optional[str] = Query(default=None, description="上一次刷新返回的游标"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     刷新推荐（换一批）
 
-    排除已显示的卡片ID
+    首次刷新（无游标）时对全部候选打分排序，并在服务端缓存排序结果；
+    之后带上返回的 cursor 即可按排序顺序继续翻页，每次只取 limit 个，
+    已展示的卡片（含 exclude_ids）不会重复出现。
+    会话只在当前进程内，游标失效时按 exclude_ids 重新排序，因此客户端每次都应带上已展示的ID。
     """
-    # 获取用户偏好
-    user_prefs = db.query(UserPreference).filter(
-        UserPreference.user_id == user_id,
-        UserPreference.preference_type == 'tag'
-    ).all()
+    session = recommendation_sessions.get(cursor, user_id)
 
-    interest_tags = [pref.preference_value for pref in user_prefs] if user_prefs else []
+    if session is None:
+        interest_tags = await _get_interest_tags(db, user_id)
 
-    if not interest_tags:
-        return {"recommendations": [], "message": "请先设置兴趣标签"}
-
-    # 获取候选卡片（排除已显示的）
-    query = db.query(TechCard).filter(
-        TechCard.created_at >= datetime.now() - timedelta(days=60),
-        TechCard.quality_score >= 5.0
-    )
-
-    if exclude_ids:
-        query = query.filter(~TechCard.id.in_(exclude_ids))
+        if not interest_tags:
+            return {"recommendations": [], "message": "请先设置兴趣标签"}
 
-    candidate_cards = query.limit(limit * 3).all()
-
-    # 计算推荐分数
-    user_behaviors = db.query(UserBehavior).filter(
-        UserBehavior.user_id == user_id
-    ).all()
-
-    recommendations = []
-    for card in candidate_cards:
-        score, matched_tags, reason = RecommendationEngine.calculate_recommendation_score(
-            card,
-            interest_tags,
-            user_behaviors
-        )
+        ranked = [
+            (card.id, score, matched_tags, reason)
+            for card, score, matched_tags, reason in await db.run_sync(
+                RecommendationEngine.rank_candidates, user_id, interest_tags, 0.3
+            )
+        ]
+        cursor, session = recommendation_sessions.create(user_id, ranked, seen=exclude_ids)
 
-        if score >= 0.3:
-            recommendations.append((card, score, matched_tags, reason))
+    page = session.next_page(limit, exclude_ids)
 
-    # 排序并返回
-    recommendations.sort(key=lambda x: x[1], reverse=True)
+    # 只加载本批卡片
+    cards = {}
+    if page:
+        cards = {
+            card.id: card
+            for card in await db.scalars(
+                select(TechCard).where(TechCard.id.in_([entry[0] for entry in page]))
+            )
+        }
 
     results = []
-    for card, score, matched_tags, reason in recommendations[:limit]:
+    for card_id, score, matched_tags, reason in page:
+        card = cards.get(card_id)
+        if card is None:  # 卡片已被删除
+            continue
         results.append(RecommendationItem(
-            card={
-                "id": card.id,
-                "title": card.title,
-                "source": card.source.value,
-                "original_url": card.original_url,
-                "summary": card.summary,
-                "chinese_tags": card.chinese_tags,
-                "quality_score": card.quality_score,
-                "created_at": card.created_at.isoformat()
-            },
+            card=_card_to_dict(card),
             score=round(score, 2),
             reason=reason,
             matched_tags=matched_tags
@@ -285,26 +340,26 @@ async def refresh_recommendations(
 
     return {
         "recommendations": results,
-        "total": len(results)
+        "total": len(results),
+        "cursor": cursor,
+        "has_more": session.has_more()
     }
 
 
 @router.post("/recommendations/{recommendation_id}/click")
 async def mark_recommendation_clicked(
     recommendation_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """标记推荐被点击"""
-    rec = db.query(UserRecommendation).filter(
-        UserRecommendation.id == recommendation_id
-    ).first()
+    rec = await db.get(UserRecommendation, recommendation_id)
 
     if not rec:
         return {"success": False, "message": "Recommendation not found"}
 
     rec.is_clicked = 1
     rec.clicked_at = datetime.now()
-    db.commit()
+    await db.commit()
 
     return {"success": True, "message": "Recommendation marked as clicked"}
 
@@ -313,7 +368,8 @@ async def mark_recommendation_clicked(
 async def get_recommendation_stats(
     user_id: Optional[int] = None,
     days: int = 7,
-    db: Session = Depends(get_db)
+    tag_limit: int = Query(20, ge=0, le=100),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     获取推荐系统统计
@@ -321,26 +377,83 @@ async def get_recommendation_stats(
     包括：
     - 推荐总数
     - 点击率
-    - 最受欢迎的推荐理由
-    """
-    cutoff_date = datetime.now() - timedelta(days=days)
+    - 按推荐理由、数据源、匹配标签的点击率
 
-    query = db.query(UserRecommendation).filter(
-        UserRecommendation.created_at >= cutoff_date
+    数据来自按天汇总的统计表，统计窗口按自然日计算（包含起始日全天）。
+    """
+    cutoff_date = (datetime.now() - timedelta(days=days)).date()
+
+    query = select(
+        RecommendationDailyStats.reason,
+        RecommendationDailyStats.source,
+        func.sum(RecommendationDailyStats.impressions),
+        func.sum(RecommendationDailyStats.clicks)
+    ).where(
+        RecommendationDailyStats.stat_date >= cutoff_date
     )
 
     if user_id:
-        query = query.filter(UserRecommendation.user_id == user_id)
-
-    recommendations = query.all()
+        query = query.where(RecommendationDailyStats.user_id == user_id)
+
+    rows = await db.execute(query.group_by(
+        RecommendationDailyStats.reason,
+        RecommendationDailyStats.source
+    ))
+
+    total_recs = 0
+    clicked_recs = 0
+    by_reason = {}
+    by_source = {}
+    for reason, source, impressions, clicks in rows:
+        impressions = int(impressions or 0)
+        clicks = int(clicks or 0)
+        total_recs += impressions
+        clicked_recs += clicks
+        for bucket, key in ((by_reason, reason), (by_source, source or "unknown")):
+            counts = bucket.setdefault(key, [0, 0])
+            counts[0] += impressions
+            counts[1] += clicks
 
-    total_recs = len(recommendations)
-    clicked_recs = sum(1 for r in recommendations if r.is_clicked)
     click_rate = (clicked_recs / total_recs * 100) if total_recs > 0 else 0
 
+    # 按匹配标签
+    tag_query = select(
+        RecommendationTagDailyStats.tag,
+        func.sum(RecommendationTagDailyStats.impressions).label("impressions"),
+        func.sum(RecommendationTagDailyStats.clicks).label("clicks")
+    ).where(
+        RecommendationTagDailyStats.stat_date >= cutoff_date
+    )
+
+    if user_id:
+        tag_query = tag_query.where(RecommendationTagDailyStats.user_id == user_id)
+
+    tag_rows = (await db.execute(tag_query.group_by(RecommendationTagDailyStats.tag).order_by(
+        desc("impressions")
+    ).limit(tag_limit))).all() if tag_limit else []
+
     return {
         "total_recommendations": total_recs,
         "clicked_recommendations": clicked_recs,
         "click_rate": round(click_rate, 2),
-        "period_days": days
+        "period_days": days,
+        "by_reason": _ctr_breakdown(by_reason.items()),
+        "by_source": _ctr_breakdown(by_source.items()),
+        "by_tag": _ctr_breakdown((tag, (imp, clk)) for tag, imp, clk in tag_rows)
     }
+
+
+def _ctr_breakdown(items) -> List[dict]:
+    """[(key, (impressions, clicks))] -> 按曝光数倒序的点击率列表"""
+    results = []
+    for key, (impressions, clicks) in items:
+        impressions = int(impressions or 0)
+        clicks = int(clicks or 0)
+        results.append({
+            "key": key,
+            "impressions": impressions,
+            "clicks": clicks,
+            "click_rate": round(clicks / impressions * 100, 2) if impressions > 0 else 0
+        })
+    results.sort(key=lambda x: x["impressions"], reverse=True)
+    return results
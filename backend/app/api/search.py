@@ -2,18 +2,32 @@
 智能搜索API
 """
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import or_, func, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
 from pydantic import BaseModel
 from typing import List, Optional
 import re
+from datetime import datetime
 
-from ..core.database import get_db
-from ..models.card import TechCard
-from ..models.behavior import SearchHistory
+from ..core.database import get_async_db
+from ..core.read_replica import get_read_db
+from ..models.card import TechCard, SEARCH_CONFIG, card_search_vector
+from ..services.query_cache import corpus_version, search_cache
+from ..services.write_buffer import search_history_writer
+from ..services.autocomplete import (
+    autocomplete_index, normalize_key, TOP_K, KIND_HISTORY, KIND_TAG, KIND_TITLE
+)
 
 router = APIRouter(tags=["search"])
 
+AUTOCOMPLETE_ICONS = {
+    KIND_HISTORY: "🕐",
+    KIND_TAG: "🏷️",
+    KIND_TITLE: "📄",
+}
+
 
 # Pydantic模型
 class SearchRequest(BaseModel):
@@ -118,35 +132,41 @@ class SearchEngine:
                     highlights.append(f'技术:{tech}')
                     break
 
+        # 5. 全文检索匹配：PostgreSQL 的 tsvector 条件按词匹配，词序不同时上面的子串匹配不到
+        if not highlights:
+            words = query_lower.split()
+            text_words = set(f"{card.title or ''} {card.summary or ''}".lower().split())
+            if words and all(word in text_words for word in words):
+                score += 0.3
+                highlights.append('全文')
+
         return score, highlights
 
     @staticmethod
-    def generate_suggestions(query: str, db: Session) -> List[str]:
+    def generate_suggestions(query: str, db: Session, limit: int = 3) -> List[str]:
         """
         生成搜索建议
 
-        基于：
-        1. 热门搜索词
-        2. 相关标签
+        基于自动补全索引，不建议包含查询本身的词：
+        1. 与查询共享前缀的热门搜索词、标签（前缀由长到短）
+        2. 不足时用全局热门的搜索词、标签补齐
         """
-        suggestions = []
+        autocomplete_index.ensure_built(db)
+        query_key = normalize_key(query)
+        kinds = [KIND_HISTORY, KIND_TAG]
 
-        # TODO: 基于查询生成智能建议
-        # 这里先返回一些通用建议
-        common_suggestions = [
-            "深度学习",
-            "Transformer",
-            "FastAPI",
-            "大语言模型",
-            "推荐系统"
-        ]
-
-        # 返回与查询相关的建议
-        for sug in common_suggestions:
-            if query.lower() not in sug.lower():
-                suggestions.append(sug)
-                if len(suggestions) >= 3:
-                    break
+        prefixes = [query_key[:n] for n in range(len(query_key) - 1, max(len(query_key) // 2, 1) - 1, -1)]
+        prefixes.append("")
+
+        suggestions = []
+        for prefix in prefixes:
+            for item in autocomplete_index.complete(prefix, limit=TOP_K, kinds=kinds):
+                if query_key and query_key in normalize_key(item["text"]):
+                    continue
+                if item["text"] not in suggestions:
+                    suggestions.append(item["text"])
+                if len(suggestions) >= limit:
+                    return suggestions
 
         return suggestions
 
@@ -154,7 +174,8 @@ class SearchEngine:
 @router.post("/search", response_model=SearchResponse)
 async def smart_search(
     request: SearchRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db),
+    primary_db: AsyncSession = Depends(get_async_db)
 ):
     """
     智能搜索
@@ -162,30 +183,73 @@ async def smart_search(
     支持两种模式：
     1. keyword - 关键词搜索
     2. ai - AI问答搜索（需要OpenAI配置）
+
+    结果按 (归一化查询, 模式, limit) 缓存，卡片变化时失效。
+    语料版本号从主库读取（与 get_read_db 共用同一个主库会话）：延迟的副本可能返回旧版本号，
+    用副本上的旧数据重新填充缓存。
+    """
+
+    # 合并多余空白后作为缓存键（相关度计算本身不区分大小写）
+    query_text = " ".join(request.query.split())
+    cache_key = (query_text.lower(), request.mode, request.limit)
+    version = await primary_db.run_sync(corpus_version)
+
+    response = search_cache.get(cache_key, version=version)
+    if response is None:
+        response = await _run_search(query_text, request, db)
+        search_cache.set(cache_key, response, version=version)
+
+    # 记录搜索历史（进入写缓冲，不阻塞请求）
+    if request.user_id:
+        search_history_writer.add({
+            "user_id": request.user_id,
+            "query": request.query,
+            "mode": request.mode,
+            "results_count": response.total,
+            "intent": response.intent,
+            "created_at": datetime.now()
+        })
+
+    return response
+
+
+def _keyword_conditions(query_text: str, dialect: str) -> list:
+    """
+    关键词搜索的匹配条件（OR）
+
+    - 所有数据库：标题、摘要子串匹配（PostgreSQL 上由 lower() 三元组索引支持）
+    - PostgreSQL：另加全文检索（tsvector GIN 索引）和标签精确匹配（JSONB GIN 索引）
     """
+    query_lower = query_text.lower()
+    conditions = [
+        func.lower(TechCard.title).contains(query_lower),
+        func.lower(TechCard.summary).contains(query_lower),
+    ]
+    if dialect == "postgresql":
+        conditions.append(
+            card_search_vector().op("@@")(func.plainto_tsquery(SEARCH_CONFIG, query_text))
+        )
+        conditions.append(type_coerce(TechCard.chinese_tags, JSONB).contains([query_text]))
+    return conditions
+
 
+async def _run_search(query_text: str, request: SearchRequest, db: AsyncSession) -> SearchResponse:
+    """执行搜索（缓存未命中时）"""
     # 意图识别
-    intent = IntentClassifier.classify(request.query)
+    intent = IntentClassifier.classify(query_text)
 
     results = []
 
     if request.mode == "keyword":
-        # 关键词搜索
-        query_lower = request.query.lower()
-
-        # 在标题、摘要、标签中搜索
-        cards = db.query(TechCard).filter(
-            or_(
-                func.lower(TechCard.title).contains(query_lower),
-                func.lower(TechCard.summary).contains(query_lower),
-                # 注意：SQLite的JSON查询可能需要特殊处理
-            )
-        ).limit(request.limit * 2).all()  # 多获取一些，后续排序
+        # 关键词搜索：在标题、摘要、标签中搜索
+        cards = await db.scalars(select(TechCard).where(
+            or_(*_keyword_conditions(query_text, db.bind.dialect.name))
+        ).limit(request.limit * 2))  # 多获取一些，后续排序
 
         # 计算相关度并排序
         scored_cards = []
         for card in cards:
-            score, highlights = SearchEngine.calculate_relevance_score(card, request.query)
+            score, highlights = SearchEngine.calculate_relevance_score(card, query_text)
             if score > 0:
                 scored_cards.append((card, score, highlights))
 
@@ -217,19 +281,7 @@ async def smart_search(
         pass
 
     # 生成搜索建议
-    suggestions = SearchEngine.generate_suggestions(request.query, db)
-
-    # 记录搜索历史
-    if request.user_id:
-        history = SearchHistory(
-            user_id=request.user_id,
-            query=request.query,
-            mode=request.mode,
-            results_count=len(results),
-            intent=intent
-        )
-        db.add(history)
-        db.commit()
+    suggestions = await db.run_sync(lambda session: SearchEngine.generate_suggestions(query_text, session))
 
     return SearchResponse(
         results=results,
@@ -239,31 +291,31 @@ async def smart_search(
     )
 
 
+@router.get("/search/cache/status")
+async def get_search_cache_status():
+    """搜索结果缓存状态（命中率等）"""
+    return search_cache.get_status()
+
+
 @router.get("/search/autocomplete")
 async def search_autocomplete(
     q: str = Query(..., min_length=1),
-    limit: int = 5,
-    db: Session = Depends(get_db)
+    limit: int = Query(5, ge=1, le=TOP_K),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     搜索自动补全
 
-    返回匹配的标签和历史搜索
+    前缀匹配历史搜索词、标签和卡片标题，按频率排序
     """
-    suggestions = []
-
-    # 1. 从历史搜索中查找
-    history = db.query(SearchHistory.query).filter(
-        func.lower(SearchHistory.query).contains(q.lower())
-    ).distinct().limit(limit).all()
-
-    for (query,) in history:
-        suggestions.append({
-            "type": "history",
-            "text": query,
-            "icon": "🕐"
-        })
-
-    # 2. TODO: 从热门标签中查找
-
-    return suggestions[:limit]
+    if not autocomplete_index.is_built:
+        await db.run_sync(autocomplete_index.ensure_built)
+
+    return [
+        {
+            "type": item["type"],
+            "text": item["text"],
+            "icon": AUTOCOMPLETE_ICONS[item["type"]]
+        }
+        for item in autocomplete_index.complete(q, limit=limit)
+    ]
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from ..core.config import settings
 from ..core.database import get_db
 from ..services.data_collector import DataCollector
+from ..services.job_handlers import PRIORITY_DEFAULT
+from ..services.job_queue import job_queue
+from ..services.leader_lease import LeaseBusy, hold_lease
+from ..services.scheduler import collection_lease
 from ..models.config import DataSource
 import logging
 
@@ -11,24 +16,26 @@ router = APIRouter(prefix="/sources", tags=["sources"])
 
 
 @router.post("/collect")
-async def trigger_data_collection(background_tasks: BackgroundTasks):
+async def trigger_data_collection(db: Session = Depends(get_db)):
     """
-    触发数据收集任务
+    触发数据收集任务（加入任务队列，由 worker 执行）
     """
-    collector = DataCollector()
-    
-    background_tasks.add_task(collector.collect_all_sources)
+    queued = _enqueue_collection(db, "all")
     
-    return {"message": "Data collection started in background"}
+    return {"message": "Data collection queued", **queued}
 
 
 @router.get("/collect/sync")
 async def sync_data_collection():
     """
-    同步数据收集（用于测试）
+    同步数据收集（用于测试）；与其他采集互斥，已有采集在运行时返回 409
     """
     collector = DataCollector()
-    results = await collector.collect_all_sources()
+    try:
+        async with hold_lease(collection_lease(), settings.scheduler_lease_renew_seconds):
+            results = await collector.collect_all_sources()
+    except LeaseBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
     return {
         "message": "Data collection completed",
@@ -63,56 +70,48 @@ async def get_daily_trending_preview():
 
 
 @router.post("/collect/github")
-async def collect_github_only(background_tasks: BackgroundTasks):
+async def collect_github_only(db: Session = Depends(get_db)):
     """
     只收集GitHub数据
     """
-    collector = DataCollector()
-    background_tasks.add_task(single_source_collection_task, collector.collect_github_data)
-    return {"message": "GitHub data collection started", "source": "github"}
+    queued = _enqueue_collection(db, "github")
+    return {"message": "GitHub data collection queued", "source": "github", **queued}
 
 
 @router.post("/collect/arxiv")
-async def collect_arxiv_only(background_tasks: BackgroundTasks):
+async def collect_arxiv_only(db: Session = Depends(get_db)):
     """
     只收集arXiv数据
     """
-    collector = DataCollector()
-    background_tasks.add_task(single_source_collection_task, collector.collect_arxiv_data)
-    return {"message": "arXiv data collection started", "source": "arxiv"}
+    queued = _enqueue_collection(db, "arxiv")
+    return {"message": "arXiv data collection queued", "source": "arxiv", **queued}
 
 
 @router.post("/collect/huggingface")
-async def collect_huggingface_only(background_tasks: BackgroundTasks):
+async def collect_huggingface_only(db: Session = Depends(get_db)):
     """
     只收集HuggingFace数据
     """
-    collector = DataCollector()
-    background_tasks.add_task(single_source_collection_task, collector.collect_huggingface_data)
-    return {"message": "HuggingFace data collection started", "source": "huggingface"}
+    queued = _enqueue_collection(db, "huggingface")
+    return {"message": "HuggingFace data collection queued", "source": "huggingface", **queued}
 
 
 @router.post("/collect/zenn")
-async def collect_zenn_only(background_tasks: BackgroundTasks):
+async def collect_zenn_only(db: Session = Depends(get_db)):
     """
     只收集Zenn数据
     """
-    collector = DataCollector()
-    background_tasks.add_task(single_source_collection_task, collector.collect_zenn_data)
-    return {"message": "Zenn data collection started", "source": "zenn"}
+    queued = _enqueue_collection(db, "zenn")
+    return {"message": "Zenn data collection queued", "source": "zenn", **queued}
 
 
-async def single_source_collection_task(collection_func):
+def _enqueue_collection(db: Session, source: str) -> dict:
     """
-    单个数据源收集任务
+    采集任务入队；同一数据源已在队列中时不重复加入
     """
-    try:
-        count = await collection_func()
-        logger.info(f"Single source collection completed: {count} items")
-        return {"count": count}
-    except Exception as e:
-        logger.error(f"Error in single source collection: {e}")
-        return {"error": str(e)}
+    return job_queue.enqueue(
+        db, "collect_source", {"source": source}, priority=PRIORITY_DEFAULT, dedup_key=f"collect_source:{source}"
+    )
 
 
 @router.get("/")
@@ -7,7 +7,6 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List
 import os
-from openai import OpenAI
 
 router = APIRouter()
 
@@ -63,6 +62,8 @@ async def translate_texts(request: TranslateRequest):
 
     # 调用OpenAI API进行翻译
     try:
+        from openai import OpenAI  # 延迟导入，避免拖慢应用启动
+
         client = OpenAI(api_key=api_key)
 
         # 构建翻译提示
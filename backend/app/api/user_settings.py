@@ -8,6 +8,7 @@ from ..core.database import get_db
 from ..models.user import User
 from ..models.user_settings import UserSettings, DataSourceConfig
 from ..api.auth import get_current_user
+from ..services.scheduler import task_scheduler
 
 router = APIRouter(prefix="/api/v1/user-settings", tags=["user-settings"])
 
@@ -80,6 +81,12 @@ class DataSourceConfigUpdate(BaseModel):
     schedule_timezone: Optional[str] = None
 
 
+async def _reload_fetch_plans():
+    """数据源配置变更后立即重新编译本进程的采集计划（其他进程由定期重载任务同步）"""
+    if task_scheduler.initialized:
+        await task_scheduler.reload_fetch_plans()
+
+
 # 获取用户设置
 @router.get("")
 async def get_user_settings(
@@ -247,6 +254,7 @@ async def create_or_update_datasource_config(
         existing.schedule_timezone = config.schedule_timezone
         db.commit()
         db.refresh(existing)
+        await _reload_fetch_plans()
         return {"message": "Data source config updated", "id": existing.id}
     else:
         # 创建新配置
@@ -263,6 +271,7 @@ async def create_or_update_datasource_config(
         db.add(new_config)
         db.commit()
         db.refresh(new_config)
+        await _reload_fetch_plans()
         return {"message": "Data source config created", "id": new_config.id}
 
 
@@ -301,6 +310,7 @@ async def update_datasource_config(
 
     db.commit()
     db.refresh(config)
+    await _reload_fetch_plans()
 
     return {"message": "Data source config updated"}
 
@@ -326,5 +336,6 @@ async def delete_datasource_config(
 
     db.delete(config)
     db.commit()
+    await _reload_fetch_plans()
 
     return {"message": "Data source config deleted"}
@@ -8,6 +8,26 @@ class Settings(BaseSettings):
     database_url: str = "sqlite:///./techpulse.db"
     secret_key: str = "your-secret-key-here"
 
+    # Database Tuning
+    db_pool_size: int = 10  # 连接池常驻连接数（内存 SQLite 除外）
+    db_max_overflow: int = 20  # 超出常驻连接数后最多再建立的连接数
+    db_pool_timeout: int = 30  # 等待空闲连接的秒数
+    db_pool_recycle: int = 1800  # 连接最长复用秒数（PostgreSQL 等服务端数据库）
+    db_pool_pre_ping: bool = True  # 取出连接前检测是否可用（PostgreSQL 等服务端数据库）
+    sqlite_journal_mode: str = "WAL"  # WAL 下读写互不阻塞
+    sqlite_synchronous: str = "NORMAL"  # WAL 模式下 NORMAL 不会损坏数据库，只可能丢失最后的事务
+    sqlite_busy_timeout_ms: int = 5000  # 写锁被占用时的等待时间
+    sqlite_cache_size_kb: int = 64000  # 每个连接的页缓存大小
+    sqlite_mmap_size_mb: int = 256  # 内存映射读取的大小，0 为关闭
+
+    # Read Replica
+    database_read_url: Optional[str] = None  # 只读副本地址，留空则读请求也走主库
+    read_your_writes_seconds: int = 10  # 客户端写入后该时间内的读请求走主库（覆盖复制延迟）
+    read_your_writes_by_ip: bool = False  # 没有 user_id / 令牌的请求按客户端 IP 识别（共享代理或 NAT 后的客户端会一起读主库）
+    read_replica_max_lag_seconds: float = 30  # 副本复制延迟超过该值时暂停使用副本
+    read_replica_check_seconds: int = 15  # 复制延迟检查间隔
+    read_replica_retry_seconds: int = 30  # 副本不可用后重新尝试的间隔
+
     # JWT Configuration
     jwt_secret_key: Optional[str] = None
     jwt_algorithm: str = "HS256"
@@ -65,9 +85,56 @@ class Settings(BaseSettings):
 
     # Data Collection Settings
     collection_interval_hours: int = 6
+    scheduler_jitter_seconds: int = 60  # 定时任务触发前的最大随机延迟
+    scheduler_enabled: bool = True  # 本进程是否参与调度（仍需获得 leader 租约才会执行任务）
+    scheduler_lease_ttl_seconds: int = 60  # leader 租约有效期，持有者崩溃后最长这么久由其他进程接管
+    scheduler_lease_renew_seconds: int = 20  # 续约/竞选间隔，应明显小于 TTL
+    job_queue_visibility_timeout_seconds: int = 300  # 任务认领后的可见性超时，worker 崩溃后超时即重新执行
+    job_queue_max_attempts: int = 3  # 默认最大执行次数（含首次）
+    job_queue_retry_base_seconds: int = 30  # 重试退避基数，第 n 次失败后等待 base * 2^(n-1) 秒
+    job_queue_retry_max_seconds: int = 3600
+    job_worker_concurrency: int = 2  # worker 进程并发执行的任务数
+    job_worker_poll_seconds: float = 2.0  # 队列为空时的轮询间隔
+    job_worker_embedded: bool = False  # 在 API 进程内运行 worker（仅开发环境，生产使用 python -m app.worker）
+    source_cursor_overlap_minutes: int = 10  # 增量采集时从游标回退的重叠窗口，容忍上游索引延迟
+    huggingface_min_downloads: int = 100  # HuggingFace 增量采集只保留下载量或点赞数达到阈值的条目
+    huggingface_min_likes: int = 5
+    fetch_plan_reload_minutes: int = 5  # 重新编译用户采集计划的间隔（本进程的配置变更会立即生效）
+    enrichment_backlog_scan_limit: int = 500  # 每次补充 AI 增强积压时最多扫描的未增强卡片数
+    enrichment_backlog_max_age_days: int = 30  # 只为最近 N 天内采集的卡片补充增强任务
+    enrichment_refill_minutes: int = 10  # 定期补充增强积压的间隔
+    enrichment_budget_per_hour: int = 60  # 每小时最多增强的卡片数（LLM 预算），0 表示不限制
+    metric_refresh_minutes: int = 30  # 批量刷新卡片指标（star、下载量）的间隔
+    metric_refresh_batch_size: int = 100  # 每次刷新的卡片数（最久未刷新的优先）
+    metric_tracking_days: int = 30  # 追踪最近 N 天内采集的 GitHub/HuggingFace 卡片
+    metric_growth_half_life_hours: int = 72  # 增速平滑的半衰期：越短越偏向最近两次快照之间的增长
+    metric_snapshot_retention_days: int = 90  # 指标快照保留天数
+    rate_limit_max_wait_seconds: int = 120  # 采集请求等待上游限速额度的上限，超过则本次请求失败
     max_items_per_source: int = 50
     ai_keywords: str = "machine learning,deep learning,neural network,artificial intelligence,tensorflow,pytorch,keras,scikit-learn,transformers,llm,gpt,bert,stable diffusion,generative ai,chatbot,computer vision,nlp,data science"
 
+    # Recommendation Settings
+    cf_model_path: str = "data/cf_model.npz"  # 协同过滤因子文件（scripts/train_cf_model.py 生成）
+    cf_weight: float = 0.2  # 协同过滤分数在最终推荐分数中的权重
+
+    # Behavior Retention
+    behavior_retention_days: int = 90  # 原始行为记录保留天数（之后归档删除，汇总表保留）
+    behavior_hourly_retention_days: int = 14  # 按小时汇总保留天数
+    behavior_archive_dir: str = "data/behavior_archive"  # 归档目录，留空则不归档直接删除
+
+    # Popular Searches
+    popular_search_capacity: int = 500  # 每天热词草图跟踪的词数上限
+    popular_search_max_days: int = 30  # 保留的天数（popular-searches 的 days 上限）
+    popular_search_snapshot_minutes: int = 10  # 草图持久化间隔
+
+    # Search Cache
+    search_cache_size: int = 1000  # 缓存的查询结果条数上限
+    search_cache_ttl_seconds: int = 300  # 结果最长缓存时间（卡片变化时立即失效）
+
+    # Scraper HTTP Cache
+    http_cache_dir: str = "data/http_cache"  # 带 ETag/Last-Modified 的采集响应缓存目录，留空则不缓存
+    http_cache_max_mb: int = 200  # 缓存总大小上限，超出时淘汰最久未使用的条目
+
     # Logging
     log_level: str = "INFO"
     log_file: str = "logs/backend.log"
@@ -1,21 +1,199 @@
-from sqlalchemy import create_engine
+import importlib
+import logging
+import pkgutil
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from sqlalchemy import DDL, JSON, create_engine, event, inspect
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
-engine = create_engine(
-    settings.database_url, 
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+logger = logging.getLogger(__name__)
+
+
+# ==================== 连接池与 SQLite 调优 ====================
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    按数据库类型生成 create_engine 参数
+
+    - SQLite：允许跨线程使用连接（调度器、写缓冲线程与请求共用连接池）
+    - 文件数据库 / 服务端数据库：显式设置连接池大小和等待时间
+    - 服务端数据库（PostgreSQL 等）：取出连接前 ping，定期回收连接
+    """
+    url = make_url(database_url)
+    options: Dict[str, Any] = {}
+    if url.get_backend_name() == "sqlite":
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+        if _is_memory_sqlite(url):
+            return options
+    else:
+        options["pool_pre_ping"] = settings.db_pool_pre_ping
+        options["pool_recycle"] = settings.db_pool_recycle
+
+    options["pool_size"] = settings.db_pool_size
+    options["max_overflow"] = settings.db_max_overflow
+    options["pool_timeout"] = settings.db_pool_timeout
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """connect 事件：为每个新的 SQLite 连接设置 PRAGMA"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        # cache_size 为负数时单位是 KiB
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_mb) * 1024 * 1024}")
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas(engine: Engine):
+    """SQLite 引擎注册 set_sqlite_pragmas，其他数据库不做处理"""
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", set_sqlite_pragmas)
+
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+install_sqlite_pragmas(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# JSON 列：PostgreSQL 上为 JSONB（支持 GIN 索引和 @> 包含查询），其他数据库为通用 JSON
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+# PostgreSQL 的三元组索引（子串匹配）依赖 pg_trgm 扩展，建表前确保已安装
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# ==================== 数据库结构 ====================
+# 应用启动时不再自动建表，结构由 Alembic 管理；部署或首次运行前执行 init_db()。
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# 引入 Alembic 管理之前，旧版本 create_all 建出的库与此版本的结构一致
+BASELINE_REVISION = "872586777ad8"
+
+
+def import_all_models():
+    """导入 app.models 下的全部模块，使所有表注册到 Base.metadata"""
+    from .. import models
+    for module in pkgutil.iter_modules(models.__path__):
+        importlib.import_module(f"{models.__name__}.{module.name}")
+
+
+def init_db():
+    """
+    初始化或升级数据库结构
+
+    - 已纳入管理的数据库：alembic upgrade head
+    - 旧版本启动时 create_all 建出的库（有表但没有 alembic_version）：
+      先 stamp 到基线版本，再 upgrade head 补齐之后新增的表、列和索引
+    - 空库：按模型建表，并 stamp 到最新版本
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    import_all_models()
+    config = Config(str(ALEMBIC_INI))
+    existing = inspect(engine)
+    if existing.has_table("alembic_version"):
+        logger.info("Upgrading database schema to Alembic head")
+        command.upgrade(config, "head")
+    elif existing.has_table("tech_cards"):
+        logger.info("Stamping unversioned database at Alembic baseline %s and upgrading", BASELINE_REVISION)
+        command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+    else:
+        logger.info("Creating database schema and stamping Alembic head")
+        Base.metadata.create_all(bind=engine)
+        command.stamp(config, "head")
+
+
+# ==================== 异步数据库 ====================
+# 与同步引擎指向同一个数据库，供高频接口使用，避免在事件循环中执行阻塞 I/O。
+# 驱动：SQLite -> aiosqlite，PostgreSQL -> asyncpg；首次使用时才创建引擎。
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+_read_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def get_async_database_url(database_url: str) -> str:
+    """将同步数据库 URL 转换为对应异步驱动的 URL（已指定异步驱动时原样返回）"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if url.drivername in ASYNC_DRIVERS.values() or backend not in ASYNC_DRIVERS:
+        return database_url
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _create_async_engine(database_url: str) -> AsyncEngine:
+    async_url = get_async_database_url(database_url)
+    async_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+    install_sqlite_pragmas(async_engine.sync_engine)
+    return async_engine
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = _create_async_engine(settings.database_url)
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        _async_sessionmaker = async_sessionmaker(
+            get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmaker()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def AsyncReadSessionLocal() -> Optional[AsyncSession]:
+    """只读副本的异步会话；未配置 database_read_url 时返回 None（路由见 core/read_replica.py）"""
+    global _read_sessionmaker
+    if not settings.database_read_url:
+        return None
+    if _read_sessionmaker is None:
+        _read_sessionmaker = async_sessionmaker(
+            _create_async_engine(settings.database_read_url), autoflush=False, expire_on_commit=False
+        )
+    return _read_sessionmaker()
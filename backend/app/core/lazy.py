@@ -0,0 +1,81 @@
+"""
+延迟初始化
+
+构造时需要访问数据库、网络或导入重量级依赖的全局实例用 LazyProvider 包装：
+导入模块时只登记工厂函数，第一次访问属性（或在 lifespan 中调用 get()）时才创建实例。
+这样 worker 启动、测试收集和命令行脚本导入 app 时都不会连接数据库。
+
+    azure_openai_service = LazyProvider(AzureOpenAIService)
+    azure_openai_service.is_available()   # 首次调用时才执行 AzureOpenAIService()
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_providers: List["LazyProvider"] = []
+
+
+class LazyProvider(Generic[T]):
+    """首次使用时才创建的全局实例（线程安全），属性访问透明转发到实例"""
+
+    def __init__(self, factory: Callable[[], T], name: Optional[str] = None):
+        # 直接写 __dict__，避免触发 __getattr__ 转发
+        self.__dict__["_factory"] = factory
+        self.__dict__["_name"] = name or getattr(factory, "__name__", repr(factory))
+        self.__dict__["_instance"] = None
+        self.__dict__["_lock"] = threading.Lock()
+        self.__dict__["init_seconds"] = None
+        _providers.append(self)
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> T:
+        """返回实例，不存在时创建"""
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                started = time.perf_counter()
+                self.__dict__["_instance"] = self._factory()
+                self.__dict__["init_seconds"] = time.perf_counter() - started
+                logger.info(f"Initialized {self._name} in {self.init_seconds * 1000:.1f}ms")
+            return self._instance
+
+    def override(self, instance: T):
+        """替换为指定实例（测试使用）"""
+        self.__dict__["_instance"] = instance
+
+    def reset(self):
+        """丢弃已创建的实例，下次访问时重新创建"""
+        with self._lock:
+            self.__dict__["_instance"] = None
+            self.__dict__["init_seconds"] = None
+
+    def __getattr__(self, item):
+        return getattr(self.get(), item)
+
+    def __setattr__(self, key, value):
+        setattr(self.get(), key, value)
+
+    def __repr__(self):
+        state = "initialized" if self.initialized else "pending"
+        return f"<LazyProvider {self._name} ({state})>"
+
+
+def get_status() -> Dict[str, Dict]:
+    """各延迟实例是否已创建及创建耗时"""
+    return {
+        provider._name: {
+            "initialized": provider.initialized,
+            "init_ms": round(provider.init_seconds * 1000, 1) if provider.init_seconds is not None else None,
+        }
+        for provider in _providers
+    }
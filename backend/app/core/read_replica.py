@@ -0,0 +1,225 @@
+"""
+只读副本路由
+
+只读接口通过 get_read_db 获取会话：配置了 database_read_url 且副本可用时使用副本，
+否则使用主库（get_async_db）。
+
+- 读己之写：请求中的主库会话提交写入后记录该客户端的写入时间，
+  read_your_writes_seconds 内该客户端的读请求仍走主库
+- 复制延迟：PostgreSQL 副本每隔 read_replica_check_seconds 检查一次回放延迟，
+  超过 read_replica_max_lag_seconds 时暂停使用副本
+- 副本连接失败时回退到主库，read_replica_retry_seconds 后再尝试
+
+客户端标识取 user_id 参数和 Authorization 令牌，任一标识最近写入过即读主库。
+客户端 IP 默认不作为标识：共享代理或 NAT 后的所有客户端 IP 相同，其中一个写入就会让全部读请求回到主库。
+read_your_writes_by_ip 开启后，没有 user_id / 令牌的请求按 IP 识别。
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import AsyncGenerator, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Depends, Request
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import AsyncReadSessionLocal, get_async_db
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_CLIENTS = 100_000
+WRITE_FLAG = "read_replica_has_writes"
+
+# 副本没有待回放的 WAL 时延迟为 0，否则为最后一次回放距今的秒数
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+# 当前请求的客户端标识，由 ReadYourWritesMiddleware 设置，会话提交时读取
+_client_keys: ContextVar[Tuple[str, ...]] = ContextVar("read_replica_client_keys", default=())
+
+
+def client_keys(request: Request) -> Tuple[str, ...]:
+    """请求的客户端标识"""
+    keys = []
+    user_id = request.path_params.get("user_id") or request.query_params.get("user_id")
+    if user_id:
+        keys.append(f"user:{user_id}")
+    authorization = request.headers.get("authorization")
+    if authorization:
+        keys.append("auth:" + hashlib.sha1(authorization.encode()).hexdigest())
+    if not keys and settings.read_your_writes_by_ip and request.client:
+        keys.append(f"ip:{request.client.host}")
+    return tuple(keys)
+
+
+class ReadReplicaRouter:
+    """决定读请求使用副本还是主库"""
+
+    def __init__(self):
+        self.session_factory: Callable[[], Optional[AsyncSession]] = AsyncReadSessionLocal
+        self._writes: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._unavailable_until = 0.0
+        self._lag_checked_at: Optional[float] = None
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.stats = {"replica": 0, "primary": 0, "read_your_writes": 0, "fallbacks": 0}
+
+    def mark_write(self, keys: Iterable[str]):
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                self._writes[key] = now
+                self._writes.move_to_end(key)
+            while len(self._writes) > MAX_TRACKED_CLIENTS:
+                self._writes.popitem(last=False)
+
+    def recently_wrote(self, keys: Iterable[str]) -> bool:
+        cutoff = time.monotonic() - settings.read_your_writes_seconds
+        with self._lock:
+            for key in keys:
+                written_at = self._writes.get(key)
+                if written_at is not None and written_at > cutoff:
+                    return True
+        return False
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+
+    def mark_unavailable(self, reason: str):
+        self._unavailable_until = time.monotonic() + settings.read_replica_retry_seconds
+        self.last_error = reason
+        logger.warning(f"Read replica disabled for {settings.read_replica_retry_seconds}s: {reason}")
+
+    async def open_session(self, keys: Iterable[str]) -> Optional[AsyncSession]:
+        """
+        打开副本会话
+
+        Returns:
+            已连接的副本会话；应读主库（未配置、读己之写、副本不可用）时返回 None
+        """
+        if self.recently_wrote(keys):
+            self.stats["read_your_writes"] += 1
+            return None
+        if not self.available:
+            return None
+        session = self.session_factory()
+        if session is None:
+            return None
+
+        try:
+            await session.connection()
+            if self._lag_check_due():
+                await self._check_lag(session)
+        except Exception as e:
+            await session.close()
+            self.stats["fallbacks"] += 1
+            self.mark_unavailable(str(e))
+            return None
+
+        if not self.available:
+            await session.close()
+            return None
+        return session
+
+    def _lag_check_due(self) -> bool:
+        return (
+            self._lag_checked_at is None
+            or time.monotonic() - self._lag_checked_at >= settings.read_replica_check_seconds
+        )
+
+    async def _check_lag(self, session: AsyncSession):
+        self._lag_checked_at = time.monotonic()
+        if session.bind.dialect.name != "postgresql":
+            return
+        lag = await session.scalar(REPLICA_LAG_SQL)
+        self.lag_seconds = float(lag) if lag is not None else None
+        if self.lag_seconds is not None and self.lag_seconds > settings.read_replica_max_lag_seconds:
+            self.mark_unavailable(f"replication lag {self.lag_seconds:.1f}s")
+
+    def reset(self):
+        """恢复初始状态（测试使用）"""
+        self.__init__()
+
+    def get_status(self) -> Dict:
+        return {
+            "configured": bool(settings.database_read_url),
+            "available": self.available,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+            "tracked_writers": len(self._writes),
+            **self.stats,
+        }
+
+
+async def get_read_db(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """只读接口的会话：优先使用副本，需要时回退到主库会话"""
+    session = await read_router.open_session(client_keys(request))
+    if session is None:
+        read_router.stats["primary"] += 1
+        yield db
+        return
+
+    read_router.stats["replica"] += 1
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+class ReadYourWritesMiddleware:
+    """记录当前请求的客户端标识，供会话提交写入时使用"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _client_keys.set(client_keys(Request(scope)))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _client_keys.reset(token)
+
+
+# 主库会话（同步会话及 AsyncSession 内部的同步会话）提交写入后标记客户端
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    session.info[WRITE_FLAG] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_orm_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WRITE_FLAG] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if session.info.pop(WRITE_FLAG, False):
+        keys = _client_keys.get()
+        if keys:
+            read_router.mark_write(keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(WRITE_FLAG, None)
+
+
+# 全局实例
+read_router = ReadReplicaRouter()
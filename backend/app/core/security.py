@@ -3,9 +3,12 @@ from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ..core.database import get_db
+from ..core.database import get_db, get_async_db
 from ..models.user import User
 from ..models.user_schemas import TokenData
 
@@ -66,6 +69,16 @@ def create_refresh_token(
     return encoded_jwt
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """验证密码（在线程池中计算哈希，不阻塞事件循环）"""
+    return await run_in_threadpool(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """获取密码哈希（在线程池中计算）"""
+    return await run_in_threadpool(get_password_hash, password)
+
+
 def decode_access_token(token: str) -> TokenData:
     """解码访问令牌"""
     try:
@@ -100,14 +113,7 @@ def decode_access_token(token: str) -> TokenData:
         )
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """获取当前用户"""
-    token_data = decode_access_token(token)
-
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+def _check_user(user: Optional[User]) -> User:
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -124,6 +130,24 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """获取当前用户"""
+    token_data = decode_access_token(token)
+    return _check_user(db.query(User).filter(User.id == token_data.user_id).first())
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """获取当前用户（异步会话，返回的对象可在同一请求的 get_async_db 会话中修改）"""
+    token_data = decode_access_token(token)
+    return _check_user(await db.scalar(select(User).where(User.id == token_data.user_id)))
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -131,3 +155,12 @@ async def get_current_active_user(
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="用户已被禁用")
     return current_user
+
+
+async def get_current_active_user_async(
+    current_user: User = Depends(get_current_user_async)
+) -> User:
+    """获取当前活跃用户（异步会话）"""
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="用户已被禁用")
+    return current_user
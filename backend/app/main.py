@@ -1,23 +1,87 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy.orm import Session
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
-from .core.database import engine, Base
+from .core.database import get_db
+from .core import lazy
+from .core.read_replica import ReadYourWritesMiddleware, read_router
 from .api import cards, sources, ai, notion, chat, auth, translate, user_settings, preferences, ai_config, health, behavior, search, recommend
 from .api import settings as settings_api
 from .services.scheduler import task_scheduler
+from .services import enrichment_backlog, write_buffer
+from .services.popular_searches import popular_searches
+from .services.job_queue import job_queue
+from .services.job_worker import JobWorker
+from .services.source_cursors import source_cursors
+from .services.card_metrics import card_metric_tracker
+from .services.scrapers.rate_governor import request_governor
+from .services.scrapers.http_cache import http_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    应用生命周期
+
+    导入 app.main 不访问数据库：表结构由 Alembic 管理（见 database.init_db），
+    需要数据库或外部服务的全局实例在首次使用时创建（见 core/lazy.py）。
+    """
+    try:
+        logger.info("Starting TechPulse application...")
+
+        # 启动任务调度器（首次访问时创建实例）；多进程部署时只有 leader 执行任务
+        if settings.scheduler_enabled:
+            task_scheduler.start_scheduler()
+
+        # 开发环境可在 API 进程内运行任务队列 worker（生产环境使用 python -m app.worker）
+        if settings.job_worker_embedded:
+            app.state.job_worker = JobWorker()
+            app.state.job_worker.start()
+
+        logger.info("TechPulse application started successfully")
+    except Exception as e:
+        logger.error(f"Error during application startup: {e}")
+
+    yield
+
+    try:
+        logger.info("Shutting down TechPulse application...")
+
+        # 停止任务调度器（取消等待中和正在运行的任务）
+        if task_scheduler.initialized:
+            await task_scheduler.stop_scheduler()
+
+        # 停止内嵌 worker，正在执行的任务放回队列
+        if getattr(app.state, "job_worker", None):
+            await app.state.job_worker.stop()
+
+        # 刷新写缓冲中剩余的数据
+        write_buffer.stop_all()
+
+        # 保存热门搜索词草图
+        popular_searches.persist()
+
+        logger.info("TechPulse application shut down successfully")
+    except Exception as e:
+        logger.error(f"Error during application shutdown: {e}")
+
 
 app = FastAPI(
     title=settings.app_name,
     description="TechPulse - 每日技术情报可视化仪表盘",
     version="0.2.0",
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
+# 记录写入请求的客户端，之后短时间内的读请求不走只读副本
+app.add_middleware(ReadYourWritesMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -43,38 +107,6 @@ app.include_router(search.router, prefix="/api/v1")  # 智能搜索路由
 app.include_router(recommend.router, prefix="/api/v1")  # 推荐系统路由
 
 
-@app.on_event("startup")
-async def startup_event():
-    """
-    应用启动事件
-    """
-    try:
-        logger.info("Starting TechPulse application...")
-        
-        # 启动任务调度器
-        task_scheduler.start_scheduler()
-        
-        logger.info("TechPulse application started successfully")
-    except Exception as e:
-        logger.error(f"Error during application startup: {e}")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """
-    应用关闭事件
-    """
-    try:
-        logger.info("Shutting down TechPulse application...")
-        
-        # 停止任务调度器
-        task_scheduler.stop_scheduler()
-        
-        logger.info("TechPulse application shut down successfully")
-    except Exception as e:
-        logger.error(f"Error during application shutdown: {e}")
-
-
 @app.get("/")
 async def root():
     return {"message": "Welcome to TechPulse API", "version": "0.2.0"}
@@ -93,22 +125,110 @@ async def get_scheduler_status():
     return task_scheduler.get_status()
 
 
+@app.get("/api/v1/write-buffers/status")
+async def get_write_buffer_status():
+    """
+    获取写缓冲队列状态
+    """
+    return write_buffer.get_status()
+
+
+@app.get("/api/v1/job-queue/status")
+def get_job_queue_status(db: Session = Depends(get_db)):
+    """
+    获取任务队列中各状态、各类型的任务数
+    """
+    return job_queue.get_status(db)
+
+
+@app.get("/api/v1/job-queue/jobs/{job_id}")
+def get_queued_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    获取单个队列任务的状态和结果
+    """
+    job = job_queue.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/api/v1/enrichment-backlog/status")
+def get_enrichment_backlog_status(db: Session = Depends(get_db)):
+    """
+    获取 AI 增强积压：排队数、未增强卡片数、本小时剩余预算和下一批卡片
+    """
+    return enrichment_backlog.get_status(db)
+
+
+@app.get("/api/v1/source-cursors/status")
+def get_source_cursor_status():
+    """
+    获取各数据源查询的增量采集游标
+    """
+    return source_cursors.get_status()
+
+
+@app.get("/api/v1/card-metrics/status")
+def get_card_metric_status():
+    """
+    获取卡片指标刷新状态（快照数、有增速的卡片数、最近一次刷新结果）
+    """
+    return card_metric_tracker.get_status()
+
+
+@app.get("/api/v1/rate-limits/status")
+async def get_rate_limit_status():
+    """
+    获取各上游限速桶的剩余额度、暂停时间和限流次数
+    """
+    return request_governor.get_status()
+
+
+@app.get("/api/v1/http-cache/status")
+def get_http_cache_status():
+    """
+    获取采集 HTTP 缓存的大小，以及各数据源的重新验证命中次数和节省的字节数
+
+    同步端点（在线程池中执行）：首次调用会扫描缓存目录
+    """
+    return http_cache.get_status()
+
+
+@app.get("/api/v1/providers/status")
+async def get_provider_status():
+    """
+    获取延迟初始化实例的状态（是否已创建、创建耗时）
+    """
+    return lazy.get_status()
+
+
+@app.get("/api/v1/read-replica/status")
+async def get_read_replica_status():
+    """
+    获取只读副本路由状态
+    """
+    return read_router.get_status()
+
+
+@app.post("/api/v1/scheduler/reload-fetch-plans")
+async def reload_fetch_plans():
+    """
+    按当前的数据源配置重新编译采集计划
+    """
+    return await task_scheduler.reload_fetch_plans()
+
+
 @app.post("/api/v1/scheduler/trigger-collection")
 async def trigger_manual_collection():
     """
-    手动触发数据收集
+    手动触发数据收集（与定时采集互斥，已有采集在运行时不会重复执行）
     """
-    try:
-        import asyncio
-        from .services.data_collector import DataCollector
-        
-        collector = DataCollector()
-        results = await collector.collect_all_sources()
-        
+    record = await task_scheduler.trigger_collection()
+    if record["status"] == "success":
         return {
             "message": "Manual collection completed",
-            "results": results
+            "results": record["result"]
         }
-    except Exception as e:
-        logger.error(f"Error in manual collection: {e}")
-        return {"message": "Collection failed", "error": str(e)}
\ No newline at end of file
+    if record["status"] == "skipped":
+        return {"message": "Collection skipped", "error": record["error"]}
+    return {"message": "Collection failed", "error": record["error"]}
@@ -1,7 +1,7 @@
 """
 用户行为数据模型
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from ..core.database import Base
 import enum
@@ -31,6 +31,11 @@ class UserBehavior(Base):
     extra_data = Column(Text, nullable=True)  # 额外信息（JSON格式）
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
+    __table_args__ = (
+        # 用户最近行为：user_id 等值 + created_at 范围/排序
+        Index('idx_user_behaviors_user_created', 'user_id', 'created_at'),
+    )
+
 
 class SearchHistory(Base):
     """搜索历史表"""
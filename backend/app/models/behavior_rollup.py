@@ -0,0 +1,45 @@
+"""
+用户行为汇总表（按小时 / 按天）
+
+由 user_behaviors 增量维护（批量写入与单条写入时同步累加），
+原始行为记录超过保留期后归档并删除，统计与推荐特征只读这两张表。
+"""
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint, Index
+from ..core.database import Base
+
+
+class BehaviorHourlyRollup(Base):
+    """按小时 × 用户 × 卡片 × 行为类型 汇总的次数"""
+    __tablename__ = "behavior_hourly_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_start = Column(DateTime, nullable=False)  # 小时起点（本地时间，分秒为0）
+    user_id = Column(Integer, nullable=False)
+    card_id = Column(Integer, nullable=False, default=0)  # 无卡片的行为（如搜索）记为0
+    action = Column(String(20), nullable=False)  # ActionType 的值
+    count = Column(Integer, nullable=False, default=0)
+    total_duration = Column(Integer, nullable=False, default=0)  # 浏览时长合计（秒）
+
+    __table_args__ = (
+        UniqueConstraint('bucket_start', 'user_id', 'card_id', 'action', name='uq_behavior_hourly_rollup'),
+        Index('idx_behavior_hourly_user', 'user_id', 'bucket_start'),
+    )
+
+
+class BehaviorDailyRollup(Base):
+    """按天 × 用户 × 卡片 × 行为类型 汇总的次数"""
+    __tablename__ = "behavior_daily_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_date = Column(Date, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    card_id = Column(Integer, nullable=False, default=0)  # 无卡片的行为（如搜索）记为0
+    action = Column(String(20), nullable=False)  # ActionType 的值
+    count = Column(Integer, nullable=False, default=0)
+    total_duration = Column(Integer, nullable=False, default=0)  # 浏览时长合计（秒）
+
+    __table_args__ = (
+        UniqueConstraint('bucket_date', 'user_id', 'card_id', 'action', name='uq_behavior_daily_rollup'),
+        Index('idx_behavior_daily_user', 'user_id', 'bucket_date'),
+        Index('idx_behavior_daily_card', 'card_id', 'bucket_date'),
+    )
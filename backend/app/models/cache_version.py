@@ -0,0 +1,26 @@
+"""
+缓存失效版本号表
+
+多个进程（API、调度 leader、worker）各自持有进程内缓存，而写入可能发生在任意进程。
+写入方在同一事务内递增对应的版本号，读取方查询时比较版本号判断缓存是否仍有效，
+见 services/query_cache.py。
+"""
+from sqlalchemy import Column, DDL, Integer, String, event
+
+from ..core.database import Base
+
+
+class CacheVersion(Base):
+    """一类数据的版本号，例如 tech_cards"""
+    __tablename__ = "cache_versions"
+
+    name = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+# 新建库（create_all）时写入初始行，递增时只需 UPDATE
+event.listen(
+    CacheVersion.__table__,
+    "after_create",
+    DDL("INSERT INTO cache_versions (name, version) VALUES ('tech_cards', 0)")
+)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON, Float, Index, text
 from sqlalchemy.sql import func
-from ..core.database import Base
+from ..core.database import Base, JSONType
 import enum
 
 
@@ -26,14 +26,16 @@ class TechCard(Base):
     source = Column(Enum(SourceType), nullable=False, index=True)
     original_url = Column(String(1000), nullable=False)
     summary = Column(Text)
-    chinese_tags = Column(JSON)  # 中文标签
-    ai_category = Column(JSON)   # AI分类标签：LLM、CV、NLP、Agent等
-    tech_stack = Column(JSON)    # 技术栈：Python、PyTorch、FastAPI等
+    chinese_tags = Column(JSONType)  # 中文标签
+    ai_category = Column(JSONType)   # AI分类标签：LLM、CV、NLP、Agent等
+    tech_stack = Column(JSONType)    # 技术栈：Python、PyTorch、FastAPI等
     license = Column(String(100))  # 开源协议
     stars = Column(Integer, default=0)  # GitHub Stars
     forks = Column(Integer, default=0)  # GitHub Forks
     issues = Column(Integer, default=0)  # Issue活跃度
     quality_score = Column(Float, default=5.0, index=True)  # 质量评分 (0-10)
+    growth_rate = Column(Float, index=True)  # 指标日增速（GitHub star / HuggingFace 下载量），见 services/card_metrics.py
+    metrics_updated_at = Column(DateTime)  # 最近一次刷新指标的时间（UTC）
     trial_suggestion = Column(Text)
     status = Column(Enum(TrialStatus), default=TrialStatus.NOT_TRIED, index=True)
     trial_notes = Column(Text)
@@ -42,4 +44,56 @@ class TechCard(Base):
     
     notion_page_id = Column(String(100))
     
-    raw_data = Column(JSON)
\ No newline at end of file
+    raw_data = Column(JSON)
+
+    __table_args__ = (
+        # /cards 按 created_at 倒序分页；推荐候选按 created_at 范围 + quality_score 过滤
+        Index('idx_tech_cards_created_quality', 'created_at', 'quality_score'),
+        # /cards?source=... 按来源过滤后按时间排序，/cards/stats 按来源分组
+        Index('idx_tech_cards_source_created', 'source', 'created_at'),
+    )
+
+
+# 全文检索配置：simple 不做词干化，中日文由三元组索引支持子串匹配
+SEARCH_CONFIG = text("'simple'")
+
+
+def card_search_vector():
+    """
+    标题 + 摘要的全文检索向量（PostgreSQL）
+
+    查询时必须使用与 idx_tech_cards_search_tsv 完全相同的表达式才能命中索引，
+    因此空白和配置名都写成字面量而不是绑定参数。
+    """
+    columns = TechCard.__table__.c
+    return func.to_tsvector(
+        SEARCH_CONFIG,
+        func.coalesce(columns.title, text("''"))
+        + text("' '")
+        + func.coalesce(columns.summary, text("''"))
+    )
+
+
+# 以下索引只在 PostgreSQL 上创建（SQLite 不支持 GIN）
+for _column in ("chinese_tags", "ai_category", "tech_stack"):
+    Index(
+        f"idx_tech_cards_{_column}_gin",
+        TechCard.__table__.c[_column],
+        postgresql_using="gin",
+        postgresql_ops={_column: "jsonb_path_ops"},
+    ).ddl_if(dialect="postgresql")
+
+Index(
+    "idx_tech_cards_search_tsv",
+    card_search_vector(),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+
+# lower(title/summary) LIKE '%...%' 与自动补全的子串匹配
+for _column in ("title", "summary"):
+    Index(
+        f"idx_tech_cards_{_column}_trgm",
+        func.lower(TechCard.__table__.c[_column]).label(f"{_column}_lower"),
+        postgresql_using="gin",
+        postgresql_ops={f"{_column}_lower": "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
@@ -0,0 +1,29 @@
+"""
+卡片指标快照表
+
+定期批量刷新追踪中的卡片（GitHub star/fork、HuggingFace 下载量/点赞数），
+每次刷新写一行，增速由相邻快照增量计算，见 services/card_metrics.py。
+"""
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+
+from ..core.database import Base
+
+
+class CardMetricSnapshot(Base):
+    """一张卡片在某一时刻的上游指标"""
+    __tablename__ = "card_metric_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    card_id = Column(Integer, ForeignKey("tech_cards.id", ondelete="CASCADE"), nullable=False)
+    captured_at = Column(DateTime, nullable=False)  # 刷新时间（UTC）
+    stars = Column(Integer)
+    forks = Column(Integer)
+    downloads = Column(Integer)  # HuggingFace 近 30 天下载量
+    likes = Column(Integer)
+
+    __table_args__ = (
+        # 取每张卡片的最新快照、按时间范围画趋势
+        Index('idx_card_metric_snapshots_card_captured', 'card_id', 'captured_at'),
+        # 按保留期清理
+        Index('idx_card_metric_snapshots_captured', 'captured_at'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, Float, Enum
+from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, Float, Enum, Index
 from sqlalchemy.sql import func
 from ..core.database import Base
 import enum
@@ -65,4 +65,9 @@ class DataSourceHealth(Base):
     items_expected = Column(Integer, default=0)  # 预期采集数
     error_message = Column(Text)  # 错误信息
     duration_seconds = Column(Float)  # 执行耗时（秒）
-    extra_info = Column(Text)  # 额外信息（JSON格式）
\ No newline at end of file
+    extra_info = Column(Text)  # 额外信息（JSON格式）
+
+    __table_args__ = (
+        # 单个数据源的健康记录按时间范围查询/排序
+        Index('idx_data_source_health_source_time', 'source_name', 'check_time'),
+    )
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+持久化任务队列表
+
+API 进程只负责入队，独立的 worker 进程（python -m app.worker）认领并执行，
+见 services/job_queue.py。
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+
+from ..core.database import Base
+
+
+class JobStatus:
+    PENDING = "pending"      # 等待执行（含重试退避中）
+    RUNNING = "running"      # 已被 worker 认领，locked_until 前不会被其他 worker 认领
+    SUCCEEDED = "succeeded"
+    DEAD = "dead"            # 重试次数用完
+
+
+class QueuedJob(Base):
+    """一个待执行的后台任务"""
+    __tablename__ = "job_queue"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)  # 任务类型，对应 services/job_handlers.py 中注册的处理函数
+    payload = Column(Text, nullable=False, default="{}")  # JSON 参数
+    priority = Column(Integer, nullable=False, default=0)  # 越大越先执行
+    status = Column(String(20), nullable=False, default=JobStatus.PENDING)
+
+    # 去重键：未结束（pending/running）的任务中唯一，任务结束时清空以便再次入队。
+    # NULL 不参与唯一约束，SQLite 和 PostgreSQL 行为一致
+    dedup_key = Column(String(255))
+    active_dedup_key = Column(String(255), unique=True)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    available_at = Column(DateTime, nullable=False)  # 最早可执行时间（UTC），重试退避时后移
+    locked_by = Column(String(255))  # 认领的 worker
+    locked_until = Column(DateTime)  # 可见性超时（UTC），worker 崩溃后过期即可被重新认领
+    last_error = Column(Text)
+    result = Column(Text)  # JSON 结果
+
+    created_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # 认领：按状态筛选后按优先级、可执行时间排序
+        Index("idx_job_queue_claim", "status", "priority", "available_at"),
+    )
@@ -0,0 +1,43 @@
+"""
+推荐统计汇总表
+
+由 user_recommendations 增量维护（曝光写入、点击时更新），
+/recommendations/stats 只读这两张按天汇总的表。
+"""
+from sqlalchemy import Column, Integer, String, Date, UniqueConstraint, Index
+from ..core.database import Base
+
+
+class RecommendationDailyStats(Base):
+    """按天 × 用户 × 推荐理由 × 数据源 汇总的曝光/点击数"""
+    __tablename__ = "recommendation_daily_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    stat_date = Column(Date, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    reason = Column(String(20), nullable=False, default='')  # 推荐理由类别：interest/quality/recent/collaborative/other
+    source = Column(String(20), nullable=False, default='')  # github/arxiv/huggingface/zenn
+    impressions = Column(Integer, nullable=False, default=0)
+    clicks = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('stat_date', 'user_id', 'reason', 'source', name='uq_rec_daily_stats'),
+        Index('idx_rec_daily_stats_user', 'user_id', 'stat_date'),
+    )
+
+
+class RecommendationTagDailyStats(Base):
+    """按天 × 用户 × 匹配标签 汇总的曝光/点击数"""
+    __tablename__ = "recommendation_tag_daily_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    stat_date = Column(Date, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    tag = Column(String(100), nullable=False)
+    impressions = Column(Integer, nullable=False, default=0)
+    clicks = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('stat_date', 'user_id', 'tag', name='uq_rec_tag_daily_stats'),
+        Index('idx_rec_tag_daily_stats_user', 'user_id', 'stat_date'),
+    )
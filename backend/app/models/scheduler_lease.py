@@ -0,0 +1,19 @@
+"""
+调度器租约表
+
+多个进程（uvicorn/gunicorn worker、多台主机）共用一行租约选出唯一的调度器 leader，
+见 services/leader_lease.py。
+"""
+from sqlalchemy import Column, String, DateTime
+
+from ..core.database import Base
+
+
+class SchedulerLease(Base):
+    """一个租约：name 对应一种需要单实例运行的后台任务"""
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(100), primary_key=True)
+    holder_id = Column(String(255), nullable=False)  # 持有者：主机名:进程号:随机后缀
+    acquired_at = Column(DateTime, nullable=False)  # 本轮持有开始时间（UTC）
+    expires_at = Column(DateTime, nullable=False)  # 过期时间（UTC），持有者需在此之前续约
@@ -43,6 +43,7 @@ class TechCardUpdate(BaseModel):
 
 class TechCard(TechCardBase):
     id: int
+    growth_rate: Optional[float] = None      # 指标日增速
     created_at: datetime
     updated_at: datetime
     notion_page_id: Optional[str] = None
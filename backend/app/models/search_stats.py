@@ -0,0 +1,27 @@
+"""
+热门搜索快照表
+
+内存中的 Space-Saving 热词草图按天定期持久化到此表，
+重启后从快照恢复，不再对 search_history 做 GROUP BY。
+"""
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class PopularSearchSnapshot(Base):
+    """按天的热门搜索词计数快照（近似值）"""
+    __tablename__ = "popular_search_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_date = Column(Date, nullable=False)
+    query = Column(String(255), nullable=False)  # 归一化后的搜索词
+    display = Column(String(255), nullable=True)  # 最近一次出现的原始写法（用于展示）
+    count = Column(Integer, nullable=False, default=0)  # 估计次数（上界）
+    error = Column(Integer, nullable=False, default=0)  # 估计误差（count - error 为下界）
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('bucket_date', 'query', name='uq_popular_search_snapshot'),
+        Index('idx_popular_search_snapshot_date', 'bucket_date'),
+    )
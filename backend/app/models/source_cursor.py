@@ -0,0 +1,18 @@
+"""
+数据源增量采集游标表
+
+每个上游查询记录已见到的最新时间（high-water mark），采集器只请求比它更新的内容，
+见 services/source_cursors.py。
+"""
+from sqlalchemy import Column, String, DateTime
+
+from ..core.database import Base
+
+
+class SourceCursor(Base):
+    """一个查询范围的游标，例如 arxiv:cs.AI,cs.LG、github:python"""
+    __tablename__ = "source_cursors"
+
+    name = Column(String(200), primary_key=True)
+    position = Column(DateTime, nullable=False)  # 已见到的最新时间（UTC）
+    updated_at = Column(DateTime, nullable=False)  # 最近一次推进的时间（UTC）
@@ -13,7 +13,7 @@ class UserInteraction(Base):
     item_type = Column(String(20), nullable=False)
     action_type = Column(String(20), nullable=False)  # view/click/share/comment
     duration = Column(Integer)  # Duration in seconds
-    metadata = Column(Text)  # Additional data as JSON
+    extra_metadata = Column("metadata", Text)  # Additional data as JSON (attribute name "metadata" is reserved by Declarative)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     __table_args__ = (
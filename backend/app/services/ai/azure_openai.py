@@ -1,8 +1,8 @@
 import json
 import logging
 from typing import Optional, Dict, Any, List
-from openai import AzureOpenAI
 from ...core.config import settings
+from ...core.lazy import LazyProvider
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +26,9 @@ class AzureOpenAIService:
     def _initialize_client(self, api_key: Optional[str] = None, endpoint: Optional[str] = None,
                           api_version: Optional[str] = None, deployment_name: Optional[str] = None):
         """初始化Azure OpenAI客户端 - 优先使用数据库配置"""
+        # openai SDK 导入较慢（约1秒），只在真正创建客户端时导入
+        from openai import AzureOpenAI
+
         try:
             # 如果提供了参数，直接使用（用于测试）
             if api_key and endpoint:
@@ -269,5 +272,5 @@ class AzureOpenAIService:
             return None
 
 
-# 全局实例
-azure_openai_service = AzureOpenAIService()
\ No newline at end of file
+# 全局实例（首次使用时才读取配置、创建客户端）
+azure_openai_service = LazyProvider(AzureOpenAIService, "azure_openai_service")
\ No newline at end of file
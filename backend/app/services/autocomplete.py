@@ -0,0 +1,396 @@
+"""
+搜索自动补全（前缀树）
+
+索引三类词：卡片标签、卡片标题、热门搜索词，按频率加权：
+- 标签：使用该标签的卡片数
+- 标题：1
+- 搜索词：搜索次数
+
+每个节点缓存子树中权重最高的 TOP_K 个词，补全只需沿前缀走到对应节点
+并截取缓存列表，与词表大小无关（单次查询为微秒级）。
+
+首次使用时从数据库构建；之后新卡片入库、标签更新、新的搜索记录通过
+mapper 事件增量更新（只增不减），调度器每天全量重建一次以清理过期词。
+
+归一化：NFKC（全角/半角统一）、小写、合并空白、片假名折叠为平假名；
+中日文不分词，英文/罗马字在空格和标点处额外建立入口，
+因此 "db" 可以补全 "vector db"。
+"""
+import heapq
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from ..models.behavior import SearchHistory
+from ..models.card import TechCard
+from .popular_searches import normalize_query, popular_searches
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 20  # 每个节点缓存的候选数（补全 limit 上限）
+BUCKET_SIZE = 32  # 叶子桶容量，超过后才拆分为子节点
+MAX_DEPTH = 16  # 前缀树最大深度，更长的前缀在该深度节点上按子串过滤
+MAX_ENTRY_POINTS = 4  # 每个词最多的入口数（开头 + 分隔符之后）
+MAX_TEXT_LENGTH = 100
+
+SEPARATORS = set(" -_/.:,()[]|+#@")
+
+KIND_HISTORY = "history"
+KIND_TAG = "tag"
+KIND_TITLE = "title"
+KIND_ORDER = {KIND_HISTORY: 0, KIND_TAG: 1, KIND_TITLE: 2}
+
+# 片假名 -> 平假名（ァ..ヶ）
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def normalize_key(text: Optional[str]) -> str:
+    """补全用的归一化键（在搜索词归一化基础上折叠片假名）"""
+    return normalize_query(text).translate(_KATAKANA_TO_HIRAGANA)
+
+
+def _entry_points(key: str) -> List[int]:
+    points = [0]
+    for i, ch in enumerate(key[:-1]):
+        if ch in SEPARATORS and key[i + 1] not in SEPARATORS:
+            points.append(i + 1)
+            if len(points) >= MAX_ENTRY_POINTS:
+                break
+    return points
+
+
+class _Term:
+    __slots__ = ("kind", "key", "text", "weight")
+
+    def __init__(self, kind: str, key: str, text: str, weight: float = 0.0):
+        self.kind = kind
+        self.key = key
+        self.text = text
+        self.weight = weight
+
+
+class _Node:
+    """
+    前缀树节点（burst trie）
+
+    叶子节点是一个桶，直接保存经过此前缀的入口 (term_id, 入口偏移)；
+    桶超过 BUCKET_SIZE 时按下一个字符拆分为子节点，
+    拆分后 entries 只保留恰好在此深度结束的入口。
+    """
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children: Optional[Dict[str, "_Node"]] = None
+        self.entries: List[Tuple[int, int]] = []
+        self.top: List[int] = []  # 子树中排序最前的 TOP_K 个词
+
+
+class AutocompleteIndex:
+    """带 Top-K 缓存的前缀树"""
+
+    def __init__(self):
+        self._root = _Node()
+        self._terms: List[_Term] = []
+        self._ids: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.RLock()
+        self.built_at: Optional[datetime] = None
+        self.build_seconds = 0.0
+
+    @property
+    def is_built(self) -> bool:
+        return self.built_at is not None
+
+    def _order(self, term_id: int) -> tuple:
+        term = self._terms[term_id]
+        return (-term.weight, KIND_ORDER[term.kind], term.key)
+
+    def _term_id(self, kind: str, text: str) -> Optional[int]:
+        text = " ".join(text.split())[:MAX_TEXT_LENGTH]
+        key = normalize_key(text)
+        if not key:
+            return None
+        term_id = self._ids.get((kind, key))
+        if term_id is None:
+            term_id = len(self._terms)
+            self._terms.append(_Term(kind, key, text))
+            self._ids[(kind, key)] = term_id
+        return term_id
+
+    def _path_char(self, entry: Tuple[int, int], depth: int) -> Optional[str]:
+        """入口在 depth 处的字符，路径在此结束时返回 None"""
+        term_id, start = entry
+        if depth >= MAX_DEPTH:
+            return None
+        key = self._terms[term_id].key
+        position = start + depth
+        return key[position] if position < len(key) else None
+
+    def _insert(self, term_id: int, start: int) -> List[_Node]:
+        """
+        插入一个入口
+
+        Returns:
+            从根到入口所在节点经过的节点
+        """
+        entry = (term_id, start)
+        node = self._root
+        depth = 0
+        visited = [node]
+        while node.children is not None:
+            ch = self._path_char(entry, depth)
+            if ch is None:
+                break
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _Node()
+            node = child
+            depth += 1
+            visited.append(node)
+
+        if entry not in node.entries:
+            node.entries.append(entry)
+        if node.children is None and len(node.entries) > BUCKET_SIZE and depth < MAX_DEPTH:
+            self._burst(node, depth)
+        return visited
+
+    def _burst(self, node: _Node, depth: int):
+        entries = node.entries
+        node.children = {}
+        node.entries = []
+        for entry in entries:
+            ch = self._path_char(entry, depth)
+            if ch is None:
+                node.entries.append(entry)
+                continue
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _Node()
+            child.entries.append(entry)
+        for ch, child in node.children.items():
+            child.top = self._rank({term_id for term_id, _ in child.entries})
+            if len(child.entries) > BUCKET_SIZE and depth + 1 < MAX_DEPTH:
+                self._burst(child, depth + 1)
+
+    def _rank(self, term_ids) -> List[int]:
+        return heapq.nsmallest(TOP_K, term_ids, key=self._order)
+
+    # ---------- 构建 ----------
+
+    def build(self, db: Session):
+        """从数据库全量构建（构建完成后整体替换）"""
+        started = time.perf_counter()
+        fresh = AutocompleteIndex()
+
+        tag_counts: Counter = Counter()
+        for title, tags in db.query(TechCard.title, TechCard.chinese_tags).yield_per(2000):
+            if title:
+                fresh._stage(KIND_TITLE, title, 1)
+            for tag in tags or []:
+                if isinstance(tag, str) and tag.strip():
+                    tag_counts[tag.strip()] += 1
+        for tag, count in tag_counts.items():
+            fresh._stage(KIND_TAG, tag, count)
+
+        for item in popular_searches.top(db, days=popular_searches.max_days,
+                                         limit=popular_searches.capacity):
+            fresh._stage(KIND_HISTORY, item["query"], item["count"])
+
+        fresh._compute_tops()
+
+        with self._lock:
+            self._root = fresh._root
+            self._terms = fresh._terms
+            self._ids = fresh._ids
+            self.built_at = datetime.now()
+            self.build_seconds = time.perf_counter() - started
+
+        logger.info(
+            f"Built autocomplete index: {len(self._terms)} terms in {self.build_seconds:.2f}s"
+        )
+
+    def _stage(self, kind: str, text: str, weight: float):
+        """构建阶段：累加权重并插入入口，不维护 top"""
+        term_id = self._term_id(kind, text)
+        if term_id is None:
+            return
+        term = self._terms[term_id]
+        is_new = term.weight == 0
+        term.weight += weight
+        if is_new:
+            for start in _entry_points(term.key):
+                self._insert(term_id, start)
+
+    def _compute_tops(self):
+        """自底向上合并子节点的 top（迭代后序遍历）"""
+        stack = [(self._root, False)]
+        while stack:
+            node, visited = stack.pop()
+            if not visited and node.children:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+                continue
+            candidates = {term_id for term_id, _ in node.entries}
+            for child in (node.children or {}).values():
+                candidates.update(child.top)
+            node.top = self._rank(candidates)
+
+    def ensure_built(self, db: Session):
+        if self.is_built:
+            return
+        with self._lock:
+            if not self.is_built:
+                self.build(db)
+
+    # ---------- 增量更新 ----------
+
+    def add(self, kind: str, text: Optional[str], weight: float = 1):
+        """
+        增加一个词的权重（只增不减，权重下降由每日重建处理）
+
+        索引尚未构建时忽略，构建时会从数据库读取。
+        """
+        if not text or not self.is_built:
+            return
+        with self._lock:
+            term_id = self._term_id(kind, text)
+            if term_id is None:
+                return
+            term = self._terms[term_id]
+            term.weight += weight
+            order = self._order(term_id)
+
+            for start in _entry_points(term.key):
+                for node in self._insert(term_id, start):
+                    self._promote(node, term_id, order)
+
+    def _promote(self, node: _Node, term_id: int, order: tuple):
+        top = node.top
+        if term_id not in top:
+            if len(top) >= TOP_K and order >= self._order(top[-1]):
+                return
+            top = top + [term_id]
+        # 整体替换列表，读者不加锁也能看到一致的结果
+        node.top = sorted(top, key=self._order)[:TOP_K]
+
+    # ---------- 查询 ----------
+
+    def complete(self, prefix: str, limit: int = 5,
+                 kinds: Optional[List[str]] = None) -> List[Dict]:
+        """
+        前缀补全
+
+        Returns:
+            [{"type", "text", "weight"}]，按权重降序；相同显示文本只保留一条
+        """
+        key = normalize_key(prefix)
+        node = self._root
+        depth = 0
+        while depth < min(len(key), MAX_DEPTH) and node.children is not None:
+            node = node.children.get(key[depth])
+            if node is None:
+                return []
+            depth += 1
+
+        if depth < len(key):
+            if node.children is None and depth < MAX_DEPTH:
+                # 落在桶里：逐个检查桶内入口
+                candidates = self._rank({
+                    term_id for term_id, start in node.entries
+                    if self._terms[term_id].key.startswith(key, start)
+                })
+            else:
+                candidates = [term_id for term_id in node.top if key in self._terms[term_id].key]
+        else:
+            candidates = node.top
+
+        results = []
+        seen = set()
+        for term_id in candidates:
+            term = self._terms[term_id]
+            if kinds and term.kind not in kinds:
+                continue
+            if term.key in seen:
+                continue
+            seen.add(term.key)
+            results.append({"type": term.kind, "text": term.text, "weight": term.weight})
+            if len(results) >= limit:
+                break
+        return results
+
+    def reset(self):
+        """清空索引（测试使用）"""
+        with self._lock:
+            self._root = _Node()
+            self._terms = []
+            self._ids = {}
+            self.built_at = None
+
+    def get_status(self) -> Dict:
+        return {
+            "built_at": self.built_at.isoformat() if self.built_at else None,
+            "build_seconds": round(self.build_seconds, 3),
+            "terms": len(self._terms),
+        }
+
+
+# 单条写入的搜索历史和卡片在 flush 时登记到会话上，事务提交后才加入索引（回滚的插入不计入），
+# 与 popular_searches 相同
+PENDING_KEY = "autocomplete_pending"
+
+
+def _queue(session: Optional[Session], kind: str, text: Optional[str]):
+    if session is not None and text:
+        session.info.setdefault(PENDING_KEY, []).append((kind, text))
+
+
+@event.listens_for(SearchHistory, "after_insert")
+def _history_after_insert(mapper, connection, target):
+    _queue(object_session(target), KIND_HISTORY, target.query)
+
+
+@event.listens_for(TechCard, "after_insert")
+def _card_after_insert(mapper, connection, target):
+    session = object_session(target)
+    _queue(session, KIND_TITLE, target.title)
+    for tag in target.chinese_tags or []:
+        if isinstance(tag, str):
+            _queue(session, KIND_TAG, tag)
+
+
+@event.listens_for(TechCard, "after_update")
+def _card_after_update(mapper, connection, target):
+    session = object_session(target)
+    state = inspect(target)
+
+    title = state.attrs.title.history
+    if title.has_changes() and target.title:
+        _queue(session, KIND_TITLE, target.title)
+
+    tags = state.attrs.chinese_tags.history
+    if tags.has_changes():
+        old = set(tags.deleted[0] or []) if tags.deleted else set()
+        for tag in target.chinese_tags or []:
+            if isinstance(tag, str) and tag not in old:
+                _queue(session, KIND_TAG, tag)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    for kind, text in session.info.pop(PENDING_KEY, ()):
+        autocomplete_index.add(kind, text)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_soft_rollback(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(PENDING_KEY, None)
+
+
+# 全局实例
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,287 @@
+"""
+用户行为汇总与原始记录保留
+
+user_behaviors 的每次写入都会同步累加到按小时、按天的汇总表：
+- 批量上报经写缓冲写入时，由 write_buffer 的 on_flush 钩子在同一事务内累加
+- 通过 ORM 单条写入（/behavior/log）时，由 mapper 事件累加
+
+原始记录只保留最近 behavior_retention_days 天，更早的记录由 compact()
+归档为 gzip JSONL 文件后删除；按小时汇总只保留 behavior_hourly_retention_days 天。
+行为统计、推荐特征只读汇总表。
+"""
+import gzip
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.behavior import UserBehavior, ActionType
+from ..models.behavior_rollup import BehaviorHourlyRollup, BehaviorDailyRollup
+from .counters import upsert_counters
+
+logger = logging.getLogger(__name__)
+
+HOURLY_KEY = ("bucket_start", "user_id", "card_id", "action")
+DAILY_KEY = ("bucket_date", "user_id", "card_id", "action")
+
+
+def _action_value(action) -> str:
+    return action.value if isinstance(action, ActionType) else str(action)
+
+
+def _event_time(created_at) -> datetime:
+    if isinstance(created_at, datetime):
+        # 带时区的时间统一换算为本地时间，与 datetime.now() 写入的记录对齐
+        if created_at.tzinfo is not None:
+            return created_at.astimezone().replace(tzinfo=None)
+        return created_at
+    return datetime.now()
+
+
+def apply_events(connection: Connection, events: Iterable[Dict]):
+    """
+    将行为事件累加到按小时/按天汇总表
+
+    Args:
+        events: [{user_id, action, card_id, duration, created_at}]
+    """
+    hourly: Dict[tuple, Dict[str, int]] = defaultdict(lambda: {"count": 0, "total_duration": 0})
+    daily: Dict[tuple, Dict[str, int]] = defaultdict(lambda: {"count": 0, "total_duration": 0})
+
+    for e in events:
+        created_at = _event_time(e.get("created_at"))
+        action = _action_value(e["action"])
+        card_id = e.get("card_id") or 0
+        duration = e.get("duration") or 0
+
+        hour_key = (created_at.replace(minute=0, second=0, microsecond=0), e["user_id"], card_id, action)
+        hourly[hour_key]["count"] += 1
+        hourly[hour_key]["total_duration"] += duration
+
+        day_key = (created_at.date(), e["user_id"], card_id, action)
+        daily[day_key]["count"] += 1
+        daily[day_key]["total_duration"] += duration
+
+    upsert_counters(connection, BehaviorHourlyRollup, HOURLY_KEY, hourly)
+    upsert_counters(connection, BehaviorDailyRollup, DAILY_KEY, daily)
+
+
+def record_logged(db: Session, rows: List[Dict]):
+    """write_buffer 钩子：批量行为写入后累加汇总（同一事务）"""
+    apply_events(db.connection(), rows)
+
+
+@event.listens_for(UserBehavior, "after_insert")
+def _after_insert(mapper, connection, target):
+    apply_events(connection, [{
+        "user_id": target.user_id,
+        "action": target.action,
+        "card_id": target.card_id,
+        "duration": target.duration,
+        # created_at 由数据库默认值生成时此处尚未加载，按当前时间计入
+        "created_at": target.__dict__.get("created_at"),
+    }])
+
+
+def count_actions(db: Session, user_id: int, since: date) -> Dict[str, int]:
+    """
+    用户自 since（含）以来各行为类型的次数
+
+    Returns:
+        {action: count}
+    """
+    rows = db.query(
+        BehaviorDailyRollup.action,
+        func.sum(BehaviorDailyRollup.count)
+    ).filter(
+        BehaviorDailyRollup.user_id == user_id,
+        BehaviorDailyRollup.bucket_date >= since
+    ).group_by(BehaviorDailyRollup.action).all()
+
+    return {action: int(total or 0) for action, total in rows}
+
+
+def get_card_actions(db: Session, user_id: int, since: date,
+                     actions: Optional[List[ActionType]] = None,
+                     limit: Optional[int] = None) -> List[Dict]:
+    """
+    用户自 since（含）以来对各卡片的行为汇总（推荐特征）
+
+    Returns:
+        [{"card_id", "action": ActionType, "count"}]，按次数降序
+    """
+    total = func.sum(BehaviorDailyRollup.count).label("total")
+    query = db.query(
+        BehaviorDailyRollup.card_id,
+        BehaviorDailyRollup.action,
+        total
+    ).filter(
+        BehaviorDailyRollup.user_id == user_id,
+        BehaviorDailyRollup.bucket_date >= since,
+        BehaviorDailyRollup.card_id != 0
+    )
+    if actions:
+        query = query.filter(BehaviorDailyRollup.action.in_([a.value for a in actions]))
+
+    query = query.group_by(
+        BehaviorDailyRollup.card_id, BehaviorDailyRollup.action
+    ).order_by(total.desc(), BehaviorDailyRollup.card_id)
+    if limit:
+        query = query.limit(limit)
+
+    return [
+        {"card_id": card_id, "action": ActionType(action), "count": int(count)}
+        for card_id, action, count in query.all()
+    ]
+
+
+def rebuild(db: Session, since: Optional[date] = None, batch_size: int = 5000) -> int:
+    """
+    从 user_behaviors 重建汇总表（首次上线或修复数据时使用）
+
+    注意：已超过保留期被归档删除的原始记录无法再重建，since 之前的汇总保持不变。
+
+    Returns:
+        处理的行为记录数
+    """
+    since_time = datetime.combine(since, datetime.min.time()) if since else None
+
+    for model, column, bound in (
+        (BehaviorHourlyRollup, BehaviorHourlyRollup.bucket_start, since_time),
+        (BehaviorDailyRollup, BehaviorDailyRollup.bucket_date, since),
+    ):
+        query = db.query(model)
+        if bound:
+            query = query.filter(column >= bound)
+        query.delete(synchronize_session=False)
+
+    query = db.query(
+        UserBehavior.user_id,
+        UserBehavior.action,
+        UserBehavior.card_id,
+        UserBehavior.duration,
+        UserBehavior.created_at
+    )
+    if since_time:
+        query = query.filter(UserBehavior.created_at >= since_time)
+
+    connection = db.connection()
+    processed = 0
+    batch = []
+    for user_id, action, card_id, duration, created_at in query.yield_per(batch_size):
+        batch.append({
+            "user_id": user_id,
+            "action": action,
+            "card_id": card_id,
+            "duration": duration,
+            "created_at": created_at,
+        })
+        if len(batch) >= batch_size:
+            apply_events(connection, batch)
+            processed += len(batch)
+            batch = []
+    if batch:
+        apply_events(connection, batch)
+        processed += len(batch)
+
+    db.commit()
+    logger.info(f"Rebuilt behavior rollups from {processed} records")
+    return processed
+
+
+def _serialize(behavior: UserBehavior) -> Dict:
+    return {
+        "id": behavior.id,
+        "user_id": behavior.user_id,
+        "action": _action_value(behavior.action),
+        "card_id": behavior.card_id,
+        "query": behavior.query,
+        "duration": behavior.duration,
+        "search_mode": behavior.search_mode,
+        "extra_data": behavior.extra_data,
+        "created_at": behavior.created_at.isoformat() if behavior.created_at else None,
+    }
+
+
+def compact(db: Session, retention_days: Optional[int] = None,
+            hourly_retention_days: Optional[int] = None,
+            archive_dir: Optional[str] = None,
+            batch_size: int = 5000) -> Dict[str, int]:
+    """
+    归档并删除超过保留期的原始行为记录，清理过期的按小时汇总
+
+    汇总表在写入时已同步累加，删除原始记录不影响统计结果。
+
+    Args:
+        retention_days: 原始记录保留天数，默认 settings.behavior_retention_days
+        hourly_retention_days: 按小时汇总保留天数，默认 settings.behavior_hourly_retention_days
+        archive_dir: 归档目录，默认 settings.behavior_archive_dir；为空字符串时不归档直接删除
+        batch_size: 每批处理的记录数
+
+    Returns:
+        {"archived": 归档删除的原始记录数, "hourly_pruned": 删除的按小时汇总行数}
+    """
+    if retention_days is None:
+        retention_days = settings.behavior_retention_days
+    if hourly_retention_days is None:
+        hourly_retention_days = settings.behavior_hourly_retention_days
+    if archive_dir is None:
+        archive_dir = settings.behavior_archive_dir
+
+    now = datetime.now()
+    cutoff = now - timedelta(days=retention_days)
+
+    archive = None
+    archive_path = None
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+        archive_path = os.path.join(archive_dir, f"user_behaviors-{now.strftime('%Y%m%d-%H%M%S')}.jsonl.gz")
+
+    archived = 0
+    last_id = 0
+    try:
+        while True:
+            batch = db.query(UserBehavior).filter(
+                UserBehavior.created_at < cutoff,
+                UserBehavior.id > last_id
+            ).order_by(UserBehavior.id).limit(batch_size).all()
+            if not batch:
+                break
+
+            if archive_path:
+                if archive is None:
+                    archive = gzip.open(archive_path, "wt", encoding="utf-8")
+                for behavior in batch:
+                    archive.write(json.dumps(_serialize(behavior), ensure_ascii=False) + "\n")
+                archive.flush()
+
+            ids = [behavior.id for behavior in batch]
+            last_id = ids[-1]
+            db.query(UserBehavior).filter(UserBehavior.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+            db.expunge_all()
+            archived += len(ids)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    hourly_cutoff = (now - timedelta(days=hourly_retention_days)).replace(minute=0, second=0, microsecond=0)
+    hourly_pruned = db.query(BehaviorHourlyRollup).filter(
+        BehaviorHourlyRollup.bucket_start < hourly_cutoff
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    if archived or hourly_pruned:
+        logger.info(
+            f"Compacted behaviors: archived {archived} raw events"
+            f"{' to ' + archive_path if archived and archive_path else ''}, "
+            f"pruned {hourly_pruned} hourly rollups"
+        )
+    return {"archived": archived, "hourly_pruned": hourly_pruned}
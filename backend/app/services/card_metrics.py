@@ -0,0 +1,247 @@
+"""
+卡片指标刷新与增速计算
+
+质量评分中的 star_growth_rate / download_growth_rate 需要指标随时间的变化，
+采集时只能拿到一个时刻的值。这里定期批量刷新追踪中的卡片并写入快照表：
+- 追踪范围：最近 metric_tracking_days 天内采集的 GitHub 和 HuggingFace 卡片，
+  每次刷新 metric_refresh_batch_size 张，最久未刷新的优先
+- 增速按相邻两次快照增量计算：日增长率 = 增量 / 上次的值 / 间隔天数，
+  再按间隔时间做指数平滑（半衰期 metric_growth_half_life_hours），不需要回扫历史
+- 刷新后更新卡片的 stars/forks、raw_data 中的指标和 growth_rate，并重新计算质量分
+- 超过 metric_snapshot_retention_days 的快照在刷新时清理
+- 选卡和写入各自在线程中用一个短会话完成，请求上游期间不占用数据库连接，也不阻塞事件循环
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.card import SourceType, TechCard
+from ..models.card_metric import CardMetricSnapshot
+from .quality_filter import quality_scorer
+from .scrapers.github import GitHubScraper
+from .scrapers.huggingface import HuggingFaceScraper
+
+logger = logging.getLogger(__name__)
+
+GITHUB_PREFIX = "https://github.com/"
+HF_PREFIX = "https://huggingface.co/"
+
+# 各数据源用于计算增速的指标，以及质量评分中对应的字段
+GROWTH_METRIC = {
+    SourceType.GITHUB: ("stars", "star_growth_rate"),
+    SourceType.HUGGINGFACE: ("downloads", "download_growth_rate"),
+}
+
+
+def metric_target(card: TechCard) -> Optional[Tuple[str, str]]:
+    """
+    卡片在上游的查询目标
+
+    Returns:
+        (github | models | datasets, 仓库名)，无法识别的 URL 返回 None
+    """
+    url = (card.original_url or "").rstrip("/")
+    if card.source == SourceType.GITHUB and url.startswith(GITHUB_PREFIX):
+        parts = url[len(GITHUB_PREFIX):].split("/")
+        return ("github", "/".join(parts[:2])) if len(parts) >= 2 else None
+    if card.source == SourceType.HUGGINGFACE and url.startswith(HF_PREFIX):
+        path = url[len(HF_PREFIX):]
+        if path.startswith("datasets/"):
+            return "datasets", path[len("datasets/"):]
+        return "models", path
+    return None
+
+
+def growth_rate(previous: Optional[int], current: Optional[int], elapsed: timedelta,
+                previous_rate: Optional[float]) -> Optional[float]:
+    """
+    由上一次快照增量更新日增长率
+
+    Args:
+        previous: 上一次快照的指标值，没有快照时为 None
+        current: 本次的指标值
+        elapsed: 两次快照的间隔
+        previous_rate: 上一次的平滑增速
+
+    Returns:
+        新的平滑增速；无法计算时沿用 previous_rate
+    """
+    days = elapsed.total_seconds() / 86400
+    if previous is None or current is None or days <= 0:
+        return previous_rate
+    instant = (current - previous) / max(previous, 1) / days
+    if previous_rate is None:
+        return instant
+    alpha = 1 - 0.5 ** (elapsed.total_seconds() / 3600 / settings.metric_growth_half_life_hours)
+    return previous_rate + alpha * (instant - previous_rate)
+
+
+def scoring_data(card: TechCard) -> Dict[str, Any]:
+    """质量评分的输入：raw_data 加上卡片上的最新指标和增速"""
+    data = dict(card.raw_data) if isinstance(card.raw_data, dict) else {}
+    data.setdefault("title", card.title)
+    data.setdefault("summary", card.summary or "")
+    if card.source == SourceType.GITHUB:
+        data["stars"] = card.stars or 0
+        data["forks"] = card.forks or 0
+    if card.source in GROWTH_METRIC:
+        data[GROWTH_METRIC[card.source][1]] = max(card.growth_rate or 0.0, 0.0)
+    return data
+
+
+class CardMetricTracker:
+    """批量刷新卡片指标"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self.github_scraper = GitHubScraper()
+        self.hf_scraper = HuggingFaceScraper()
+        self.last_refresh: Optional[Dict[str, Any]] = None
+
+    def tracked_cards(self, db: Session, limit: int, now: datetime) -> List[TechCard]:
+        """追踪范围内最久未刷新的卡片"""
+        cutoff = now - timedelta(days=settings.metric_tracking_days)
+        return db.query(TechCard).filter(
+            TechCard.source.in_(list(GROWTH_METRIC)),
+            TechCard.created_at >= cutoff
+        ).order_by(
+            TechCard.metrics_updated_at.asc().nulls_first(), TechCard.id
+        ).limit(limit).all()
+
+    async def fetch_metrics(self, targets: Dict[int, Tuple[str, str]]) -> Dict[int, Dict[str, Any]]:
+        """按数据源分组批量请求上游，返回 {card_id: 指标}"""
+        grouped: Dict[str, Dict[str, List[int]]] = {}
+        for card_id, (kind, name) in targets.items():
+            grouped.setdefault(kind, {}).setdefault(name, []).append(card_id)
+
+        metrics: Dict[int, Dict[str, Any]] = {}
+        for kind, names in grouped.items():
+            if kind == "github":
+                fetched = await self.github_scraper.get_repo_metrics(list(names))
+            else:
+                fetched = await self.hf_scraper.get_repo_metrics(list(names), kind)
+            for name, values in fetched.items():
+                for card_id in names.get(name, []):
+                    metrics[card_id] = values
+        return metrics
+
+    def latest_snapshots(self, db: Session, card_ids: List[int]) -> Dict[int, CardMetricSnapshot]:
+        """每张卡片的最新快照"""
+        if not card_ids:
+            return {}
+        latest = db.query(
+            CardMetricSnapshot.card_id, func.max(CardMetricSnapshot.captured_at).label("captured_at")
+        ).filter(CardMetricSnapshot.card_id.in_(card_ids)).group_by(CardMetricSnapshot.card_id).subquery()
+        snapshots = db.query(CardMetricSnapshot).join(
+            latest,
+            (CardMetricSnapshot.card_id == latest.c.card_id)
+            & (CardMetricSnapshot.captured_at == latest.c.captured_at)
+        ).all()
+        return {snapshot.card_id: snapshot for snapshot in snapshots}
+
+    def apply(self, db: Session, card: TechCard, values: Dict[str, Any],
+              previous: Optional[CardMetricSnapshot], now: datetime) -> CardMetricSnapshot:
+        """写入快照，更新卡片指标、增速和质量分"""
+        snapshot = CardMetricSnapshot(
+            card_id=card.id, captured_at=now,
+            stars=values.get("stars"), forks=values.get("forks"),
+            downloads=values.get("downloads"), likes=values.get("likes"),
+        )
+        db.add(snapshot)
+
+        metric = GROWTH_METRIC[card.source][0]
+        if previous is not None:
+            card.growth_rate = growth_rate(getattr(previous, metric), values.get(metric),
+                                           now - previous.captured_at, card.growth_rate)
+
+        if card.source == SourceType.GITHUB:
+            card.stars = values.get("stars", card.stars)
+            card.forks = values.get("forks", card.forks)
+            card.issues = values.get("open_issues", card.issues)
+        raw = dict(card.raw_data) if isinstance(card.raw_data, dict) else {}
+        raw.update(values)
+        card.raw_data = raw
+        card.metrics_updated_at = now
+        card.quality_score = quality_scorer.score_item(scoring_data(card), card.source.value)
+        return snapshot
+
+    def _select(self, limit: int, now: datetime) -> Tuple[List[int], Dict[int, Tuple[str, str]]]:
+        """本批卡片的 id 和上游查询目标"""
+        db = self.session_factory()
+        try:
+            cards = self.tracked_cards(db, limit, now)
+            return [card.id for card in cards], {card.id: target for card in cards if (target := metric_target(card))}
+        finally:
+            db.close()
+
+    def _store(self, card_ids: List[int], metrics: Dict[int, Dict[str, Any]], now: datetime) -> Tuple[int, int]:
+        """
+        重新读取本批卡片并写入指标，清理过期快照
+
+        Returns:
+            (刷新成功数, 清理的快照数)
+        """
+        db = self.session_factory()
+        try:
+            cards = db.query(TechCard).filter(TechCard.id.in_(card_ids)).all()
+            previous = self.latest_snapshots(db, list(metrics))
+
+            refreshed = 0
+            for card in cards:
+                values = metrics.get(card.id)
+                if values is not None:
+                    self.apply(db, card, values, previous.get(card.id), now)
+                    refreshed += 1
+                else:
+                    # 请求失败或仓库已删除：也标记为已刷新，避免一直排在最前面
+                    card.metrics_updated_at = now
+
+            pruned = db.query(CardMetricSnapshot).filter(
+                CardMetricSnapshot.captured_at < now - timedelta(days=settings.metric_snapshot_retention_days)
+            ).delete(synchronize_session=False)
+            db.commit()
+            return refreshed, pruned
+        finally:
+            db.close()
+
+    async def refresh(self, limit: Optional[int] = None, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        刷新一批卡片的指标
+
+        Returns:
+            本批卡片数、刷新成功数、失败数和清理的过期快照数
+        """
+        limit = limit or settings.metric_refresh_batch_size
+        now = now or datetime.utcnow()
+        card_ids, targets = await asyncio.to_thread(self._select, limit, now)
+        metrics = await self.fetch_metrics(targets)
+        refreshed, pruned = await asyncio.to_thread(self._store, card_ids, metrics, now)
+
+        result = {"cards": len(card_ids), "refreshed": refreshed,
+                  "failed": len(card_ids) - refreshed, "pruned": pruned}
+        self.last_refresh = {**result, "at": now.isoformat()}
+        logger.info(f"Card metrics refreshed: {result}")
+        return result
+
+    def get_status(self) -> Dict[str, Any]:
+        db = self.session_factory()
+        try:
+            return {
+                "snapshots": db.query(func.count(CardMetricSnapshot.id)).scalar(),
+                "cards_with_growth": db.query(func.count(TechCard.id)).filter(
+                    TechCard.growth_rate.isnot(None)
+                ).scalar(),
+                "last_refresh": self.last_refresh,
+            }
+        finally:
+            db.close()
+
+
+# 全局指标刷新器
+card_metric_tracker = CardMetricTracker()
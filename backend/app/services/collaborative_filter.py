@@ -0,0 +1,389 @@
+"""
+协同过滤推荐（矩阵分解）
+
+离线：从行为汇总表 / user_favorites / recommendation_history 构建
+用户×卡片隐式反馈稀疏矩阵，使用 ALS（Hu, Koren & Volinsky 2008）分解，
+将 float32 的用户/物品因子写入 .npz 文件。
+
+在线：加载因子文件，对候选卡片做点积打分。
+
+依赖 NumPy / SciPy（pyproject 的 cf 可选依赖：poetry install -E cf），均为延迟导入；
+未安装或模型文件不存在时，在线打分返回空结果，推荐接口自动退化为纯内容推荐。
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.behavior import ActionType
+from ..models.behavior_rollup import BehaviorDailyRollup
+from ..models.recommendation_history import RecommendationHistory
+from ..models.user_favorite import UserFavorite
+
+logger = logging.getLogger(__name__)
+
+
+# 各行为的隐式反馈权重（取消收藏为负，用于抵消收藏）
+ACTION_WEIGHTS: Dict[ActionType, float] = {
+    ActionType.CLICK: 1.0,
+    ActionType.VIEW: 0.5,
+    ActionType.FAVORITE: 4.0,
+    ActionType.UNFAVORITE: -4.0,
+    ActionType.SHARE: 3.0,
+    ActionType.SEARCH: 0.0,  # 搜索不关联卡片
+}
+
+FAVORITE_WEIGHT = 4.0             # user_favorites 中的收藏
+RECOMMENDATION_CLICK_WEIGHT = 1.0  # 推荐被点击
+RECOMMENDATION_LIKE_WEIGHT = 3.0   # 推荐被点赞
+
+
+def _numpy():
+    import numpy as np
+    return np
+
+
+def _sparse():
+    import scipy.sparse as sp
+    return sp
+
+
+class InteractionMatrixBuilder:
+    """用户×卡片隐式反馈矩阵构建器"""
+
+    def __init__(self, days: Optional[int] = None):
+        """
+        Args:
+            days: 只使用最近N天的数据，None 表示全部
+        """
+        self.days = days
+
+    def collect(self, db: Session) -> Dict[Tuple[int, int], float]:
+        """
+        汇总三张表的行为，返回 {(user_id, card_id): weight}
+        """
+        cutoff = datetime.now() - timedelta(days=self.days) if self.days else None
+        weights: Dict[Tuple[int, int], float] = {}
+
+        def add(user_id, card_id, weight):
+            if user_id is None or card_id is None or not weight:
+                return
+            key = (int(user_id), int(card_id))
+            weights[key] = weights.get(key, 0.0) + weight
+
+        # 1. 行为日志（读按天汇总表，原始记录超过保留期会被归档删除）
+        query = db.query(
+            BehaviorDailyRollup.user_id,
+            BehaviorDailyRollup.card_id,
+            BehaviorDailyRollup.action,
+            BehaviorDailyRollup.count
+        ).filter(BehaviorDailyRollup.card_id != 0)
+        if cutoff:
+            query = query.filter(BehaviorDailyRollup.bucket_date >= cutoff.date())
+        for user_id, card_id, action, count in query.yield_per(10000):
+            add(user_id, card_id, ACTION_WEIGHTS.get(ActionType(action), 0.0) * count)
+
+        # 2. 收藏
+        query = db.query(UserFavorite.user_id, UserFavorite.item_id)
+        if cutoff:
+            query = query.filter(UserFavorite.created_at >= cutoff)
+        for user_id, item_id in query.yield_per(10000):
+            add(user_id, item_id, FAVORITE_WEIGHT)
+
+        # 3. 推荐历史（只使用正反馈）
+        query = db.query(
+            RecommendationHistory.user_id,
+            RecommendationHistory.item_id,
+            RecommendationHistory.is_clicked,
+            RecommendationHistory.is_liked
+        ).filter(
+            (RecommendationHistory.is_clicked == True) | (RecommendationHistory.is_liked == True)
+        )
+        if cutoff:
+            query = query.filter(RecommendationHistory.shown_at >= cutoff)
+        for user_id, item_id, is_clicked, is_liked in query.yield_per(10000):
+            weight = 0.0
+            if is_clicked:
+                weight += RECOMMENDATION_CLICK_WEIGHT
+            if is_liked:
+                weight += RECOMMENDATION_LIKE_WEIGHT
+            add(user_id, item_id, weight)
+
+        # 净权重<=0（如收藏后取消）的交互不作为正反馈
+        return {key: w for key, w in weights.items() if w > 0}
+
+    @staticmethod
+    def to_matrix(interactions: Dict[Tuple[int, int], float]):
+        """
+        将交互字典转换为 CSR 矩阵
+
+        Returns:
+            (matrix, user_ids, item_ids) - matrix[i, j] 对应 user_ids[i] × item_ids[j]
+        """
+        np = _numpy()
+        sp = _sparse()
+
+        if not interactions:
+            empty = np.zeros(0, dtype=np.int64)
+            return sp.csr_matrix((0, 0), dtype=np.float32), empty, empty
+
+        keys = np.fromiter(
+            (k for pair in interactions.keys() for k in pair),
+            dtype=np.int64,
+            count=len(interactions) * 2
+        ).reshape(-1, 2)
+        values = np.fromiter(interactions.values(), dtype=np.float32, count=len(interactions))
+        return InteractionMatrixBuilder.from_arrays(keys[:, 0], keys[:, 1], values)
+
+    @staticmethod
+    def from_arrays(user_col, item_col, values):
+        """
+        由 (user_id, card_id, weight) 三列数组构建 CSR 矩阵，重复项自动累加
+        """
+        np = _numpy()
+        sp = _sparse()
+
+        user_ids, user_idx = np.unique(np.asarray(user_col, dtype=np.int64), return_inverse=True)
+        item_ids, item_idx = np.unique(np.asarray(item_col, dtype=np.int64), return_inverse=True)
+        matrix = sp.csr_matrix(
+            (np.asarray(values, dtype=np.float32), (user_idx, item_idx)),
+            shape=(len(user_ids), len(item_ids))
+        )
+        matrix.sum_duplicates()
+        return matrix, user_ids, item_ids
+
+    def build(self, db: Session):
+        return self.to_matrix(self.collect(db))
+
+
+class ALSTrainer:
+    """隐式反馈 ALS 矩阵分解"""
+
+    def __init__(self, factors: int = 32, regularization: float = 0.05,
+                 alpha: float = 20.0, iterations: int = 15, cg_steps: int = 3,
+                 seed: int = 42):
+        """
+        Args:
+            factors: 隐向量维度
+            regularization: L2 正则系数
+            alpha: 置信度系数，c = 1 + alpha * r
+            iterations: 交替迭代轮数
+            cg_steps: 每轮共轭梯度步数
+            seed: 随机种子
+        """
+        self.factors = factors
+        self.regularization = regularization
+        self.alpha = alpha
+        self.iterations = iterations
+        self.cg_steps = cg_steps
+        self.seed = seed
+
+    def fit(self, matrix):
+        """
+        训练模型
+
+        Args:
+            matrix: 用户×物品 CSR 矩阵（值为隐式反馈强度）
+
+        Returns:
+            (user_factors, item_factors) - float32 数组
+        """
+        np = _numpy()
+
+        rng = np.random.default_rng(self.seed)
+        n_users, n_items = matrix.shape
+        user_factors = (rng.standard_normal((n_users, self.factors)) * 0.01).astype(np.float32)
+        item_factors = (rng.standard_normal((n_items, self.factors)) * 0.01).astype(np.float32)
+
+        confidence = matrix.tocsr().astype(np.float32)
+        confidence.data = confidence.data * self.alpha
+        confidence_t = confidence.T.tocsr()
+
+        for iteration in range(self.iterations):
+            self._solve(confidence, user_factors, item_factors)
+            self._solve(confidence_t, item_factors, user_factors)
+            logger.debug(f"ALS iteration {iteration + 1}/{self.iterations} done")
+
+        return user_factors, item_factors
+
+    def _solve(self, confidence, target, fixed):
+        """
+        固定 fixed，求解 target 的每一行：
+        (YᵀY + Yᵀ(Cu - I)Y + λI) x_u = Yᵀ Cu p_u
+
+        对所有行同时做若干步共轭梯度（以上一轮结果为初值），
+        每步只需一次稀疏矩阵乘法，避免逐行构造和求解 k×k 方程组。
+        """
+        np = _numpy()
+        sp = _sparse()
+
+        indptr, indices = confidence.indptr, confidence.indices
+        conf = confidence.data  # 即 c - 1
+        shape = confidence.shape
+        rows = np.repeat(np.arange(shape[0]), np.diff(indptr))
+        y_cols = fixed[indices]
+        gram = fixed.T @ fixed + self.regularization * np.eye(self.factors, dtype=np.float32)
+
+        def apply(x):
+            dots = np.einsum("ij,ij->i", y_cols, x[rows])
+            weighted = sp.csr_matrix((conf * dots, indices, indptr), shape=shape)
+            return x @ gram + weighted @ fixed
+
+        b = sp.csr_matrix((conf + 1.0, indices, indptr), shape=shape) @ fixed
+        x = target
+        r = b - apply(x)
+        p = r.copy()
+        rs_old = np.einsum("ij,ij->i", r, r)
+
+        for _ in range(self.cg_steps):
+            ap = apply(p)
+            denom = np.einsum("ij,ij->i", p, ap)
+            step = np.divide(rs_old, denom, out=np.zeros_like(rs_old), where=denom > 1e-12)
+            x += step[:, None] * p
+            r -= step[:, None] * ap
+            rs_new = np.einsum("ij,ij->i", r, r)
+            beta = np.divide(rs_new, rs_old, out=np.zeros_like(rs_new), where=rs_old > 1e-12)
+            p = r + beta[:, None] * p
+            rs_old = rs_new
+
+
+class CollaborativeFilterModel:
+    """协同过滤因子存储（在线打分）"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.user_factors = None
+        self.item_factors = None
+        self._user_index: Dict[int, int] = {}
+        self._item_index: Dict[int, int] = {}
+        self._loaded_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_path(self) -> str:
+        return self.path or settings.cf_model_path
+
+    @staticmethod
+    def save(path: str, user_ids, item_ids, user_factors, item_factors):
+        """保存因子文件（float32 因子 + int64 ID 映射）"""
+        np = _numpy()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                user_ids=np.asarray(user_ids, dtype=np.int64),
+                item_ids=np.asarray(item_ids, dtype=np.int64),
+                user_factors=np.asarray(user_factors, dtype=np.float32),
+                item_factors=np.asarray(item_factors, dtype=np.float32),
+            )
+        os.replace(tmp_path, path)
+
+    def _ensure_loaded(self) -> bool:
+        """按需加载，文件更新后自动重新加载"""
+        path = self.model_path
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return False
+
+        if self._loaded_mtime == mtime:
+            return True
+
+        with self._lock:
+            if self._loaded_mtime == mtime:
+                return True
+            try:
+                np = _numpy()
+                with np.load(path) as data:
+                    self.user_factors = data["user_factors"]
+                    self.item_factors = data["item_factors"]
+                    user_ids = data["user_ids"]
+                    item_ids = data["item_ids"]
+                self._user_index = {int(uid): i for i, uid in enumerate(user_ids)}
+                self._item_index = {int(iid): i for i, iid in enumerate(item_ids)}
+                self._loaded_mtime = mtime
+                logger.info(
+                    f"Loaded CF model: {len(self._user_index)} users, {len(self._item_index)} items"
+                )
+                return True
+            except ImportError:
+                logger.warning("NumPy not installed (poetry install -E cf), collaborative filtering disabled")
+            except Exception as e:
+                logger.error(f"Failed to load CF model from {path}: {e}")
+            return False
+
+    def is_available(self) -> bool:
+        return self._ensure_loaded()
+
+    def has_user(self, user_id: int) -> bool:
+        return self._ensure_loaded() and user_id in self._user_index
+
+    def score(self, user_id: int, card_ids: Iterable[int]) -> Dict[int, float]:
+        """
+        对候选卡片点积打分
+
+        Returns:
+            {card_id: score}，分数截断到 0-1；未知用户返回空字典，未知卡片不出现在结果中
+        """
+        if not self._ensure_loaded():
+            return {}
+
+        user_row = self._user_index.get(user_id)
+        if user_row is None:
+            return {}
+
+        known = [(cid, self._item_index[cid]) for cid in card_ids if cid in self._item_index]
+        if not known:
+            return {}
+
+        np = _numpy()
+        rows = np.fromiter((row for _, row in known), dtype=np.int64, count=len(known))
+        scores = np.clip(self.item_factors[rows] @ self.user_factors[user_row], 0.0, 1.0)
+        return {cid: float(s) for (cid, _), s in zip(known, scores)}
+
+
+def train_and_save(db: Session, path: Optional[str] = None, days: Optional[int] = None,
+                   **trainer_kwargs) -> Dict[str, float]:
+    """
+    构建矩阵、训练并保存模型
+
+    Returns:
+        训练统计信息
+    """
+    path = path or settings.cf_model_path
+
+    start = time.perf_counter()
+    matrix, user_ids, item_ids = InteractionMatrixBuilder(days=days).build(db)
+    build_seconds = time.perf_counter() - start
+
+    if matrix.nnz == 0:
+        logger.warning("No interactions found, CF model not trained")
+        return {"users": 0, "items": 0, "interactions": 0}
+
+    start = time.perf_counter()
+    user_factors, item_factors = ALSTrainer(**trainer_kwargs).fit(matrix)
+    train_seconds = time.perf_counter() - start
+
+    CollaborativeFilterModel.save(path, user_ids, item_ids, user_factors, item_factors)
+
+    return {
+        "users": len(user_ids),
+        "items": len(item_ids),
+        "interactions": int(matrix.nnz),
+        "build_seconds": round(build_seconds, 2),
+        "train_seconds": round(train_seconds, 2),
+        "model_bytes": os.path.getsize(path),
+    }
+
+
+# 全局单例（在线打分用）
+cf_model = CollaborativeFilterModel()
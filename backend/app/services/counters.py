@@ -0,0 +1,68 @@
+"""
+汇总表计数累加
+
+各类按时间分桶的汇总表（推荐统计、行为汇总等）共用：
+按唯一键把增量加到计数列上，不存在则插入。
+"""
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.engine import Connection
+
+
+def upsert_counters(connection: Connection, model, key_columns: Tuple[str, ...],
+                    counts: Dict[tuple, Dict[str, int]],
+                    values: Optional[Dict[tuple, Dict[str, Any]]] = None):
+    """
+    按唯一键累加计数列
+
+    SQLite / PostgreSQL 使用 INSERT ... ON CONFLICT DO UPDATE；
+    其他数据库退化为先 UPDATE、无命中再 INSERT。
+
+    Args:
+        model: 汇总表模型，key_columns 上需有唯一约束
+        key_columns: 唯一键列名
+        counts: {唯一键元组: {计数列名: 增量}}，全为0的项会被跳过
+        values: {唯一键元组: {列名: 值}}，非计数列，插入时写入、已存在时覆盖（如展示文本）
+    """
+    values = values or {}
+    rows = [
+        {**dict(zip(key_columns, key)), **increments, **values.get(key, {})}
+        for key, increments in counts.items()
+        if any(increments.values())
+    ]
+    if not rows:
+        return
+
+    table = model.__table__
+    counter_columns = list(next(iter(counts.values())).keys())
+    value_columns = [col for col in rows[0] if col not in key_columns and col not in counter_columns]
+
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        stmt = dialect_insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={
+                **{col: table.c[col] + stmt.excluded[col] for col in counter_columns},
+                **{col: stmt.excluded[col] for col in value_columns},
+            }
+        )
+        connection.execute(stmt)
+        return
+
+    for row in rows:
+        condition = [table.c[col] == row[col] for col in key_columns]
+        result = connection.execute(
+            update(table).where(*condition).values(
+                **{col: table.c[col] + row[col] for col in counter_columns},
+                **{col: row[col] for col in value_columns}
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(**row))
@@ -1,11 +1,12 @@
 import asyncio
-from typing import List, Dict
+from typing import List, Dict, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
 from ..models.card import TechCard, SourceType
 from ..models.config import DataSourceHealth, HealthStatus
 from ..core.database import SessionLocal
 from .scrapers import GitHubScraper, ArxivScraper, HuggingFaceScraper, ZennScraper
+from .source_cursors import advance_cursor, fetch_incremental
 from .ai.azure_openai import azure_openai_service
 from ..core.config import settings
 import logging
@@ -72,20 +73,32 @@ class DataCollector:
         
         return results
     
-    async def collect_github_data(self) -> int:
+    async def collect_github_data(self, language: Optional[str] = "python", min_stars: int = 0) -> int:
         """
         收集 GitHub 数据 - 优化为获取每日最新trending项目
+
+        Args:
+            language: 编程语言，None 表示不限语言
+            min_stars: 最低星数（采集计划中取订阅用户的最小值）
         """
         start_time = datetime.now()
         db = SessionLocal()
 
         try:
-            # 使用新的每日trending算法获取最新项目
-            daily_trending = await self.github_scraper.get_daily_trending_repos(language="python", limit=25)
-            ai_repos = await self.github_scraper.get_ai_python_repos(since="daily")
+            async def fetch(since):
+                # 使用新的每日trending算法获取最新项目；有游标时只查询游标之后推送的项目
+                daily_trending = await self.github_scraper.get_daily_trending_repos(
+                    language=language, limit=25, pushed_since=since, min_stars=min_stars
+                )
+                # AI 项目的搜索固定为 Python
+                ai_repos = await self.github_scraper.get_ai_python_repos(
+                    since="daily", pushed_since=since, min_stars=min_stars
+                ) if language == "python" else []
+                return daily_trending + ai_repos
 
-            # 合并并去重
-            all_repos = daily_trending + ai_repos
+            # 合并并去重；min_stars 在搜索条件中，不同门槛的查询结果不同，各用一个游标
+            cursor = f"github:{language or '*'}" + (f":stars>={min_stars}" if min_stars else "")
+            all_repos, mark = await fetch_incremental(cursor, fetch, "pushed_at")
             unique_repos = list({repo["url"]: repo for repo in all_repos}.values())
 
             # 按trending得分和更新时间排序，确保获取最新内容
@@ -146,6 +159,7 @@ class DataCollector:
                     saved_count += 1
             
             db.commit()
+            advance_cursor(cursor, mark)
 
             # 记录成功的健康状态
             duration = (datetime.now() - start_time).total_seconds()
@@ -166,13 +180,19 @@ class DataCollector:
             logger.error(f"Error collecting GitHub data: {e}")
             return 0
     
-    async def collect_arxiv_data(self) -> int:
+    async def collect_arxiv_data(self, categories: Optional[List[str]] = None) -> int:
         """
         收集 arXiv 数据 - 改进版，只获取一个月内的论文并进行AI分析
+
+        Args:
+            categories: arXiv 分类，None 表示默认的 AI 相关分类
         """
         try:
-            # 获取最近30天内的论文
-            papers = await self.arxiv_scraper.get_recent_papers(max_results=25, days_back=30)
+            # 获取最近30天内的论文；有游标时只请求游标之后提交的论文
+            cursor = f"arxiv:{','.join(sorted(categories)) if categories else '*'}"
+            papers, mark = await fetch_incremental(cursor, lambda since: self.arxiv_scraper.get_recent_papers(
+                categories=categories, max_results=25, days_back=30, submitted_since=since
+            ), "published")
             db = SessionLocal()
             
             saved_count = 0
@@ -228,6 +248,7 @@ class DataCollector:
             
             db.commit()
             db.close()
+            advance_cursor(cursor, mark)
             
             logger.info(f"Collected {saved_count} arXiv papers from last 30 days")
             return saved_count
@@ -236,18 +257,35 @@ class DataCollector:
             logger.error(f"Error collecting arXiv data: {e}")
             return 0
     
-    async def collect_huggingface_data(self) -> int:
+    async def collect_huggingface_data(self, task: Optional[str] = None) -> int:
         """
         收集 HuggingFace 数据
+
+        Args:
+            task: pipeline tag（如 text-generation），None 表示不限任务
         """
         try:
-            # 收集热门模型和每日trending模型
-            trending_models = await self.hf_scraper.get_trending_models(limit=15)
-            daily_models = await self.hf_scraper.get_daily_trending_models(limit=15)
-            datasets = await self.hf_scraper.get_trending_datasets(limit=10)
+            async def fetch_models(since):
+                if since:
+                    # 增量：只请求游标之后更新的模型
+                    return await self.hf_scraper.get_recently_modified("models", task=task, modified_since=since)
+                # 首次运行：收集热门模型和每日trending模型（每日trending不支持按任务过滤）
+                trending_models = await self.hf_scraper.get_trending_models(task=task, limit=15)
+                daily_models = await self.hf_scraper.get_daily_trending_models(limit=15) if task is None else []
+                return trending_models + daily_models
+
+            async def fetch_datasets(since):
+                if since:
+                    return await self.hf_scraper.get_recently_modified("datasets", task=task, modified_since=since)
+                return await self.hf_scraper.get_trending_datasets(task=task, limit=10)
+
+            models_cursor = f"huggingface:models:{task or '*'}"
+            datasets_cursor = f"huggingface:datasets:{task or '*'}"
+            models, models_mark = await fetch_incremental(models_cursor, fetch_models, "last_modified")
+            datasets, datasets_mark = await fetch_incremental(datasets_cursor, fetch_datasets, "last_modified")
             
             # 合并并去重
-            all_items = trending_models + daily_models + datasets
+            all_items = models + datasets
             unique_items = {item["url"]: item for item in all_items}.values()
             
             db = SessionLocal()
@@ -308,6 +346,8 @@ class DataCollector:
             
             db.commit()
             db.close()
+            advance_cursor(models_cursor, models_mark)
+            advance_cursor(datasets_cursor, datasets_mark)
             
             logger.info(f"Collected {saved_count} HuggingFace items")
             return saved_count
@@ -321,16 +361,22 @@ class DataCollector:
         收集 Zenn 数据 - 改进版，获取最近30天的活跃文章
         """
         try:
-            # 使用新的最近文章方法获取一个月内的文章
-            recent_articles = await self.zenn_scraper.get_recent_articles(days=30)
-            tech_articles = await self.zenn_scraper.get_tech_articles(limit=10)
+            async def fetch(since):
+                if since:
+                    # 增量：只翻到游标之前的文章为止
+                    return await self.zenn_scraper.get_articles_since(since)
+                # 使用新的最近文章方法获取一个月内的文章
+                recent_articles = await self.zenn_scraper.get_recent_articles(days=30)
+                tech_articles = await self.zenn_scraper.get_tech_articles(limit=10)
+                return recent_articles + tech_articles
             
             # 合并并去重
-            all_articles = recent_articles + tech_articles
+            all_articles, mark = await fetch_incremental("zenn:articles", fetch, "published_at")
             unique_articles = {article["url"]: article for article in all_articles}.values()
             
             db = SessionLocal()
             saved_count = 0
+            failed_count = 0
 
             for article in unique_articles:
                 try:
@@ -419,9 +465,13 @@ class DataCollector:
                 except Exception as e:
                     logger.error(f"Error processing Zenn article {article.get('title', 'Unknown')[:50]}: {e}")
                     db.rollback()
+                    failed_count += 1
                     continue
 
             db.close()
+            # 有文章保存失败时游标不动，下次重新抓取（已保存的按 URL 跳过）
+            if not failed_count:
+                advance_cursor("zenn:articles", mark)
             
             logger.info(f"Collected {saved_count} Zenn articles")
             return saved_count
@@ -0,0 +1,165 @@
+"""
+按优先级排序的 AI 增强积压队列
+
+替代调度器中无序的 LIMIT 20/50 扫描：未增强的卡片按优先级写入任务队列
+（每张卡片一个 enrich_card 任务，dedup_key 去重），由 worker 持续消费直到清空。
+- 优先级分（0~100）= 质量分（40）+ 新鲜度（30，每 24 小时减半）+ 用户兴趣重合度（30）
+- 用户在界面上对单张卡片的增强请求（/ai/enhance-card）使用 PRIORITY_USER_REQUEST，排在所有积压之前
+- 补充（refill）定期执行，已在队列中的卡片按重新计算的分数提升优先级
+- LLM 预算：最近一小时成功增强的卡片数达到 enrichment_budget_per_hour 后，
+  积压任务延后到预算恢复再执行（显式请求不受限制，但计入预算）
+"""
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.card import TechCard
+from ..models.job_queue import JobStatus, QueuedJob
+from ..models.user_preference import UserPreference
+from .job_queue import JobQueue, job_queue
+
+logger = logging.getLogger(__name__)
+
+ENRICH_KIND = "enrich_card"
+
+QUALITY_WEIGHT = 40
+RECENCY_WEIGHT = 30
+INTEREST_WEIGHT = 30
+RECENCY_HALF_LIFE_HOURS = 24
+
+
+def enrich_dedup_key(card_id: int) -> str:
+    return f"{ENRICH_KIND}:{card_id}"
+
+
+def needs_enrichment():
+    """未增强卡片的过滤条件"""
+    return TechCard.summary.is_(None) | (TechCard.summary == "")
+
+
+def interest_weights(db: Session) -> Dict[str, float]:
+    """所有用户偏好标签的权重之和，归一化到最大值为 1"""
+    rows = db.query(
+        func.lower(UserPreference.preference_value), func.sum(UserPreference.weight)
+    ).group_by(func.lower(UserPreference.preference_value)).all()
+    weights = {value: float(total or 0) for value, total in rows if value}
+    top = max(weights.values(), default=0)
+    return {value: weight / top for value, weight in weights.items()} if top > 0 else {}
+
+
+def card_terms(card: TechCard) -> Set[str]:
+    """卡片上可与用户兴趣匹配的词：标签、技术栈、分类和上游元数据"""
+    terms: List[Any] = []
+    for field in (card.chinese_tags, card.tech_stack, card.ai_category):
+        if isinstance(field, list):
+            terms.extend(field)
+    raw = card.raw_data if isinstance(card.raw_data, dict) else {}
+    for key in ("topics", "categories", "tags"):
+        if isinstance(raw.get(key), list):
+            terms.extend(raw[key])
+    for key in ("language", "pipeline_tag", "keyword"):
+        if raw.get(key):
+            terms.append(raw[key])
+    return {str(term).strip().lower() for term in terms if term}
+
+
+def enrichment_priority(card: TechCard, interests: Dict[str, float],
+                        now: Optional[datetime] = None) -> int:
+    """卡片的增强优先级分（0~100）"""
+    now = now or datetime.now(timezone.utc)
+    quality = min(max(card.quality_score or 0.0, 0.0), 10.0) / 10.0
+
+    created_at = card.created_at or now
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age_hours = max((now - created_at).total_seconds() / 3600, 0.0)
+    recency = 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+
+    overlap = min(sum(interests.get(term, 0.0) for term in card_terms(card)), 1.0)
+
+    return round(QUALITY_WEIGHT * quality + RECENCY_WEIGHT * recency + INTEREST_WEIGHT * overlap)
+
+
+def refill(db: Session, limit: Optional[int] = None, queue: JobQueue = job_queue) -> Dict[str, int]:
+    """
+    把未增强的卡片按优先级写入任务队列
+
+    只扫描最近 enrichment_backlog_max_age_days 天内的卡片，先按质量分取 limit 张候选。
+
+    Returns:
+        候选数、新入队数和提升了优先级的任务数
+    """
+    limit = limit or settings.enrichment_backlog_scan_limit
+    cutoff = datetime.utcnow() - timedelta(days=settings.enrichment_backlog_max_age_days)
+    cards = db.query(TechCard).filter(
+        needs_enrichment(), TechCard.created_at >= cutoff
+    ).order_by(TechCard.quality_score.desc(), TechCard.created_at.desc()).limit(limit).all()
+
+    interests = interest_weights(db)
+    now = datetime.now(timezone.utc)
+    result = queue.enqueue_many(db, ENRICH_KIND, (
+        ({"card_id": card.id}, enrichment_priority(card, interests, now), enrich_dedup_key(card.id))
+        for card in cards
+    ))
+    result["candidates"] = len(cards)
+    if result["created"] or result["raised"]:
+        logger.info(f"Enrichment backlog refilled: {result}")
+    return result
+
+
+def budget_remaining(db: Session, now: Optional[datetime] = None) -> Optional[int]:
+    """最近一小时内剩余的增强次数；enrichment_budget_per_hour 为 0 时不限制（返回 None）"""
+    if not settings.enrichment_budget_per_hour:
+        return None
+    now = now or datetime.utcnow()
+    used = db.query(func.count(QueuedJob.id)).filter(
+        QueuedJob.kind == ENRICH_KIND,
+        QueuedJob.status == JobStatus.SUCCEEDED,
+        QueuedJob.finished_at >= now - timedelta(hours=1)
+    ).scalar()
+    return max(settings.enrichment_budget_per_hour - used, 0)
+
+
+def budget_retry_after(db: Session, now: Optional[datetime] = None) -> float:
+    """预算用完时到最早一次增强移出一小时窗口的秒数"""
+    now = now or datetime.utcnow()
+    oldest = db.query(func.min(QueuedJob.finished_at)).filter(
+        QueuedJob.kind == ENRICH_KIND,
+        QueuedJob.status == JobStatus.SUCCEEDED,
+        QueuedJob.finished_at >= now - timedelta(hours=1)
+    ).scalar()
+    if oldest is None:
+        return 60.0
+    return max((oldest + timedelta(hours=1) - now).total_seconds(), 1.0)
+
+
+def get_status(db: Session) -> Dict[str, Any]:
+    pending = db.query(func.count(QueuedJob.id)).filter(
+        QueuedJob.kind == ENRICH_KIND,
+        QueuedJob.status.in_([JobStatus.PENDING, JobStatus.RUNNING])
+    ).scalar()
+    top = db.query(QueuedJob.payload, QueuedJob.priority).filter(
+        QueuedJob.kind == ENRICH_KIND, QueuedJob.status == JobStatus.PENDING
+    ).order_by(QueuedJob.priority.desc(), QueuedJob.available_at).limit(10).all()
+    return {
+        "queued": pending,
+        "unenriched_cards": db.query(func.count(TechCard.id)).filter(needs_enrichment()).scalar(),
+        "budget_per_hour": settings.enrichment_budget_per_hour or None,
+        "budget_remaining": budget_remaining(db),
+        "next": [{**json.loads(payload), "priority": priority} for payload, priority in top],
+    }
+
+
+def explicit_payload(card_id: int) -> Dict[str, Any]:
+    """用户显式请求的增强任务参数（不受预算限制）"""
+    return {"card_id": card_id, "explicit": True}
+
+
+def is_explicit(payload: Dict[str, Any]) -> bool:
+    return bool(payload.get("explicit"))
+
@@ -0,0 +1,224 @@
+"""
+按用户数据源配置编译的采集计划
+
+DataSourceConfig 中的兴趣（config_data）和定时（schedule_*）编译为去重的采集计划：
+- 采集单元：一个数据源上的一个上游查询，例如 GitHub 的某个语言、arXiv 的某个分类、
+  HuggingFace 的某个 pipeline tag；兴趣重叠的用户共享同一个单元，只抓取一次
+- 单元的节奏取订阅者中最频繁的一个（hourly > daily > weekly），同频率时取最早的时刻；
+  用户时区的时刻换算为服务器本地时刻（weekly 固定在用户时区的周一）
+- GitHub 单元的 min_stars 取订阅者中的最小值，保证每个用户需要的项目都会被抓到
+- 同一数据源、同一节奏的单元合并为一个计划，调度器为每个计划注册一个任务，
+  各数据源按各自的节奏运行
+
+配置变更后由 TaskScheduler.reload_fetch_plans() 重新编译并增删任务，无需重启。
+"""
+import json
+import logging
+from datetime import date, datetime, time as dt_time, timedelta, tzinfo
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy.orm import Session
+
+from ..models.user_settings import DataSourceConfig
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ("hourly", "daily", "weekly")
+
+
+class Cadence(NamedTuple):
+    """运行节奏；at/weekday 为服务器本地时间"""
+    frequency: str
+    at: Optional[str] = None
+    weekday: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        if self.frequency == "hourly":
+            return "hourly"
+        if self.frequency == "weekly":
+            return f"weekly-{self.weekday}-{self.at}"
+        return f"daily-{self.at}"
+
+    def sort_key(self) -> Tuple:
+        return FREQUENCIES.index(self.frequency), self.at or "", self.weekday or 0
+
+    def job_trigger(self) -> Dict[str, Any]:
+        """Job 的触发参数"""
+        if self.frequency == "hourly":
+            return {"interval": timedelta(hours=1)}
+        return {"at": self.at, "weekday": self.weekday}
+
+
+class FetchUnit:
+    """一个上游查询及其订阅用户"""
+
+    def __init__(self, source: str, key: str, params: Dict[str, Any]):
+        self.source = source
+        self.key = key
+        self.params = params
+        self.subscribers: set = set()
+        self.cadences: List[Cadence] = []
+
+    @property
+    def cadence(self) -> Cadence:
+        return min(self.cadences, key=Cadence.sort_key)
+
+    def merge_params(self, params: Dict[str, Any]):
+        if "min_stars" in params:
+            self.params["min_stars"] = min(self.params["min_stars"], params["min_stars"])
+
+
+class FetchPlan:
+    """同一数据源、同一节奏的一组采集单元，对应一个调度任务"""
+
+    def __init__(self, source: str, cadence: Cadence, units: List[FetchUnit]):
+        self.source = source
+        self.cadence = cadence
+        self.units = sorted(units, key=lambda u: u.key)
+
+    @property
+    def name(self) -> str:
+        return f"fetch_plan:{self.source}:{self.cadence.key}"
+
+    @property
+    def signature(self) -> Tuple:
+        """判断重载前后计划是否变化（订阅者变化不影响抓取，不计入）"""
+        return self.cadence, tuple((u.key, tuple(sorted(u.params.items()))) for u in self.units)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "source": self.source,
+            "frequency": self.cadence.frequency,
+            "at": self.cadence.at,
+            "weekday": self.cadence.weekday,
+            "units": [
+                {"key": u.key, "params": u.params, "subscribers": sorted(u.subscribers)}
+                for u in self.units
+            ],
+        }
+
+
+def _units_for(source: str, config: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """把一个用户的 config_data 拆成 (单元 key, 查询参数)；不支持的数据源返回空列表"""
+    if source == "github":
+        min_stars = int(config.get("min_stars") or 0)
+        languages = [lang.strip().lower() for lang in config.get("languages") or [] if lang.strip()]
+        if not languages:
+            return [("*", {"language": None, "min_stars": min_stars})]
+        return [(lang, {"language": lang, "min_stars": min_stars}) for lang in languages]
+    if source == "arxiv":
+        categories = [cat.strip() for cat in config.get("categories") or [] if cat.strip()]
+        return [(cat, {"category": cat}) for cat in categories] or [("*", {"category": None})]
+    if source == "huggingface":
+        tags = [tag.strip() for tag in config.get("pipeline_tags") or [] if tag.strip()]
+        return [(tag, {"task": tag}) for tag in tags] or [("*", {"task": None})]
+    if source == "zenn":
+        # Zenn 的抓取不支持按主题过滤，所有订阅者共享一个单元
+        return [("*", {})]
+    return []
+
+
+def to_local_cadence(frequency: str, schedule_time: str, timezone: str,
+                     local_tz: Optional[tzinfo] = None, today: Optional[date] = None) -> Cadence:
+    """
+    把用户时区的定时换算为服务器本地时间的节奏
+
+    Raises:
+        ValueError: 频率、时刻或时区无效
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"unknown frequency {frequency!r}")
+    if frequency == "hourly":
+        return Cadence("hourly")
+    try:
+        zone = ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"unknown timezone {timezone!r}")
+
+    today = today or datetime.now(zone).date()
+    if frequency == "weekly":
+        # 用户时区的本周一
+        today -= timedelta(days=today.weekday())
+    user_dt = datetime.combine(today, dt_time.fromisoformat(schedule_time), tzinfo=zone)
+    local_dt = user_dt.astimezone(local_tz)
+    at = local_dt.strftime("%H:%M")
+    if frequency == "weekly":
+        return Cadence("weekly", at, local_dt.weekday())
+    return Cadence("daily", at)
+
+
+def compile_fetch_plans(configs: Iterable[DataSourceConfig], local_tz: Optional[tzinfo] = None,
+                        today: Optional[date] = None) -> List[FetchPlan]:
+    """
+    把数据源配置编译为去重的采集计划
+
+    Args:
+        configs: 已启用定时的配置
+        local_tz: 服务器时区，默认为系统本地时区
+        today: 换算时区使用的日期（夏令时相关），默认为今天
+    """
+    units: Dict[Tuple[str, str], FetchUnit] = {}
+    for config in configs:
+        try:
+            cadence = to_local_cadence(
+                config.schedule_frequency or "daily", config.schedule_time or "09:00",
+                config.schedule_timezone or "UTC", local_tz, today
+            )
+            data = json.loads(config.config_data or "{}")
+        except ValueError as e:
+            logger.warning(f"Skipping {config.source_type} schedule of user {config.user_id}: {e}")
+            continue
+
+        for key, params in _units_for(config.source_type, data):
+            unit = units.get((config.source_type, key))
+            if unit is None:
+                unit = units[(config.source_type, key)] = FetchUnit(config.source_type, key, dict(params))
+            else:
+                unit.merge_params(params)
+            unit.subscribers.add(config.user_id)
+            unit.cadences.append(cadence)
+
+    grouped: Dict[Tuple[str, Cadence], List[FetchUnit]] = {}
+    for unit in units.values():
+        grouped.setdefault((unit.source, unit.cadence), []).append(unit)
+    plans = [FetchPlan(source, cadence, group) for (source, cadence), group in grouped.items()]
+    return sorted(plans, key=lambda p: p.name)
+
+
+def load_fetch_plans(db: Session, local_tz: Optional[tzinfo] = None) -> List[FetchPlan]:
+    """从数据库读取启用了定时的数据源配置并编译"""
+    configs = db.query(DataSourceConfig).filter(
+        DataSourceConfig.enabled.is_(True),
+        DataSourceConfig.schedule_enabled.is_(True)
+    ).all()
+    return compile_fetch_plans(configs, local_tz)
+
+
+async def execute_plan(collector, plan: FetchPlan) -> Dict[str, Any]:
+    """
+    执行一个采集计划
+
+    arXiv 的指定分类合并为一次查询；其他数据源每个单元一次查询，依次执行以免触发上游限流。
+    """
+    saved = 0
+    if plan.source == "github":
+        for unit in plan.units:
+            saved += await collector.collect_github_data(
+                language=unit.params["language"], min_stars=unit.params["min_stars"]
+            )
+    elif plan.source == "arxiv":
+        categories = [u.params["category"] for u in plan.units if u.params["category"]]
+        if categories:
+            saved += await collector.collect_arxiv_data(categories=categories)
+        if len(categories) < len(plan.units):
+            # 未指定分类的订阅者使用默认分类
+            saved += await collector.collect_arxiv_data()
+    elif plan.source == "huggingface":
+        for unit in plan.units:
+            saved += await collector.collect_huggingface_data(task=unit.params["task"])
+    elif plan.source == "zenn":
+        saved += await collector.collect_zenn_data()
+    return {"plan": plan.name, "units": len(plan.units), "saved": saved}
@@ -0,0 +1,171 @@
+"""
+任务队列的处理函数
+
+每种任务类型（QueuedJob.kind）对应一个协程函数，参数为任务的 payload 字典，
+返回值（可 JSON 序列化）记录为任务结果；抛出异常时任务按退避重试，
+抛出 JobDeferred 时延后执行且不计入重试次数。
+"""
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.card import TechCard
+from .job_queue import JobDeferred
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+HANDLERS: Dict[str, Handler] = {}
+
+# 各类任务的默认优先级（越大越先执行）
+PRIORITY_USER_REQUEST = 1000  # 用户在界面上针对单张卡片的操作
+PRIORITY_DEFAULT = 500  # 手动触发的采集等
+PRIORITY_BULK = 0  # 批量操作；AI 增强积压按卡片的优先级分在 0~100 之间排序，见 enrichment_backlog.py
+
+
+def handler(kind: str):
+    """注册任务处理函数"""
+    def decorator(func: Handler) -> Handler:
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+@handler("enrich_card")
+async def enrich_card(payload: Dict[str, Any]):
+    """AI 增强单个卡片：摘要、标签和试用建议"""
+    from .ai.summarizer import AISummarizer
+    from . import enrichment_backlog
+
+    card_id = payload["card_id"]
+    db = SessionLocal()
+    try:
+        # 积压任务受每小时 LLM 预算限制，用完时延后；用户显式请求不受限制
+        if not enrichment_backlog.is_explicit(payload) and enrichment_backlog.budget_remaining(db) == 0:
+            raise JobDeferred(enrichment_backlog.budget_retry_after(db), "enrichment budget exhausted")
+
+        card = db.query(TechCard).filter(TechCard.id == card_id).first()
+        if not card:
+            logger.error(f"Card {card_id} not found")
+            return {"card_id": card_id, "enhanced": False}
+
+        summarizer = AISummarizer()
+
+        description = ""
+        if card.raw_data:
+            if card.source.value == "github":
+                description = card.raw_data.get("description", "")
+            elif card.source.value == "arxiv":
+                description = card.raw_data.get("summary", "")[:500]
+            elif card.source.value == "huggingface":
+                description = f"Downloads: {card.raw_data.get('downloads', 0)}"
+            elif card.source.value == "zenn":
+                description = card.raw_data.get("content", "")[:300]
+
+        if not card.summary:
+            summary = await summarizer.generate_summary(card.title, description, card.source.value)
+            if summary:
+                card.summary = summary
+
+        if not card.chinese_tags:
+            tags = await summarizer.extract_tags(card.title, description, card.source.value)
+            if tags:
+                card.chinese_tags = tags
+
+        if not card.trial_suggestion:
+            trial_suggestion = await summarizer.generate_trial_suggestion(
+                card.title, description, card.chinese_tags or []
+            )
+            if trial_suggestion:
+                card.trial_suggestion = trial_suggestion
+
+        db.commit()
+        logger.info(f"Enhanced card {card_id}")
+        return {"card_id": card_id, "enhanced": True}
+    finally:
+        db.close()
+
+
+@handler("notion_sync_card")
+async def notion_sync_card(payload: Dict[str, Any]):
+    """同步单个卡片到 Notion"""
+    from .notion import NotionService
+
+    card_id = payload["card_id"]
+    db = SessionLocal()
+    try:
+        card = db.query(TechCard).filter(TechCard.id == card_id).first()
+        if not card:
+            logger.error(f"Card {card_id} not found")
+            return {"card_id": card_id, "synced": False}
+
+        if not await NotionService().sync_card_to_notion(card, db):
+            raise RuntimeError(f"Failed to sync card {card_id} to Notion")
+        logger.info(f"Successfully synced card {card_id} to Notion")
+        return {"card_id": card_id, "synced": True}
+    finally:
+        db.close()
+
+
+@handler("notion_sync_all")
+async def notion_sync_all(payload: Dict[str, Any]):
+    """同步所有卡片到 Notion"""
+    from .notion import NotionService
+
+    db = SessionLocal()
+    try:
+        results = await NotionService().sync_all_cards(db, payload.get("limit", 50))
+        if "error" in results:
+            raise RuntimeError(results["error"])
+        logger.info(f"Notion sync completed: {results}")
+        return results
+    finally:
+        db.close()
+
+
+@handler("enrichment_refill")
+async def enrichment_refill(payload: Dict[str, Any]):
+    """把未增强的卡片按优先级补充到队列"""
+    from . import enrichment_backlog
+
+    db = SessionLocal()
+    try:
+        return enrichment_backlog.refill(db, payload.get("limit"))
+    finally:
+        db.close()
+
+
+@handler("collect_source")
+async def collect_source(payload: Dict[str, Any]):
+    """
+    采集一个数据源（source 为 all 时采集全部）
+
+    运行期间持有采集租约，与调度 leader 的定时采集互斥；租约被占用时延后执行。
+    """
+    from .leader_lease import LeaseBusy, hold_lease
+    from .scheduler import collection_lease
+
+    try:
+        async with hold_lease(collection_lease(), settings.scheduler_lease_renew_seconds):
+            return await _collect(payload["source"])
+    except LeaseBusy as e:
+        raise JobDeferred(settings.scheduler_lease_ttl_seconds, str(e))
+
+
+async def _collect(source: str):
+    from .data_collector import DataCollector
+
+    collector = DataCollector()
+    if source == "all":
+        return await collector.collect_all_sources()
+    collect = {
+        "github": collector.collect_github_data,
+        "arxiv": collector.collect_arxiv_data,
+        "huggingface": collector.collect_huggingface_data,
+        "zenn": collector.collect_zenn_data,
+    }[source]
+    count = await collect()
+    logger.info(f"Single source collection completed: {count} items")
+    return {"source": source, "count": count}
@@ -0,0 +1,294 @@
+"""
+基于数据库表的持久化任务队列
+
+替代 FastAPI BackgroundTasks：任务写入 job_queue 表，重启不丢失；
+API 进程只入队，由独立的 worker 进程（python -m app.worker）执行。
+- 优先级：priority 大的先执行，同优先级按可执行时间先后
+- 去重：dedup_key 相同且未结束的任务只保留一个（例如每张卡片一个增强任务），
+  重复入队返回已有任务
+- 认领：一条条件 UPDATE 把 pending（或可见性超时的 running）任务改为 running，
+  多个 worker 并发认领同一任务时只有一个成功；与 leader 租约相同，不依赖数据库专有的锁
+- 可见性超时：认领后 locked_until 前其他 worker 不可见；worker 执行期间定期延长，
+  崩溃后超时即被重新认领
+- 重试：失败后按指数退避重新排队，超过 max_attempts 后标记为 dead
+
+时间统一使用 UTC。
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.job_queue import JobStatus, QueuedJob
+
+logger = logging.getLogger(__name__)
+
+
+class JobDeferred(Exception):
+    """处理函数抛出以推迟任务（例如预算用完），不计入重试次数"""
+
+    def __init__(self, delay_seconds: float, reason: str = ""):
+        super().__init__(reason or f"deferred for {delay_seconds:.0f}s")
+        self.delay_seconds = delay_seconds
+
+
+def job_to_dict(job: QueuedJob) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "payload": json.loads(job.payload or "{}"),
+        "priority": job.priority,
+        "status": job.status,
+        "dedup_key": job.dedup_key,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "available_at": job.available_at.isoformat() if job.available_at else None,
+        "locked_by": job.locked_by,
+        "last_error": job.last_error,
+        "result": json.loads(job.result) if job.result else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """第 attempts 次失败后的退避时间：base * 2^(attempts-1)，不超过上限"""
+    seconds = settings.job_queue_retry_base_seconds * (2 ** max(0, attempts - 1))
+    return timedelta(seconds=min(seconds, settings.job_queue_retry_max_seconds))
+
+
+class JobQueue:
+    """任务队列操作（同步方法；API 中使用请求的数据库会话，worker 中在线程里执行）"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+
+    def enqueue(self, db: Session, kind: str, payload: Optional[Dict[str, Any]] = None,
+                priority: int = 0, dedup_key: Optional[str] = None,
+                max_attempts: Optional[int] = None, delay_seconds: float = 0) -> Dict[str, Any]:
+        """
+        入队（在调用方的会话中提交）
+
+        Returns:
+            {"job_id", "created"}；去重命中时 created 为 False，返回已有任务的 id。
+            已有任务的优先级低于本次请求时提升为本次的优先级，并改用本次的参数
+        """
+        if dedup_key:
+            existing = self._active(db, dedup_key)
+            if existing is not None:
+                return self._deduplicated(db, existing, priority, payload)
+
+        now = datetime.utcnow()
+        job = QueuedJob(
+            kind=kind,
+            payload=json.dumps(payload or {}),
+            priority=priority,
+            status=JobStatus.PENDING,
+            dedup_key=dedup_key,
+            active_dedup_key=dedup_key,
+            attempts=0,
+            max_attempts=max_attempts or settings.job_queue_max_attempts,
+            available_at=now + timedelta(seconds=delay_seconds),
+            created_at=now,
+        )
+        try:
+            # SAVEPOINT：去重冲突只回滚这一次插入，不影响调用方会话中的其他修改
+            with db.begin_nested():
+                db.add(job)
+            db.commit()
+        except IntegrityError:
+            # 并发入队了相同 dedup_key 的任务
+            existing = self._active(db, dedup_key)
+            if existing is None:
+                raise
+            return self._deduplicated(db, existing, priority, payload)
+        return {"job_id": job.id, "created": True}
+
+    def enqueue_many(self, db: Session, kind: str,
+                     jobs: Iterable[Tuple[Dict[str, Any], int, str]]) -> Dict[str, int]:
+        """
+        批量入队 (payload, priority, dedup_key)，一次查询已有任务、一次提交
+
+        已在队列中的任务只在新优先级更高时提升优先级（不改参数）。
+
+        Returns:
+            新入队数和提升了优先级的任务数
+        """
+        jobs = list(jobs)
+        keys = [dedup_key for _, _, dedup_key in jobs]
+        active = {
+            job.active_dedup_key: job
+            for job in db.query(QueuedJob).filter(QueuedJob.active_dedup_key.in_(keys)).all()
+        } if keys else {}
+
+        now = datetime.utcnow()
+        created = raised = 0
+        for payload, priority, dedup_key in jobs:
+            existing = active.get(dedup_key)
+            if existing is not None:
+                if priority > existing.priority:
+                    existing.priority = priority
+                    raised += 1
+                continue
+            active[dedup_key] = QueuedJob(
+                kind=kind, payload=json.dumps(payload), priority=priority, status=JobStatus.PENDING,
+                dedup_key=dedup_key, active_dedup_key=dedup_key, attempts=0,
+                max_attempts=settings.job_queue_max_attempts, available_at=now, created_at=now,
+            )
+            db.add(active[dedup_key])
+            created += 1
+        try:
+            db.commit()
+        except IntegrityError:
+            # 并发入队了相同的任务：回滚后逐个入队
+            db.rollback()
+            for payload, priority, dedup_key in jobs:
+                self.enqueue(db, kind, payload, priority=priority, dedup_key=dedup_key)
+        return {"created": created, "raised": raised}
+
+    def _active(self, db: Session, dedup_key: str) -> Optional[QueuedJob]:
+        return db.query(QueuedJob).filter(QueuedJob.active_dedup_key == dedup_key).first()
+
+    def _deduplicated(self, db: Session, job: QueuedJob, priority: int,
+                      payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if priority > job.priority:
+            job.priority = priority
+            if payload is not None:
+                job.payload = json.dumps(payload)
+            db.commit()
+        return {"job_id": job.id, "created": False}
+
+    def claim(self, worker_id: str, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        认领一个可执行的任务
+
+        Returns:
+            任务字典（attempts 已加 1），没有可执行的任务时返回 None
+        """
+        now = now or datetime.utcnow()
+        claimable = or_(
+            (QueuedJob.status == JobStatus.PENDING) & (QueuedJob.available_at <= now),
+            (QueuedJob.status == JobStatus.RUNNING) & (QueuedJob.locked_until < now)
+            & (QueuedJob.attempts < QueuedJob.max_attempts),
+        )
+        db = self.session_factory()
+        try:
+            candidates = db.execute(
+                select(QueuedJob.id).where(claimable)
+                .order_by(QueuedJob.priority.desc(), QueuedJob.available_at, QueuedJob.id)
+                .limit(5)
+            ).scalars().all()
+            for job_id in candidates:
+                result = db.execute(
+                    update(QueuedJob)
+                    .where(QueuedJob.id == job_id, claimable)
+                    .values(
+                        status=JobStatus.RUNNING,
+                        locked_by=worker_id,
+                        locked_until=now + timedelta(seconds=settings.job_queue_visibility_timeout_seconds),
+                        attempts=QueuedJob.attempts + 1,
+                    )
+                )
+                db.commit()
+                if result.rowcount == 1:
+                    return job_to_dict(db.get(QueuedJob, job_id))
+                # 被其他 worker 抢先认领，尝试下一个
+            return None
+        finally:
+            db.close()
+
+    def extend(self, job_id: int, worker_id: str) -> bool:
+        """延长可见性超时（worker 执行期间的心跳）；任务已不归本 worker 时返回 False"""
+        return self._finish_update(job_id, worker_id, locked_until=(
+            datetime.utcnow() + timedelta(seconds=settings.job_queue_visibility_timeout_seconds)
+        ))
+
+    def complete(self, job_id: int, worker_id: str, result: Any = None) -> bool:
+        return self._finish_update(
+            job_id, worker_id,
+            status=JobStatus.SUCCEEDED, result=json.dumps(result, default=str),
+            finished_at=datetime.utcnow(), locked_until=None, active_dedup_key=None,
+        )
+
+    def fail(self, job_id: int, worker_id: str, error: str, attempts: int, max_attempts: int) -> bool:
+        """记录失败：还有重试次数时退避后重新排队，否则标记为 dead"""
+        now = datetime.utcnow()
+        if attempts >= max_attempts:
+            logger.error(f"Job {job_id} failed permanently after {attempts} attempts: {error}")
+            return self._finish_update(
+                job_id, worker_id, status=JobStatus.DEAD, last_error=error,
+                finished_at=now, locked_until=None, active_dedup_key=None,
+            )
+        delay = retry_delay(attempts)
+        logger.warning(f"Job {job_id} failed (attempt {attempts}/{max_attempts}), retrying in {delay}: {error}")
+        return self._finish_update(
+            job_id, worker_id, status=JobStatus.PENDING, last_error=error,
+            available_at=now + delay, locked_by=None, locked_until=None,
+        )
+
+    def release(self, job_id: int, worker_id: str, delay_seconds: float = 0) -> bool:
+        """放回队列（worker 停止或任务推迟时），本次认领不计入重试次数"""
+        return self._finish_update(
+            job_id, worker_id, status=JobStatus.PENDING,
+            available_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+            locked_by=None, locked_until=None, attempts=QueuedJob.attempts - 1,
+        )
+
+    def _finish_update(self, job_id: int, worker_id: str, **values) -> bool:
+        """只在任务仍由本 worker 持有时更新（可见性超时后被重新认领的任务不受影响）"""
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(QueuedJob)
+                .where(QueuedJob.id == job_id, QueuedJob.locked_by == worker_id,
+                       QueuedJob.status == JobStatus.RUNNING)
+                .values(**values)
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+    def reap(self, now: Optional[datetime] = None) -> int:
+        """把可见性超时且重试次数已用完的任务（worker 反复崩溃）标记为 dead"""
+        now = now or datetime.utcnow()
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(QueuedJob)
+                .where(QueuedJob.status == JobStatus.RUNNING, QueuedJob.locked_until < now,
+                       QueuedJob.attempts >= QueuedJob.max_attempts)
+                .values(status=JobStatus.DEAD, last_error="visibility timeout expired",
+                        finished_at=now, locked_until=None, active_dedup_key=None)
+            )
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    def get_job(self, db: Session, job_id: int) -> Optional[Dict[str, Any]]:
+        job = db.get(QueuedJob, job_id)
+        return job_to_dict(job) if job else None
+
+    def get_status(self, db: Session) -> Dict[str, Any]:
+        """各状态、各类型的任务数"""
+        rows = db.execute(
+            select(QueuedJob.kind, QueuedJob.status, func.count())
+            .group_by(QueuedJob.kind, QueuedJob.status)
+        ).all()
+        by_status: Dict[str, int] = {}
+        by_kind: Dict[str, Dict[str, int]] = {}
+        for kind, status, count in rows:
+            by_status[status] = by_status.get(status, 0) + count
+            by_kind.setdefault(kind, {})[status] = count
+        return {"by_status": by_status, "by_kind": by_kind}
+
+
+# 全局任务队列（不在构造时访问数据库）
+job_queue = JobQueue()
@@ -0,0 +1,261 @@
+"""
+异步任务调度器
+
+在应用自身的事件循环中运行定时任务（替代 schedule 库 + 轮询线程）：
+- 精确计时：每个任务一个 asyncio.Task，按下次运行时间 sleep，而不是每分钟轮询
+- 防重叠：同一 lock_group 的任务互斥，已有任务在运行时本次触发记为 skipped
+  （例如定时采集、增量检查、全量采集共用 "collection" 组，不会同时采集）；
+  wait_for_lock 的任务则排队等待，不会被跳过；任务函数抛出 JobSkipped 时同样记为 skipped
+- 抖动：每次触发前随机延迟 0~jitter 秒，避免多个任务在整点同时启动
+- 关闭时取消所有任务并等待其退出
+- 运行历史：最近 N 次运行的开始/结束时间、耗时、状态和错误
+
+任务函数为协程函数；同步的数据库操作由任务内部通过 asyncio.to_thread 执行。
+"""
+import asyncio
+import logging
+import random
+from collections import deque
+from datetime import datetime, time as dt_time, timedelta
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JobFunc = Callable[[], Awaitable[Any]]
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+class JobSkipped(Exception):
+    """任务函数抛出以把本次运行记为 skipped（例如跨进程的互斥租约被占用）"""
+
+
+def next_daily_run(at: dt_time, now: datetime) -> datetime:
+    """每天 at 时刻运行的任务在 now 之后的下一次运行时间"""
+    candidate = datetime.combine(now.date(), at)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def next_weekly_run(at: dt_time, weekday: int, now: datetime) -> datetime:
+    """每周 weekday（0=周一）at 时刻运行的任务在 now 之后的下一次运行时间"""
+    candidate = datetime.combine(now.date() + timedelta(days=(weekday - now.weekday()) % 7), at)
+    if candidate <= now:
+        candidate += timedelta(days=7)
+    return candidate
+
+
+class Job:
+    """一个定时任务：按固定间隔（interval）、每天或每周固定时刻（at/weekday）运行"""
+
+    def __init__(self, name: str, func: JobFunc, interval: Optional[timedelta] = None,
+                 at: Optional[str] = None, weekday: Optional[int] = None, jitter_seconds: float = 0,
+                 lock_group: Optional[str] = None, run_at_start: bool = False,
+                 wait_for_lock: bool = False):
+        """
+        Args:
+            name: 任务名（唯一）
+            func: 协程函数
+            interval: 运行间隔
+            at: 运行的时刻 "HH:MM"（与 interval 二选一）
+            weekday: 与 at 一起使用时每周只在这一天运行（0=周一）
+            jitter_seconds: 每次触发前的最大随机延迟
+            lock_group: 互斥组，默认为任务名（即同一任务不会重叠）
+            run_at_start: 启动后立即运行一次
+            wait_for_lock: 互斥组忙时等待而不是跳过
+        """
+        if (interval is None) == (at is None):
+            raise ValueError("Job needs exactly one of interval or at")
+        if weekday is not None and at is None:
+            raise ValueError("Job weekday requires at")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.at = dt_time.fromisoformat(at) if at else None
+        self.weekday = weekday
+        self.jitter_seconds = jitter_seconds
+        self.lock_group = lock_group or name
+        self.run_at_start = run_at_start
+        self.wait_for_lock = wait_for_lock
+        self.next_run: Optional[datetime] = None
+        self.last_status: Optional[str] = None
+
+    def compute_next_run(self, now: datetime) -> datetime:
+        if self.interval is not None:
+            return now + self.interval
+        if self.weekday is not None:
+            return next_weekly_run(self.at, self.weekday, now)
+        return next_daily_run(self.at, now)
+
+    def describe(self) -> str:
+        if self.interval is not None:
+            return f"every {self.interval}"
+        if self.weekday is not None:
+            return f"weekly on {WEEKDAYS[self.weekday]} at {self.at.strftime('%H:%M')}"
+        return f"daily at {self.at.strftime('%H:%M')}"
+
+
+class AsyncJobScheduler:
+    """在事件循环内运行 Job 的调度器"""
+
+    def __init__(self, history_size: int = 100):
+        self.jobs: Dict[str, Job] = {}
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._running_runs: Dict[str, asyncio.Task] = {}
+        self._active: set = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def add_job(self, job: Job) -> Job:
+        if job.name in self.jobs:
+            raise ValueError(f"Job {job.name} already registered")
+        self.jobs[job.name] = job
+        if self.running:
+            self._start_job(job)
+        return job
+
+    def remove_job(self, name: str):
+        """移除任务；正在进行的运行不受影响"""
+        self.jobs.pop(name, None)
+        task = self._tasks.pop(name, None)
+        if task:
+            task.cancel()
+
+    def start(self):
+        """为每个任务创建计时协程（需在事件循环中调用）"""
+        if self.running:
+            logger.warning("Job scheduler is already running")
+            return
+        for job in self.jobs.values():
+            self._start_job(job)
+        logger.info(f"Job scheduler started with {len(self.jobs)} jobs")
+
+    async def stop(self):
+        """取消所有计时协程和正在运行的任务，并等待它们退出"""
+        tasks = list(self._tasks.values()) + list(self._running_runs.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for job in self.jobs.values():
+            job.next_run = None
+        logger.info("Job scheduler stopped")
+
+    def _start_job(self, job: Job):
+        self._tasks[job.name] = asyncio.get_running_loop().create_task(
+            self._job_loop(job), name=f"job:{job.name}"
+        )
+
+    def _lock(self, group: str) -> asyncio.Lock:
+        if group not in self._locks:
+            self._locks[group] = asyncio.Lock()
+        return self._locks[group]
+
+    async def _job_loop(self, job: Job):
+        if job.run_at_start:
+            await self.run_job(job.name)
+        while True:
+            job.next_run = job.compute_next_run(datetime.now())
+            delay = (job.next_run - datetime.now()).total_seconds()
+            if job.jitter_seconds:
+                delay += random.uniform(0, job.jitter_seconds)
+            await asyncio.sleep(max(0.0, delay))
+            # 运行放在单独的 Task 中，运行中的异常、取消不影响计时循环
+            await asyncio.shield(self._spawn_run(job))
+
+    def _spawn_run(self, job: Job) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(self.run_job(job.name))
+        self._running_runs[job.name] = task
+        task.add_done_callback(lambda _: self._running_runs.pop(job.name, None))
+        return task
+
+    async def run_job(self, name: str) -> Dict[str, Any]:
+        """
+        立即运行一次任务（定时触发和手动触发共用）
+
+        同组已有任务在运行时不等待，直接记为 skipped（wait_for_lock 的任务排队等待）；
+        任务函数抛出 JobSkipped 时也记为 skipped。
+
+        Returns:
+            本次运行的历史记录
+        """
+        job = self.jobs[name]
+        lock = self._lock(job.lock_group)
+        record: Dict[str, Any] = {
+            "job": name,
+            "started_at": datetime.now(),
+            "finished_at": None,
+            "duration_seconds": None,
+            "status": "running",
+            "error": None,
+            "result": None,
+        }
+
+        if lock.locked() and not job.wait_for_lock:
+            record.update(status="skipped", finished_at=record["started_at"], duration_seconds=0.0)
+            record["error"] = f"lock group '{job.lock_group}' busy"
+            logger.info(f"Skipping job {name}: {record['error']}")
+            return self._record(job, record)
+
+        async with lock:
+            self._active.add(name)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            try:
+                record["result"] = await job.func()
+                record["status"] = "success"
+            except asyncio.CancelledError:
+                record["status"] = "cancelled"
+                raise
+            except JobSkipped as e:
+                record["status"] = "skipped"
+                record["error"] = str(e)
+                logger.info(f"Skipping job {name}: {e}")
+            except Exception as e:
+                record["status"] = "failed"
+                record["error"] = str(e)
+                logger.error(f"Job {name} failed: {e}")
+            finally:
+                self._active.discard(name)
+                record["finished_at"] = datetime.now()
+                record["duration_seconds"] = round(loop.time() - started, 3)
+                self._record(job, record)
+        return record
+
+    def _record(self, job: Job, record: Dict[str, Any]) -> Dict[str, Any]:
+        job.last_status = record["status"]
+        self.history.append(record)
+        return record
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "jobs": [
+                {
+                    "name": job.name,
+                    "schedule": job.describe(),
+                    "lock_group": job.lock_group,
+                    "next_run": job.next_run.isoformat() if job.next_run else None,
+                    "in_progress": job.name in self._active,
+                    "last_status": job.last_status,
+                }
+                for job in self.jobs.values()
+            ],
+            "history": [
+                {
+                    **{k: v for k, v in record.items() if k != "result"},
+                    "started_at": record["started_at"].isoformat(),
+                    "finished_at": record["finished_at"].isoformat() if record["finished_at"] else None,
+                }
+                for record in list(self.history)[-20:]
+            ],
+        }
+
+    def get_history(self, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [r for r in self.history if name is None or r["job"] == name]
@@ -0,0 +1,129 @@
+"""
+任务队列 worker
+
+从 job_queue 认领任务并调用 job_handlers 中注册的处理函数：
+- concurrency 个执行槽并发认领，空闲时每 poll_seconds 轮询一次
+- 执行期间定期延长可见性超时（心跳），长任务不会被其他 worker 重复认领
+- 停止时正在执行的任务放回队列（不计入重试次数）；处理函数抛出 JobDeferred 时同样放回并延后
+
+独立进程运行见 app/worker.py；开发环境可设置 JOB_WORKER_EMBEDDED=true 在 API 进程内运行。
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from .job_handlers import HANDLERS, Handler
+from .job_queue import JobDeferred, JobQueue, job_queue
+from .leader_lease import default_holder_id
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    def __init__(self, queue: JobQueue = job_queue, handlers: Optional[Dict[str, Handler]] = None,
+                 worker_id: Optional[str] = None, concurrency: Optional[int] = None,
+                 poll_seconds: Optional[float] = None):
+        self.queue = queue
+        self.handlers = handlers if handlers is not None else HANDLERS
+        self.worker_id = worker_id or default_holder_id()
+        self.concurrency = concurrency or settings.job_worker_concurrency
+        self.poll_seconds = poll_seconds if poll_seconds is not None else settings.job_worker_poll_seconds
+        self.processed = 0
+        self.failed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """在当前事件循环中后台运行"""
+        if self.running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self.run(), name="job-worker")
+        logger.info(f"Job worker {self.worker_id} started with concurrency {self.concurrency}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            logger.info(f"Job worker {self.worker_id} stopped")
+
+    async def run(self, burst: bool = False):
+        """
+        运行执行槽
+
+        Args:
+            burst: 队列中没有可执行的任务时退出（而不是继续轮询）
+        """
+        await asyncio.gather(*(self._slot(i, burst) for i in range(self.concurrency)))
+
+    async def _slot(self, index: int, burst: bool):
+        while True:
+            if await self.run_once():
+                continue
+            if burst:
+                return
+            if index == 0:
+                await asyncio.to_thread(self.queue.reap)
+            await asyncio.sleep(self.poll_seconds)
+
+    async def run_once(self) -> bool:
+        """
+        认领并执行一个任务
+
+        Returns:
+            是否执行了任务
+        """
+        job = await asyncio.to_thread(self.queue.claim, self.worker_id)
+        if job is None:
+            return False
+        await self._execute(job)
+        return True
+
+    async def _execute(self, job: Dict[str, Any]):
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            # 未知类型重试也不会成功，直接标记为 dead
+            await asyncio.to_thread(self.queue.fail, job["id"], self.worker_id,
+                                    f"unknown job kind {job['kind']!r}", job["max_attempts"], job["max_attempts"])
+            self.failed += 1
+            return
+
+        heartbeat = asyncio.get_running_loop().create_task(self._heartbeat(job["id"]))
+        try:
+            result = await handler(job["payload"])
+        except asyncio.CancelledError:
+            await asyncio.shield(asyncio.to_thread(self.queue.release, job["id"], self.worker_id))
+            raise
+        except JobDeferred as e:
+            logger.info(f"Job {job['id']} deferred: {e}")
+            await asyncio.to_thread(self.queue.release, job["id"], self.worker_id, e.delay_seconds)
+        except Exception as e:
+            self.failed += 1
+            await asyncio.to_thread(self.queue.fail, job["id"], self.worker_id, str(e),
+                                    job["attempts"], job["max_attempts"])
+        else:
+            self.processed += 1
+            await asyncio.to_thread(self.queue.complete, job["id"], self.worker_id, result)
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: int):
+        interval = settings.job_queue_visibility_timeout_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            if not await asyncio.to_thread(self.queue.extend, job_id, self.worker_id):
+                logger.warning(f"Job {job_id} is no longer held by {self.worker_id}")
+                return
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
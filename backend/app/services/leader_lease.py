@@ -0,0 +1,193 @@
+"""
+基于数据库行的 leader 租约
+
+多个进程/主机各自运行调度器时，只有持有租约的进程执行任务：
+- 获取：一条条件 UPDATE（租约已过期或本来就是自己持有时才改写持有者），
+  行不存在时 INSERT；并发 INSERT 由主键冲突保证只有一个成功。
+  SQLite 和 PostgreSQL 都是单条语句原子完成，不依赖数据库专有的锁
+- 续约：持有者每 renew_seconds 重新执行获取，把过期时间向后推 ttl_seconds
+- 故障转移：持有者崩溃后不再续约，租约过期，其他进程的下一次获取即成功
+- 释放：正常退出时把过期时间置为当前时间，其他进程无需等待 TTL
+
+hold_lease 在持有租约期间执行一段异步代码（后台续约），用作跨进程的互斥锁。
+
+时间使用各进程的 UTC 时钟，主机之间的时钟偏差应远小于 ttl_seconds。
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from sqlalchemy import case, literal, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal
+from ..models.scheduler_lease import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+
+def default_holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderLease:
+    """一个命名租约的获取、续约与释放（同步方法，调用方在线程中执行）"""
+
+    def __init__(self, name: str, ttl_seconds: float, holder_id: Optional[str] = None,
+                 session_factory: Callable[[], Session] = SessionLocal):
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.holder_id = holder_id or default_holder_id()
+        self.session_factory = session_factory
+        self.is_leader = False
+        self.expires_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    def try_acquire(self, now: Optional[datetime] = None) -> bool:
+        """
+        获取或续约租约
+
+        Returns:
+            本进程当前是否为 leader
+        """
+        now = now or datetime.utcnow()
+        expires_at = now + self.ttl
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == self.name,
+                    (SchedulerLease.holder_id == self.holder_id) | (SchedulerLease.expires_at < now)
+                )
+                .values(
+                    holder_id=self.holder_id,
+                    expires_at=expires_at,
+                    # 续约时保留原 acquired_at，易主时重新计时
+                    acquired_at=_acquired_at_expr(self.holder_id, now)
+                )
+            )
+            acquired = result.rowcount == 1
+            if not acquired and db.get(SchedulerLease, self.name) is None:
+                db.add(SchedulerLease(
+                    name=self.name, holder_id=self.holder_id, acquired_at=now, expires_at=expires_at
+                ))
+                try:
+                    db.flush()
+                    acquired = True
+                except IntegrityError:
+                    # 其他进程同时插入了该租约
+                    db.rollback()
+                    acquired = False
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self.last_error = str(e)
+            logger.error(f"Failed to acquire lease {self.name}: {e}")
+            # 无法确认租约时按失去 leader 处理，避免两个进程同时执行
+            acquired = False
+        finally:
+            db.close()
+
+        if acquired != self.is_leader:
+            logger.info(f"Lease {self.name}: {self.holder_id} {'acquired' if acquired else 'lost'} leadership")
+        self.is_leader = acquired
+        self.expires_at = expires_at if acquired else None
+        return acquired
+
+    def release(self):
+        """释放租约（只影响自己持有的租约）"""
+        if not self.is_leader:
+            return
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name, SchedulerLease.holder_id == self.holder_id)
+                .values(expires_at=datetime.utcnow())
+            )
+            db.commit()
+            logger.info(f"Lease {self.name} released by {self.holder_id}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to release lease {self.name}: {e}")
+        finally:
+            db.close()
+            self.is_leader = False
+            self.expires_at = None
+
+    def current_holder(self) -> Optional[Dict]:
+        """当前租约记录（未过期时）"""
+        db = self.session_factory()
+        try:
+            lease = db.get(SchedulerLease, self.name)
+            if lease is None or lease.expires_at < datetime.utcnow():
+                return None
+            return {
+                "holder_id": lease.holder_id,
+                "acquired_at": lease.acquired_at.isoformat(),
+                "expires_at": lease.expires_at.isoformat(),
+            }
+        finally:
+            db.close()
+
+    def get_status(self) -> Dict:
+        return {
+            "name": self.name,
+            "holder_id": self.holder_id,
+            "is_leader": self.is_leader,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "ttl_seconds": self.ttl.total_seconds(),
+            "last_error": self.last_error,
+        }
+
+
+class LeaseBusy(Exception):
+    """租约正被其他进程持有"""
+
+    def __init__(self, name: str, holder: Optional[Dict] = None):
+        super().__init__(f"lease '{name}' held by {holder['holder_id'] if holder else 'another process'}")
+        self.name = name
+        self.holder = holder
+
+
+@asynccontextmanager
+async def hold_lease(lease: LeaderLease, renew_seconds: float, wait: bool = False) -> AsyncIterator[LeaderLease]:
+    """
+    持有租约执行 async with 中的代码，期间每 renew_seconds 在后台续约，退出时释放
+
+    Args:
+        lease: 要获取的租约
+        renew_seconds: 续约间隔（应明显小于租约 TTL），也是 wait 时的重试间隔
+        wait: 租约被占用时等待直到获取；否则抛出 LeaseBusy
+    """
+    while not await asyncio.to_thread(lease.try_acquire):
+        if not wait:
+            raise LeaseBusy(lease.name, await asyncio.to_thread(lease.current_holder))
+        await asyncio.sleep(renew_seconds)
+
+    async def renew():
+        while True:
+            await asyncio.sleep(renew_seconds)
+            await asyncio.to_thread(lease.try_acquire)
+
+    renewer = asyncio.get_running_loop().create_task(renew(), name=f"lease:{lease.name}")
+    try:
+        yield lease
+    finally:
+        renewer.cancel()
+        await asyncio.gather(renewer, return_exceptions=True)
+        await asyncio.to_thread(lease.release)
+
+
+def _acquired_at_expr(holder_id: str, now: datetime):
+    return case(
+        (SchedulerLease.holder_id == holder_id, SchedulerLease.acquired_at),
+        else_=literal(now)
+    )
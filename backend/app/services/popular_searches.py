@@ -0,0 +1,404 @@
+"""
+热门搜索词（流式 Top-K）
+
+每次提交搜索历史时把归一化后的搜索词计入当天的 Space-Saving 草图
+（Metwally et al. 2005）：固定容量、O(log capacity) 更新，
+任何真实频率超过 total / capacity 的词都保证在草图中。
+
+- /behavior/popular-searches 合并最近 N 天的草图取 Top-K，不再扫描 search_history
+- 每个进程只看到自己记录的搜索：各进程的调度器定期把上次持久化以来的增量累加到
+  popular_search_snapshots，再读回所有进程合并后的计数（启动后首次使用时同样从快照恢复）
+- 已有的 search_history 由迁移回填一次（backfill）
+"""
+import heapq
+import logging
+import threading
+import unicodedata
+from datetime import date, datetime, timedelta
+from itertools import chain
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from .counters import upsert_counters
+from ..models.behavior import SearchHistory
+from ..models.search_stats import PopularSearchSnapshot
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_LENGTH = 255
+
+
+def normalize_query(query: Optional[str]) -> str:
+    """
+    搜索词归一化：NFKC（全角/半角、兼容字符统一）、小写、合并空白
+    """
+    if not query:
+        return ""
+    text = unicodedata.normalize("NFKC", query).lower()
+    return " ".join(text.split())[:MAX_QUERY_LENGTH]
+
+
+class SpaceSaving:
+    """Space-Saving 频繁项草图"""
+
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        self.counters: Dict[str, List[int]] = {}  # item -> [count, error]
+        self.total = 0
+        # 每个被跟踪的项在堆中恰有一个条目；计数增加后条目可能过期，弹出时校正
+        self._heap: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.counters)
+
+    def offer(self, item: str, count: int = 1):
+        self.total += count
+        entry = self.counters.get(item)
+        if entry is not None:
+            entry[0] += count
+            return
+
+        if len(self.counters) < self.capacity:
+            self.counters[item] = [count, 0]
+            heapq.heappush(self._heap, (count, item))
+            return
+
+        # 替换当前最小计数的项，新项继承其计数作为误差上界
+        min_item, min_count = self._pop_min()
+        del self.counters[min_item]
+        self.counters[item] = [min_count + count, min_count]
+        heapq.heappush(self._heap, (min_count + count, item))
+
+    def _pop_min(self) -> Tuple[str, int]:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            entry = self.counters.get(item)
+            if entry is None:
+                continue
+            if entry[0] != count:
+                heapq.heappush(self._heap, (entry[0], item))
+                continue
+            return item, count
+
+    def load(self, item: str, count: int, error: int = 0):
+        """直接载入一项（从快照恢复时使用），超出容量时保留计数较大的项"""
+        self.total += count
+        entry = self.counters.get(item)
+        if entry is not None:
+            entry[0] += count
+            entry[1] += error
+            return
+        self.counters[item] = [count, error]
+        heapq.heappush(self._heap, (count, item))
+        if len(self.counters) > self.capacity:
+            min_item, _ = self._pop_min()
+            del self.counters[min_item]
+
+    def top(self, k: int) -> List[Tuple[str, int, int]]:
+        """
+        Returns:
+            [(item, count, error)]，按 count 降序，同数按词排序
+        """
+        largest = heapq.nsmallest(k, self.counters.items(), key=lambda kv: (-kv[1][0], kv[0]))
+        return [(item, count, error) for item, (count, error) in largest]
+
+
+def _merge_counts(target: Dict[str, List[int]], sketch: SpaceSaving):
+    """将草图计数累加到 target（合并后的 error 为各草图误差之和）"""
+    for item, (count, error) in sketch.counters.items():
+        entry = target.get(item)
+        if entry is None:
+            target[item] = [count, error]
+        else:
+            entry[0] += count
+            entry[1] += error
+
+
+class PopularSearchTracker:
+    """按天分桶的热门搜索词草图"""
+
+    def __init__(self, capacity: Optional[int] = None, max_days: Optional[int] = None):
+        self.capacity = capacity or settings.popular_search_capacity
+        self.max_days = max_days or settings.popular_search_max_days
+
+        self.session_factory: Callable[[], Session] = SessionLocal
+
+        self._days: Dict[date, SpaceSaving] = {}  # 快照（所有进程）+ 本进程未持久化的计数
+        self._pending: Dict[date, SpaceSaving] = {}  # 本进程上次持久化以来的计数
+        self._display: Dict[str, str] = {}  # 归一化词 -> 最近一次的原始写法
+        self._loaded = False
+        self._lock = threading.RLock()
+        # 历史天（不含今天）的合并结果缓存：{days: (今天的日期, 合并计数)}
+        self._past_cache: Dict[int, Tuple[date, Dict[str, List[int]]]] = {}
+
+    def _sketch(self, day: date) -> SpaceSaving:
+        sketch = self._days.get(day)
+        if sketch is None:
+            sketch = self._days[day] = SpaceSaving(self.capacity)
+            self._prune(day)
+        return sketch
+
+    def _prune(self, today: date):
+        oldest = today - timedelta(days=self.max_days - 1)
+        for day in [d for d in self._days if d < oldest]:
+            del self._days[day]
+            self._pending.pop(day, None)
+
+    def record(self, query: Optional[str], when: Optional[datetime] = None):
+        """记录一次搜索"""
+        item = normalize_query(query)
+        if not item:
+            return
+        day = (when or datetime.now()).date()
+        with self._lock:
+            self._sketch(day).offer(item)
+            self._pending.setdefault(day, SpaceSaving(self.capacity)).offer(item)
+            self._display[item] = " ".join(query.split())[:MAX_QUERY_LENGTH]
+            if day != date.today():
+                self._past_cache.clear()
+
+    def ensure_loaded(self, db: Session):
+        """首次使用时从快照恢复（无快照则从 search_history 回填）"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                self._load(db)
+            except Exception as e:
+                logger.error(f"Failed to load popular search snapshots: {e}")
+            self._loaded = True
+            self._past_cache.clear()
+
+    def _load(self, db: Session):
+        self._apply(self._snapshot_rows(db))
+        if self._days:
+            logger.info(f"Loaded popular search snapshots for {len(self._days)} days")
+
+    def _snapshot_rows(self, db: Session) -> list:
+        since = date.today() - timedelta(days=self.max_days - 1)
+        return db.query(
+            PopularSearchSnapshot.bucket_date,
+            PopularSearchSnapshot.query,
+            PopularSearchSnapshot.count,
+            PopularSearchSnapshot.error,
+            PopularSearchSnapshot.display
+        ).filter(PopularSearchSnapshot.bucket_date >= since).all()
+
+    def _apply(self, rows: list):
+        """用快照行重建按天草图，并叠加本进程尚未持久化的计数"""
+        with self._lock:
+            days = {}
+            for day, query, count, error, display in rows:
+                days.setdefault(day, SpaceSaving(self.capacity)).load(query, count, error)
+                if display:
+                    self._display.setdefault(query, display)
+            for day, sketch in self._pending.items():
+                target = days.setdefault(day, SpaceSaving(self.capacity))
+                for item, (count, error) in sketch.counters.items():
+                    target.load(item, count, error)
+            self._days = days
+            self._past_cache.clear()
+
+    def top(self, db: Session, days: int = 7, limit: int = 10,
+            contains: Optional[str] = None) -> List[Dict]:
+        """
+        最近 days 天（含今天）的热门搜索词
+
+        Args:
+            contains: 只返回包含该子串（归一化后比较）的词，用于自动补全
+
+        Returns:
+            [{"query", "count"}]，count 为估计次数
+        """
+        self.ensure_loaded(db)
+        days = max(1, min(days, self.max_days))
+        today = date.today()
+        needle = normalize_query(contains) if contains else None
+
+        with self._lock:
+            past = self._past_counts(today, days)
+            sketch = self._days.get(today)
+            current = sketch.counters if sketch is not None else {}
+
+            def total(item: str) -> int:
+                return past.get(item, (0,))[0] + current.get(item, (0,))[0]
+
+            candidates = chain(past.keys(), (item for item in current if item not in past))
+            if needle:
+                candidates = (item for item in candidates if needle in item)
+            largest = heapq.nsmallest(limit, candidates, key=lambda item: (-total(item), item))
+            return [{"query": self._display.get(item, item), "count": total(item)} for item in largest]
+
+    def _past_counts(self, today: date, days: int) -> Dict[str, List[int]]:
+        cached = self._past_cache.get(days)
+        if cached and cached[0] == today:
+            return cached[1]
+
+        counts: Dict[str, List[int]] = {}
+        for offset in range(1, days):
+            sketch = self._days.get(today - timedelta(days=offset))
+            if sketch is not None:
+                _merge_counts(counts, sketch)
+        self._past_cache[days] = (today, counts)
+        return counts
+
+    def persist(self, db: Optional[Session] = None) -> int:
+        """
+        将本进程上次持久化以来的计数累加到快照表，再读回所有进程合并后的快照
+
+        每个进程各自调用；计数按 (日期, 词) 累加而不是整天替换，不会覆盖其他进程写入的计数。
+        每天只保留计数最高的 capacity 个词。
+
+        Args:
+            db: 数据库会话，不传时使用 session_factory 新建
+
+        Returns:
+            写入的快照行数
+        """
+        if db is None:
+            db = self.session_factory()
+            try:
+                return self.persist(db)
+            finally:
+                db.close()
+
+        self.ensure_loaded(db)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            # 只保留仍被草图跟踪的词的展示写法
+            tracked = set().union(*(sketch.counters.keys() for sketch in self._days.values()))
+            self._display = {item: text for item, text in self._display.items() if item in tracked}
+            display = dict(self._display)
+
+        counts = {
+            (day, item): {"count": count, "error": error}
+            for day, sketch in pending.items()
+            for item, (count, error) in sketch.counters.items()
+        }
+        try:
+            upsert_counters(db.connection(), PopularSearchSnapshot, ("bucket_date", "query"), counts,
+                            values={key: {"display": display.get(key[1], key[1])} for key in counts})
+            for day in pending:
+                self._trim(db, day)
+
+            oldest = date.today() - timedelta(days=self.max_days - 1)
+            db.query(PopularSearchSnapshot).filter(
+                PopularSearchSnapshot.bucket_date < oldest
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for day, sketch in pending.items():
+                    target = self._pending.setdefault(day, SpaceSaving(self.capacity))
+                    for item, (count, error) in sketch.counters.items():
+                        target.load(item, count, error)
+            raise
+
+        self._apply(self._snapshot_rows(db))
+        return len(counts)
+
+    def _trim(self, db: Session, day: date):
+        """删除当天计数低于第 capacity 名的快照行"""
+        threshold = db.query(PopularSearchSnapshot.count).filter(
+            PopularSearchSnapshot.bucket_date == day
+        ).order_by(PopularSearchSnapshot.count.desc()).offset(self.capacity - 1).limit(1).scalar()
+        if threshold is not None:
+            db.query(PopularSearchSnapshot).filter(
+                PopularSearchSnapshot.bucket_date == day,
+                PopularSearchSnapshot.count < threshold
+            ).delete(synchronize_session=False)
+
+    def reset(self):
+        """清空内存中的草图（测试使用）"""
+        with self._lock:
+            self._days = {}
+            self._pending = {}
+            self._display = {}
+            self._past_cache = {}
+            self._loaded = False
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "capacity": self.capacity,
+                "days": len(self._days),
+                "pending_days": len(self._pending),
+                "tracked_terms": sum(len(s) for s in self._days.values()),
+                "total_searches": sum(s.total for s in self._days.values()),
+            }
+
+
+def backfill(db: Session) -> int:
+    """
+    从 search_history 回填快照表（首次上线时由迁移调用；计数精确，每天保留前 capacity 个词）
+
+    Returns:
+        写入的快照行数
+    """
+    since = date.today() - timedelta(days=settings.popular_search_max_days - 1)
+    day_column = func.date(SearchHistory.created_at)
+    history = db.query(
+        day_column,
+        SearchHistory.query,
+        func.count(SearchHistory.id)
+    ).filter(
+        SearchHistory.created_at >= datetime.combine(since, datetime.min.time())
+    ).group_by(day_column, SearchHistory.query).all()
+
+    counts: Dict[date, Dict[str, int]] = {}
+    display: Dict[str, str] = {}
+    for day, query, count in history:
+        item = normalize_query(query)
+        if not item or day is None:
+            continue
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        day_counts = counts.setdefault(day, {})
+        day_counts[item] = day_counts.get(item, 0) + count
+        display.setdefault(item, " ".join(query.split())[:MAX_QUERY_LENGTH])
+
+    rows = [
+        {"bucket_date": day, "query": item, "display": display[item], "count": count, "error": 0}
+        for day, day_counts in counts.items()
+        for item, count in heapq.nlargest(settings.popular_search_capacity, day_counts.items(),
+                                          key=lambda kv: kv[1])
+    ]
+    db.bulk_insert_mappings(PopularSearchSnapshot, rows)
+    db.commit()
+    logger.info(f"Backfilled {len(rows)} popular search snapshot rows from search history")
+    return len(rows)
+
+
+# 单条写入的搜索历史在 flush 时登记到会话上，事务提交后才计数（回滚的插入不计入）
+PENDING_KEY = "popular_searches_pending"
+
+
+@event.listens_for(SearchHistory, "after_insert")
+def _after_insert(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(PENDING_KEY, []).append(target.query)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    for query in session.info.pop(PENDING_KEY, ()):
+        popular_searches.record(query)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _after_soft_rollback(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(PENDING_KEY, None)
+
+
+# 全局实例
+popular_searches = PopularSearchTracker()
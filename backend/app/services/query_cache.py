@@ -0,0 +1,137 @@
+"""
+查询结果缓存
+
+进程内 LRU + TTL 缓存，用于 /search 等读多写少的查询。
+每个条目记录写入时的语料版本号，旧版本的条目在下次读取时视为未命中，无需逐条清理。
+
+卡片由调度 leader 或 worker 进程写入，版本号因此保存在数据库（cache_versions）：
+新增、删除卡片或修改可搜索字段的事务内递增，各进程查询前从主库读取当前版本号，
+其他进程的写入同样会让缓存失效。只改指标（star、质量分等）的写入不递增，
+这类变化由 TTL 兜底，避免指标刷新、AI 增强反复清空缓存并争用同一行。
+"""
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.cache_version import CacheVersion
+from ..models.card import TechCard
+
+CORPUS = "tech_cards"
+
+# 影响搜索匹配的卡片字段
+SEARCHABLE_FIELDS = ("title", "summary", "chinese_tags", "tech_stack")
+
+
+class QueryResultCache:
+    """LRU + TTL 查询结果缓存"""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, version, value)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key: Hashable, version: Optional[int] = None) -> Optional[Any]:
+        """
+        读取缓存
+
+        Args:
+            version: 当前的语料版本号，与条目写入时的版本不同则视为未命中；不传时使用进程内版本号
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            expires_at, entry_version, value = entry
+            if expires_at < now or entry_version != (self.version if version is None else version):
+                del self._entries[key]
+                self.stats["stale"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None):
+        """
+        写入缓存
+
+        Args:
+            version: 计算结果前读到的语料版本号；不传时使用进程内版本号
+        """
+        with self._lock:
+            version = self.version if version is None else version
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self):
+        """进程内语料变化：递增进程内版本号，使按它写入的条目全部失效"""
+        with self._lock:
+            self.version += 1
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def reset(self):
+        """清空缓存和统计（测试使用）"""
+        with self._lock:
+            self._entries.clear()
+            self.stats = {key: 0 for key in self.stats}
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "version": self.version,
+                "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+                **self.stats
+            }
+
+
+# 搜索结果缓存
+search_cache = QueryResultCache(
+    max_entries=settings.search_cache_size,
+    ttl_seconds=settings.search_cache_ttl_seconds
+)
+
+
+def corpus_version(db: Session) -> int:
+    """数据库中卡片语料的当前版本号"""
+    return db.query(CacheVersion.version).filter(CacheVersion.name == CORPUS).scalar() or 0
+
+
+def _searchable_change(card: TechCard) -> bool:
+    attrs = inspect(card).attrs
+    return any(attrs[field].history.has_changes() for field in SEARCHABLE_FIELDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _corpus_changed(session, flush_context):
+    """新增/删除卡片或修改可搜索字段的 flush 在同一事务内递增语料版本号（每次 flush 一次）"""
+    changed = any(isinstance(obj, TechCard) for obj in chain(session.new, session.deleted)) or any(
+        isinstance(obj, TechCard) and _searchable_change(obj) for obj in session.dirty
+    )
+    if changed:
+        session.execute(
+            update(CacheVersion).where(CacheVersion.name == CORPUS).values(version=CacheVersion.version + 1)
+        )
@@ -0,0 +1,110 @@
+"""
+推荐会话（换一批）
+
+首次刷新时把完整的候选排序结果缓存在服务端，返回一个游标；
+之后每次“换一批”只需从游标位置向后取 limit 个未展示过的卡片，
+不再重新打分全部候选。会话带 TTL，并按 LRU 限制总数量。
+
+会话只存在于当前进程：请求落到其他 worker、重启、过期或被淘汰时游标失效，
+服务端重新排序。客户端每次都带上已展示的 exclude_ids，失效后也不会重复已看过的卡片。
+"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Set, Tuple
+
+# (card_id, score, matched_tags, reason)
+RankedEntry = Tuple[int, float, List[str], str]
+
+
+class RecommendationSession:
+    """单个用户的推荐翻页状态"""
+
+    def __init__(self, user_id: int, ranked: List[RankedEntry], seen: Iterable[int] = ()):
+        self.user_id = user_id
+        self.ranked = ranked
+        self.offset = 0
+        self.seen: Set[int] = set(seen)
+        self.expires_at = 0.0
+        # 同一游标的并发请求（重复点击、多个标签页）不能同时移动 offset
+        self._lock = threading.Lock()
+
+    def next_page(self, limit: int, exclude_ids: Iterable[int] = ()) -> List[RankedEntry]:
+        """
+        按排序顺序取下一批未展示的卡片
+        """
+        with self._lock:
+            self.seen.update(exclude_ids)
+
+            page = []
+            while self.offset < len(self.ranked) and len(page) < limit:
+                entry = self.ranked[self.offset]
+                self.offset += 1
+                if entry[0] in self.seen:
+                    continue
+                self.seen.add(entry[0])
+                page.append(entry)
+            return page
+
+    def has_more(self) -> bool:
+        """是否还有未展示的卡片（跳过的位置不会被重复扫描）"""
+        with self._lock:
+            while self.offset < len(self.ranked) and self.ranked[self.offset][0] in self.seen:
+                self.offset += 1
+            return self.offset < len(self.ranked)
+
+
+class RecommendationSessionStore:
+    """推荐会话存储（进程内，TTL + LRU）"""
+
+    def __init__(self, ttl_seconds: int = 1800, max_sessions: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, RecommendationSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, user_id: int, ranked: List[RankedEntry],
+               seen: Iterable[int] = ()) -> Tuple[str, RecommendationSession]:
+        session = RecommendationSession(user_id, ranked, seen)
+        session.expires_at = time.monotonic() + self.ttl_seconds
+        cursor = secrets.token_urlsafe(12)
+
+        with self._lock:
+            self._sessions[cursor] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return cursor, session
+
+    def get(self, cursor: Optional[str], user_id: int) -> Optional[RecommendationSession]:
+        """获取会话，过期或不属于该用户时返回 None；命中时续期"""
+        if not cursor:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(cursor)
+            if session is None:
+                return None
+            if session.expires_at < now or session.user_id != user_id:
+                if session.expires_at < now:
+                    del self._sessions[cursor]
+                return None
+            session.expires_at = now + self.ttl_seconds
+            self._sessions.move_to_end(cursor)
+            return session
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, s in self._sessions.items() if s.expires_at < now]
+            for key in expired:
+                del self._sessions[key]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+# 全局单例
+recommendation_sessions = RecommendationSessionStore()
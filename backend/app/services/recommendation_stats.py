@@ -0,0 +1,201 @@
+"""
+推荐统计汇总（增量维护）
+
+user_recommendations 的每次写入都会同步累加到按天汇总的统计表：
+- 缓冲队列批量写入曝光时，由 write_buffer 的 on_flush 钩子在同一事务内累加
+- 通过 ORM 单条写入/更新（如标记点击）时，由 mapper 事件累加
+
+统计接口只需对汇总表做 SUM，不再扫描原始推荐记录。
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..models.behavior import UserRecommendation
+from ..models.card import TechCard
+from ..models.recommendation_stats import RecommendationDailyStats, RecommendationTagDailyStats
+from .counters import upsert_counters
+
+logger = logging.getLogger(__name__)
+
+
+def classify_reason(reason: Optional[str]) -> str:
+    """将推荐理由文本归类（理由中含有标签、分数等可变内容）"""
+    if not reason:
+        return "other"
+    if reason.startswith("基于你的兴趣"):
+        return "interest"
+    if reason.startswith("高质量内容"):
+        return "quality"
+    if reason == "最新发布":
+        return "recent"
+    if reason == "兴趣相似的用户也喜欢":
+        return "collaborative"
+    return "other"
+
+
+def split_tags(matched_tags: Optional[str]) -> List[str]:
+    if not matched_tags:
+        return []
+    return [tag.strip()[:100] for tag in matched_tags.split(",") if tag.strip()]
+
+
+def _stat_date(created_at) -> date:
+    if isinstance(created_at, datetime):
+        return created_at.date()
+    if isinstance(created_at, date):
+        return created_at
+    return datetime.now().date()
+
+
+def _lookup_sources(connection: Connection, card_ids: Iterable[int]) -> Dict[int, str]:
+    card_ids = {cid for cid in card_ids if cid is not None}
+    if not card_ids:
+        return {}
+    rows = connection.execute(
+        select(TechCard.id, TechCard.source).where(TechCard.id.in_(card_ids))
+    ).all()
+    return {cid: source.value if hasattr(source, "value") else str(source) for cid, source in rows}
+
+
+def _upsert_counts(connection: Connection, model, key_columns: Tuple[str, ...],
+                   counts: Dict[tuple, List[int]]):
+    """按唯一键累加 impressions / clicks"""
+    upsert_counters(connection, model, key_columns, {
+        key: {"impressions": imp, "clicks": clk}
+        for key, (imp, clk) in counts.items()
+    })
+
+
+def apply_events(connection: Connection, events: List[Dict]):
+    """
+    将推荐事件累加到汇总表
+
+    Args:
+        events: [{user_id, card_id, reason, matched_tags, created_at,
+                  impressions, clicks, source(可选)}]
+    """
+    if not events:
+        return
+
+    missing = [e["card_id"] for e in events if not e.get("source")]
+    sources = _lookup_sources(connection, missing) if missing else {}
+
+    daily: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0])
+    tags: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0])
+
+    for e in events:
+        stat_date = _stat_date(e.get("created_at"))
+        user_id = e["user_id"]
+        source = e.get("source") or sources.get(e.get("card_id"), "")
+        key = (stat_date, user_id, classify_reason(e.get("reason")), source)
+        daily[key][0] += e.get("impressions", 0)
+        daily[key][1] += e.get("clicks", 0)
+
+        for tag in split_tags(e.get("matched_tags")):
+            tag_key = (stat_date, user_id, tag)
+            tags[tag_key][0] += e.get("impressions", 0)
+            tags[tag_key][1] += e.get("clicks", 0)
+
+    _upsert_counts(connection, RecommendationDailyStats,
+                   ("stat_date", "user_id", "reason", "source"), daily)
+    _upsert_counts(connection, RecommendationTagDailyStats,
+                   ("stat_date", "user_id", "tag"), tags)
+
+
+def record_served(db: Session, rows: List[Dict]):
+    """write_buffer 钩子：批量曝光写入后累加统计（同一事务）"""
+    apply_events(db.connection(), [
+        {**row, "impressions": 1, "clicks": 1 if row.get("is_clicked") else 0}
+        for row in rows
+    ])
+
+
+@event.listens_for(UserRecommendation, "after_insert")
+def _after_insert(mapper, connection, target):
+    apply_events(connection, [{
+        "user_id": target.user_id,
+        "card_id": target.card_id,
+        "reason": target.reason,
+        "matched_tags": target.matched_tags,
+        "created_at": target.created_at,
+        "impressions": 1,
+        "clicks": 1 if target.is_clicked else 0,
+    }])
+
+
+@event.listens_for(UserRecommendation, "after_update")
+def _after_update(mapper, connection, target):
+    history = inspect(target).attrs.is_clicked.history
+    if not history.has_changes():
+        return
+
+    was_clicked = bool(history.deleted and history.deleted[0])
+    is_clicked = bool(target.is_clicked)
+    if was_clicked == is_clicked:
+        return
+
+    apply_events(connection, [{
+        "user_id": target.user_id,
+        "card_id": target.card_id,
+        "reason": target.reason,
+        "matched_tags": target.matched_tags,
+        "created_at": target.created_at,
+        "impressions": 0,
+        "clicks": 1 if is_clicked else -1,
+    }])
+
+
+def rebuild(db: Session, since: Optional[date] = None, batch_size: int = 5000) -> int:
+    """
+    从 user_recommendations 重建汇总表（首次上线或修复数据时使用）
+
+    Returns:
+        处理的推荐记录数
+    """
+    for model in (RecommendationDailyStats, RecommendationTagDailyStats):
+        query = db.query(model)
+        if since:
+            query = query.filter(model.stat_date >= since)
+        query.delete(synchronize_session=False)
+
+    query = db.query(
+        UserRecommendation.user_id,
+        UserRecommendation.card_id,
+        UserRecommendation.reason,
+        UserRecommendation.matched_tags,
+        UserRecommendation.is_clicked,
+        UserRecommendation.created_at
+    )
+    if since:
+        query = query.filter(UserRecommendation.created_at >= datetime.combine(since, datetime.min.time()))
+
+    connection = db.connection()
+    processed = 0
+    batch = []
+    for user_id, card_id, reason, matched_tags, is_clicked, created_at in query.yield_per(batch_size):
+        batch.append({
+            "user_id": user_id,
+            "card_id": card_id,
+            "reason": reason,
+            "matched_tags": matched_tags,
+            "created_at": created_at,
+            "impressions": 1,
+            "clicks": 1 if is_clicked else 0,
+        })
+        if len(batch) >= batch_size:
+            apply_events(connection, batch)
+            processed += len(batch)
+            batch = []
+    if batch:
+        apply_events(connection, batch)
+        processed += len(batch)
+
+    db.commit()
+    logger.info(f"Rebuilt recommendation stats from {processed} records")
+    return processed
@@ -1,298 +1,431 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Any
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Any, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
 from .data_collector import DataCollector
+from .fetch_plans import FetchPlan, execute_plan, load_fetch_plans
+from .job_scheduler import AsyncJobScheduler, Job, JobSkipped
+from .leader_lease import LeaderLease, LeaseBusy, hold_lease
+from .scrapers.github_graphql import github_graphql
 from ..core.config import settings
-import schedule
-import threading
-import time
+from ..core.database import SessionLocal
+from ..core.lazy import LazyProvider
+from ..models.config import DataSourceHealth
 
 logger = logging.getLogger(__name__)
 
+# 所有采集任务共用的互斥组：定时采集、增量检查、全量采集和手动触发不会同时运行
+COLLECTION_LOCK = "collection"
+
+# 跨进程的 leader 租约名：多个 worker/主机中只有持有者运行跨进程的定时任务
+SCHEDULER_LEASE = "collection_scheduler"
+
+# 跨进程的采集租约名：leader 的定时采集和 worker 执行的手动采集（collect_source 任务）
+# 运行期间都持有它，同一时间只有一个采集在运行
+COLLECTION_LEASE = "collection_run"
+
+# 全局采集任务：只在没有配置采集计划时注册，配置了计划后由各计划任务按各自的节奏采集
+GLOBAL_COLLECTION_JOBS = ("data_collection", "full_collection", "incremental_check")
+
+
+def collection_lease(session_factory: Callable[[], Session] = SessionLocal) -> LeaderLease:
+    """新建一个采集租约（每次采集单独获取和释放）"""
+    return LeaderLease(COLLECTION_LEASE, settings.scheduler_lease_ttl_seconds, session_factory=session_factory)
+
 
 class TaskScheduler:
     def __init__(self):
         self.data_collector = DataCollector()
-        self.running = False
-        self.scheduler_thread = None
+        self.jobs = AsyncJobScheduler()
+        # 维护本进程内存状态的任务：每个进程都运行，不需要租约
+        self.local_jobs = AsyncJobScheduler()
+        self.lease = LeaderLease(SCHEDULER_LEASE, settings.scheduler_lease_ttl_seconds)
+        self.session_factory = SessionLocal
+        self.fetch_plans: Dict[str, FetchPlan] = {}
         self.last_collection_time = None
-        
+        self._lease_task = None
+        self._register_jobs()
+        self._register_local_jobs()
+
+    def _register_jobs(self):
+        jitter = settings.scheduler_jitter_seconds
+        add = self.jobs.add_job
+
+        self._register_global_collection_jobs()
+
+        # 每天凌晨3点归档过期的原始行为记录
+        add(Job("behavior_compaction", self._run_behavior_compaction, at="03:00", jitter_seconds=jitter))
+
+        # 定期补充AI增强积压（新卡片、质量分和用户兴趣的变化会重新计算优先级）
+        add(Job("enrichment_backlog_refill", self._refill_enrichment_backlog,
+                interval=timedelta(minutes=settings.enrichment_refill_minutes), jitter_seconds=jitter))
+
+        # 定期批量刷新卡片指标（star、下载量），计算增速并重新评分
+        add(Job("metric_refresh", self._refresh_card_metrics,
+                interval=timedelta(minutes=settings.metric_refresh_minutes), jitter_seconds=jitter))
+
+        # 定期重新编译用户采集计划（同步其他进程中的配置变更和夏令时切换）
+        add(Job("fetch_plan_reload", self.reload_fetch_plans,
+                interval=timedelta(minutes=settings.fetch_plan_reload_minutes), run_at_start=True))
+
+    def _register_global_collection_jobs(self):
+        jitter = settings.scheduler_jitter_seconds
+        add = self.jobs.add_job
+
+        # 定时采集
+        add(Job("data_collection", self._run_data_collection,
+                interval=timedelta(hours=settings.collection_interval_hours),
+                jitter_seconds=jitter, lock_group=COLLECTION_LOCK))
+
+        # 每天凌晨2点执行全量更新
+        add(Job("full_collection", self._run_full_collection, at="02:00",
+                jitter_seconds=jitter, lock_group=COLLECTION_LOCK))
+
+        # 每小时检查是否需要增量更新
+        add(Job("incremental_check", self._check_incremental_update, interval=timedelta(hours=1),
+                jitter_seconds=jitter, lock_group=COLLECTION_LOCK))
+
+    def _update_global_collection_jobs(self):
+        """配置了采集计划时移除全局采集任务，计划全部移除后重新注册"""
+        registered = GLOBAL_COLLECTION_JOBS[0] in self.jobs.jobs
+        if self.fetch_plans and registered:
+            for name in GLOBAL_COLLECTION_JOBS:
+                self.jobs.remove_job(name)
+            logger.info("Fetch plans configured, global collection jobs removed")
+        elif not self.fetch_plans and not registered:
+            self._register_global_collection_jobs()
+            logger.info("No fetch plans configured, global collection jobs registered")
+
+    def _register_local_jobs(self):
+        jitter = settings.scheduler_jitter_seconds
+        add = self.local_jobs.add_job
+
+        # 定期把本进程的热门搜索词计数累加到快照，并读回所有进程的合并结果
+        add(Job("popular_search_snapshot", self._persist_popular_searches,
+                interval=timedelta(minutes=settings.popular_search_snapshot_minutes), jitter_seconds=jitter))
+
+        # 每天凌晨4点全量重建本进程的自动补全索引（清理过期的词和权重）
+        add(Job("autocomplete_rebuild", self._rebuild_autocomplete_index, at="04:00", jitter_seconds=jitter))
+
+    async def reload_fetch_plans(self) -> Dict[str, List[str]]:
+        """
+        按当前的数据源配置重新编译采集计划，增删变化的计划任务（无需重启）
+
+        Returns:
+            新增、移除和未变化的计划名
+        """
+        def load():
+            db = self.session_factory()
+            try:
+                return load_fetch_plans(db)
+            finally:
+                db.close()
+
+        return self.apply_fetch_plans(await asyncio.to_thread(load))
+
+    def apply_fetch_plans(self, plans: List[FetchPlan]) -> Dict[str, List[str]]:
+        """用新的计划列表替换已注册的计划任务；未变化的计划保留原任务和下次运行时间"""
+        new_plans = {plan.name: plan for plan in plans}
+        removed = [
+            name for name, plan in self.fetch_plans.items()
+            if name not in new_plans or new_plans[name].signature != plan.signature
+        ]
+        for name in removed:
+            self.jobs.remove_job(name)
+            del self.fetch_plans[name]
+
+        added = []
+        for name, plan in new_plans.items():
+            if name in self.fetch_plans:
+                # 只有订阅者变化时更新计划对象，任务不动
+                self.fetch_plans[name] = plan
+                continue
+            self.fetch_plans[name] = plan
+            # 计划任务与其他采集共用互斥组，但排队等待而不是跳过，保证各自的节奏
+            self.jobs.add_job(Job(name, self._plan_runner(name), jitter_seconds=settings.scheduler_jitter_seconds,
+                                  lock_group=COLLECTION_LOCK, wait_for_lock=True, **plan.cadence.job_trigger()))
+            added.append(name)
+        self._update_global_collection_jobs()
+
+        changed = set(added) | set(removed)
+        if changed:
+            logger.info(f"Fetch plans reloaded: {len(added)} added, {len(removed)} removed")
+        return {
+            "added": added,
+            "removed": [name for name in removed if name not in new_plans],
+            "unchanged": [name for name in new_plans if name not in changed],
+        }
+
+    def _plan_runner(self, name: str):
+        async def run():
+            # 运行时读取最新的计划对象（订阅者可能已更新，等待互斥锁期间计划也可能已被移除）
+            plan = self.fetch_plans.get(name)
+            if plan is None:
+                return None
+            async with self._collection_lease(wait=True):
+                result = await execute_plan(self.data_collector, plan)
+            logger.info(f"Fetch plan completed: {result}")
+            if result["saved"] > 0:
+                await self._refill_enrichment_backlog()
+            return result
+        return run
+
+    @asynccontextmanager
+    async def _collection_lease(self, wait: bool = False):
+        """
+        持有跨进程的采集租约执行采集，与 worker 执行的手动采集互斥
+
+        租约被占用时，wait 的计划任务等待释放，其他采集本次记为 skipped。
+        """
+        try:
+            async with hold_lease(collection_lease(self.session_factory), settings.scheduler_lease_renew_seconds,
+                                  wait=wait):
+                yield
+        except LeaseBusy as e:
+            raise JobSkipped(str(e)) from e
+
+    @property
+    def running(self) -> bool:
+        return self._lease_task is not None and not self._lease_task.done()
+
     def start_scheduler(self):
         """
-        启动调度器
+        启动调度器（在应用事件循环中调用）
+
+        每个进程都参与 leader 竞选，只有持有租约的进程启动跨进程的定时任务；
+        维护本进程内存状态的任务（local_jobs）在每个进程都立即启动。
         """
         if self.running:
             logger.warning("Scheduler is already running")
             return
-            
-        self.running = True
-        
-        # 设置定时任务
-        schedule.every(settings.collection_interval_hours).hours.do(self._run_data_collection)
-        
-        # 每天凌晨2点执行全量更新
-        schedule.every().day.at("02:00").do(self._run_full_collection)
-        
-        # 每小时检查是否需要增量更新
-        schedule.every().hour.do(self._check_incremental_update)
-        
-        # 启动调度器线程
-        self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-        self.scheduler_thread.start()
-        
-        logger.info("Task scheduler started")
-    
-    def stop_scheduler(self):
+        self.local_jobs.start()
+        self._lease_task = asyncio.get_running_loop().create_task(self._lease_loop(), name="scheduler-lease")
+        logger.info(f"Task scheduler started as {self.lease.holder_id}")
+
+    async def stop_scheduler(self):
         """
-        停止调度器
+        停止调度器：取消竞选/续约和所有任务，并释放租约以便其他进程立即接管
+
+        退出前持久化一次本进程尚未写入的热门搜索词计数。
         """
-        self.running = False
-        schedule.clear()
-        if self.scheduler_thread and self.scheduler_thread.is_alive():
-            self.scheduler_thread.join(timeout=5)
+        if self._lease_task:
+            self._lease_task.cancel()
+            await asyncio.gather(self._lease_task, return_exceptions=True)
+            self._lease_task = None
+        await self.jobs.stop()
+        if self.local_jobs.running:
+            await self.local_jobs.stop()
+            try:
+                await self._persist_popular_searches()
+            except Exception as e:
+                logger.error(f"Failed to persist popular searches on shutdown: {e}")
+        await asyncio.to_thread(self.lease.release)
         logger.info("Task scheduler stopped")
-    
-    def _run_scheduler(self):
+
+    async def _lease_loop(self):
         """
-        调度器主循环
+        竞选/续约循环：成为 leader 时启动任务，失去租约（或无法确认）时立即停止任务
         """
-        while self.running:
-            try:
-                schedule.run_pending()
-                time.sleep(60)  # 每分钟检查一次
-            except Exception as e:
-                logger.error(f"Error in scheduler loop: {e}")
-                time.sleep(60)
-    
-    def _run_data_collection(self):
+        while True:
+            is_leader = await asyncio.to_thread(self.lease.try_acquire)
+            if is_leader and not self.jobs.running:
+                logger.info("Became scheduler leader, starting jobs")
+                self.jobs.start()
+            elif not is_leader and self.jobs.running:
+                logger.warning("Lost scheduler leadership, stopping jobs")
+                await self.jobs.stop()
+            await asyncio.sleep(settings.scheduler_lease_renew_seconds)
+
+    async def trigger_collection(self) -> Dict[str, Any]:
+        """
+        手动触发一次采集
+
+        只在 leader 进程执行；非 leader、已有采集在运行或配置了采集计划（由计划任务采集）时
+        返回 skipped 记录。
+        """
+        if not self.lease.is_leader:
+            holder = await asyncio.to_thread(self.lease.current_holder)
+            return {
+                "job": "data_collection",
+                "status": "skipped",
+                "error": f"not the scheduler leader (leader: {holder['holder_id'] if holder else 'none'})",
+                "result": None,
+            }
+        if "data_collection" not in self.jobs.jobs:
+            return {
+                "job": "data_collection",
+                "status": "skipped",
+                "error": f"collections run from {len(self.fetch_plans)} fetch plans",
+                "result": None,
+            }
+        return await self.jobs.run_job("data_collection")
+
+    async def _run_data_collection(self):
         """
         运行数据收集任务
         """
-        try:
-            logger.info("Starting scheduled data collection")
-            
-            # 使用异步运行
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            try:
-                results = loop.run_until_complete(self.data_collector.collect_all_sources())
-                self.last_collection_time = datetime.now()
-                
-                logger.info(f"Scheduled collection completed: {results}")
-                
-                # 如果有新数据，触发AI增强
-                if results["total"] > 0:
-                    loop.run_until_complete(self._enhance_recent_cards())
-                
-            finally:
-                loop.close()
-                
-        except Exception as e:
-            logger.error(f"Error in scheduled data collection: {e}")
-    
-    def _run_full_collection(self):
+        logger.info("Starting scheduled data collection")
+
+        async with self._collection_lease():
+            results = await self.data_collector.collect_all_sources()
+        self.last_collection_time = datetime.now()
+
+        logger.info(f"Scheduled collection completed: {results}")
+
+        # 如果有新数据，补充AI增强积压
+        if results["total"] > 0:
+            await self._refill_enrichment_backlog()
+        return results
+
+    async def _run_full_collection(self):
         """
         运行全量数据收集
         """
+        logger.info("Starting full data collection")
+
+        # 运行所有数据源的收集
+        async with self._collection_lease():
+            results = await self.data_collector.collect_all_sources()
+        self.last_collection_time = datetime.now()
+
+        logger.info(f"Full collection completed: {results}")
+
+        # 如果有新数据，补充AI增强积压
+        if results["total"] > 0:
+            await self._refill_enrichment_backlog()
+        return results
+
+    async def _check_incremental_update(self):
+        """
+        检查是否需要增量更新（与采集任务同组，调用时已持有采集锁）
+
+        上次采集时间取本进程记录和数据源健康记录中较晚的一个：
+        leader 故障转移或重启后沿用之前的采集时间，而不是立即重新采集。
+        """
+        now = datetime.now()
+        recorded = await asyncio.to_thread(self._load_last_collection_time)
+        if recorded and (not self.last_collection_time or recorded > self.last_collection_time):
+            self.last_collection_time = recorded
+
+        # 如果距离上次收集超过2小时，进行增量更新
+        if (not self.last_collection_time or
+                now - self.last_collection_time > timedelta(hours=2)):
+            logger.info("Running incremental update")
+            return await self._run_data_collection()
+        return None
+
+    def _load_last_collection_time(self) -> Optional[datetime]:
+        """最近一次数据源健康记录的时间（各数据源采集结束时写入），转换为本地时间"""
+        db = self.session_factory()
         try:
-            logger.info("Starting full data collection")
-            
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
+            latest = db.query(func.max(DataSourceHealth.check_time)).scalar()
+        finally:
+            db.close()
+        if latest is None:
+            return None
+        if latest.tzinfo is None:
+            # SQLite 的 CURRENT_TIMESTAMP 为不带时区的 UTC 时间
+            latest = latest.replace(tzinfo=timezone.utc)
+        return latest.astimezone().replace(tzinfo=None)
+
+    async def _run_behavior_compaction(self):
+        """
+        归档并删除超过保留期的原始行为记录
+        """
+        from ..core.database import SessionLocal
+        from . import behavior_rollup
+
+        def compact():
+            db = SessionLocal()
             try:
-                # 运行所有数据源的收集
-                results = loop.run_until_complete(self.data_collector.collect_all_sources())
-                
-                logger.info(f"Full collection completed: {results}")
-                
-                # 对所有未处理的卡片进行AI增强
-                if results["total"] > 0:
-                    loop.run_until_complete(self._enhance_all_cards())
-                
+                return behavior_rollup.compact(db)
             finally:
-                loop.close()
-                
-        except Exception as e:
-            logger.error(f"Error in full data collection: {e}")
-    
-    def _check_incremental_update(self):
+                db.close()
+
+        result = await asyncio.to_thread(compact)
+        logger.info(f"Behavior compaction completed: {result}")
+        return result
+
+    async def _persist_popular_searches(self):
         """
-        检查是否需要增量更新
+        把本进程的热门搜索词增量累加到快照
         """
-        try:
-            now = datetime.now()
-            
-            # 如果距离上次收集超过2小时，进行增量更新
-            if (not self.last_collection_time or 
-                now - self.last_collection_time > timedelta(hours=2)):
-                
-                logger.info("Running incremental update")
-                self._run_data_collection()
-                
-        except Exception as e:
-            logger.error(f"Error in incremental update check: {e}")
-    
-    async def _enhance_recent_cards(self):
+        from .popular_searches import popular_searches
+
+        written = await asyncio.to_thread(popular_searches.persist)
+        if written:
+            logger.info(f"Persisted {written} popular search snapshot rows")
+        return written
+
+    async def _rebuild_autocomplete_index(self):
         """
-        增强最近添加的卡片
+        全量重建本进程的自动补全索引
         """
-        try:
-            from ..models.card import TechCard
-            from ..core.database import SessionLocal
-            from .ai.summarizer import AISummarizer
-            
+        from ..core.database import SessionLocal
+        from .autocomplete import autocomplete_index
+
+        def rebuild():
             db = SessionLocal()
-            summarizer = AISummarizer()
-            
-            # 获取最近1小时内添加的卡片，且没有AI摘要的
-            cutoff_time = datetime.now() - timedelta(hours=1)
-            recent_cards = db.query(TechCard).filter(
-                TechCard.created_at >= cutoff_time,
-                TechCard.summary.is_(None) | (TechCard.summary == "")
-            ).limit(20).all()
-            
-            enhanced_count = 0
-            for card in recent_cards:
-                try:
-                    description = ""
-                    if card.raw_data:
-                        if card.source.value == "github":
-                            description = card.raw_data.get("description", "")
-                        elif card.source.value == "arxiv":
-                            description = card.raw_data.get("summary", "")[:500]
-                        elif card.source.value == "huggingface":
-                            description = f"Downloads: {card.raw_data.get('downloads', 0)}"
-                        elif card.source.value == "zenn":
-                            description = card.raw_data.get("content", "")[:300]
-                    
-                    # 生成AI摘要
-                    if not card.summary:
-                        summary = await summarizer.generate_summary(
-                            card.title, description, card.source.value
-                        )
-                        if summary:
-                            card.summary = summary
-                    
-                    # 提取标签
-                    if not card.chinese_tags:
-                        tags = await summarizer.extract_tags(
-                            card.title, description, card.source.value
-                        )
-                        if tags:
-                            card.chinese_tags = tags
-                    
-                    # 生成试用建议
-                    if not card.trial_suggestion:
-                        trial_suggestion = await summarizer.generate_trial_suggestion(
-                            card.title, description, card.chinese_tags or []
-                        )
-                        if trial_suggestion:
-                            card.trial_suggestion = trial_suggestion
-                    
-                    enhanced_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error enhancing card {card.id}: {e}")
-                    continue
-            
-            db.commit()
-            db.close()
-            
-            if enhanced_count > 0:
-                logger.info(f"Enhanced {enhanced_count} recent cards with AI")
-                
-        except Exception as e:
-            logger.error(f"Error in _enhance_recent_cards: {e}")
-    
-    async def _enhance_all_cards(self):
+            try:
+                autocomplete_index.build(db)
+            finally:
+                db.close()
+
+        await asyncio.to_thread(rebuild)
+
+    async def _refresh_card_metrics(self):
         """
-        增强所有未处理的卡片
+        刷新一批追踪中卡片的指标快照（GitHub GraphQL 点数用完时等到重置后再刷新）
         """
-        try:
-            from ..models.card import TechCard
-            from ..core.database import SessionLocal
-            from .ai.summarizer import AISummarizer
-            
-            db = SessionLocal()
-            summarizer = AISummarizer()
-            
-            # 获取所有没有AI摘要的卡片
-            unprocessed_cards = db.query(TechCard).filter(
-                TechCard.summary.is_(None) | (TechCard.summary == "")
-            ).limit(50).all()
-            
-            enhanced_count = 0
-            for card in unprocessed_cards:
-                try:
-                    description = ""
-                    if card.raw_data:
-                        if card.source.value == "github":
-                            description = card.raw_data.get("description", "")
-                        elif card.source.value == "arxiv":
-                            description = card.raw_data.get("summary", "")[:500]
-                        elif card.source.value == "huggingface":
-                            description = f"Downloads: {card.raw_data.get('downloads', 0)}"
-                        elif card.source.value == "zenn":
-                            description = card.raw_data.get("content", "")[:300]
-                    
-                    # 生成AI摘要
-                    if not card.summary:
-                        summary = await summarizer.generate_summary(
-                            card.title, description, card.source.value
-                        )
-                        if summary:
-                            card.summary = summary
-                    
-                    # 提取标签
-                    if not card.chinese_tags:
-                        tags = await summarizer.extract_tags(
-                            card.title, description, card.source.value
-                        )
-                        if tags:
-                            card.chinese_tags = tags
-                    
-                    # 生成试用建议
-                    if not card.trial_suggestion:
-                        trial_suggestion = await summarizer.generate_trial_suggestion(
-                            card.title, description, card.chinese_tags or []
-                        )
-                        if trial_suggestion:
-                            card.trial_suggestion = trial_suggestion
-                    
-                    enhanced_count += 1
-                    
-                    # 每处理10个卡片就提交一次，避免长时间占用数据库
-                    if enhanced_count % 10 == 0:
-                        db.commit()
-                    
-                except Exception as e:
-                    logger.error(f"Error enhancing card {card.id}: {e}")
-                    continue
-            
-            db.commit()
-            db.close()
-            
-            if enhanced_count > 0:
-                logger.info(f"Enhanced {enhanced_count} cards with AI")
-                
-        except Exception as e:
-            logger.error(f"Error in _enhance_all_cards: {e}")
-    
+        from .card_metrics import card_metric_tracker
+
+        if github_graphql.budget_exhausted():
+            logger.info(f"Skipping metric refresh until GitHub rate limit resets at "
+                        f"{github_graphql.rate_limit['reset_at']}")
+            return None
+        return await card_metric_tracker.refresh()
+
+    async def _refill_enrichment_backlog(self):
+        """
+        把未增强的卡片按优先级补充到任务队列（由 worker 在 LLM 预算内持续消费）
+        """
+        from . import enrichment_backlog
+
+        def refill():
+            db = self.session_factory()
+            try:
+                return enrichment_backlog.refill(db)
+            finally:
+                db.close()
+
+        return await asyncio.to_thread(refill)
+
     def get_status(self) -> Dict[str, Any]:
         """
         获取调度器状态
         """
+        status = self.jobs.get_status()
+        local_status = self.local_jobs.get_status()
         return {
             "running": self.running,
             "last_collection_time": self.last_collection_time.isoformat() if self.last_collection_time else None,
             "collection_interval_hours": settings.collection_interval_hours,
-            "next_scheduled_jobs": [str(job) for job in schedule.jobs],
-            "scheduler_thread_alive": self.scheduler_thread.is_alive() if self.scheduler_thread else False
+            "next_scheduled_jobs": [
+                f"{job['name']} ({job['schedule']}), next run {job['next_run']}"
+                for job in status["jobs"] + local_status["jobs"]
+            ],
+            "leader": self.lease.get_status(),
+            "fetch_plans": [plan.to_dict() for plan in self.fetch_plans.values()],
+            "github_graphql": github_graphql.get_status(),
+            "jobs": status["jobs"],
+            "history": status["history"],
+            "local_jobs": local_status["jobs"],
+            "local_history": local_status["history"],
         }
 
 
 # 全局调度器实例
-task_scheduler = TaskScheduler()
\ No newline at end of file
+task_scheduler = LazyProvider(TaskScheduler, "task_scheduler")
@@ -1,6 +1,7 @@
 from .github import GitHubScraper
+from .github_graphql import GitHubGraphQLFetcher
 from .arxiv import ArxivScraper  
 from .huggingface import HuggingFaceScraper
 from .zenn import ZennScraper
 
-__all__ = ["GitHubScraper", "ArxivScraper", "HuggingFaceScraper", "ZennScraper"]
\ No newline at end of file
+__all__ = ["GitHubScraper", "GitHubGraphQLFetcher", "ArxivScraper", "HuggingFaceScraper", "ZennScraper"]
\ No newline at end of file
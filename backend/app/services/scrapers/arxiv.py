@@ -1,9 +1,10 @@
 import feedparser
-import requests
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 import logging
 
+from .http_cache import http_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,9 +21,14 @@ class ArxivScraper:
             "stat.ML": "Machine Learning (Statistics)"
         }
     
-    async def get_recent_papers(self, categories: Optional[List[str]] = None, max_results: int = 30, days_back: int = 30) -> List[Dict]:
+    async def get_recent_papers(self, categories: Optional[List[str]] = None, max_results: int = 30, days_back: int = 30,
+                                submitted_since: Optional[datetime] = None) -> List[Dict]:
         """
         获取最近的 arXiv 论文 - 重点关注AI相关领域，只获取指定天数内的论文
+
+        Args:
+            submitted_since: 增量采集游标（UTC）。设置时只查询此后提交的论文，并按提交时间升序返回，
+                结果超过 max_results 时游标逐次推进，不会跳过中间的论文
         """
         try:
             if not categories:
@@ -46,16 +52,19 @@ class ArxivScraper:
             
             # 组合查询：(分类 OR 关键词) 
             query = f"({cat_query}) OR ({keyword_query})"
+            if submitted_since:
+                since = submitted_since.strftime("%Y%m%d%H%M")
+                query = f"({query}) AND submittedDate:[{since} TO 209912312359]"
             
             params = {
                 "search_query": query,
                 "start": 0,
                 "max_results": max_results * 2,  # 获取更多以便过滤
                 "sortBy": "submittedDate",
-                "sortOrder": "descending"
+                "sortOrder": "ascending" if submitted_since else "descending"
             }
             
-            response = requests.get(self.base_url, params=params, timeout=30)
+            response = await http_cache.get(self.base_url, params=params, timeout=30)
             response.raise_for_status()
             
             feed = feedparser.parse(response.text)
@@ -118,7 +127,7 @@ class ArxivScraper:
                 "max_results": 1
             }
             
-            response = requests.get(self.base_url, params=params, timeout=30)
+            response = await http_cache.get(self.base_url, params=params, timeout=30)
             response.raise_for_status()
             
             feed = feedparser.parse(response.text)
@@ -1,8 +1,11 @@
-import requests
 from typing import List, Dict, Optional
 from datetime import datetime
 import logging
 
+from ...core.config import settings
+from .github_graphql import github_graphql
+from .http_cache import http_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -10,6 +13,13 @@ class GitHubScraper:
     def __init__(self):
         self.base_url = "https://api.github.com"
         self.trending_url = "https://github.com/trending"
+
+    def _headers(self) -> Dict[str, str]:
+        """配置了 github_token 时认证请求（搜索 30 次/分钟、其他 5000 次/小时，未认证为 10 次/分钟、60 次/小时）"""
+        headers = {"Accept": "application/vnd.github+json"}
+        if settings.github_token:
+            headers["Authorization"] = f"Bearer {settings.github_token}"
+        return headers
     
     async def get_trending_repos(self, language: Optional[str] = None, since: str = "daily") -> List[Dict]:
         """
@@ -27,7 +37,7 @@ class GitHubScraper:
             if language:
                 params["q"] += f" language:{language}"
             
-            response = requests.get(url, params=params, timeout=30)
+            response = await http_cache.get(url, params=params, headers=self._headers(), timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -55,21 +65,30 @@ class GitHubScraper:
             logger.error(f"Error fetching GitHub trending: {e}")
             return []
     
-    async def get_daily_trending_repos(self, language: Optional[str] = None, limit: int = 30) -> List[Dict]:
+    async def get_daily_trending_repos(self, language: Optional[str] = None, limit: int = 30,
+                                       pushed_since: Optional[datetime] = None, min_stars: int = 0) -> List[Dict]:
         """
         获取每日真正trending的项目 - 结合新建和活跃项目
+
+        Args:
+            pushed_since: 增量采集游标（UTC），活跃项目只查询此后推送的，替代按天的窗口。
+                新建项目的查询仍用按天的滚动窗口：新项目要过一段时间才有星，
+                在之后几次采集中都需要能被查到
+            min_stars: 最低星数，放进搜索条件：结果（以及据此推进的游标）只包含达到要求的项目
         """
         try:
             from datetime import datetime, timedelta
             
             today = datetime.now().strftime("%Y-%m-%d")
             yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+            pushed_after = pushed_since.strftime("%Y-%m-%dT%H:%M:%SZ") if pushed_since else yesterday
             
             all_repos = []
             
             # 策略1: 获取今天新建的项目
             new_repos = await self._search_repos({
-                "q": f"created:{today}" + (f" language:{language}" if language else ""),
+                "q": f"created:{today}" + (f" stars:>={min_stars}" if min_stars else "")
+                     + (f" language:{language}" if language else ""),
                 "sort": "stars", 
                 "order": "desc",
                 "per_page": 15
@@ -77,7 +96,8 @@ class GitHubScraper:
             
             # 策略2: 获取昨天活跃且星数增长的项目  
             active_repos = await self._search_repos({
-                "q": f"pushed:>{yesterday} stars:>10" + (f" language:{language}" if language else ""),
+                "q": f"pushed:>{pushed_after} stars:>={max(11, min_stars)}"
+                     + (f" language:{language}" if language else ""),
                 "sort": "updated",
                 "order": "desc", 
                 "per_page": 15
@@ -85,7 +105,8 @@ class GitHubScraper:
             
             # 策略3: 获取最近2天创建的新兴项目
             recent_repos = await self._search_repos({
-                "q": f"created:>{yesterday} stars:>3" + (f" language:{language}" if language else ""),
+                "q": f"created:>{yesterday} stars:>={max(4, min_stars)}"
+                     + (f" language:{language}" if language else ""),
                 "sort": "stars",
                 "order": "desc",
                 "per_page": 15
@@ -132,7 +153,7 @@ class GitHubScraper:
         """
         try:
             url = "https://api.github.com/search/repositories"
-            response = requests.get(url, params=params, timeout=30)
+            response = await http_cache.get(url, params=params, headers=self._headers(), timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -149,6 +170,7 @@ class GitHubScraper:
                     "license": repo.get("license", {}).get("name") if repo.get("license") else None,
                     "created_at": repo["created_at"],
                     "updated_at": repo["updated_at"],
+                    "pushed_at": repo.get("pushed_at"),
                     "topics": repo.get("topics", []),
                     "raw_data": repo
                 }
@@ -160,9 +182,15 @@ class GitHubScraper:
             logger.error(f"Error in _search_repos: {e}")
             return []
 
-    async def get_ai_python_repos(self, since: str = "daily") -> List[Dict]:
+    async def get_ai_python_repos(self, since: str = "daily", pushed_since: Optional[datetime] = None,
+                                  min_stars: int = 0) -> List[Dict]:
         """
         获取 AI 相关的 Python 项目
+
+        Args:
+            pushed_since: 增量采集游标（UTC），设置时替代 pushed 条件的时间窗口；
+                created 条件仍用 since 的滚动窗口（新项目之后几次采集中仍能被查到）
+            min_stars: 最低星数（放进搜索条件）
         """
         try:
             from datetime import datetime, timedelta
@@ -173,6 +201,7 @@ class GitHubScraper:
                 date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
             else:
                 date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+            pushed_after = pushed_since.strftime("%Y-%m-%dT%H:%M:%SZ") if pushed_since else date
             
             ai_keywords = [
                 "machine learning", "deep learning", "neural network", "artificial intelligence",
@@ -187,7 +216,7 @@ class GitHubScraper:
             # 搜索不同的AI关键词组合，降低星数要求以获取更多新项目
             for keyword in ai_keywords[:5]:  # 限制搜索次数避免API限制
                 params = {
-                    "q": f'"{keyword}" language:python (created:>{date} OR pushed:>{date}) stars:>1',
+                    "q": f'"{keyword}" language:python (created:>{date} OR pushed:>{pushed_after}) stars:>={max(2, min_stars)}',
                     "sort": "updated",
                     "order": "desc",
                     "per_page": 10
@@ -228,13 +257,70 @@ class GitHubScraper:
             date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
             return f"created:>{date} OR (stars:>5 pushed:>{date})"
     
+    async def get_repo_metrics(self, full_names: List[str]) -> Dict[str, Dict]:
+        """
+        批量获取仓库的当前指标（指标快照刷新用）
+
+        配置了 github_token 时用 GraphQL 每 100 个仓库一次请求（含最近 30 天提交数），
+        否则逐个请求 REST。
+
+        Returns:
+            {full_name: {"stars", "forks", "open_issues"[, "commit_count_30d"]}}，请求失败的仓库不在结果中
+        """
+        if github_graphql.available:
+            repos = await github_graphql.fetch_repos(full_names, with_readme=False)
+            return {
+                full_name: {key: repo[key] for key in ("stars", "forks", "open_issues", "commit_count_30d")}
+                for full_name, repo in repos.items()
+            }
+
+        metrics = {}
+        for full_name in full_names:
+            try:
+                response = await http_cache.get(
+                    f"{self.base_url}/repos/{full_name}", headers=self._headers(), timeout=30
+                )
+                response.raise_for_status()
+                repo_data = response.json()
+                metrics[full_name] = {
+                    "stars": repo_data["stargazers_count"],
+                    "forks": repo_data["forks_count"],
+                    "open_issues": repo_data.get("open_issues_count", 0),
+                }
+            except Exception as e:
+                logger.error(f"Error fetching metrics for {full_name}: {e}")
+        return metrics
+
+    async def get_repos_details(self, full_names: List[str]) -> Dict[str, Dict]:
+        """
+        批量获取仓库详情（含 README）
+
+        配置了 github_token 时用 GraphQL 批量查询，否则逐个调用 get_repo_details。
+
+        Returns:
+            {full_name: 仓库详情}
+        """
+        if github_graphql.available:
+            return await github_graphql.fetch_repos(full_names)
+
+        details = {}
+        for full_name in full_names:
+            owner, _, repo = full_name.partition("/")
+            repo_data = await self.get_repo_details(owner, repo)
+            if repo_data:
+                details[full_name] = repo_data
+        return details
+
     async def get_repo_details(self, owner: str, repo: str) -> Optional[Dict]:
         """
-        获取特定仓库的详细信息
+        获取特定仓库的详细信息（配置了 github_token 时用一次 GraphQL 请求代替 REST 的两次请求）
         """
+        if github_graphql.available:
+            return (await github_graphql.fetch_repos([f"{owner}/{repo}"])).get(f"{owner}/{repo}")
+
         try:
             url = f"{self.base_url}/repos/{owner}/{repo}"
-            response = requests.get(url, timeout=30)
+            response = await http_cache.get(url, headers=self._headers(), timeout=30)
             response.raise_for_status()
             
             repo_data = response.json()
@@ -266,7 +352,7 @@ class GitHubScraper:
         """
         try:
             url = f"{self.base_url}/repos/{owner}/{repo}/readme"
-            response = requests.get(url, timeout=30)
+            response = await http_cache.get(url, headers=self._headers(), timeout=30)
             response.raise_for_status()
             
             readme_data = response.json()
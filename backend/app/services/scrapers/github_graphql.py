@@ -0,0 +1,198 @@
+"""
+GitHub GraphQL 批量仓库查询
+
+REST 获取一个仓库的指标和 README 至少需要 2 次请求（/repos/{repo}、/repos/{repo}/readme），
+GraphQL 用别名在一次请求中查询最多 BATCH_SIZE 个仓库：
+star/fork/open issue 数、协议、topics、默认分支最近 30 天的提交数和 README。
+
+- GraphQL API 必须认证，使用 Settings.github_token；未配置时 available 为 False，调用方回退到 REST
+- 每次响应附带 rateLimit（剩余点数、重置时间），记录在 rate_limit 中供调度器查看；
+  剩余点数不足时在重置前不再发送请求
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from ...core.config import settings
+from .rate_governor import request_governor
+
+logger = logging.getLogger(__name__)
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+# 单次查询的仓库数（GitHub 对单个查询的节点数和响应时间有限制，100 个仓库约消耗 1~2 点）
+BATCH_SIZE = 100
+
+# 剩余点数低于此值时暂停，给其他使用同一 token 的请求留出余量
+MIN_REMAINING = 50
+
+README_MAX_CHARS = 2000
+
+REPO_FIELDS = """
+fragment RepoFields on Repository {
+  nameWithOwner
+  url
+  description
+  stargazerCount
+  forkCount
+  issues(states: OPEN) { totalCount }
+  licenseInfo { name spdxId }
+  primaryLanguage { name }
+  repositoryTopics(first: 20) { nodes { topic { name } } }
+  createdAt
+  updatedAt
+  pushedAt
+  defaultBranchRef {
+    target { ... on Commit { history(since: $since) { totalCount } } }
+  }
+  readme: object(expression: "HEAD:README.md") { ... on Blob { text } }
+  readmeLower: object(expression: "HEAD:readme.md") { ... on Blob { text } }
+}
+"""
+
+REPO_FIELDS_NO_README = REPO_FIELDS.replace(
+    '  readme: object(expression: "HEAD:README.md") { ... on Blob { text } }\n'
+    '  readmeLower: object(expression: "HEAD:readme.md") { ... on Blob { text } }\n', ""
+)
+
+
+def build_query(full_names: List[str], with_readme: bool = True) -> Dict[str, Any]:
+    """
+    构造一批仓库的查询：每个仓库一个别名 r{i}，owner/name 通过变量传入
+
+    Returns:
+        {"query": ..., "variables": ...}
+    """
+    declarations = ["$since: GitTimestamp!"]
+    selections = []
+    variables: Dict[str, Any] = {
+        "since": (datetime.now(timezone.utc) - timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    }
+    for i, full_name in enumerate(full_names):
+        owner, name = full_name.split("/", 1)
+        declarations.append(f"$o{i}: String!, $n{i}: String!")
+        selections.append(f"  r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...RepoFields }}")
+        variables[f"o{i}"] = owner
+        variables[f"n{i}"] = name
+
+    query = (
+        f"query({', '.join(declarations)}) {{\n"
+        + "\n".join(selections)
+        + "\n  rateLimit { limit cost remaining resetAt }\n}\n"
+        + (REPO_FIELDS if with_readme else REPO_FIELDS_NO_README)
+    )
+    return {"query": query, "variables": variables}
+
+
+def parse_repo(node: Dict[str, Any]) -> Dict[str, Any]:
+    """把 GraphQL 仓库节点转换为与 REST 采集结果一致的字段"""
+    license_info = node.get("licenseInfo") or {}
+    target = (node.get("defaultBranchRef") or {}).get("target") or {}
+    readme = node.get("readme") or node.get("readmeLower") or {}
+    return {
+        "title": node["nameWithOwner"],
+        "description": node.get("description") or "",
+        "url": node["url"],
+        "stars": node["stargazerCount"],
+        "forks": node["forkCount"],
+        "open_issues": (node.get("issues") or {}).get("totalCount", 0),
+        "language": (node.get("primaryLanguage") or {}).get("name"),
+        "topics": [n["topic"]["name"] for n in (node.get("repositoryTopics") or {}).get("nodes", [])],
+        "license": license_info.get("name"),
+        "commit_count_30d": (target.get("history") or {}).get("totalCount", 0),
+        "readme": (readme.get("text") or "")[:README_MAX_CHARS],
+        "created_at": node.get("createdAt"),
+        "updated_at": node.get("updatedAt"),
+        "pushed_at": node.get("pushedAt"),
+    }
+
+
+class GitHubGraphQLFetcher:
+    """按批查询仓库，并记录 GraphQL 的剩余点数"""
+
+    def __init__(self, token: Optional[str] = None, batch_size: int = BATCH_SIZE):
+        self.token = token
+        self.batch_size = batch_size
+        self.rate_limit: Optional[Dict[str, Any]] = None
+        self.requests_made = 0
+
+    @property
+    def available(self) -> bool:
+        return bool(self.token or settings.github_token)
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"bearer {self.token or settings.github_token}"}
+
+    def budget_exhausted(self, now: Optional[datetime] = None) -> bool:
+        """剩余点数不足且尚未到重置时间"""
+        if not self.rate_limit or self.rate_limit["remaining"] >= MIN_REMAINING:
+            return False
+        now = now or datetime.now(timezone.utc)
+        return now < datetime.fromisoformat(self.rate_limit["reset_at"].replace("Z", "+00:00"))
+
+    def _record_rate_limit(self, rate_limit: Optional[Dict[str, Any]]):
+        if rate_limit:
+            self.rate_limit = {
+                "limit": rate_limit.get("limit"),
+                "remaining": rate_limit.get("remaining"),
+                "cost": rate_limit.get("cost"),
+                "reset_at": rate_limit.get("resetAt"),
+            }
+
+    async def fetch_repos(self, full_names: List[str], with_readme: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        批量查询仓库
+
+        Args:
+            full_names: owner/name 列表
+            with_readme: 是否同时获取 README（只刷新指标时可关闭以减小响应）
+
+        Returns:
+            {full_name: 仓库字段}；不存在、无权限或因点数不足未查询的仓库不在结果中
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        if not self.available:
+            return results
+
+        names = [name for name in dict.fromkeys(full_names) if "/" in name]
+        for start in range(0, len(names), self.batch_size):
+            if self.budget_exhausted():
+                logger.warning(f"GitHub GraphQL budget exhausted until {self.rate_limit['reset_at']}, "
+                               f"skipping {len(names) - start} repos")
+                break
+
+            batch = names[start:start + self.batch_size]
+            try:
+                response = await request_governor.post(GRAPHQL_URL, json=build_query(batch, with_readme),
+                                                       headers=self._headers(), timeout=60)
+                self.requests_made += 1
+                response.raise_for_status()
+                body = response.json()
+            except Exception as e:
+                logger.error(f"Error querying GitHub GraphQL for {len(batch)} repos: {e}")
+                continue
+
+            data = body.get("data") or {}
+            self._record_rate_limit(data.get("rateLimit"))
+            for error in body.get("errors", []):
+                # 单个仓库不存在（NOT_FOUND）时其余仓库照常返回
+                logger.debug(f"GitHub GraphQL error: {error.get('message')}")
+
+            for i, full_name in enumerate(batch):
+                node = data.get(f"r{i}")
+                if node:
+                    results[full_name] = parse_repo(node)
+
+        return results
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "requests": self.requests_made,
+            "rate_limit": self.rate_limit,
+            "budget_exhausted": self.budget_exhausted(),
+        }
+
+
+# 全局实例：同一 token 的剩余点数在进程内共享
+github_graphql = GitHubGraphQLFetcher()
@@ -0,0 +1,269 @@
+"""
+采集器的磁盘 HTTP 缓存（条件请求重新验证）
+
+HuggingFace /api/models、Zenn /api/articles、README 等响应在两次采集之间经常没有变化。
+带 ETag / Last-Modified 的 200 响应保存在 http_cache_dir 下，再次请求时附带
+If-None-Match / If-Modified-Since：
+- 上游返回 304 时直接使用缓存的响应体，不再下载；解析后的 JSON 在进程内按验证器记忆，
+  内容未变时 .json() 也不需要重新解析（GitHub 的 304 还不计入 REST 额度）
+- 缓存总大小不超过 http_cache_max_mb，超出时淘汰最久未使用的条目
+- 按数据源统计重新验证命中次数和节省的字节数
+
+请求经过 request_governor 限速；http_cache_dir 为空时不缓存，直接转发。
+磁盘读写（加载索引、读写条目、淘汰）在线程中执行，不阻塞事件循环。
+多个进程共享同一目录时，读到不完整的条目按未命中处理。
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+
+from ...core.config import settings
+from .rate_governor import RequestGovernor, bucket_for, request_governor
+
+logger = logging.getLogger(__name__)
+
+# 进程内记忆的已解析 JSON 条数
+PARSED_MEMO_SIZE = 64
+
+
+def cache_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """URL 和查询参数（与顺序无关）的摘要"""
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    return hashlib.sha256(json.dumps([url, items]).encode()).hexdigest()
+
+
+def source_of(url: str) -> str:
+    """统计用的数据源名：github、huggingface、arxiv、zenn 或主机名"""
+    return bucket_for(url).split(":")[0]
+
+
+class CachedResponse:
+    """由缓存提供的响应，接口与采集器用到的 requests.Response 部分一致"""
+
+    status_code = 200
+    from_cache = True
+
+    def __init__(self, cache: "HttpCache", key: str, meta: Dict[str, Any], content: bytes):
+        self._cache = cache
+        self._key = key
+        self.url = meta["url"]
+        self.headers = meta["headers"]
+        self.content = content
+        self.encoding = meta.get("encoding") or "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self) -> Any:
+        return self._cache.parsed(self._key, self.headers, self.text)
+
+    def raise_for_status(self):
+        pass
+
+
+class HttpCache:
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 governor: Optional[RequestGovernor] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.governor = governor
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None  # key -> meta
+        self._parsed: "OrderedDict[str, Any]" = OrderedDict()
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._last_access = 0.0
+        # 索引和解析缓存由线程中的磁盘操作修改
+        self._lock = threading.RLock()
+
+    @property
+    def root(self) -> Optional[Path]:
+        directory = self.directory if self.directory is not None else settings.http_cache_dir
+        return Path(directory) if directory else None
+
+    @property
+    def limit(self) -> int:
+        return self.max_bytes if self.max_bytes is not None else settings.http_cache_max_mb * 1024 * 1024
+
+    def _touch(self) -> float:
+        """最近使用时间（严格递增，同一时刻的多次访问也能分出先后）"""
+        with self._lock:
+            self._last_access = max(time.time(), self._last_access + 1e-6)
+            return self._last_access
+
+    def _stat(self, source: str, name: str, amount: int = 1):
+        with self._lock:
+            counters = self.stats.setdefault(source, {
+                "requests": 0, "revalidated": 0, "stored": 0, "bytes_saved": 0, "evicted": 0,
+            })
+            counters[name] += amount
+
+    # ---------- 磁盘条目 ----------
+
+    def _paths(self, key: str):
+        return self.root / f"{key}.json", self.root / f"{key}.body"
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            if self._index is None:
+                index = {}
+                if self.root and self.root.is_dir():
+                    for meta_path in self.root.glob("*.json"):
+                        try:
+                            index[meta_path.stem] = json.loads(meta_path.read_text())
+                        except (OSError, ValueError):
+                            continue
+                self._index = index
+            return self._index
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            return self._paths(key)[1].read_bytes()
+        except OSError:
+            return None
+
+    def _write(self, key: str, meta: Dict[str, Any], content: Optional[bytes] = None):
+        meta_path, body_path = self._paths(key)
+        self.root.mkdir(parents=True, exist_ok=True)
+        suffix = f".tmp{os.getpid()}-{threading.get_ident()}"
+        if content is not None:
+            tmp = body_path.with_suffix(suffix)
+            tmp.write_bytes(content)
+            os.replace(tmp, body_path)
+        tmp = meta_path.with_suffix(suffix)
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, meta_path)
+
+    def _remove(self, key: str):
+        with self._lock:
+            self._load_index().pop(key, None)
+            self._parsed.pop(key, None)
+        for path in self._paths(key):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _evict(self):
+        """淘汰最久未使用的条目直到总大小不超过上限"""
+        with self._lock:
+            index = self._load_index()
+            total = sum(meta["size"] for meta in index.values())
+            for key in sorted(index, key=lambda k: index[k]["accessed"]):
+                if total <= self.limit:
+                    break
+                meta = index[key]
+                total -= meta["size"]
+                self._stat(meta["source"], "evicted")
+                self._remove(key)
+
+    def parsed(self, key: str, headers: Dict[str, str], text: str) -> Any:
+        """按验证器记忆解析后的 JSON"""
+        validator = headers.get("ETag") or headers.get("Last-Modified")
+        with self._lock:
+            memo = self._parsed.get(key)
+            if memo is not None and memo[0] == validator:
+                self._parsed.move_to_end(key)
+                return memo[1]
+        value = json.loads(text)
+        with self._lock:
+            self._parsed[key] = (validator, value)
+            if len(self._parsed) > PARSED_MEMO_SIZE:
+                self._parsed.popitem(last=False)
+        return value
+
+    # ---------- 请求 ----------
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+                  headers: Optional[Dict[str, str]] = None, **kwargs):
+        """
+        带条件请求的 GET
+
+        Returns:
+            上游的 requests.Response，或 304 时由缓存提供的 CachedResponse
+        """
+        governor = self.governor or request_governor
+        if self.root is None:
+            return await governor.get(url, params=params, headers=headers, **kwargs)
+
+        key = cache_key(url, params)
+        source = source_of(url)
+        self._stat(source, "requests")
+        meta = (await asyncio.to_thread(self._load_index)).get(key)
+        content = await asyncio.to_thread(self._read, key) if meta else None
+        if meta and content is None:
+            await asyncio.to_thread(self._remove, key)
+            meta = None
+
+        request_headers = dict(headers or {})
+        if meta:
+            if meta["headers"].get("ETag"):
+                request_headers["If-None-Match"] = meta["headers"]["ETag"]
+            if meta["headers"].get("Last-Modified"):
+                request_headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+        response = await governor.get(url, params=params, headers=request_headers, **kwargs)
+
+        if meta and response.status_code == 304:
+            meta["accessed"] = self._touch()
+            self._stat(source, "revalidated")
+            self._stat(source, "bytes_saved", meta["size"])
+            await asyncio.to_thread(self._write, key, meta)
+            return CachedResponse(self, key, meta, content)
+
+        if response.status_code == 200 and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+            await asyncio.to_thread(self._store, key, source, url, response)
+        elif meta and response.status_code == 200:
+            # 内容已变且上游不再提供验证器：旧条目不会再被重新验证
+            await asyncio.to_thread(self._remove, key)
+        return response
+
+    def _store(self, key: str, source: str, url: str, response: requests.Response):
+        """保存响应并按需淘汰（在线程中执行）"""
+        content = response.content
+        if len(content) > self.limit // 10:
+            # 单个响应过大时不缓存，避免挤掉其他条目
+            return
+        meta = {
+            "url": url,
+            "source": source,
+            "headers": {name: response.headers[name] for name in ("ETag", "Last-Modified", "Content-Type", "Link")
+                        if response.headers.get(name)},
+            "encoding": response.encoding,
+            "size": len(content),
+            "accessed": self._touch(),
+        }
+        try:
+            self._write(key, meta, content)
+        except OSError as e:
+            logger.warning(f"Failed to cache {url}: {e}")
+            return
+        with self._lock:
+            self._parsed.pop(key, None)
+            self._load_index()[key] = meta
+            self._stat(source, "stored")
+            self._evict()
+
+    def get_status(self) -> Dict[str, Any]:
+        """缓存状态（首次调用会扫描缓存目录）"""
+        with self._lock:
+            index = self._load_index() if self.root else {}
+            return {
+                "enabled": self.root is not None,
+                "entries": len(index),
+                "bytes": sum(meta["size"] for meta in index.values()),
+                "max_bytes": self.limit,
+                "sources": self.stats,
+            }
+
+
+# 全局实例
+http_cache = HttpCache()
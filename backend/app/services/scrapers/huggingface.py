@@ -1,11 +1,23 @@
-import requests
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 import logging
 
+import requests
+
+from ...core.config import settings
+from .http_cache import http_cache
+
 logger = logging.getLogger(__name__)
 
 
+def _next_link(response) -> Optional[str]:
+    """Link 头中 rel="next" 的地址（HuggingFace 列表接口的翻页游标）"""
+    for link in requests.utils.parse_header_links(response.headers.get("Link", "")):
+        if link.get("rel") == "next":
+            return link.get("url")
+    return None
+
+
 class HuggingFaceScraper:
     def __init__(self):
         self.base_url = "https://huggingface.co/api"
@@ -26,7 +38,7 @@ class HuggingFaceScraper:
             if task:
                 params["filter"] = task
             
-            response = requests.get(self.models_url, params=params, timeout=30)
+            response = await http_cache.get(self.models_url, params=params, timeout=30)
             response.raise_for_status()
             
             models = response.json()
@@ -82,7 +94,7 @@ class HuggingFaceScraper:
                     "filter": task
                 }
                 
-                response = requests.get(self.models_url, params=params, timeout=30)
+                response = await http_cache.get(self.models_url, params=params, timeout=30)
                 if response.status_code == 200:
                     models = response.json()
                     
@@ -112,7 +124,7 @@ class HuggingFaceScraper:
                 "limit": 15
             }
             
-            response = requests.get(self.models_url, params=recent_params, timeout=30)
+            response = await http_cache.get(self.models_url, params=recent_params, timeout=30)
             if response.status_code == 200:
                 models = response.json()
                 
@@ -163,7 +175,7 @@ class HuggingFaceScraper:
             if task:
                 params["filter"] = task
             
-            response = requests.get(self.datasets_url, params=params, timeout=30)
+            response = await http_cache.get(self.datasets_url, params=params, timeout=30)
             response.raise_for_status()
             
             datasets = response.json()
@@ -190,13 +202,134 @@ class HuggingFaceScraper:
             logger.error(f"Error fetching HuggingFace datasets: {e}")
             return []
     
+    async def get_recently_modified(self, kind: str = "models", task: Optional[str] = None,
+                                    modified_since: Optional[datetime] = None, limit: int = 100,
+                                    max_pages: int = 20) -> List[Dict]:
+        """
+        获取最近更新的模型或数据集（增量采集）
+
+        按 lastModified 倒序翻页（Link 头的 next 游标），遇到不晚于 modified_since（UTC）的条目即停止，
+        替代每次重复下载同一批下载量最高的条目。只保留下载量或点赞数达到
+        huggingface_min_downloads / huggingface_min_likes 的条目（最近更新的仓库大多无人使用）。
+
+        Args:
+            kind: models 或 datasets
+            limit: 每页条数
+            max_pages: 最多请求的页数，达到时更早的更新被跳过
+        """
+        try:
+            params = {
+                "sort": "lastModified",
+                "direction": -1,
+                "limit": limit
+            }
+            
+            if task:
+                params["filter"] = task
+            
+            url = self.models_url if kind == "models" else self.datasets_url
+            result = []
+            scanned = 0
+            for page in range(1, max_pages + 1):
+                response = await http_cache.get(url, params=params, timeout=30)
+                response.raise_for_status()
+
+                for item in response.json():
+                    scanned += 1
+                    last_modified = item.get("lastModified")
+                    if modified_since and last_modified:
+                        modified = datetime.fromisoformat(last_modified.replace("Z", "+00:00")).replace(tzinfo=None)
+                        if modified <= modified_since:
+                            # 按时间倒序，之后的条目都更旧
+                            logger.info(f"Fetched {len(result)} of {scanned} updated HuggingFace {kind} "
+                                        f"in {page} page(s)")
+                            return result
+
+                    if not self._is_popular(item):
+                        continue
+
+                    result.append(self._recent_item(kind, item))
+
+                url, params = _next_link(response), None
+                if not url or not modified_since:
+                    break
+            else:
+                logger.warning(f"Stopped after {max_pages} pages of updated HuggingFace {kind}; "
+                               f"older updates since {modified_since} are skipped")
+
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error fetching recently modified HuggingFace {kind}: {e}")
+            return []
+
+    @staticmethod
+    def _is_popular(item: Dict) -> bool:
+        return (item.get("downloads", 0) >= settings.huggingface_min_downloads
+                or item.get("likes", 0) >= settings.huggingface_min_likes)
+
+    @staticmethod
+    def _recent_item(kind: str, item: Dict) -> Dict:
+        if kind == "models":
+            item_id = item.get("modelId") or item.get("id", "")
+            return {
+                "title": item_id,
+                "author": item.get("author", ""),
+                "downloads": item.get("downloads", 0),
+                "likes": item.get("likes", 0),
+                "url": f"https://huggingface.co/{item_id}",
+                "tags": item.get("tags", []),
+                "pipeline_tag": item.get("pipeline_tag"),
+                "library_name": item.get("library_name"),
+                "created_at": item.get("createdAt"),
+                "last_modified": item.get("lastModified"),
+                "raw_data": item
+            }
+        return {
+            "title": item.get("id", ""),
+            "author": item.get("author", ""),
+            "downloads": item.get("downloads", 0),
+            "likes": item.get("likes", 0),
+            "url": f"https://huggingface.co/datasets/{item.get('id', '')}",
+            "tags": item.get("tags", []),
+            "task_categories": item.get("task_categories", []),
+            "created_at": item.get("createdAt"),
+            "last_modified": item.get("lastModified"),
+            "raw_data": item
+        }
+    
+    async def get_repo_metrics(self, repo_ids: List[str], kind: str = "models") -> Dict[str, Dict]:
+        """
+        批量获取模型或数据集的当前指标（指标快照刷新用）
+
+        Args:
+            kind: models 或 datasets
+
+        Returns:
+            {repo_id: {"downloads", "likes"}}，请求失败的条目不在结果中
+        """
+        url = self.models_url if kind == "models" else self.datasets_url
+        metrics = {}
+        for repo_id in repo_ids:
+            try:
+                response = await http_cache.get(f"{url}/{repo_id}", timeout=30)
+                response.raise_for_status()
+                item = response.json()
+                metrics[repo_id] = {
+                    "downloads": item.get("downloads", 0),
+                    "likes": item.get("likes", 0),
+                }
+            except Exception as e:
+                logger.error(f"Error fetching metrics for HuggingFace {kind} {repo_id}: {e}")
+        return metrics
+
     async def get_model_details(self, model_id: str) -> Optional[Dict]:
         """
         获取特定模型的详细信息
         """
         try:
             url = f"{self.models_url}/{model_id}"
-            response = requests.get(url, timeout=30)
+            response = await http_cache.get(url, timeout=30)
             response.raise_for_status()
             
             model = response.json()
@@ -232,7 +365,7 @@ class HuggingFaceScraper:
         """
         try:
             url = f"https://huggingface.co/{model_id}/raw/main/README.md"
-            response = requests.get(url, timeout=30)
+            response = await http_cache.get(url, timeout=30)
             
             if response.status_code == 200:
                 return response.text[:2000]
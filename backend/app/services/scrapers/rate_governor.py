@@ -0,0 +1,219 @@
+"""
+按上游主机限速的请求调度器
+
+所有采集器的 HTTP 请求经过这里，每个限速桶（主机，GitHub 再按 search/core/graphql 细分）一个令牌桶：
+- 令牌按 rate 匀速补充，最多积累 burst 个；没有令牌时预约下一个令牌并等待，
+  同一个桶的并发请求因此被排队并均匀间隔（arXiv 要求每 3 秒最多 1 次请求）
+- 响应的 X-RateLimit-Remaining / X-RateLimit-Reset（GitHub）用于校正本地估计，
+  剩余为 0 时在重置前暂停该桶；Retry-After 同样暂停对应时长
+- 429（或剩余为 0 的 403）在暂停结束后重试一次；需要等待超过 rate_limit_max_wait_seconds 时
+  抛出 RateLimited，采集器按原来的请求失败处理，不会让定时任务长时间挂起
+
+预约令牌时不 await，因此不需要跨事件循环的锁（API 进程、worker 进程和测试各自有事件循环）。
+"""
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RatePolicy(NamedTuple):
+    rate: float  # 每秒补充的请求数
+    burst: int  # 最多积累的请求数
+
+
+def default_policies() -> Dict[str, RatePolicy]:
+    """各限速桶的默认速率（GitHub 配置 token 后额度更高）"""
+    authenticated = bool(settings.github_token)
+    return {
+        # 搜索 API：未认证 10 次/分钟，认证 30 次/分钟
+        "github:search": RatePolicy(30 / 60, 30) if authenticated else RatePolicy(10 / 60, 10),
+        # 其他 REST API：未认证 60 次/小时，认证 5000 次/小时
+        "github:core": RatePolicy(5000 / 3600, 100) if authenticated else RatePolicy(60 / 3600, 20),
+        # GraphQL 按点数计费，点数由 GitHubGraphQLFetcher 跟踪，这里只控制请求间隔
+        "github:graphql": RatePolicy(1.0, 5),
+        "huggingface": RatePolicy(1.0, 10),
+        # arXiv API 使用条款：每 3 秒最多 1 次请求
+        "arxiv": RatePolicy(1 / 3, 1),
+        "zenn": RatePolicy(1.0, 3),
+    }
+
+
+DEFAULT_POLICY = RatePolicy(2.0, 5)
+
+
+def bucket_for(url: str) -> str:
+    """请求所属的限速桶"""
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    if host == "api.github.com":
+        if parts.path.startswith("/search"):
+            return "github:search"
+        if parts.path.startswith("/graphql"):
+            return "github:graphql"
+        return "github:core"
+    if host.endswith("huggingface.co"):
+        return "huggingface"
+    if host.endswith("arxiv.org"):
+        return "arxiv"
+    if host.endswith("zenn.dev"):
+        return "zenn"
+    return host
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 的秒数（整数秒或 HTTP 日期）"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+class RateLimited(requests.RequestException):
+    """等待时间超过上限，放弃本次请求"""
+
+
+class TokenBucket:
+    def __init__(self, name: str, policy: RatePolicy):
+        self.name = name
+        self.policy = policy
+        self.tokens = float(policy.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # 上游要求暂停到的时间（monotonic）
+        self.server: Dict[str, Any] = {}  # 上游报告的 limit/remaining/reset
+        self.requests = 0
+        self.throttled = 0  # 收到 429/403 限流响应的次数
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.policy.burst, self.tokens + max(now - self.updated, 0.0) * self.policy.rate)
+        self.updated = now
+
+    def reserve(self, now: float, max_wait: float) -> float:
+        """
+        预约一个令牌
+
+        Returns:
+            需要等待的秒数
+
+        Raises:
+            RateLimited: 等待时间超过 max_wait（不消耗令牌）
+        """
+        self._refill(now)
+        wait_for_token = max(0.0, (1 - self.tokens) / self.policy.rate)
+        wait = max(wait_for_token, self.blocked_until - now)
+        if wait > max_wait:
+            raise RateLimited(f"{self.name} rate limit: next request allowed in {wait:.0f}s")
+        self.tokens -= 1
+        self.requests += 1
+        self.waited_seconds += wait
+        return wait
+
+    def block(self, seconds: float, now: float):
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+    def observe(self, response: requests.Response, now: float) -> Optional[float]:
+        """
+        根据响应头校正额度
+
+        Returns:
+            被限流时需要暂停的秒数，否则为 None
+        """
+        headers = response.headers
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is not None:
+            self.server = {
+                "limit": int(headers.get("X-RateLimit-Limit", 0)) or None,
+                "remaining": int(remaining),
+                "reset": int(reset) if reset else None,
+            }
+            # 本地估计不能比上游报告的剩余额度更乐观（同一 token 可能被其他进程使用）
+            self.tokens = min(self.tokens, float(remaining))
+
+        pause = parse_retry_after(headers.get("Retry-After"))
+        if pause is None and remaining == "0" and reset:
+            pause = max(int(reset) - time.time(), 0.0) + 1
+        limited = response.status_code == 429 or (response.status_code == 403 and pause is not None)
+        if pause is not None:
+            self.block(pause, now)
+        if limited:
+            self.throttled += 1
+            return pause if pause is not None else 1 / self.policy.rate
+        return None
+
+    def get_status(self, now: float) -> Dict[str, Any]:
+        self._refill(now)
+        return {
+            "rate_per_minute": round(self.policy.rate * 60, 2),
+            "burst": self.policy.burst,
+            "available": round(max(self.tokens, 0.0), 2),
+            "blocked_for_seconds": round(max(self.blocked_until - now, 0.0), 1),
+            "server": self.server or None,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "waited_seconds": round(self.waited_seconds, 1),
+        }
+
+
+class RequestGovernor:
+    """按限速桶排队发送请求"""
+
+    def __init__(self, policies: Optional[Dict[str, RatePolicy]] = None, max_retries: int = 1):
+        self.policies = policies
+        self.max_retries = max_retries
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, name: str) -> TokenBucket:
+        if name not in self.buckets:
+            policies = self.policies if self.policies is not None else default_policies()
+            self.buckets[name] = TokenBucket(name, policies.get(name, DEFAULT_POLICY))
+        return self.buckets[name]
+
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        排队发送请求（在线程中执行，不阻塞事件循环）
+
+        Raises:
+            RateLimited: 需要等待的时间超过 rate_limit_max_wait_seconds
+        """
+        bucket = self.bucket(bucket_for(url))
+        for attempt in range(self.max_retries + 1):
+            wait = bucket.reserve(time.monotonic(), settings.rate_limit_max_wait_seconds)
+            if wait > 0:
+                logger.debug(f"Waiting {wait:.1f}s for {bucket.name} rate limit")
+                await asyncio.sleep(wait)
+
+            response = await asyncio.to_thread(requests.request, method, url, **kwargs)
+            pause = bucket.observe(response, time.monotonic())
+            if pause is None:
+                return response
+            logger.warning(f"{bucket.name} rate limited ({response.status_code}), paused for {pause:.0f}s")
+        return response
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> requests.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {name: bucket.get_status(now) for name, bucket in sorted(self.buckets.items())}
+
+
+# 全局实例：同一进程内所有采集器共享上游额度
+request_governor = RequestGovernor()
@@ -1,9 +1,11 @@
-import requests
 from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
+from itertools import count
 from bs4 import BeautifulSoup
 
+from .http_cache import http_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,7 +25,7 @@ class ZennScraper:
 
             # 使用 Zenn API
             api_url = f"{self.base_url}/api/articles"
-            response = requests.get(api_url, headers=self.headers, timeout=30)
+            response = await http_cache.get(api_url, headers=self.headers, timeout=30)
             response.raise_for_status()
 
             data = response.json()
@@ -65,7 +67,7 @@ class ZennScraper:
 
             # 使用 Zenn API
             api_url = f"{self.base_url}/api/articles"
-            response = requests.get(api_url, headers=self.headers, timeout=30)
+            response = await http_cache.get(api_url, headers=self.headers, timeout=30)
             response.raise_for_status()
 
             data = response.json()
@@ -114,6 +116,57 @@ class ZennScraper:
             logger.error(f"Error fetching recent articles: {e}")
             return []
 
+    async def get_articles_since(self, published_since: datetime) -> List[Dict]:
+        """
+        获取 published_since（UTC）之后发布的文章（增量采集）
+
+        按发布时间倒序翻页，遇到不晚于 published_since 的文章或没有下一页时才停止，
+        稳定运行时通常只需要请求第一页。不限制页数：游标会推进到最新的文章，
+        中途停止会永久跳过游标与最后一页之间发布的文章。
+        """
+        try:
+            articles = []
+            api_url = f"{self.base_url}/api/articles"
+
+            for page in count(1):
+                response = await http_cache.get(
+                    api_url, params={"order": "latest", "page": page}, headers=self.headers, timeout=30
+                )
+                response.raise_for_status()
+                data = response.json()
+
+                for article in data.get('articles', []):
+                    published_at = article.get('published_at', '')
+                    if published_at:
+                        published = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
+                        if published.tzinfo is not None:
+                            published = published.astimezone(timezone.utc).replace(tzinfo=None)
+                        if published <= published_since:
+                            logger.info(f"Fetched {len(articles)} new Zenn articles in {page} page(s)")
+                            return articles
+
+                    articles.append({
+                        'title': article.get('title', 'No Title'),
+                        'url': f"{self.base_url}{article.get('path', '')}",
+                        'author': article.get('user', {}).get('name', 'Unknown'),
+                        'author_name': article.get('user', {}).get('username', ''),
+                        'likes': article.get('liked_count', 0),
+                        'comments': article.get('comments_count', 0),
+                        'emoji': article.get('emoji', '📝'),
+                        'published_at': published_at,
+                        'type': 'article',
+                        'is_premium': False
+                    })
+
+                if not data.get('next_page'):
+                    break
+
+            logger.info(f"Fetched {len(articles)} new Zenn articles")
+            return articles
+        except Exception as e:
+            logger.error(f"Error fetching new Zenn articles: {e}")
+            return []
+
     async def get_article_details(self, url: str) -> Optional[Dict]:
         """
         获取文章详细内容 - 基本信息版本
@@ -139,7 +192,7 @@ class ZennScraper:
 
             # 获取文章页面
             url = f"{self.base_url}/articles"
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = await http_cache.get(url, headers=self.headers, timeout=30)
             response.raise_for_status()
 
             soup = BeautifulSoup(response.text, 'html.parser')
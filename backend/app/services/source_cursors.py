@@ -0,0 +1,172 @@
+"""
+数据源增量采集游标
+
+每个上游查询（数据源 + 查询范围）记录已见到的最新时间（high-water mark）：
+- arXiv：论文提交时间（published）
+- HuggingFace：模型/数据集的 lastModified
+- Zenn：文章 published_at
+- GitHub：仓库 pushed_at
+
+采集器带着游标请求上游，只下载更新的内容；没有游标时（首次运行）按原来的窗口抓取。
+请求时从游标回退 source_cursor_overlap_minutes，容忍上游索引延迟和时钟偏差，
+重叠部分由按 URL 去重处理。游标只前进不后退，上游请求失败（返回空列表）时不变。
+抓取只返回新的 high-water mark，采集器把条目提交到数据库后才推进游标（advance_cursor），
+保存失败时下次采集重新抓取这些条目。
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.source_cursor import SourceCursor
+
+logger = logging.getLogger(__name__)
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """把上游的时间字符串（ISO 8601 或 RFC 2822）解析为 UTC 的 naive datetime"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                parsed = parsedate_to_datetime(str(value))
+            except (TypeError, ValueError):
+                return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def high_water_mark(items: Iterable[Dict], field: str) -> Optional[datetime]:
+    """一批条目中 field 的最大时间"""
+    stamps = [ts for ts in (parse_timestamp(item.get(field)) for item in items) if ts]
+    return max(stamps) if stamps else None
+
+
+class SourceCursorStore:
+    """游标的读取与推进（同步方法）"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+
+    def get(self, name: str) -> Optional[datetime]:
+        db = self.session_factory()
+        try:
+            cursor = db.get(SourceCursor, name)
+            return cursor.position if cursor else None
+        finally:
+            db.close()
+
+    def since(self, name: str) -> Optional[datetime]:
+        """请求上游时使用的起点：游标回退重叠窗口；没有游标时为 None"""
+        position = self.get(name)
+        if position is None:
+            return None
+        return position - timedelta(minutes=settings.source_cursor_overlap_minutes)
+
+    def advance(self, name: str, position: datetime) -> bool:
+        """
+        把游标推进到 position（只前进）
+
+        Returns:
+            游标是否发生了变化
+        """
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                update(SourceCursor)
+                .where(SourceCursor.name == name, SourceCursor.position < position)
+                .values(position=position, updated_at=now)
+            )
+            advanced = result.rowcount == 1
+            if not advanced and db.get(SourceCursor, name) is None:
+                db.add(SourceCursor(name=name, position=position, updated_at=now))
+                try:
+                    db.flush()
+                    advanced = True
+                except IntegrityError:
+                    # 并发采集同时创建了游标，下次运行再推进
+                    db.rollback()
+            db.commit()
+            return advanced
+        finally:
+            db.close()
+
+    def reset(self, name: Optional[str] = None) -> int:
+        """删除游标（下次采集恢复为完整窗口）；name 为 None 时删除全部"""
+        db = self.session_factory()
+        try:
+            query = db.query(SourceCursor)
+            if name is not None:
+                query = query.filter(SourceCursor.name == name)
+            deleted = query.delete()
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def get_status(self) -> List[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            return [
+                {
+                    "name": cursor.name,
+                    "position": cursor.position.isoformat(),
+                    "updated_at": cursor.updated_at.isoformat(),
+                }
+                for cursor in db.query(SourceCursor).order_by(SourceCursor.name).all()
+            ]
+        finally:
+            db.close()
+
+
+async def fetch_incremental(name: str, fetch: Callable[[Optional[datetime]], Awaitable[List[Dict]]],
+                            field: str, store: Optional[SourceCursorStore] = None
+                            ) -> Tuple[List[Dict], Optional[datetime]]:
+    """
+    带游标抓取：fetch(since) 只请求 since 之后的内容
+
+    游标不在这里推进：调用方保存条目并提交成功后，用返回的 high-water mark 调用 advance_cursor。
+
+    Args:
+        name: 游标名（数据源 + 查询范围）
+        fetch: 抓取函数，since 为 None 时按完整窗口抓取
+        field: 条目中用于推进游标的时间字段
+
+    Returns:
+        (条目, 条目中 field 的最新时间)；没有条目时时间为 None
+    """
+    store = store or source_cursors
+    since = store.since(name)
+    items = await fetch(since)
+    return items, high_water_mark(items, field)
+
+
+def advance_cursor(name: str, mark: Optional[datetime], store: Optional[SourceCursorStore] = None) -> bool:
+    """
+    条目提交成功后把游标推进到 fetch_incremental 返回的 high-water mark
+
+    Returns:
+        游标是否发生了变化
+    """
+    store = store or source_cursors
+    if mark is None or not store.advance(name, mark):
+        return False
+    logger.info(f"Cursor {name} advanced to {mark.isoformat()}")
+    return True
+
+
+# 全局游标存储
+source_cursors = SourceCursorStore()
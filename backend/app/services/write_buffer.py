@@ -0,0 +1,245 @@
+"""
+写缓冲（write-behind）
+
+请求路径上只把待写入的行放进内存队列，由后台线程按数量或时间阈值
+批量 INSERT，避免每个请求单独 commit 带来的写延迟和 SQLite 锁竞争。
+
+用法:
+    recommendation_log_writer.add({"user_id": 1, "card_id": 2, ...})
+
+应用关闭时调用 stop_all() 把剩余数据刷入数据库。
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal
+from ..models.behavior import UserBehavior, UserRecommendation, SearchHistory
+from . import recommendation_stats, behavior_rollup
+from .popular_searches import popular_searches
+from .autocomplete import autocomplete_index, KIND_HISTORY
+
+logger = logging.getLogger(__name__)
+
+
+class BufferedWriter:
+    """按数量/时间阈值批量写入的缓冲队列"""
+
+    def __init__(self, model, max_batch: int = 500, flush_interval: float = 2.0,
+                 max_buffer: int = 50000,
+                 on_flush: Optional[Callable[[Session, List[Dict]], None]] = None,
+                 after_commit: Optional[Callable[[List[Dict]], None]] = None):
+        """
+        Args:
+            model: SQLAlchemy 模型类
+            max_batch: 单次 INSERT 的最大行数，缓冲达到此数量时立即触发刷新
+            flush_interval: 最长刷新间隔（秒）
+            max_buffer: 缓冲上限，超出时丢弃最旧的数据，防止数据库故障时内存无限增长
+            on_flush: 每批写入后、提交前调用（同一事务），用于维护汇总表等
+            after_commit: 每批提交成功后调用，用于更新内存中的统计（失败重试的批次不会重复计入）
+        """
+        self.model = model
+        self.on_flush = on_flush
+        self.after_commit = after_commit
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        self.session_factory: Callable[[], Session] = SessionLocal
+        self.background = True
+
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self.stats = {"queued": 0, "written": 0, "dropped": 0, "flushes": 0, "errors": 0}
+
+    @property
+    def name(self) -> str:
+        return self.model.__tablename__
+
+    def add(self, row: Dict):
+        self.add_many([row])
+
+    def add_many(self, rows: List[Dict]):
+        """入队（不等待写入）"""
+        if not rows:
+            return
+
+        with self._lock:
+            self._buffer.extend(rows)
+            self.stats["queued"] += len(rows)
+            self._drop_overflow()
+            pending = len(self._buffer)
+
+        if not self.background:
+            if pending >= self.max_batch:
+                self.flush()
+            return
+
+        self._ensure_started()
+        if pending >= self.max_batch:
+            self._wakeup.set()
+
+    def _drop_overflow(self):
+        """超出 max_buffer 时丢弃最旧的数据（调用方持有 _lock）"""
+        overflow = len(self._buffer) - self.max_buffer
+        if overflow > 0:
+            for _ in range(overflow):
+                self._buffer.popleft()
+            self.stats["dropped"] += overflow
+            logger.warning(f"Write buffer {self.name} full, dropped {overflow} rows")
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> int:
+        """
+        同步刷新缓冲中的全部数据
+
+        Returns:
+            写入的行数
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    if not self._buffer:
+                        break
+                    count = min(self.max_batch, len(self._buffer))
+                    batch = [self._buffer.popleft() for _ in range(count)]
+
+                if not self._write(batch):
+                    # 写入失败，放回队首等待下次刷新（数据库持续故障时同样受 max_buffer 限制）
+                    with self._lock:
+                        self._buffer.extendleft(reversed(batch))
+                        self._drop_overflow()
+                    break
+                written += len(batch)
+        return written
+
+    def _write(self, batch: List[Dict]) -> bool:
+        db = self.session_factory()
+        try:
+            db.execute(insert(self.model), batch)
+            if self.on_flush:
+                self.on_flush(db, batch)
+            db.commit()
+            self.stats["written"] += len(batch)
+            self.stats["flushes"] += 1
+        except Exception as e:
+            db.rollback()
+            self.stats["errors"] += 1
+            logger.error(f"Failed to flush {len(batch)} rows to {self.name}: {e}")
+            return False
+        finally:
+            db.close()
+
+        if self.after_commit:
+            try:
+                self.after_commit(batch)
+            except Exception as e:
+                logger.error(f"Error in after_commit of write buffer {self.name}: {e}")
+        return True
+
+    def _ensure_started(self):
+        if self._running:
+            return
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name=f"write-buffer-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error in write buffer {self.name}: {e}")
+                time.sleep(self.flush_interval)
+
+    def stop(self):
+        """停止后台线程并刷新剩余数据"""
+        self._running = False
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+
+    def get_status(self) -> Dict:
+        return {
+            "table": self.name,
+            "pending": self.pending(),
+            "running": self._running,
+            **self.stats
+        }
+
+
+# 推荐曝光记录（同时累加推荐统计汇总表）
+recommendation_log_writer = BufferedWriter(UserRecommendation, on_flush=recommendation_stats.record_served)
+
+# 用户行为日志（批量上报，同时累加行为汇总表）
+behavior_log_writer = BufferedWriter(UserBehavior, max_batch=1000, flush_interval=1.0,
+                                     on_flush=behavior_rollup.record_logged)
+
+
+def _record_searches(rows: List[Dict]):
+    """批量写入不触发 mapper 事件，提交后在这里更新热门搜索和自动补全"""
+    for row in rows:
+        popular_searches.record(row.get("query"), row.get("created_at"))
+        autocomplete_index.add(KIND_HISTORY, row.get("query"))
+
+
+# 搜索历史（/search 请求路径上不再同步 commit）
+search_history_writer = BufferedWriter(SearchHistory, after_commit=_record_searches)
+
+_writers: List[BufferedWriter] = [recommendation_log_writer, behavior_log_writer, search_history_writer]
+
+
+def register_writer(writer: BufferedWriter) -> BufferedWriter:
+    _writers.append(writer)
+    return writer
+
+
+def configure(session_factory: Optional[Callable[[], Session]] = None,
+              background: Optional[bool] = None):
+    """
+    配置所有写缓冲（测试时指向测试数据库并关闭后台线程）
+    """
+    for writer in _writers:
+        if session_factory is not None:
+            writer.session_factory = session_factory
+        if background is not None:
+            writer.background = background
+
+
+def flush_all() -> int:
+    return sum(writer.flush() for writer in _writers)
+
+
+def stop_all():
+    for writer in _writers:
+        try:
+            writer.stop()
+        except Exception as e:
+            logger.error(f"Error stopping write buffer {writer.name}: {e}")
+
+
+def get_status() -> List[Dict]:
+    return [writer.get_status() for writer in _writers]
@@ -0,0 +1,47 @@
+"""
+任务队列 worker 进程入口
+
+API 进程只把采集、AI 增强、Notion 同步等任务写入 job_queue 表，由本进程执行。
+可以运行多个 worker 进程（或多台主机），任务认领是原子的，不会重复执行。
+
+运行方式:
+    python -m app.worker                    # 按 JOB_WORKER_CONCURRENCY 持续执行
+    python -m app.worker --concurrency 4
+    python -m app.worker --burst            # 执行完当前可执行的任务后退出
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from .services.job_worker import JobWorker
+
+logger = logging.getLogger(__name__)
+
+
+async def main(concurrency: int = None, burst: bool = False):
+    worker = JobWorker(concurrency=concurrency)
+    if burst:
+        await worker.run(burst=True)
+        logger.info(f"Burst finished: {worker.get_status()}")
+        return
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker.start()
+    await stop.wait()
+    # 正在执行的任务放回队列
+    await worker.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TechPulse 任务队列 worker")
+    parser.add_argument("--concurrency", type=int, default=None, help="并发执行的任务数")
+    parser.add_argument("--burst", action="store_true", help="队列清空后退出")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    asyncio.run(main(args.concurrency, args.burst))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+API 并发压测
+
+对运行中的后端按不同并发数发起请求，输出吞吐量与延迟分位数，
+用于比较同步会话与异步会话（get_async_db）下接口随并发的扩展情况。
+
+运行方式:
+    uvicorn app.main:app --port 8000                      # 先启动服务（单 worker）
+    python scripts/load_test.py                           # 默认接口、并发 1/8/32/64
+    python scripts/load_test.py --concurrency 1 16 64 --requests 2000
+    python scripts/load_test.py --path /api/v1/cards/stats --path "/api/v1/recommendations?user_id=1"
+
+比较前后差异：分别在切换前后的代码上启动服务，使用相同参数运行本脚本。
+同步会话下并发增加时吞吐量基本不变、延迟线性上升；异步会话下吞吐量随并发增长直到数据库饱和。
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/cards/?limit=20",
+    "/api/v1/cards/stats",
+    "/api/v1/behavior/popular-searches",
+    "/api/v1/recommendations?user_id=1",
+    "/api/v1/recommendations/stats",
+]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_level(client: httpx.AsyncClient, paths: List[str], concurrency: int, total: int) -> Dict:
+    """以固定并发发起 total 个请求（轮流请求各接口）"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            path = paths[i % len(paths)]
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+async def main(args):
+    paths = args.path or DEFAULT_PATHS
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        # 预热：建立连接、加载内存索引
+        await run_level(client, paths, 1, len(paths) * 2)
+
+        print(f"{'concurrency':>11} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for concurrency in args.concurrency:
+            result = await run_level(client, paths, concurrency, args.requests)
+            print(
+                f"{result['concurrency']:>11} {result['requests']:>9} {result['errors']:>7} "
+                f"{result['rps']:>9.1f} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API 并发压测")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", action="append", help="压测的接口路径，可多次指定")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=1000, help="每个并发级别的请求总数")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    asyncio.run(main(parser.parse_args()))
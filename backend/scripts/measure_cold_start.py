@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+冷启动耗时测量
+
+每轮启动一个新的 Python 进程，测量：
+- import：导入 app.main 的耗时
+- first_request：从导入完成到第一个请求返回的耗时（含 lifespan 启动）
+- connects_on_import：导入 app.main 期间打开的数据库连接数（应为 0）
+
+数据库使用临时 SQLite 文件：先在单独的进程中执行 init_db() 建表，
+测量进程的第一个请求为 GET /api/v1/cards/，包含异步引擎的创建。
+
+运行方式:
+    python scripts/measure_cold_start.py                 # 默认 3 轮，输出中位数
+    python scripts/measure_cold_start.py --runs 5 --json
+    python scripts/measure_cold_start.py --check         # 超出预算时返回非 0（测试中使用）
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# 冷启动预算（秒），tests/integration/test_cold_start.py 以 --check 运行本脚本
+IMPORT_BUDGET_SECONDS = 3.0
+FIRST_REQUEST_BUDGET_SECONDS = 1.5
+
+PROBE = r"""
+import json, time
+started = time.perf_counter()
+# sqlalchemy 也是 app.main 的依赖，计入导入耗时；Pool 级监听可以捕获所有引擎的连接
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+connects = []
+event.listen(Pool, "connect", lambda *args: connects.append(1))
+import app.main
+imported = time.perf_counter()
+connects_on_import = len(connects)
+
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    status = client.get("/api/v1/cards/").status_code
+    responded = time.perf_counter()
+
+print(json.dumps({
+    "import": imported - started,
+    "first_request": responded - imported,
+    "status": status,
+    "connects_on_import": connects_on_import,
+}))
+"""
+
+
+def _run(code: str, database_url: str) -> str:
+    env = dict(os.environ, DATABASE_URL=database_url, PYTHONPATH=str(BACKEND_DIR))
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Probe failed:\n{result.stderr}")
+    return result.stdout
+
+
+def measure_once(workdir: Path, run: int) -> Dict:
+    """在新进程中测量一次冷启动（数据库先在另一个进程中初始化）"""
+    database_url = f"sqlite:///{workdir / f'cold_{run}.db'}"
+    _run("from app.core.database import init_db; init_db()", database_url)
+    return json.loads(_run(PROBE, database_url).strip().splitlines()[-1])
+
+
+def measure(runs: int) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        samples = [measure_once(Path(tmp), i) for i in range(runs)]
+    return {
+        "runs": runs,
+        "import_seconds": statistics.median(s["import"] for s in samples),
+        "first_request_seconds": statistics.median(s["first_request"] for s in samples),
+        "first_request_status": samples[-1]["status"],
+        "connects_on_import": max(s["connects_on_import"] for s in samples),
+    }
+
+
+def check(result: Dict) -> list:
+    """返回超出预算的项"""
+    problems = []
+    if result["connects_on_import"]:
+        problems.append(f"importing app.main opened {result['connects_on_import']} database connection(s)")
+    if result["first_request_status"] != 200:
+        problems.append(f"first request returned {result['first_request_status']}")
+    if result["import_seconds"] > IMPORT_BUDGET_SECONDS:
+        problems.append(f"import {result['import_seconds']:.2f}s > {IMPORT_BUDGET_SECONDS}s")
+    if result["first_request_seconds"] > FIRST_REQUEST_BUDGET_SECONDS:
+        problems.append(
+            f"first request {result['first_request_seconds']:.2f}s > {FIRST_REQUEST_BUDGET_SECONDS}s"
+        )
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="冷启动耗时测量")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    parser.add_argument("--check", action="store_true", help="超出预算时返回非 0")
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    problems = check(result)
+
+    if args.json:
+        print(json.dumps({**result, "problems": problems}, indent=2))
+    else:
+        print(f"import:        {result['import_seconds']:.3f}s (budget {IMPORT_BUDGET_SECONDS}s)")
+        print(f"first request: {result['first_request_seconds']:.3f}s (budget {FIRST_REQUEST_BUDGET_SECONDS}s)")
+        print(f"db connections on import: {result['connects_on_import']}")
+        for problem in problems:
+            print(f"OVER BUDGET: {problem}")
+
+    if args.check and problems:
+        sys.exit(1)
@@ -35,7 +35,7 @@ def prepare_card_data(card: TechCard) -> dict:
         data['stars'] = data.get('stars', card.stars or 0)
         data['forks'] = data.get('forks', card.forks or 0)
         data['commit_count_30d'] = data.get('commit_count_30d', 0)
-        data['star_growth_rate'] = data.get('star_growth_rate', 0)
+        data['star_growth_rate'] = data.get('star_growth_rate', max(card.growth_rate or 0, 0))
 
     # arXiv特定字段
     elif card.source == SourceType.ARXIV:
@@ -46,7 +46,7 @@ def prepare_card_data(card: TechCard) -> dict:
     elif card.source == SourceType.HUGGINGFACE:
         data['downloads'] = data.get('downloads', 0)
         data['likes'] = data.get('likes', 0)
-        data['download_growth_rate'] = data.get('download_growth_rate', 0)
+        data['download_growth_rate'] = data.get('download_growth_rate', max(card.growth_rate or 0, 0))
 
     # Zenn特定字段
     elif card.source == SourceType.ZENN:
@@ -0,0 +1,179 @@
+"""
+Integration tests for Behavior API endpoints.
+
+Tests cover:
+- POST /api/v1/behavior/log/batch - Batched behavior ingestion
+- GET /api/v1/behavior/stats/{user_id} - Stats served from rollups
+- GET /api/v1/behavior/popular-searches - Top queries from the streaming sketch
+"""
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.behavior import UserBehavior, ActionType
+from app.models.card import TechCard, SourceType
+from app.services import write_buffer
+
+
+# ==================== POST /behavior/log/batch Tests ====================
+
+@pytest.mark.integration
+@pytest.mark.api
+class TestLogBehaviorBatch:
+    """Tests for POST /api/v1/behavior/log/batch endpoint"""
+
+    def test_batch_json_array(self, client: TestClient, test_db: Session):
+        """Test a JSON array of events is accepted and written in bulk"""
+        events = [
+            {"user_id": 1, "action": "click", "card_id": i}
+            for i in range(10)
+        ]
+
+        response = client.post("/api/v1/behavior/log/batch", json=events)
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["accepted"] == 10
+        assert data["rejected"] == []
+
+        write_buffer.flush_all()
+        assert test_db.query(UserBehavior).filter(
+            UserBehavior.action == ActionType.CLICK
+        ).count() == 10
+
+    def test_batch_events_object_and_metadata(self, client: TestClient, test_db: Session):
+        """Test {"events": [...]} payload and metadata stored as extra_data"""
+        response = client.post(
+            "/api/v1/behavior/log/batch",
+            json={"events": [
+                {"user_id": 2, "action": "view", "card_id": 5, "duration": 12, "metadata": "{\"page\": \"home\"}"}
+            ]}
+        )
+
+        assert response.status_code == 202
+        write_buffer.flush_all()
+
+        row = test_db.query(UserBehavior).filter(UserBehavior.user_id == 2).one()
+        assert row.duration == 12
+        assert row.extra_data == "{\"page\": \"home\"}"
+
+    def test_batch_send_beacon_text_plain(self, client: TestClient, test_db: Session):
+        """Test sendBeacon-style text/plain body"""
+        body = json.dumps({"events": [{"user_id": 3, "action": "search", "query": "llm"}]})
+
+        response = client.post(
+            "/api/v1/behavior/log/batch",
+            content=body,
+            headers={"Content-Type": "text/plain;charset=UTF-8"}
+        )
+
+        assert response.status_code == 202
+        assert response.json()["accepted"] == 1
+
+    def test_batch_form_encoded(self, client: TestClient):
+        """Test form-encoded events field"""
+        events = json.dumps([{"user_id": 4, "action": "share", "card_id": 1}])
+
+        response = client.post("/api/v1/behavior/log/batch", data={"events": events})
+
+        assert response.status_code == 202
+        assert response.json()["accepted"] == 1
+
+    def test_batch_partial_rejection(self, client: TestClient, test_db: Session):
+        """Test invalid events are skipped and reported by index"""
+        events = [
+            {"user_id": 1, "action": "click", "card_id": 1},
+            {"user_id": 1, "action": "teleport", "card_id": 1},
+            {"action": "click"},
+        ]
+
+        response = client.post("/api/v1/behavior/log/batch", json=events)
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["accepted"] == 1
+        assert [r["index"] for r in data["rejected"]] == [1, 2]
+
+        write_buffer.flush_all()
+        assert test_db.query(UserBehavior).count() == 1
+
+    def test_batch_invalid_json(self, client: TestClient):
+        """Test malformed body returns 400"""
+        response = client.post(
+            "/api/v1/behavior/log/batch",
+            content="not json",
+            headers={"Content-Type": "text/plain"}
+        )
+
+        assert response.status_code == 400
+
+    def test_batch_too_large(self, client: TestClient):
+        """Test oversized batch returns 413"""
+        events = [{"user_id": 1, "action": "view", "card_id": 1}] * 1001
+
+        response = client.post("/api/v1/behavior/log/batch", json=events)
+
+        assert response.status_code == 413
+
+
+# ==================== GET /behavior/stats Tests ====================
+
+@pytest.mark.integration
+@pytest.mark.api
+class TestBehaviorStats:
+    """Tests for GET /api/v1/behavior/stats/{user_id} endpoint"""
+
+    def test_stats_from_batched_and_single_events(self, client: TestClient, test_db: Session):
+        """Test counts include both batched and single-logged events"""
+        card = TechCard(
+            title="Rollup Card",
+            source=SourceType.GITHUB,
+            original_url="https://github.com/test/rollup",
+            chinese_tags=["机器学习", "Python"]
+        )
+        test_db.add(card)
+        test_db.commit()
+        client.post("/api/v1/behavior/log/batch", json=[
+            {"user_id": 7, "action": "click", "card_id": card.id},
+            {"user_id": 7, "action": "click", "card_id": card.id},
+            {"user_id": 7, "action": "search", "query": "llm"},
+        ])
+        write_buffer.flush_all()
+
+        response = client.post("/api/v1/behavior/log", json={
+            "user_id": 7, "action": "favorite", "card_id": card.id
+        })
+        assert response.status_code == 200
+
+        response = client.get("/api/v1/behavior/stats/7")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_clicks"] == 2
+        assert data["total_favorites"] == 1
+        assert data["total_searches"] == 1
+        assert set(data["favorite_tags"]) == {"机器学习", "Python"}
+        assert len(data["recent_activities"]) == 4
+
+
+# ==================== GET /behavior/popular-searches Tests ====================
+
+@pytest.mark.integration
+@pytest.mark.api
+class TestPopularSearches:
+    """Tests for GET /api/v1/behavior/popular-searches endpoint"""
+
+    def test_popular_searches_ranked(self, client: TestClient):
+        """Test recorded search history is ranked by frequency"""
+        for query in ["LLM", "llm", "rag", "llm ", "agent", "rag"]:
+            response = client.post("/api/v1/behavior/search-history", json={"user_id": 1, "query": query})
+            assert response.status_code == 200
+
+        response = client.get("/api/v1/behavior/popular-searches?limit=2")
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {"query": "llm", "count": 3},
+            {"query": "rag", "count": 2},
+        ]
@@ -5,6 +5,8 @@ Tests cover:
 - GET /api/v1/cards - List cards with filters
 - GET /api/v1/cards/stats - Get card statistics
 - GET /api/v1/cards/overview-stats - Get overview statistics
+- GET /api/v1/cards/trending - Cards ordered by metric growth
+- GET /api/v1/cards/{id}/metrics - Metric snapshot history
 - GET /api/v1/cards/{id} - Get card by ID
 - POST /api/v1/cards - Create new card
 - PUT /api/v1/cards/{id} - Update card
@@ -16,6 +18,7 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 
 from app.models.card import TechCard, SourceType, TrialStatus
+from app.models.card_metric import CardMetricSnapshot
 
 
 # ==================== Test Fixtures ====================
@@ -348,6 +351,45 @@ class TestGetOverviewStats:
 
 # ==================== GET /cards/{id} Tests ====================
 
+@pytest.mark.integration
+@pytest.mark.api
+class TestCardMetrics:
+    """Tests for GET /api/v1/cards/trending and /api/v1/cards/{id}/metrics"""
+
+    def test_trending_orders_by_growth(self, client: TestClient, test_db: Session):
+        """Test only growing cards are listed, fastest first"""
+        cards = [
+            TechCard(title=name, source=SourceType.GITHUB, original_url=f"https://github.com/a/{name}",
+                     growth_rate=rate)
+            for name, rate in [("slow", 0.01), ("fast", 0.2), ("flat", 0.0), ("new", None)]
+        ]
+        test_db.add_all(cards)
+        test_db.commit()
+
+        response = client.get("/api/v1/cards/trending")
+
+        assert response.status_code == 200
+        assert [card["title"] for card in response.json()] == ["fast", "slow"]
+        assert response.json()[0]["growth_rate"] == 0.2
+
+    def test_metric_history(self, client: TestClient, test_db: Session, sample_cards):
+        """Test recent snapshots are returned oldest first"""
+        card = sample_cards[0]
+        now = datetime.utcnow()
+        test_db.add_all([
+            CardMetricSnapshot(card_id=card.id, captured_at=now - timedelta(days=60), stars=1),
+            CardMetricSnapshot(card_id=card.id, captured_at=now - timedelta(hours=2), stars=10),
+            CardMetricSnapshot(card_id=card.id, captured_at=now - timedelta(hours=1), stars=12),
+        ])
+        test_db.commit()
+
+        response = client.get(f"/api/v1/cards/{card.id}/metrics")
+
+        assert response.status_code == 200
+        assert [s["stars"] for s in response.json()["snapshots"]] == [10, 12]
+        assert client.get("/api/v1/cards/99999/metrics").status_code == 404
+
+
 @pytest.mark.integration
 @pytest.mark.api
 class TestGetCardById:
@@ -0,0 +1,26 @@
+"""
+Cold-start budget check.
+
+Runs scripts/measure_cold_start.py --check in fresh interpreters: importing
+app.main must not open database connections, and the import and first
+request must stay within the budgets defined in that script.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "measure_cold_start.py"
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+def test_cold_start_within_budget():
+    """Test import and first request stay within the cold-start budget"""
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), "--runs", "1", "--json", "--check"],
+        capture_output=True, text=True, timeout=300
+    )
+
+    assert result.returncode == 0, result.stdout + result.stderr
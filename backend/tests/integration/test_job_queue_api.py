@@ -0,0 +1,49 @@
+"""
+Integration tests for endpoints that enqueue background work.
+
+Tests cover:
+- POST /api/v1/ai/enhance-card/{card_id} - One enrichment job per card
+- POST /api/v1/sources/collect/{source} - Collection jobs
+- GET /api/v1/job-queue/status and /api/v1/job-queue/jobs/{job_id}
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.card import SourceType, TechCard
+from app.models.job_queue import QueuedJob
+
+
+@pytest.mark.integration
+class TestJobQueueApi:
+    """Tests for enqueueing endpoints"""
+
+    def test_enhance_card_is_queued_once(self, client: TestClient, test_db: Session):
+        """Test repeated enhancement requests share one queued job"""
+        card = TechCard(title="Repo", source=SourceType.GITHUB, original_url="https://github.com/test/repo")
+        test_db.add(card)
+        test_db.commit()
+
+        first = client.post(f"/api/v1/ai/enhance-card/{card.id}").json()
+        second = client.post(f"/api/v1/ai/enhance-card/{card.id}").json()
+
+        assert first["created"] and not second["created"]
+        assert first["job_id"] == second["job_id"]
+        job = client.get(f"/api/v1/job-queue/jobs/{first['job_id']}").json()
+        assert job["kind"] == "enrich_card"
+        assert job["payload"] == {"card_id": card.id, "explicit": True}
+        assert job["status"] == "pending"
+
+    def test_collection_is_queued(self, client: TestClient, test_db: Session):
+        """Test collection endpoints enqueue instead of running in the web worker"""
+        response = client.post("/api/v1/sources/collect/github")
+
+        assert response.status_code == 200
+        assert response.json()["source"] == "github"
+        assert test_db.query(QueuedJob).filter(QueuedJob.kind == "collect_source").count() == 1
+        status = client.get("/api/v1/job-queue/status").json()
+        assert status["by_kind"]["collect_source"] == {"pending": 1}
+
+    def test_unknown_job_returns_404(self, client: TestClient):
+        """Test looking up a missing job"""
+        assert client.get("/api/v1/job-queue/jobs/999").status_code == 404
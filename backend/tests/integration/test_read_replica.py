@@ -0,0 +1,142 @@
+"""
+Integration tests for read-replica routing.
+
+Tests cover:
+- get_read_db - Read-only endpoints use the replica when one is configured
+- Read-your-writes - A client's reads go to the primary right after it writes;
+  clients are identified by user_id / token, by IP only when enabled
+- Fallback - An unreachable replica is skipped and reads use the primary
+- GET /api/v1/read-replica/status
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.database import Base
+from app.core.read_replica import read_router
+from app.models.card import TechCard, SourceType
+
+
+def _card(title: str, url: str) -> TechCard:
+    return TechCard(title=title, source=SourceType.GITHUB, original_url=url, quality_score=8.0)
+
+
+@pytest.fixture
+def replica(tmp_path, test_db: Session):
+    """A separate SQLite file standing in for the replica, with its own data"""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.add(_card("Replica Card", "https://github.com/test/replica"))
+        session.commit()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool)
+    read_router.session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    test_db.add(_card("Primary Card", "https://github.com/test/primary"))
+    test_db.commit()
+
+    yield
+    engine.dispose()
+
+
+NEW_CARD = {
+    "title": "New Card",
+    "source": "github",
+    "original_url": "https://github.com/test/new",
+}
+TOKEN = {"Authorization": "Bearer client-a"}
+
+
+def _titles(client: TestClient, headers=None):
+    response = client.get("/api/v1/cards/", headers=headers)
+    assert response.status_code == 200
+    return [card["title"] for card in response.json()]
+
+
+@pytest.mark.integration
+class TestReadReplicaRouting:
+    """Tests for routing read-only endpoints"""
+
+    def test_without_replica_reads_primary(self, client: TestClient, test_db: Session):
+        """Test reads use the primary when no replica is configured"""
+        test_db.add(_card("Primary Card", "https://github.com/test/primary"))
+        test_db.commit()
+
+        assert _titles(client) == ["Primary Card"]
+        assert read_router.stats["primary"] == 1
+        assert read_router.stats["replica"] == 0
+
+    def test_reads_use_replica(self, client: TestClient, replica):
+        """Test read-only endpoints are served from the replica"""
+        assert _titles(client) == ["Replica Card"]
+        assert client.get("/api/v1/cards/stats").json()["total_cards"] == 1
+        assert read_router.stats["replica"] == 2
+
+    def test_read_your_writes(self, client: TestClient, replica):
+        """Test a client's reads go to the primary right after its own write"""
+        response = client.post("/api/v1/cards/", json=NEW_CARD, headers=TOKEN)
+        assert response.status_code == 200
+
+        titles = _titles(client, headers=TOKEN)
+
+        assert "New Card" in titles
+        assert "Primary Card" in titles
+        assert read_router.stats["read_your_writes"] == 1
+
+    def test_read_your_writes_expires(self, client: TestClient, replica, monkeypatch):
+        """Test reads return to the replica once the write window has passed"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "read_your_writes_seconds", 0)
+        client.post("/api/v1/cards/", json=NEW_CARD, headers=TOKEN)
+
+        assert _titles(client, headers=TOKEN) == ["Replica Card"]
+
+    def test_other_clients_keep_replica(self, client: TestClient, replica):
+        """Test a write does not send other clients behind the same IP to the primary"""
+        client.post("/api/v1/cards/", json=NEW_CARD, headers=TOKEN)
+
+        assert _titles(client, headers={"Authorization": "Bearer client-b"}) == ["Replica Card"]
+        assert _titles(client) == ["Replica Card"]
+
+    def test_read_your_writes_by_ip(self, client: TestClient, replica, monkeypatch):
+        """Test anonymous clients are identified by IP when enabled"""
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "read_your_writes_by_ip", True)
+        client.post("/api/v1/cards/", json=NEW_CARD)
+
+        assert "New Card" in _titles(client)
+
+    def test_reads_do_not_mark_write(self, client: TestClient, replica):
+        """Test plain reads do not switch the client to the primary"""
+        _titles(client)
+        client.get("/api/v1/cards/overview-stats")
+
+        assert _titles(client) == ["Replica Card"]
+        assert read_router.stats["read_your_writes"] == 0
+
+
+@pytest.mark.integration
+class TestReadReplicaFallback:
+    """Tests for falling back to the primary"""
+
+    def test_unreachable_replica_falls_back(self, client: TestClient, test_db: Session, tmp_path):
+        """Test an unreachable replica is disabled and reads use the primary"""
+        broken = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}", poolclass=NullPool
+        )
+        read_router.session_factory = async_sessionmaker(broken)
+        test_db.add(_card("Primary Card", "https://github.com/test/primary"))
+        test_db.commit()
+
+        assert _titles(client) == ["Primary Card"]
+        assert _titles(client) == ["Primary Card"]
+
+        status = client.get("/api/v1/read-replica/status").json()
+        assert status["available"] is False
+        assert status["fallbacks"] == 1
+        assert status["last_error"]
@@ -15,6 +15,7 @@ from datetime import datetime, timedelta
 from app.models.card import TechCard, SourceType
 from app.models.user_preference import UserPreference
 from app.models.behavior import UserBehavior, ActionType, UserRecommendation
+from app.services import write_buffer
 
 
 # ==================== Test Fixtures ====================
@@ -214,6 +215,9 @@ class TestGetRecommendations:
 
         assert response.status_code == 200
 
+        # Records are written behind the response; drain the buffer first
+        write_buffer.flush_all()
+
         # Verify recommendation records were created
         records = test_db.query(UserRecommendation).filter(
             UserRecommendation.user_id == test_user.id
@@ -307,6 +311,72 @@ class TestRefreshRecommendations:
             for excluded_id in exclude_ids:
                 assert excluded_id not in new_ids, f"Excluded ID {excluded_id} found in new results: {new_ids}"
 
+    def test_refresh_recommendations_cursor_paging(
+        self, client: TestClient, test_user, recommend_test_cards, user_preferences_ml
+    ):
+        """Test refresh pages through the ranked list with a cursor"""
+        response1 = client.post(
+            f"/api/v1/recommendations/refresh?user_id={test_user.id}&limit=2"
+        )
+        data1 = response1.json()
+
+        assert response1.status_code == 200
+        assert data1["cursor"]
+        assert data1["total"] == 2
+        scores = [rec["score"] for rec in data1["recommendations"]]
+        assert scores == sorted(scores, reverse=True)
+
+        response2 = client.post(
+            f"/api/v1/recommendations/refresh?user_id={test_user.id}&limit=2"
+            f"&cursor={data1['cursor']}"
+        )
+        data2 = response2.json()
+
+        assert response2.status_code == 200
+        assert data2["cursor"] == data1["cursor"]
+        first_ids = {rec["card"]["id"] for rec in data1["recommendations"]}
+        second_ids = {rec["card"]["id"] for rec in data2["recommendations"]}
+        assert first_ids.isdisjoint(second_ids)
+        # Next page never scores above the previous one
+        assert max(rec["score"] for rec in data2["recommendations"]) <= min(scores)
+
+    def test_refresh_recommendations_lost_cursor(
+        self, client: TestClient, test_user, recommend_test_cards, user_preferences_ml
+    ):
+        """Test an unknown cursor (other worker, restart, expiry) does not repeat seen cards"""
+        from app.services.recommendation_sessions import recommendation_sessions
+
+        data1 = client.post(
+            f"/api/v1/recommendations/refresh?user_id={test_user.id}&limit=2"
+        ).json()
+        seen = [rec["card"]["id"] for rec in data1["recommendations"]]
+        with recommendation_sessions._lock:
+            recommendation_sessions._sessions.clear()
+
+        exclude_params = "&".join(f"exclude_ids={card_id}" for card_id in seen)
+        data2 = client.post(
+            f"/api/v1/recommendations/refresh?user_id={test_user.id}&limit=2"
+            f"&cursor={data1['cursor']}&{exclude_params}"
+        ).json()
+
+        assert data2["cursor"] != data1["cursor"]
+        assert set(seen).isdisjoint(rec["card"]["id"] for rec in data2["recommendations"])
+
+    def test_refresh_recommendations_cursor_other_user(
+        self, client: TestClient, test_user, recommend_test_cards, user_preferences_ml
+    ):
+        """Test a cursor is not reused across users"""
+        data1 = client.post(
+            f"/api/v1/recommendations/refresh?user_id={test_user.id}&limit=2"
+        ).json()
+
+        response = client.post(
+            f"/api/v1/recommendations/refresh?user_id={test_user.id + 1}&cursor={data1['cursor']}"
+        )
+
+        assert response.status_code == 200
+        assert "兴趣标签" in response.json()["message"]
+
     def test_refresh_recommendations_without_preferences(
         self, client: TestClient, test_user, recommend_test_cards
     ):
@@ -478,3 +548,48 @@ class TestGetRecommendationStats:
         data = response.json()
 
         assert data["click_rate"] == 100.0  # 100% clicked
+
+    def test_get_stats_breakdown_after_serving(
+        self, client: TestClient, test_user, recommend_test_cards, user_preferences_ml
+    ):
+        """Test served and clicked recommendations roll up by reason, source and tag"""
+        response = client.get(f"/api/v1/recommendations?user_id={test_user.id}&limit=3")
+        assert response.status_code == 200
+        served = response.json()["recommendations"]
+        write_buffer.flush_all()
+
+        stats = client.get(f"/api/v1/recommendations/stats?user_id={test_user.id}").json()
+
+        assert stats["total_recommendations"] == len(served)
+        assert stats["clicked_recommendations"] == 0
+        reasons = {item["key"]: item for item in stats["by_reason"]}
+        assert reasons["interest"]["impressions"] == len(served)
+        sources = {item["key"]: item for item in stats["by_source"]}
+        assert sources["github"]["impressions"] == len(served)
+        tags = {item["key"]: item for item in stats["by_tag"]}
+        assert tags["机器学习"]["impressions"] == len(served)
+
+    def test_get_stats_counts_click_updates(
+        self, client: TestClient, test_db: Session, test_user, recommend_test_cards
+    ):
+        """Test marking a recommendation clicked updates the rollup once"""
+        rec = UserRecommendation(
+            user_id=test_user.id,
+            card_id=recommend_test_cards[0].id,
+            score=85,
+            reason="基于你的兴趣：机器学习",
+            matched_tags="机器学习"
+        )
+        test_db.add(rec)
+        test_db.commit()
+
+        client.post(f"/api/v1/recommendations/{rec.id}/click")
+        client.post(f"/api/v1/recommendations/{rec.id}/click")  # idempotent
+
+        stats = client.get(f"/api/v1/recommendations/stats?user_id={test_user.id}").json()
+
+        assert stats["total_recommendations"] == 1
+        assert stats["clicked_recommendations"] == 1
+        assert stats["by_tag"][0] == {
+            "key": "机器学习", "impressions": 1, "clicks": 1, "click_rate": 100.0
+        }
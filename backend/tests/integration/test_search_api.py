@@ -13,6 +13,8 @@ from datetime import datetime
 from app.models.card import TechCard, SourceType
 from app.models.behavior import SearchHistory
 from app.models.user import User
+from app.services import write_buffer
+from app.services.query_cache import search_cache
 
 
 # ==================== Test Fixtures ====================
@@ -261,7 +263,8 @@ class TestSmartSearch:
 
         assert response.status_code == 200
 
-        # Verify history was created
+        # Verify history was created (written through the buffer)
+        write_buffer.flush_all()
         history = test_db.query(SearchHistory).filter(
             SearchHistory.user_id == test_user.id,
             SearchHistory.query == "FastAPI教程"
@@ -498,3 +501,38 @@ class TestSearchAutocomplete:
         # Should only return one instance of "重复查询"
         texts = [item["text"] for item in data]
         assert texts.count("重复查询") == 1
+
+
+# ==================== Search Result Cache Tests ====================
+
+@pytest.mark.integration
+@pytest.mark.api
+class TestSearchCache:
+    """Tests for the /search result cache"""
+
+    def test_repeat_search_hits_cache(self, client: TestClient, search_test_cards):
+        """Test equivalent queries are served from the cache"""
+        first = client.post("/api/v1/search", json={"query": "FastAPI", "mode": "keyword"})
+        second = client.post("/api/v1/search", json={"query": "  fastapi ", "mode": "keyword"})
+
+        assert first.status_code == 200
+        assert second.json() == first.json()
+
+        status = client.get("/api/v1/search/cache/status").json()
+        assert status["hits"] == 1
+        assert status["misses"] == 1
+
+    def test_card_change_invalidates_cache(self, client: TestClient, test_db: Session, search_test_cards):
+        """Test ingesting a card bumps the corpus version"""
+        first = client.post("/api/v1/search", json={"query": "Cache Busting", "mode": "keyword"})
+        assert first.json()["total"] == 0
+
+        test_db.add(TechCard(
+            title="Cache Busting Toolkit",
+            source=SourceType.GITHUB,
+            original_url="https://github.com/test/cache-busting"
+        ))
+        test_db.commit()
+
+        second = client.post("/api/v1/search", json={"query": "Cache Busting", "mode": "keyword"})
+        assert second.json()["total"] == 1
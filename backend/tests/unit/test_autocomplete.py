@@ -0,0 +1,122 @@
+"""
+Unit tests for the prefix-trie autocomplete index.
+
+Tests cover:
+- normalize_key - Width, case and kana folding
+- AutocompleteIndex - Build from database, weighting, incremental updates on commit
+"""
+import random
+import string
+import time
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.behavior import SearchHistory
+from app.models.card import TechCard, SourceType
+from app.services.autocomplete import AutocompleteIndex, normalize_key, autocomplete_index
+
+
+def _card(title: str, tags: list) -> TechCard:
+    return TechCard(
+        title=title,
+        source=SourceType.GITHUB,
+        original_url=f"https://github.com/test/{title.replace(' ', '-')}",
+        chinese_tags=tags
+    )
+
+
+@pytest.mark.unit
+class TestNormalizeKey:
+    """Tests for normalize_key"""
+
+    def test_width_case_and_kana(self):
+        """Test full-width latin and katakana fold to a common key"""
+        assert normalize_key("ＲＡＧ　パイプライン") == normalize_key("rag ぱいぷらいん")
+
+    def test_cjk_not_split(self):
+        """Test CJK text is kept intact"""
+        assert normalize_key("深度学习") == "深度学习"
+
+
+@pytest.mark.unit
+class TestAutocompleteIndex:
+    """Tests for AutocompleteIndex"""
+
+    def test_build_weights_by_frequency(self, test_db: Session):
+        """Test tags are ranked by card count and titles are indexed"""
+        test_db.add_all([
+            _card("Deep Learning Toolkit", ["深度学习", "PyTorch"]),
+            _card("Diffusion Models", ["深度学习", "扩散模型"]),
+            _card("Depth Estimation", ["深度估计"]),
+        ])
+        test_db.commit()
+
+        index = AutocompleteIndex()
+        index.build(test_db)
+
+        results = index.complete("深度", limit=5)
+        assert [r["text"] for r in results] == ["深度学习", "深度估计"]
+        assert results[0]["weight"] == 2
+
+        titles = index.complete("dep", limit=5, kinds=["title"])
+        assert [r["text"] for r in titles] == ["Depth Estimation"]
+
+    def test_word_entry_points(self, test_db: Session):
+        """Test completion from the start of a later word"""
+        test_db.add(_card("Awesome Vector DB", []))
+        test_db.commit()
+
+        index = AutocompleteIndex()
+        index.build(test_db)
+
+        assert index.complete("vector")[0]["text"] == "Awesome Vector DB"
+        assert index.complete("ＶＥＣ")[0]["text"] == "Awesome Vector DB"
+
+    def test_incremental_updates(self, test_db: Session):
+        """Test new cards and searches update the built global index"""
+        autocomplete_index.reset()
+        autocomplete_index.build(test_db)
+
+        test_db.add(_card("LangGraph Agents", ["智能体"]))
+        test_db.add_all([SearchHistory(user_id=1, query="langchain") for _ in range(3)])
+        test_db.commit()
+
+        results = autocomplete_index.complete("lang", limit=5)
+        assert results[0] == {"type": "history", "text": "langchain", "weight": 3}
+        assert "LangGraph Agents" in [r["text"] for r in results]
+        assert autocomplete_index.complete("智能")[0]["text"] == "智能体"
+        autocomplete_index.reset()
+
+    def test_rolled_back_inserts_not_indexed(self, test_db: Session):
+        """Test flushed rows join the index only once their transaction commits"""
+        autocomplete_index.reset()
+        autocomplete_index.build(test_db)
+
+        test_db.add(SearchHistory(user_id=1, query="rolled back"))
+        test_db.add(_card("Discarded Card", ["丢弃"]))
+        test_db.flush()
+        assert autocomplete_index.complete("rolled") == []
+        test_db.rollback()
+        test_db.add(SearchHistory(user_id=1, query="rollout"))
+        test_db.commit()
+
+        assert [r["text"] for r in autocomplete_index.complete("rol")] == ["rollout"]
+        assert autocomplete_index.complete("discarded") == []
+        autocomplete_index.reset()
+
+    def test_complete_latency(self):
+        """Test top-k lookups stay well under 1ms on a large vocabulary"""
+        rng = random.Random(0)
+        index = AutocompleteIndex()
+        for i in range(20000):
+            word = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+            index._stage("history", f"{word} {i}", rng.randint(1, 100))
+        index._compute_tops()
+
+        prefixes = ["a", "ab", "tr", "q", "xyz", "mno"] * 200
+        started = time.perf_counter()
+        for prefix in prefixes:
+            index.complete(prefix, limit=10)
+        elapsed = (time.perf_counter() - started) / len(prefixes)
+
+        assert elapsed < 0.001
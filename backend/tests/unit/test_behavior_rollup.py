@@ -0,0 +1,100 @@
+"""
+Unit tests for behavior rollups and raw-event retention.
+
+Tests cover:
+- apply_events / mapper event - Hourly and daily counters
+- count_actions / get_card_actions - Reads from daily rollups
+- compact - Archiving expired raw events and pruning hourly rollups
+"""
+import gzip
+import json
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+
+from app.models.behavior import UserBehavior, ActionType
+from app.models.behavior_rollup import BehaviorHourlyRollup, BehaviorDailyRollup
+from app.services import behavior_rollup
+
+
+@pytest.mark.unit
+class TestBehaviorRollup:
+    """Tests for behavior rollup maintenance"""
+
+    def test_apply_events_buckets(self, test_db: Session):
+        """Test events are counted per hour and per day"""
+        base = datetime(2025, 6, 1, 10, 15)
+        behavior_rollup.apply_events(test_db.connection(), [
+            {"user_id": 1, "action": ActionType.VIEW, "card_id": 7, "duration": 5, "created_at": base},
+            {"user_id": 1, "action": ActionType.VIEW, "card_id": 7, "duration": 3, "created_at": base + timedelta(minutes=30)},
+            {"user_id": 1, "action": ActionType.VIEW, "card_id": 7, "duration": 2, "created_at": base + timedelta(hours=2)},
+            {"user_id": 1, "action": ActionType.SEARCH, "card_id": None, "created_at": base},
+        ])
+        test_db.commit()
+
+        hourly = test_db.query(BehaviorHourlyRollup).filter(
+            BehaviorHourlyRollup.action == "view"
+        ).order_by(BehaviorHourlyRollup.bucket_start).all()
+        assert [(h.bucket_start.hour, h.count, h.total_duration) for h in hourly] == [(10, 2, 8), (12, 1, 2)]
+
+        daily = test_db.query(BehaviorDailyRollup).filter(BehaviorDailyRollup.action == "view").one()
+        assert daily.count == 3
+        assert daily.total_duration == 10
+
+        search = test_db.query(BehaviorDailyRollup).filter(BehaviorDailyRollup.action == "search").one()
+        assert search.card_id == 0
+
+    def test_orm_insert_updates_rollup(self, test_db: Session):
+        """Test single ORM inserts are rolled up by the mapper event"""
+        test_db.add_all([
+            UserBehavior(user_id=2, action=ActionType.CLICK, card_id=3),
+            UserBehavior(user_id=2, action=ActionType.CLICK, card_id=3),
+            UserBehavior(user_id=2, action=ActionType.FAVORITE, card_id=4),
+        ])
+        test_db.commit()
+
+        since = (datetime.now() - timedelta(days=1)).date()
+        assert behavior_rollup.count_actions(test_db, 2, since) == {"click": 2, "favorite": 1}
+
+        card_actions = behavior_rollup.get_card_actions(test_db, 2, since, actions=[ActionType.CLICK])
+        assert card_actions == [{"card_id": 3, "action": ActionType.CLICK, "count": 2}]
+
+    def test_compact_archives_and_deletes(self, test_db: Session, tmp_path):
+        """Test expired raw events are archived and deleted while rollups remain"""
+        old = datetime.now() - timedelta(days=100)
+        test_db.add_all([
+            UserBehavior(user_id=1, action=ActionType.CLICK, card_id=1, created_at=old),
+            UserBehavior(user_id=1, action=ActionType.CLICK, card_id=2, created_at=old),
+            UserBehavior(user_id=1, action=ActionType.CLICK, card_id=3, created_at=datetime.now()),
+        ])
+        test_db.commit()
+
+        result = behavior_rollup.compact(
+            test_db, retention_days=90, hourly_retention_days=14,
+            archive_dir=str(tmp_path), batch_size=1
+        )
+
+        assert result["archived"] == 2
+        assert result["hourly_pruned"] == 2
+        assert test_db.query(UserBehavior).count() == 1
+
+        archives = list(tmp_path.glob("*.jsonl.gz"))
+        assert len(archives) == 1
+        with gzip.open(archives[0], "rt", encoding="utf-8") as f:
+            archived = [json.loads(line) for line in f]
+        assert sorted(a["card_id"] for a in archived) == [1, 2]
+
+        # 按天汇总不受影响
+        total = sum(r.count for r in test_db.query(BehaviorDailyRollup).all())
+        assert total == 3
+
+    def test_rebuild(self, test_db: Session):
+        """Test rollups can be rebuilt from raw events"""
+        test_db.add(UserBehavior(user_id=5, action=ActionType.SHARE, card_id=9))
+        test_db.commit()
+        test_db.query(BehaviorDailyRollup).delete()
+        test_db.query(BehaviorHourlyRollup).delete()
+        test_db.commit()
+
+        assert behavior_rollup.rebuild(test_db) == 1
+        assert test_db.query(BehaviorDailyRollup).one().action == "share"
@@ -0,0 +1,152 @@
+"""
+Unit tests for card metric snapshots and growth rates.
+
+Tests cover:
+- metric_target - Upstream repo names from card URLs
+- growth_rate - Incremental, time-weighted daily growth
+- CardMetricTracker.refresh - Snapshots, growth rates, rescoring, batch order, no session held while fetching
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.card import SourceType, TechCard
+from app.models.card_metric import CardMetricSnapshot
+from app.services.card_metrics import CardMetricTracker, growth_rate, metric_target
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+
+class FakeGitHub:
+    def __init__(self, stars):
+        self.stars = stars
+        self.requested = []
+
+    async def get_repo_metrics(self, full_names):
+        self.requested.append(list(full_names))
+        return {name: {"stars": self.stars[name], "forks": 1} for name in full_names if name in self.stars}
+
+
+class FakeHuggingFace:
+    def __init__(self, downloads):
+        self.downloads = downloads
+
+    async def get_repo_metrics(self, repo_ids, kind="models"):
+        return {repo_id: {"downloads": self.downloads[repo_id], "likes": 3}
+                for repo_id in repo_ids if repo_id in self.downloads}
+
+
+@pytest.fixture
+def tracker(test_db: Session) -> CardMetricTracker:
+    return CardMetricTracker(session_factory=test_db._test_sessionmaker)
+
+
+def _card(test_db: Session, source: SourceType, url: str, **fields) -> TechCard:
+    card = TechCard(title=url.rsplit("/", 1)[-1], source=source, original_url=url,
+                    created_at=NOW - timedelta(days=1), **fields)
+    test_db.add(card)
+    test_db.commit()
+    return card
+
+
+@pytest.mark.unit
+class TestGrowthRate:
+    """Tests for metric_target and growth_rate"""
+
+    def test_metric_target(self):
+        """Test repo names are parsed from GitHub and HuggingFace URLs"""
+        assert metric_target(TechCard(source=SourceType.GITHUB, original_url="https://github.com/a/b/")) == ("github", "a/b")
+        assert metric_target(TechCard(source=SourceType.HUGGINGFACE,
+                                      original_url="https://huggingface.co/org/model")) == ("models", "org/model")
+        assert metric_target(TechCard(source=SourceType.HUGGINGFACE,
+                                      original_url="https://huggingface.co/datasets/org/data")) == ("datasets", "org/data")
+        assert metric_target(TechCard(source=SourceType.ARXIV, original_url="https://arxiv.org/abs/1")) is None
+
+    def test_growth_is_smoothed_by_elapsed_time(self, monkeypatch):
+        """Test the first interval sets the rate and later ones blend by half-life"""
+        from app.services import card_metrics
+        monkeypatch.setattr(card_metrics.settings, "metric_growth_half_life_hours", 24)
+
+        assert growth_rate(None, 100, timedelta(days=1), None) is None
+        first = growth_rate(100, 110, timedelta(days=1), None)
+        assert first == pytest.approx(0.1)
+        # One half-life later the rate moves halfway towards the new daily growth
+        assert growth_rate(110, 110, timedelta(days=1), first) == pytest.approx(0.05)
+        assert growth_rate(110, 120, timedelta(0), first) == first
+
+
+@pytest.mark.unit
+class TestRefresh:
+    """Tests for CardMetricTracker.refresh"""
+
+    @pytest.mark.asyncio
+    async def test_snapshots_feed_growth_and_quality(self, tracker, test_db: Session):
+        """Test two refreshes produce a growth rate that raises the quality score"""
+        repo = _card(test_db, SourceType.GITHUB, "https://github.com/a/repo", stars=100)
+        model = _card(test_db, SourceType.HUGGINGFACE, "https://huggingface.co/org/model")
+        _card(test_db, SourceType.ARXIV, "https://arxiv.org/abs/2401.00001")
+        tracker.github_scraper = FakeGitHub({"a/repo": 100})
+        tracker.hf_scraper = FakeHuggingFace({"org/model": 1000})
+
+        first = await tracker.refresh(now=NOW)
+        test_db.expire_all()
+        base_score = test_db.get(TechCard, repo.id).quality_score
+
+        tracker.github_scraper.stars["a/repo"] = 110
+        tracker.hf_scraper.downloads["org/model"] = 1200
+        await tracker.refresh(now=NOW + timedelta(days=1))
+        test_db.expire_all()
+        repo = test_db.get(TechCard, repo.id)
+        model = test_db.get(TechCard, model.id)
+
+        assert first == {"cards": 2, "refreshed": 2, "failed": 0, "pruned": 0}
+        assert test_db.query(CardMetricSnapshot).count() == 4
+        assert repo.stars == 110
+        assert repo.growth_rate == pytest.approx(0.1)
+        assert repo.quality_score > base_score
+        assert model.growth_rate == pytest.approx(0.2)
+        assert model.raw_data["downloads"] == 1200
+
+    @pytest.mark.asyncio
+    async def test_stalest_cards_first_and_failures_rotate(self, tracker, test_db: Session):
+        """Test each batch takes the least recently refreshed cards, including failed ones"""
+        fresh = _card(test_db, SourceType.GITHUB, "https://github.com/a/fresh", metrics_updated_at=NOW)
+        stale = _card(test_db, SourceType.GITHUB, "https://github.com/a/stale",
+                      metrics_updated_at=NOW - timedelta(days=1))
+        gone = _card(test_db, SourceType.GITHUB, "https://github.com/a/gone")
+        tracker.github_scraper = FakeGitHub({"a/fresh": 1, "a/stale": 1})
+
+        result = await tracker.refresh(limit=2, now=NOW + timedelta(hours=1))
+
+        assert tracker.github_scraper.requested == [["a/gone", "a/stale"]]
+        assert result["refreshed"] == 1 and result["failed"] == 1
+        test_db.expire_all()
+        assert test_db.get(TechCard, gone.id).metrics_updated_at == NOW + timedelta(hours=1)
+        assert test_db.get(TechCard, fresh.id).metrics_updated_at == NOW
+
+    @pytest.mark.asyncio
+    async def test_no_session_open_while_fetching(self, tracker, test_db: Session):
+        """Test upstream requests run between short-lived sessions, not inside one"""
+        _card(test_db, SourceType.GITHUB, "https://github.com/a/busy")
+        open_sessions = []
+        sessionmaker = tracker.session_factory
+
+        def session_factory():
+            session = sessionmaker()
+            open_sessions.append(session)
+            close = session.close
+            session.close = lambda: (open_sessions.remove(session), close())
+            return session
+
+        class CheckingGitHub(FakeGitHub):
+            async def get_repo_metrics(self, full_names):
+                assert open_sessions == []
+                return await super().get_repo_metrics(full_names)
+
+        tracker.session_factory = session_factory
+        tracker.github_scraper = CheckingGitHub({"a/busy": 10})
+        result = await tracker.refresh(now=NOW)
+
+        assert result["refreshed"] == 1
+        assert open_sessions == []
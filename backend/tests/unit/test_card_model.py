@@ -7,10 +7,14 @@ Tests cover:
 - Default values
 - Field constraints
 - JSON fields handling
+- PostgreSQL JSONB / GIN indexes
 """
 import pytest
 from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 from app.models.card import TechCard, SourceType, TrialStatus
 
@@ -474,3 +478,41 @@ class TestTechCardQueries:
             TechCard.source == SourceType.GITHUB
         ).count()
         assert github_count == 5
+
+
+# ==================== PostgreSQL Schema Tests ====================
+
+@pytest.mark.unit
+class TestPostgresSchema:
+    """Tests for the PostgreSQL-only column types and indexes"""
+
+    def test_json_columns_are_jsonb(self):
+        """Test tag columns compile to JSONB on PostgreSQL"""
+        ddl = str(CreateTable(TechCard.__table__).compile(dialect=postgresql.dialect()))
+
+        for column in ("chinese_tags", "ai_category", "tech_stack"):
+            assert f"{column} JSONB" in ddl
+
+    def test_gin_indexes(self):
+        """Test GIN / trigram / full-text indexes are defined for PostgreSQL"""
+        indexes = {
+            index.name: str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+            for index in TechCard.__table__.indexes
+        }
+
+        assert "USING gin (chinese_tags jsonb_path_ops)" in indexes["idx_tech_cards_chinese_tags_gin"]
+        assert "USING gin (lower(title) gin_trgm_ops)" in indexes["idx_tech_cards_title_trgm"]
+        assert "to_tsvector('simple'" in indexes["idx_tech_cards_search_tsv"]
+
+    def test_gin_indexes_skipped_on_sqlite(self, test_db: Session):
+        """Test PostgreSQL-only indexes are not created on SQLite"""
+        if test_db.bind.dialect.name != "sqlite":
+            pytest.skip("SQLite only")
+        names = {
+            row[0] for row in test_db.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tech_cards'")
+            )
+        }
+
+        assert "ix_tech_cards_title" in names
+        assert not any(name.endswith(("_gin", "_trgm", "_tsv")) for name in names)
@@ -0,0 +1,120 @@
+"""
+Unit tests for collaborative filtering module.
+
+Tests cover:
+- InteractionMatrixBuilder - Implicit feedback aggregation
+- ALSTrainer - Matrix factorization
+- CollaborativeFilterModel - Factor persistence and dot-product scoring
+"""
+import numpy as np
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services.collaborative_filter import (
+    ALSTrainer,
+    CollaborativeFilterModel,
+    InteractionMatrixBuilder,
+)
+from app.models.behavior import UserBehavior, ActionType
+from app.models.user_favorite import UserFavorite
+
+
+# ==================== InteractionMatrixBuilder Tests ====================
+
+@pytest.mark.unit
+class TestInteractionMatrixBuilder:
+    """Tests for InteractionMatrixBuilder"""
+
+    def test_collect_weights_actions(self, test_db: Session, test_user):
+        """Test that behaviors and favorites are weighted and summed"""
+        test_db.add_all([
+            UserBehavior(user_id=test_user.id, action=ActionType.CLICK, card_id=1),
+            UserBehavior(user_id=test_user.id, action=ActionType.CLICK, card_id=1),
+            UserBehavior(user_id=test_user.id, action=ActionType.VIEW, card_id=2),
+            UserBehavior(user_id=test_user.id, action=ActionType.SEARCH, query="llm"),
+            UserFavorite(user_id=test_user.id, item_id=3, item_type="github"),
+        ])
+        test_db.commit()
+
+        interactions = InteractionMatrixBuilder().collect(test_db)
+
+        assert interactions[(test_user.id, 1)] == 2.0
+        assert interactions[(test_user.id, 2)] == 0.5
+        assert interactions[(test_user.id, 3)] == 4.0
+        assert len(interactions) == 3
+
+    def test_collect_drops_unfavorited(self, test_db: Session, test_user):
+        """Test that favorite followed by unfavorite is not a positive signal"""
+        test_db.add_all([
+            UserBehavior(user_id=test_user.id, action=ActionType.FAVORITE, card_id=5),
+            UserBehavior(user_id=test_user.id, action=ActionType.UNFAVORITE, card_id=5),
+        ])
+        test_db.commit()
+
+        interactions = InteractionMatrixBuilder().collect(test_db)
+
+        assert (test_user.id, 5) not in interactions
+
+    def test_from_arrays_sums_duplicates(self):
+        """Test that duplicate (user, card) pairs are accumulated"""
+        matrix, user_ids, item_ids = InteractionMatrixBuilder.from_arrays(
+            [10, 10, 20], [100, 100, 200], [1.0, 2.0, 1.0]
+        )
+
+        assert list(user_ids) == [10, 20]
+        assert list(item_ids) == [100, 200]
+        assert matrix.nnz == 2
+        assert matrix[0, 0] == pytest.approx(3.0)
+
+
+# ==================== ALS / Model Tests ====================
+
+@pytest.mark.unit
+class TestCollaborativeFilterModel:
+    """Tests for ALSTrainer and CollaborativeFilterModel"""
+
+    @staticmethod
+    def _two_clusters():
+        """Users 0-4 like cards 0-4, users 5-9 like cards 5-9"""
+        users, items = [], []
+        for user in range(10):
+            group = range(0, 5) if user < 5 else range(5, 10)
+            for item in group:
+                if (user + item) % 5 != 0:  # leave one item unseen per user
+                    users.append(user)
+                    items.append(item)
+        return InteractionMatrixBuilder.from_arrays(users, items, [1.0] * len(users))
+
+    def test_factors_are_float32(self):
+        """Test factor arrays are compact float32"""
+        matrix, _, _ = self._two_clusters()
+        user_factors, item_factors = ALSTrainer(factors=4, iterations=5).fit(matrix)
+
+        assert user_factors.dtype == np.float32
+        assert item_factors.dtype == np.float32
+        assert user_factors.shape == (10, 4)
+        assert item_factors.shape == (10, 4)
+
+    def test_scores_prefer_same_cluster(self, tmp_path):
+        """Test unseen in-cluster cards outrank out-of-cluster cards"""
+        matrix, user_ids, item_ids = self._two_clusters()
+        user_factors, item_factors = ALSTrainer(factors=4, iterations=15).fit(matrix)
+
+        path = str(tmp_path / "cf.npz")
+        CollaborativeFilterModel.save(path, user_ids, item_ids, user_factors, item_factors)
+        model = CollaborativeFilterModel(path=path)
+
+        # user 0 has not seen card 0 (same cluster) nor card 5 (other cluster)
+        scores = model.score(0, [0, 5, 999])
+
+        assert model.has_user(0)
+        assert 999 not in scores
+        assert scores[0] > scores[5]
+        assert all(0.0 <= s <= 1.0 for s in scores.values())
+
+    def test_missing_model_returns_empty(self, tmp_path):
+        """Test scoring degrades gracefully without a model file"""
+        model = CollaborativeFilterModel(path=str(tmp_path / "missing.npz"))
+
+        assert model.is_available() is False
+        assert model.score(1, [1, 2, 3]) == {}
@@ -0,0 +1,170 @@
+"""
+Unit tests for database helpers.
+
+Tests cover:
+- get_async_database_url - Sync URL to async driver URL mapping
+- engine_options / install_sqlite_pragmas - Pool sizing and SQLite tuning
+- Alembic revisions - Upgrading a versioned database creates every model table
+- init_db - Unversioned databases from the old create_all are upgraded from the baseline
+"""
+import logging.config
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import (
+    ALEMBIC_INI, Base, engine_options, get_async_database_url, import_all_models, init_db, install_sqlite_pragmas
+)
+from app.models.card import SourceType, TechCard
+
+# 由 d3a8c5e1f904 之后的迁移创建的表
+TABLES_AFTER_CARD_METRICS = {
+    "recommendation_daily_stats",
+    "recommendation_tag_daily_stats",
+    "behavior_hourly_rollups",
+    "behavior_daily_rollups",
+    "popular_search_snapshots",
+    "cache_versions",
+}
+
+# 基线版本 872586777ad8 之后的迁移新增的表、tech_cards 列和索引
+TABLES_AFTER_BASELINE = TABLES_AFTER_CARD_METRICS | {
+    "scheduler_leases",
+    "job_queue",
+    "source_cursors",
+    "card_metric_snapshots",
+}
+INDEXES_AFTER_BASELINE = (
+    "idx_tech_cards_created_quality",
+    "idx_tech_cards_source_created",
+    "idx_user_behaviors_user_created",
+    "idx_data_source_health_source_time",
+    "ix_tech_cards_growth_rate",
+)
+CARD_COLUMNS_AFTER_BASELINE = ("growth_rate", "metrics_updated_at")
+
+
+def create_baseline_schema(engine):
+    """按基线版本的结构建表，模拟旧版本 create_all 建出的库"""
+    Base.metadata.create_all(engine, tables=[
+        table for name, table in Base.metadata.tables.items() if name not in TABLES_AFTER_BASELINE
+    ])
+    with engine.begin() as conn:
+        for index in INDEXES_AFTER_BASELINE:
+            conn.exec_driver_sql(f"DROP INDEX {index}")
+        for column in CARD_COLUMNS_AFTER_BASELINE:
+            conn.exec_driver_sql(f"ALTER TABLE tech_cards DROP COLUMN {column}")
+
+
+@pytest.mark.unit
+class TestAsyncDatabaseUrl:
+    """Tests for get_async_database_url"""
+
+    def test_sqlite(self):
+        """Test SQLite URLs use aiosqlite"""
+        assert get_async_database_url("sqlite:///./techpulse.db") == "sqlite+aiosqlite:///./techpulse.db"
+
+    def test_postgresql_keeps_credentials(self):
+        """Test PostgreSQL URLs use asyncpg and keep the password"""
+        url = get_async_database_url("postgresql+psycopg2://user:secret@db:5432/techpulse")
+
+        assert url == "postgresql+asyncpg://user:secret@db:5432/techpulse"
+
+    def test_async_driver_unchanged(self):
+        """Test URLs that already name an async driver are returned as-is"""
+        url = "postgresql+asyncpg://user:secret@db/techpulse"
+
+        assert get_async_database_url(url) == url
+
+
+@pytest.mark.unit
+class TestEngineTuning:
+    """Tests for engine_options and SQLite pragmas"""
+
+    def test_sqlite_pragmas_applied(self, tmp_path):
+        """Test new SQLite connections get WAL, busy timeout and cache settings"""
+        url = f"sqlite:///{tmp_path / 'tuned.db'}"
+        engine = create_engine(url, **engine_options(url))
+        install_sqlite_pragmas(engine)
+
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == settings.sqlite_busy_timeout_ms
+            assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -settings.sqlite_cache_size_kb
+        engine.dispose()
+
+    def test_memory_sqlite_has_no_pool_sizing(self):
+        """Test in-memory SQLite only gets connect_args"""
+        assert engine_options("sqlite:///:memory:") == {"connect_args": {"check_same_thread": False}}
+
+    def test_postgresql_pool_options(self):
+        """Test server databases get pool sizing, pre-ping and recycle"""
+        options = engine_options("postgresql://user:secret@db/techpulse")
+
+        assert options["pool_size"] == settings.db_pool_size
+        assert options["max_overflow"] == settings.db_max_overflow
+        assert options["pool_pre_ping"] is settings.db_pool_pre_ping
+        assert options["pool_recycle"] == settings.db_pool_recycle
+        assert "connect_args" not in options
+
+
+@pytest.mark.unit
+class TestMigrations:
+    """Tests for the Alembic revision chain"""
+
+    def test_upgrade_versioned_database_creates_model_tables(self, tmp_path, monkeypatch):
+        """Test a database stamped before the rollup tables gets them from upgrade head"""
+        url = f"sqlite:///{tmp_path / 'versioned.db'}"
+        monkeypatch.setattr(settings, "database_url", url)
+        import_all_models()
+        engine = create_engine(url)
+        Base.metadata.create_all(engine, tables=[
+            table for name, table in Base.metadata.tables.items() if name not in TABLES_AFTER_CARD_METRICS
+        ])
+
+        # 不读取 alembic.ini 的日志配置，避免禁用其他测试的 logger
+        config = Config()
+        config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+        command.stamp(config, "d3a8c5e1f904")
+        command.upgrade(config, "head")
+
+        assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+        engine.dispose()
+
+
+@pytest.mark.unit
+class TestInitDb:
+    """Tests for init_db on existing databases"""
+
+    def test_unversioned_database_upgraded_from_baseline(self, tmp_path, monkeypatch):
+        """Test a database created by the old create_all gets the columns added since the baseline"""
+        url = f"sqlite:///{tmp_path / 'legacy.db'}"
+        import_all_models()
+        engine = create_engine(url)
+        create_baseline_schema(engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                "INSERT INTO tech_cards (title, source, original_url) "
+                "VALUES ('Legacy', 'GITHUB', 'https://github.com/t/legacy')"
+            )
+
+        monkeypatch.setattr(settings, "database_url", url)
+        monkeypatch.setattr(database, "engine", engine)
+        # 不读取 alembic.ini 的日志配置，避免禁用其他测试的 logger
+        monkeypatch.setattr(logging.config, "fileConfig", lambda *args, **kwargs: None)
+        init_db()
+
+        schema = inspect(engine)
+        assert {"growth_rate", "metrics_updated_at"} <= {c["name"] for c in schema.get_columns("tech_cards")}
+        assert set(Base.metadata.tables) <= set(schema.get_table_names())
+        with Session(engine) as session:
+            card = session.query(TechCard).one()
+            assert card.source == SourceType.GITHUB
+            assert card.growth_rate is None
+        engine.dispose()
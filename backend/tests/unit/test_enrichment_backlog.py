@@ -0,0 +1,171 @@
+"""
+Unit tests for the priority-ordered AI enrichment backlog.
+
+Tests cover:
+- enrichment_priority - Quality, recency and user interest overlap
+- refill - Queue order, dedup and priority raises
+- Explicit requests - Jump the backlog and replace the queued payload
+- LLM budget - Remaining budget and deferring jobs without using attempts
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.card import SourceType, TechCard
+from app.models.job_queue import JobStatus, QueuedJob
+from app.models.user_preference import UserPreference
+from app.services import enrichment_backlog
+from app.services.job_handlers import PRIORITY_USER_REQUEST
+from app.services.job_queue import JobDeferred, JobQueue
+from app.services.job_worker import JobWorker
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def queue(test_db: Session) -> JobQueue:
+    return JobQueue(session_factory=test_db._test_sessionmaker)
+
+
+def _card(test_db: Session, title: str, quality: float = 0.0, age_hours: float = 0.0, **fields) -> TechCard:
+    card = TechCard(
+        title=title, source=SourceType.GITHUB, original_url=f"https://github.com/test/{title}",
+        quality_score=quality, created_at=datetime.utcnow() - timedelta(hours=age_hours), **fields
+    )
+    test_db.add(card)
+    test_db.commit()
+    return card
+
+
+def _succeeded(finished_at: datetime) -> QueuedJob:
+    return QueuedJob(kind=enrichment_backlog.ENRICH_KIND, payload="{}", status=JobStatus.SUCCEEDED,
+                     available_at=finished_at, created_at=finished_at, finished_at=finished_at)
+
+
+def _claim_order(queue: JobQueue):
+    order = []
+    while (job := queue.claim("w1")) is not None:
+        order.append(job["payload"]["card_id"])
+    return order
+
+
+@pytest.mark.unit
+class TestEnrichmentPriority:
+    """Tests for enrichment_priority"""
+
+    def test_quality_and_recency(self):
+        """Test higher quality and fresher cards score higher"""
+        fresh = TechCard(title="a", quality_score=5.0, created_at=NOW)
+        stale = TechCard(title="b", quality_score=5.0, created_at=NOW - timedelta(hours=24))
+        better = TechCard(title="c", quality_score=10.0, created_at=NOW)
+
+        assert enrichment_backlog.enrichment_priority(fresh, {}, NOW) == 20 + 30
+        assert enrichment_backlog.enrichment_priority(stale, {}, NOW) == 20 + 15
+        assert enrichment_backlog.enrichment_priority(better, {}, NOW) == 40 + 30
+
+    def test_interest_overlap(self, test_db: Session, test_user):
+        """Test cards matching user preferences are boosted"""
+        test_db.add_all([
+            UserPreference(user_id=test_user.id, preference_type="tag", preference_value="LLM", weight=2.0),
+            UserPreference(user_id=test_user.id, preference_type="language", preference_value="rust", weight=1.0),
+        ])
+        test_db.commit()
+        interests = enrichment_backlog.interest_weights(test_db)
+        old = NOW - timedelta(days=30)
+
+        llm = TechCard(title="a", created_at=old, raw_data={"topics": ["llm"]})
+        rust = TechCard(title="b", created_at=old, raw_data={"language": "Rust"})
+        other = TechCard(title="c", created_at=old, raw_data={"language": "Go"})
+
+        assert interests == {"llm": 1.0, "rust": 0.5}
+        assert enrichment_backlog.enrichment_priority(llm, interests, NOW) == 30
+        assert enrichment_backlog.enrichment_priority(rust, interests, NOW) == 15
+        assert enrichment_backlog.enrichment_priority(other, interests, NOW) == 0
+
+
+@pytest.mark.unit
+class TestRefill:
+    """Tests for refill"""
+
+    def test_queue_is_drained_by_priority(self, queue, test_db: Session):
+        """Test unenriched cards are queued once and claimed best first"""
+        low = _card(test_db, "low", quality=1.0, age_hours=72)
+        high = _card(test_db, "high", quality=9.0)
+        mid = _card(test_db, "mid", quality=5.0, age_hours=12)
+        _card(test_db, "done", quality=10.0, summary="already enriched")
+        _card(test_db, "ancient", quality=10.0, age_hours=24 * 60)
+
+        first = enrichment_backlog.refill(test_db, queue=queue)
+        second = enrichment_backlog.refill(test_db, queue=queue)
+
+        assert first == {"created": 3, "raised": 0, "candidates": 3}
+        assert second == {"created": 0, "raised": 0, "candidates": 3}
+        assert _claim_order(queue) == [high.id, mid.id, low.id]
+
+    def test_refill_raises_priority_of_queued_cards(self, queue, test_db: Session, test_user):
+        """Test a card that gained user interest moves up the queue"""
+        card = _card(test_db, "card", age_hours=24 * 7, raw_data={"topics": ["agents"]})
+        other = _card(test_db, "other", quality=3.0, age_hours=24 * 7)
+        enrichment_backlog.refill(test_db, queue=queue)
+
+        test_db.add(UserPreference(user_id=test_user.id, preference_type="tag", preference_value="agents"))
+        test_db.commit()
+        result = enrichment_backlog.refill(test_db, queue=queue)
+
+        assert result["raised"] == 1
+        assert _claim_order(queue) == [card.id, other.id]
+
+    def test_explicit_request_jumps_the_backlog(self, queue, test_db: Session):
+        """Test /ai/enhance-card requests run first and are marked explicit"""
+        queued = _card(test_db, "queued")
+        best = _card(test_db, "best", quality=10.0)
+        enrichment_backlog.refill(test_db, queue=queue)
+
+        queue.enqueue(test_db, enrichment_backlog.ENRICH_KIND, enrichment_backlog.explicit_payload(queued.id),
+                      priority=PRIORITY_USER_REQUEST, dedup_key=enrichment_backlog.enrich_dedup_key(queued.id))
+
+        job = queue.claim("w1")
+        assert job["payload"] == {"card_id": queued.id, "explicit": True}
+        assert enrichment_backlog.is_explicit(job["payload"])
+        assert queue.claim("w1")["payload"] == {"card_id": best.id}
+        assert test_db.query(QueuedJob).count() == 2
+
+
+@pytest.mark.unit
+class TestBudget:
+    """Tests for the hourly LLM budget"""
+
+    def test_budget_counts_recent_enrichments(self, queue, test_db: Session, monkeypatch):
+        """Test only enrichments finished within the last hour use the budget"""
+        monkeypatch.setattr(enrichment_backlog.settings, "enrichment_budget_per_hour", 2)
+        now = datetime.utcnow()
+        test_db.add_all([_succeeded(now - timedelta(minutes=10)), _succeeded(now - timedelta(minutes=90))])
+        test_db.commit()
+
+        assert enrichment_backlog.budget_remaining(test_db, now) == 1
+        test_db.add(_succeeded(now - timedelta(minutes=20)))
+        test_db.commit()
+        assert enrichment_backlog.budget_remaining(test_db, now) == 0
+        assert enrichment_backlog.budget_retry_after(test_db, now) == pytest.approx(40 * 60)
+
+        monkeypatch.setattr(enrichment_backlog.settings, "enrichment_budget_per_hour", 0)
+        assert enrichment_backlog.budget_remaining(test_db, now) is None
+
+    @pytest.mark.asyncio
+    async def test_deferred_job_keeps_its_attempts(self, queue, test_db: Session):
+        """Test a handler deferring a job puts it back later without using an attempt"""
+        async def over_budget(payload):
+            raise JobDeferred(600, "enrichment budget exhausted")
+
+        job_id = queue.enqueue(test_db, enrichment_backlog.ENRICH_KIND, {"card_id": 1})["job_id"]
+        worker = JobWorker(queue, handlers={enrichment_backlog.ENRICH_KIND: over_budget},
+                           worker_id="w1", concurrency=1, poll_seconds=0)
+        await worker.run(burst=True)
+
+        test_db.expire_all()
+        job = test_db.get(QueuedJob, job_id)
+        assert job.status == JobStatus.PENDING
+        assert job.attempts == 0
+        assert job.available_at > datetime.utcnow() + timedelta(minutes=9)
+        assert worker.get_status()["failed"] == 0
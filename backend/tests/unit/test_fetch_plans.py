@@ -0,0 +1,166 @@
+"""
+Unit tests for fetch plans compiled from data source configs.
+
+Tests cover:
+- to_local_cadence - Timezone conversion of user schedules
+- compile_fetch_plans - Shared units, cadence merging, invalid configs
+- execute_plan - Upstream calls per plan
+- TaskScheduler.reload_fetch_plans - Adding, keeping and removing plan jobs, gating global collections
+"""
+import json
+from datetime import date, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.user_settings import DataSourceConfig
+from app.services.fetch_plans import Cadence, compile_fetch_plans, execute_plan, to_local_cadence
+
+DAY = date(2026, 10, 19)
+
+
+def _config(user_id, source, frequency="daily", at="09:00", tz="UTC", **config_data):
+    return DataSourceConfig(
+        user_id=user_id, source_type=source, enabled=True, config_data=json.dumps(config_data),
+        schedule_enabled=True, schedule_frequency=frequency, schedule_time=at, schedule_timezone=tz
+    )
+
+
+def _compile(configs):
+    return compile_fetch_plans(configs, local_tz=timezone.utc, today=DAY)
+
+
+@pytest.mark.unit
+class TestToLocalCadence:
+    """Tests for to_local_cadence"""
+
+    def test_daily_converted_to_server_time(self):
+        """Test a Tokyo morning schedule becomes the previous evening in UTC"""
+        assert to_local_cadence("daily", "09:00", "Asia/Tokyo", timezone.utc, DAY) == Cadence("daily", "00:00")
+        assert to_local_cadence("daily", "08:00", "Asia/Tokyo", timezone.utc, DAY) == Cadence("daily", "23:00")
+
+    def test_weekly_can_shift_weekday(self):
+        """Test a Monday morning in Tokyo runs on Sunday in UTC"""
+        assert to_local_cadence("weekly", "08:00", "Asia/Tokyo", timezone.utc, DAY) == Cadence("weekly", "23:00", 6)
+
+    def test_invalid_values_raise(self):
+        """Test unknown frequencies and timezones are rejected"""
+        with pytest.raises(ValueError):
+            to_local_cadence("monthly", "09:00", "UTC")
+        with pytest.raises(ValueError):
+            to_local_cadence("daily", "09:00", "Mars/Olympus")
+
+
+@pytest.mark.unit
+class TestCompileFetchPlans:
+    """Tests for compile_fetch_plans"""
+
+    def test_overlapping_interests_share_units(self):
+        """Test users with the same language share one unit with the lowest min_stars"""
+        plans = _compile([
+            _config(1, "github", languages=["Python", "Go"], min_stars=100),
+            _config(2, "github", languages=["python"], min_stars=10),
+        ])
+
+        assert len(plans) == 1
+        units = {u.key: u for u in plans[0].units}
+        assert set(units) == {"go", "python"}
+        assert units["python"].params == {"language": "python", "min_stars": 10}
+        assert units["python"].subscribers == {1, 2}
+        assert units["go"].params["min_stars"] == 100
+
+    def test_unit_runs_at_most_frequent_cadence(self):
+        """Test a shared unit follows its most frequent subscriber and sources keep separate plans"""
+        plans = _compile([
+            _config(1, "arxiv", frequency="weekly", categories=["cs.AI"]),
+            _config(2, "arxiv", frequency="daily", at="10:00", categories=["cs.AI", "cs.CV"]),
+            _config(3, "arxiv", frequency="daily", at="07:30", categories=["cs.CV"]),
+            _config(4, "zenn", frequency="hourly"),
+        ])
+
+        by_name = {p.name: p for p in plans}
+        assert set(by_name) == {"fetch_plan:arxiv:daily-10:00", "fetch_plan:arxiv:daily-07:30",
+                                "fetch_plan:zenn:hourly"}
+        assert [u.key for u in by_name["fetch_plan:arxiv:daily-10:00"].units] == ["cs.AI"]
+        assert [u.key for u in by_name["fetch_plan:arxiv:daily-07:30"].units] == ["cs.CV"]
+
+    def test_invalid_schedules_are_skipped(self):
+        """Test bad schedules and unknown sources do not break compilation"""
+        plans = _compile([
+            _config(1, "github", tz="Not/AZone", languages=["rust"]),
+            _config(2, "github", at="25:99", languages=["rust"]),
+            _config(3, "gitlab"),
+            _config(4, "huggingface", pipeline_tags=["text-generation"]),
+        ])
+
+        assert [p.name for p in plans] == ["fetch_plan:huggingface:daily-09:00"]
+
+
+class _RecordingCollector:
+    def __init__(self):
+        self.calls = []
+
+    async def collect_github_data(self, language="python", min_stars=0):
+        self.calls.append(("github", language, min_stars))
+        return 1
+
+    async def collect_arxiv_data(self, categories=None):
+        self.calls.append(("arxiv", categories))
+        return 2
+
+
+@pytest.mark.unit
+class TestExecutePlan:
+    """Tests for execute_plan"""
+
+    @pytest.mark.asyncio
+    async def test_one_upstream_call_per_unit(self):
+        """Test each shared unit is fetched once and arXiv categories are batched"""
+        collector = _RecordingCollector()
+        github, arxiv = _compile([
+            _config(1, "github", languages=["python"], min_stars=50),
+            _config(2, "github", languages=["python"], min_stars=5),
+            _config(1, "arxiv", categories=["cs.AI", "cs.LG"]),
+        ])[::-1]
+
+        assert (await execute_plan(collector, github))["saved"] == 1
+        assert (await execute_plan(collector, arxiv))["saved"] == 2
+        assert collector.calls == [("github", "python", 5), ("arxiv", ["cs.AI", "cs.LG"])]
+
+
+@pytest.mark.unit
+class TestReloadFetchPlans:
+    """Tests for reloading plan jobs without restart"""
+
+    @pytest.mark.asyncio
+    async def test_reload_adds_keeps_and_removes_jobs(self, test_db: Session, test_user):
+        """Test config changes are reflected in the registered jobs"""
+        from app.services.scheduler import TaskScheduler
+
+        scheduler = TaskScheduler()
+        scheduler.session_factory = test_db._test_sessionmaker
+        scheduler.lease.session_factory = test_db._test_sessionmaker
+        scheduler.lease.try_acquire()
+        config = _config(test_user.id, "zenn", frequency="hourly")
+        test_db.add(config)
+        test_db.commit()
+
+        first = await scheduler.reload_fetch_plans()
+        second = await scheduler.reload_fetch_plans()
+        assert first["added"] == ["fetch_plan:zenn:hourly"]
+        assert second == {"added": [], "removed": [], "unchanged": ["fetch_plan:zenn:hourly"]}
+        assert scheduler.jobs.jobs["fetch_plan:zenn:hourly"].wait_for_lock
+        assert "data_collection" not in scheduler.jobs.jobs
+        assert "incremental_check" not in scheduler.jobs.jobs
+        manual = await scheduler.trigger_collection()
+        assert manual["status"] == "skipped"
+        assert "fetch plans" in manual["error"]
+
+        config.schedule_enabled = False
+        test_db.commit()
+        third = await scheduler.reload_fetch_plans()
+
+        assert third["removed"] == ["fetch_plan:zenn:hourly"]
+        assert "fetch_plan:zenn:hourly" not in scheduler.jobs.jobs
+        assert scheduler.get_status()["fetch_plans"] == []
+        assert {"data_collection", "full_collection", "incremental_check"} <= set(scheduler.jobs.jobs)
@@ -0,0 +1,142 @@
+"""
+Unit tests for the GitHub GraphQL batch fetcher.
+
+Tests cover:
+- build_query - One aliased repository selection per repo, names passed as variables
+- parse_repo - Metrics, license, topics, commit count and README
+- GitHubGraphQLFetcher.fetch_repos - Batching, missing repos, rate-limit budget
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.scrapers import github_graphql, rate_governor
+from app.services.scrapers.github_graphql import GitHubGraphQLFetcher, build_query, parse_repo
+
+
+def _node(full_name: str, stars: int = 10) -> dict:
+    return {
+        "nameWithOwner": full_name,
+        "url": f"https://github.com/{full_name}",
+        "description": "A repo",
+        "stargazerCount": stars,
+        "forkCount": 2,
+        "issues": {"totalCount": 3},
+        "licenseInfo": {"name": "MIT License", "spdxId": "MIT"},
+        "primaryLanguage": {"name": "Python"},
+        "repositoryTopics": {"nodes": [{"topic": {"name": "llm"}}]},
+        "createdAt": "2026-01-01T00:00:00Z",
+        "updatedAt": "2026-10-01T00:00:00Z",
+        "pushedAt": "2026-10-18T00:00:00Z",
+        "defaultBranchRef": {"target": {"history": {"totalCount": 42}}},
+        "readme": None,
+        "readmeLower": {"text": "# Title"},
+    }
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture
+def graphql_server(monkeypatch):
+    """Answers each query with the repos it asked for, except missing/*"""
+    calls = []
+    reset_at = (datetime.now(timezone.utc) + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    state = {"remaining": 5000}
+
+    def request(method, url, json, headers, timeout):
+        calls.append({"variables": json["variables"], "headers": headers})
+        data = {}
+        i = 0
+        while f"o{i}" in json["variables"]:
+            full_name = f"{json['variables'][f'o{i}']}/{json['variables'][f'n{i}']}"
+            data[f"r{i}"] = None if full_name.startswith("missing/") else _node(full_name)
+            i += 1
+        state["remaining"] -= 1
+        data["rateLimit"] = {"limit": 5000, "cost": 1, "remaining": state["remaining"], "resetAt": reset_at}
+        return FakeResponse({"data": data, "errors": [{"type": "NOT_FOUND"}]})
+
+    monkeypatch.setattr(rate_governor.requests, "request", request)
+    monkeypatch.setattr(github_graphql, "request_governor", rate_governor.RequestGovernor())
+    return calls, state
+
+
+@pytest.mark.unit
+class TestQuery:
+    """Tests for build_query and parse_repo"""
+
+    def test_build_query(self):
+        """Test repos become aliases with owner and name as variables"""
+        query = build_query(["a/one", "b/two"])
+
+        assert "r0: repository(owner: $o0, name: $n0)" in query["query"]
+        assert "r1: repository(owner: $o1, name: $n1)" in query["query"]
+        assert "rateLimit" in query["query"] and "readme:" in query["query"]
+        assert {k: v for k, v in query["variables"].items() if k != "since"} == {
+            "o0": "a", "n0": "one", "o1": "b", "n1": "two"
+        }
+        assert "readme:" not in build_query(["a/one"], with_readme=False)["query"]
+
+    def test_parse_repo(self):
+        """Test a repository node maps to the collector's fields"""
+        repo = parse_repo(_node("a/one", stars=7))
+
+        assert repo["title"] == "a/one"
+        assert repo["stars"] == 7 and repo["forks"] == 2 and repo["open_issues"] == 3
+        assert repo["license"] == "MIT License"
+        assert repo["topics"] == ["llm"]
+        assert repo["commit_count_30d"] == 42
+        assert repo["readme"] == "# Title"
+
+
+@pytest.mark.unit
+class TestFetchRepos:
+    """Tests for GitHubGraphQLFetcher.fetch_repos"""
+
+    @pytest.mark.asyncio
+    async def test_batches_and_records_rate_limit(self, graphql_server):
+        """Test 150 repos take two requests and missing repos are skipped"""
+        calls, _ = graphql_server
+        fetcher = GitHubGraphQLFetcher(token="t")
+        names = [f"org/repo{i}" for i in range(149)] + ["missing/repo"]
+
+        repos = await fetcher.fetch_repos(names)
+
+        assert len(calls) == 2
+        assert calls[0]["headers"] == {"Authorization": "bearer t"}
+        assert len(repos) == 149 and "missing/repo" not in repos
+        assert fetcher.get_status()["rate_limit"]["remaining"] == 4998
+
+    @pytest.mark.asyncio
+    async def test_stops_when_budget_is_exhausted(self, graphql_server):
+        """Test no further requests are sent until the rate limit resets"""
+        calls, state = graphql_server
+        state["remaining"] = github_graphql.MIN_REMAINING
+        fetcher = GitHubGraphQLFetcher(token="t", batch_size=10)
+
+        repos = await fetcher.fetch_repos([f"org/repo{i}" for i in range(30)])
+
+        assert len(calls) == 1 and len(repos) == 10
+        assert fetcher.budget_exhausted()
+
+    @pytest.mark.asyncio
+    async def test_requires_token(self, graphql_server, monkeypatch):
+        """Test nothing is requested without a token so callers fall back to REST"""
+        calls, _ = graphql_server
+        monkeypatch.setattr(github_graphql.settings, "github_token", None)
+        fetcher = GitHubGraphQLFetcher()
+
+        assert not fetcher.available
+        assert await fetcher.fetch_repos(["a/one"]) == {}
+        assert calls == []
@@ -0,0 +1,168 @@
+"""
+Unit tests for the scrapers' on-disk HTTP cache.
+
+Tests cover:
+- HttpCache.get - Storing validated responses and revalidating with conditional requests
+- CachedResponse - 304s served from disk, parsed JSON reused
+- Eviction - Size bound with least recently used eviction
+- Status - Bytes saved per source
+- Disk I/O - Runs in worker threads, off the event loop
+"""
+import json
+import threading
+
+import pytest
+
+from app.services.scrapers.http_cache import CachedResponse, HttpCache
+
+
+class FakeResponse:
+    encoding = "utf-8"
+
+    def __init__(self, status_code: int, body: bytes = b"", headers=None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeGovernor:
+    """Returns 304 when the request's If-None-Match matches the current ETag"""
+
+    def __init__(self):
+        self.bodies = {}
+        self.sent = []
+
+    async def get(self, url, params=None, headers=None, **kwargs):
+        self.sent.append(dict(headers or {}))
+        body, etag = self.bodies[url]
+        if etag and (headers or {}).get("If-None-Match") == etag:
+            return FakeResponse(304, headers={"ETag": etag})
+        return FakeResponse(200, body, {"ETag": etag} if etag else {})
+
+
+@pytest.fixture
+def governor() -> FakeGovernor:
+    return FakeGovernor()
+
+
+@pytest.fixture
+def cache(tmp_path, governor) -> HttpCache:
+    return HttpCache(directory=str(tmp_path), max_bytes=10_000, governor=governor)
+
+
+MODELS = "https://huggingface.co/api/models"
+
+
+@pytest.mark.unit
+class TestRevalidation:
+    """Tests for conditional requests"""
+
+    @pytest.mark.asyncio
+    async def test_not_modified_is_served_from_cache(self, cache, governor):
+        """Test the second request revalidates and reuses the stored body and parsed JSON"""
+        governor.bodies[MODELS] = (b'[{"modelId": "a/b"}]', '"v1"')
+
+        first = await cache.get(MODELS, params={"limit": 10})
+        second = await cache.get(MODELS, params={"limit": 10})
+        third = await cache.get(MODELS, params={"limit": 10})
+
+        assert first.status_code == 200 and not isinstance(first, CachedResponse)
+        assert governor.sent[1] == {"If-None-Match": '"v1"'}
+        assert isinstance(second, CachedResponse)
+        assert second.json() == [{"modelId": "a/b"}]
+        assert third.json() is second.json()
+        status = cache.get_status()
+        assert status["entries"] == 1
+        assert status["sources"]["huggingface"]["revalidated"] == 2
+        assert status["sources"]["huggingface"]["bytes_saved"] == 2 * len(governor.bodies[MODELS][0])
+
+    @pytest.mark.asyncio
+    async def test_changed_content_replaces_entry(self, cache, governor):
+        """Test a new ETag stores the new body and the next 304 serves it"""
+        governor.bodies[MODELS] = (b'[1]', '"v1"')
+        await cache.get(MODELS)
+        governor.bodies[MODELS] = (b'[2]', '"v2"')
+
+        changed = await cache.get(MODELS)
+        cached = await cache.get(MODELS)
+
+        assert changed.json() == [2]
+        assert isinstance(cached, CachedResponse) and cached.json() == [2]
+
+    @pytest.mark.asyncio
+    async def test_entries_survive_restart(self, tmp_path, cache, governor):
+        """Test a new cache instance revalidates entries written by another one"""
+        governor.bodies[MODELS] = (b'[1]', '"v1"')
+        await cache.get(MODELS)
+
+        restarted = HttpCache(directory=str(tmp_path), max_bytes=10_000, governor=governor)
+        response = await restarted.get(MODELS)
+
+        assert isinstance(response, CachedResponse) and response.text == "[1]"
+
+    @pytest.mark.asyncio
+    async def test_unvalidated_and_disabled(self, tmp_path, governor):
+        """Test responses without validators are not stored and an empty directory disables caching"""
+        governor.bodies[MODELS] = (b'[1]', None)
+        cache = HttpCache(directory=str(tmp_path), governor=governor)
+        await cache.get(MODELS)
+        await cache.get(MODELS)
+
+        assert cache.get_status()["entries"] == 0
+        assert governor.sent == [{}, {}]
+        disabled = HttpCache(directory="", governor=governor)
+        assert (await disabled.get(MODELS)).status_code == 200
+        assert disabled.get_status()["enabled"] is False
+
+
+@pytest.mark.unit
+class TestEviction:
+    """Tests for the size bound"""
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_is_evicted(self, tmp_path, governor):
+        """Test storing past the limit evicts the entry used longest ago"""
+        cache = HttpCache(directory=str(tmp_path), max_bytes=1_000, governor=governor)
+        urls = [f"https://zenn.dev/api/articles?page={i}" for i in range(11)]
+        for url in urls:
+            governor.bodies[url] = (b"x" * 100, f'"{url}"')
+
+        for url in urls[:10]:
+            await cache.get(url)
+        await cache.get(urls[0])  # revalidated, now more recent than page 1
+        await cache.get(urls[10])
+
+        kept = {meta["url"] for meta in cache._load_index().values()}
+        assert kept == set(urls) - {urls[1]}
+        assert cache.get_status()["bytes"] == 1_000
+        assert cache.get_status()["sources"]["zenn"]["evicted"] == 1
+        assert len(list(tmp_path.glob("*.body"))) == 10
+
+
+@pytest.mark.unit
+class TestDiskIO:
+    """Tests for keeping disk access off the event loop"""
+
+    @pytest.mark.asyncio
+    async def test_disk_io_runs_in_threads(self, cache, governor, monkeypatch):
+        """Test index loading, reads and writes never run on the event loop thread"""
+        loop_thread = threading.get_ident()
+        threads = []
+        for name in ("_load_index", "_read", "_write", "_store"):
+            original = getattr(cache, name)
+
+            def recorder(*args, _original=original, _name=name, **kwargs):
+                threads.append((_name, threading.get_ident()))
+                return _original(*args, **kwargs)
+
+            monkeypatch.setattr(cache, name, recorder)
+        governor.bodies[MODELS] = (b'[1]', '"v1"')
+
+        await cache.get(MODELS)
+        await cache.get(MODELS)
+
+        assert {name for name, _ in threads} == {"_load_index", "_read", "_write", "_store"}
+        assert all(ident != loop_thread for _, ident in threads)
@@ -0,0 +1,157 @@
+"""
+Unit tests for the persistent job queue and its worker.
+
+Tests cover:
+- JobQueue.enqueue - Dedup keys and priority bumps
+- JobQueue.claim - Priority order, single winner, visibility timeout
+- JobQueue.fail - Backoff retries and dead jobs
+- JobWorker - Executing handlers, unknown kinds, releasing jobs on stop
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.job_queue import JobStatus, QueuedJob
+from app.services.job_queue import JobQueue
+from app.services.job_worker import JobWorker
+
+
+@pytest.fixture
+def queue(test_db: Session) -> JobQueue:
+    return JobQueue(session_factory=test_db._test_sessionmaker)
+
+
+def _job(test_db: Session, job_id: int) -> QueuedJob:
+    test_db.expire_all()
+    return test_db.get(QueuedJob, job_id)
+
+
+@pytest.mark.unit
+class TestEnqueue:
+    """Tests for JobQueue.enqueue"""
+
+    def test_dedup_key_returns_active_job(self, queue, test_db: Session):
+        """Test an active job with the same key is reused and its priority raised"""
+        first = queue.enqueue(test_db, "enrich_card", {"card_id": 1}, priority=0, dedup_key="enrich_card:1")
+        second = queue.enqueue(test_db, "enrich_card", {"card_id": 1}, priority=10, dedup_key="enrich_card:1")
+
+        assert first["created"] and not second["created"]
+        assert second["job_id"] == first["job_id"]
+        assert test_db.query(QueuedJob).count() == 1
+        assert _job(test_db, first["job_id"]).priority == 10
+
+    def test_finished_job_can_be_enqueued_again(self, queue, test_db: Session):
+        """Test the dedup key is released once the job completes"""
+        first = queue.enqueue(test_db, "enrich_card", {"card_id": 1}, dedup_key="enrich_card:1")
+        claimed = queue.claim("w1")
+        queue.complete(claimed["id"], "w1", {"ok": True})
+
+        again = queue.enqueue(test_db, "enrich_card", {"card_id": 1}, dedup_key="enrich_card:1")
+
+        assert again["created"] and again["job_id"] != first["job_id"]
+
+
+@pytest.mark.unit
+class TestClaim:
+    """Tests for JobQueue.claim"""
+
+    def test_highest_priority_first(self, queue, test_db: Session):
+        """Test jobs are claimed by priority, then age"""
+        low = queue.enqueue(test_db, "a", priority=-10)["job_id"]
+        old = queue.enqueue(test_db, "a")["job_id"]
+        new = queue.enqueue(test_db, "a")["job_id"]
+        high = queue.enqueue(test_db, "a", priority=10)["job_id"]
+
+        order = [queue.claim("w1")["id"] for _ in range(4)]
+
+        assert order == [high, old, new, low]
+        assert queue.claim("w1") is None
+
+    def test_claimed_job_is_invisible_until_timeout(self, queue, test_db: Session):
+        """Test a running job is only reclaimed after its visibility timeout"""
+        job_id = queue.enqueue(test_db, "a")["job_id"]
+        claimed = queue.claim("w1")
+
+        assert queue.claim("w2") is None
+        later = datetime.utcnow() + timedelta(hours=1)
+        reclaimed = queue.claim("w2", now=later)
+
+        assert reclaimed["id"] == job_id and reclaimed["attempts"] == 2
+        # The first worker no longer owns it and cannot complete it
+        assert not queue.complete(claimed["id"], "w1")
+        assert queue.complete(job_id, "w2")
+
+
+@pytest.mark.unit
+class TestFail:
+    """Tests for JobQueue.fail"""
+
+    def test_retry_with_backoff_then_dead(self, queue, test_db: Session):
+        """Test failures are retried after a backoff and end as dead"""
+        job_id = queue.enqueue(test_db, "a", max_attempts=2)["job_id"]
+
+        claimed = queue.claim("w1")
+        queue.fail(job_id, "w1", "boom", claimed["attempts"], claimed["max_attempts"])
+        job = _job(test_db, job_id)
+        assert job.status == JobStatus.PENDING and job.available_at > datetime.utcnow()
+        assert queue.claim("w1") is None
+
+        claimed = queue.claim("w1", now=job.available_at)
+        queue.fail(job_id, "w1", "boom again", claimed["attempts"], claimed["max_attempts"])
+        job = _job(test_db, job_id)
+
+        assert job.status == JobStatus.DEAD
+        assert job.last_error == "boom again"
+        assert job.active_dedup_key is None
+
+
+@pytest.mark.unit
+class TestJobWorker:
+    """Tests for JobWorker"""
+
+    @pytest.mark.asyncio
+    async def test_burst_runs_handlers(self, queue, test_db: Session):
+        """Test the worker executes each job once and records results"""
+        seen = []
+
+        async def handle(payload):
+            seen.append(payload["n"])
+            if payload["n"] == 2:
+                raise RuntimeError("bad input")
+            return payload["n"] * 10
+
+        ok = queue.enqueue(test_db, "work", {"n": 1})["job_id"]
+        bad = queue.enqueue(test_db, "work", {"n": 2}, max_attempts=1)["job_id"]
+        unknown = queue.enqueue(test_db, "mystery")["job_id"]
+
+        worker = JobWorker(queue, handlers={"work": handle}, worker_id="w1", concurrency=2, poll_seconds=0)
+        await worker.run(burst=True)
+
+        assert sorted(seen) == [1, 2]
+        assert _job(test_db, ok).status == JobStatus.SUCCEEDED
+        assert _job(test_db, ok).result == "10"
+        assert _job(test_db, bad).status == JobStatus.DEAD
+        assert _job(test_db, unknown).status == JobStatus.DEAD
+        assert worker.get_status()["processed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_releases_running_job(self, queue, test_db: Session):
+        """Test stopping the worker puts the in-flight job back without using an attempt"""
+        entered = asyncio.Event()
+
+        async def slow(payload):
+            entered.set()
+            await asyncio.sleep(60)
+
+        job_id = queue.enqueue(test_db, "slow")["job_id"]
+        worker = JobWorker(queue, handlers={"slow": slow}, worker_id="w1", concurrency=1, poll_seconds=0.01)
+        worker.start()
+        await asyncio.wait_for(entered.wait(), timeout=2)
+        await worker.stop()
+
+        job = _job(test_db, job_id)
+        assert job.status == JobStatus.PENDING
+        assert job.attempts == 0
+        assert job.locked_by is None
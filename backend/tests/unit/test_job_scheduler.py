@@ -0,0 +1,348 @@
+"""
+Unit tests for the asyncio job scheduler.
+
+Tests cover:
+- next_daily_run / next_weekly_run - Daily and weekly trigger computation
+- AsyncJobScheduler - Interval runs, overlap locks, failures, cancellation, history
+- TaskScheduler - Shared collection lock, leader-only execution, per-process local jobs,
+  last collection time recovered from health records
+- Collection lease - Scheduled and queued (worker) collections never overlap across processes
+"""
+import asyncio
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.config import DataSourceHealth, HealthStatus
+from app.services.job_queue import JobDeferred
+from app.services.job_scheduler import AsyncJobScheduler, Job, next_daily_run, next_weekly_run
+from app.services.leader_lease import LeaderLease
+
+
+@pytest.mark.unit
+class TestNextDailyRun:
+    """Tests for next_daily_run"""
+
+    def test_later_today(self):
+        """Test a time later today runs today"""
+        now = datetime(2026, 10, 19, 1, 30)
+
+        assert next_daily_run(time(2, 0), now) == datetime(2026, 10, 19, 2, 0)
+
+    def test_passed_runs_tomorrow(self):
+        """Test a time already passed (or now) runs tomorrow"""
+        now = datetime(2026, 10, 19, 2, 0)
+
+        assert next_daily_run(time(2, 0), now) == datetime(2026, 10, 20, 2, 0)
+
+    def test_weekly_runs_on_weekday(self):
+        """Test a weekly trigger waits for its weekday, or a week when it just passed"""
+        monday = datetime(2026, 10, 19, 10, 0)
+
+        assert next_weekly_run(time(9, 0), 2, monday) == datetime(2026, 10, 21, 9, 0)
+        assert next_weekly_run(time(9, 0), 0, monday) == datetime(2026, 10, 26, 9, 0)
+
+
+@pytest.mark.unit
+class TestJob:
+    """Tests for Job validation"""
+
+    def test_requires_one_trigger(self):
+        """Test a job needs exactly one of interval or at"""
+        async def noop():
+            pass
+
+        with pytest.raises(ValueError):
+            Job("bad", noop)
+        with pytest.raises(ValueError):
+            Job("bad", noop, interval=timedelta(hours=1), at="02:00")
+
+
+@pytest.mark.unit
+class TestAsyncJobScheduler:
+    """Tests for AsyncJobScheduler"""
+
+    @pytest.mark.asyncio
+    async def test_interval_job_runs_repeatedly(self):
+        """Test an interval job fires on its timer and records history"""
+        calls = []
+
+        async def tick():
+            calls.append(1)
+            return len(calls)
+
+        scheduler = AsyncJobScheduler()
+        scheduler.add_job(Job("tick", tick, interval=timedelta(milliseconds=20)))
+        scheduler.start()
+        await asyncio.sleep(0.15)
+        await scheduler.stop()
+
+        assert len(calls) >= 3
+        assert all(r["status"] == "success" for r in scheduler.get_history("tick"))
+        assert not scheduler.running
+
+    @pytest.mark.asyncio
+    async def test_lock_group_prevents_overlap(self):
+        """Test jobs in the same lock group never run concurrently"""
+        release = asyncio.Event()
+        started = []
+
+        async def collect():
+            started.append(1)
+            await release.wait()
+
+        scheduler = AsyncJobScheduler()
+        scheduler.add_job(Job("interval", collect, interval=timedelta(hours=1), lock_group="collection"))
+        scheduler.add_job(Job("incremental", collect, interval=timedelta(hours=1), lock_group="collection"))
+
+        first = asyncio.create_task(scheduler.run_job("interval"))
+        await asyncio.sleep(0)
+        second = await scheduler.run_job("incremental")
+        release.set()
+        first = await first
+
+        assert len(started) == 1
+        assert second["status"] == "skipped"
+        assert first["status"] == "success"
+
+    @pytest.mark.asyncio
+    async def test_wait_for_lock_queues_instead_of_skipping(self):
+        """Test a wait_for_lock job runs after the busy group frees up"""
+        release = asyncio.Event()
+        order = []
+
+        async def collect():
+            order.append("collect")
+            await release.wait()
+
+        async def plan():
+            order.append("plan")
+
+        scheduler = AsyncJobScheduler()
+        scheduler.add_job(Job("collect", collect, interval=timedelta(hours=1), lock_group="collection"))
+        scheduler.add_job(Job("plan", plan, interval=timedelta(hours=1), lock_group="collection",
+                              wait_for_lock=True))
+
+        first = asyncio.create_task(scheduler.run_job("collect"))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(scheduler.run_job("plan"))
+        await asyncio.sleep(0.01)
+        assert order == ["collect"]
+        release.set()
+
+        assert (await queued)["status"] == "success"
+        await first
+        assert order == ["collect", "plan"]
+
+    @pytest.mark.asyncio
+    async def test_failure_is_recorded(self):
+        """Test exceptions are recorded without breaking the scheduler"""
+        async def broken():
+            raise RuntimeError("upstream down")
+
+        scheduler = AsyncJobScheduler()
+        scheduler.add_job(Job("broken", broken, interval=timedelta(hours=1)))
+
+        record = await scheduler.run_job("broken")
+
+        assert record["status"] == "failed"
+        assert record["error"] == "upstream down"
+        assert scheduler.jobs["broken"].last_status == "failed"
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_running_job(self):
+        """Test stop cancels in-flight runs and waits for them"""
+        entered = asyncio.Event()
+
+        async def slow():
+            entered.set()
+            await asyncio.sleep(60)
+
+        scheduler = AsyncJobScheduler()
+        scheduler.add_job(Job("slow", slow, interval=timedelta(milliseconds=1)))
+        scheduler.start()
+        await asyncio.wait_for(entered.wait(), timeout=1)
+        await asyncio.wait_for(scheduler.stop(), timeout=1)
+
+        assert scheduler.get_history("slow")[-1]["status"] == "cancelled"
+        assert scheduler.get_status()["jobs"][0]["in_progress"] is False
+
+
+class _FakeCollector:
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def collect_all_sources(self):
+        self.calls += 1
+        await self.release.wait()
+        return {"total": 0}
+
+
+@pytest.fixture
+def task_scheduler(test_db: Session):
+    """A TaskScheduler with a fake collector and its lease on the test database"""
+    from app.services.scheduler import TaskScheduler
+
+    scheduler = TaskScheduler()
+    scheduler.data_collector = _FakeCollector()
+    scheduler.lease.session_factory = test_db._test_sessionmaker
+    scheduler.session_factory = test_db._test_sessionmaker
+    return scheduler
+
+
+@pytest.mark.unit
+class TestTaskSchedulerCollections:
+    """Tests for collection jobs sharing one lock"""
+
+    @pytest.mark.asyncio
+    async def test_collections_never_overlap(self, task_scheduler):
+        """Test manual, incremental and full collections skip while one is running"""
+        scheduler = task_scheduler
+        collector = scheduler.data_collector
+        scheduler.lease.try_acquire()
+
+        running = asyncio.create_task(scheduler.trigger_collection())
+        await asyncio.sleep(0)
+        manual = await scheduler.trigger_collection()
+        incremental = await scheduler.jobs.run_job("incremental_check")
+        full = await scheduler.jobs.run_job("full_collection")
+        collector.release.set()
+        first = await running
+
+        assert first["status"] == "success"
+        assert [manual["status"], incremental["status"], full["status"]] == ["skipped"] * 3
+        assert collector.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_incremental_skips_after_recent_collection(self, task_scheduler):
+        """Test the incremental check does not repeat a recent collection"""
+        scheduler = task_scheduler
+        collector = scheduler.data_collector
+        collector.release.set()
+        scheduler.lease.try_acquire()
+
+        await scheduler.trigger_collection()
+        record = await scheduler.jobs.run_job("incremental_check")
+
+        assert record["status"] == "success"
+        assert collector.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_incremental_uses_recorded_collection_time(self, task_scheduler, test_db: Session):
+        """Test a new leader does not collect again right after a collection recorded by another process"""
+        scheduler = task_scheduler
+        collector = scheduler.data_collector
+        collector.release.set()
+        scheduler.lease.try_acquire()
+        test_db.add(DataSourceHealth(source_name="github", status=HealthStatus.SUCCESS, items_collected=3))
+        test_db.commit()
+
+        record = await scheduler.jobs.run_job("incremental_check")
+
+        assert record["status"] == "success"
+        assert collector.calls == 0
+        assert scheduler.last_collection_time is not None
+        assert abs(datetime.now() - scheduler.last_collection_time) < timedelta(minutes=1)
+
+    @pytest.mark.asyncio
+    async def test_incremental_runs_after_stale_collection(self, task_scheduler, test_db: Session):
+        """Test the incremental check collects when the last recorded collection is old"""
+        scheduler = task_scheduler
+        collector = scheduler.data_collector
+        collector.release.set()
+        scheduler.lease.try_acquire()
+        test_db.add(DataSourceHealth(
+            source_name="github", status=HealthStatus.SUCCESS, check_time=datetime.utcnow() - timedelta(hours=3)
+        ))
+        test_db.commit()
+
+        await scheduler.jobs.run_job("incremental_check")
+
+        assert collector.calls == 1
+
+
+@pytest.mark.unit
+class TestCollectionLease:
+    """Tests for serializing collections across the scheduler leader and job workers"""
+
+    @pytest.mark.asyncio
+    async def test_scheduled_collection_skips_while_worker_collects(self, task_scheduler, test_db: Session):
+        """Test the leader skips a collection while a worker holds the collection lease"""
+        from app.services.scheduler import COLLECTION_LEASE
+
+        scheduler = task_scheduler
+        scheduler.data_collector.release.set()
+        scheduler.lease.try_acquire()
+        worker = LeaderLease(COLLECTION_LEASE, 60, holder_id="worker:1", session_factory=test_db._test_sessionmaker)
+        worker.try_acquire()
+
+        record = await scheduler.trigger_collection()
+
+        assert record["status"] == "skipped"
+        assert "worker:1" in record["error"]
+        assert scheduler.data_collector.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_queued_collection_deferred_while_leader_collects(self, task_scheduler, test_db: Session,
+                                                                    monkeypatch):
+        """Test a collect_source job is deferred while a scheduled collection runs"""
+        from app.services import scheduler as scheduler_module
+        from app.services.job_handlers import collect_source
+
+        lease_on_test_db = scheduler_module.collection_lease
+        monkeypatch.setattr(scheduler_module, "collection_lease",
+                            lambda session_factory=test_db._test_sessionmaker: lease_on_test_db(session_factory))
+        scheduler = task_scheduler
+        scheduler.lease.try_acquire()
+
+        running = asyncio.create_task(scheduler.trigger_collection())
+        await asyncio.sleep(0.05)
+        with pytest.raises(JobDeferred):
+            await collect_source({"source": "all"})
+        scheduler.data_collector.release.set()
+
+        assert (await running)["status"] == "success"
+
+
+@pytest.mark.unit
+class TestTaskSchedulerLeadership:
+    """Tests for running jobs only on the lease holder"""
+
+    @pytest.mark.asyncio
+    async def test_only_leader_runs_jobs(self, test_db: Session, monkeypatch):
+        """Test two schedulers on one database start jobs exactly once, and fail over on stop"""
+        from app.core.config import settings
+        from app.services.scheduler import TaskScheduler
+
+        monkeypatch.setattr(settings, "scheduler_lease_renew_seconds", 0.01)
+        first, second = TaskScheduler(), TaskScheduler()
+        for scheduler in (first, second):
+            scheduler.lease.session_factory = test_db._test_sessionmaker
+            scheduler.session_factory = test_db._test_sessionmaker
+
+        first.start_scheduler()
+        await asyncio.sleep(0.05)
+        second.start_scheduler()
+        await asyncio.sleep(0.05)
+
+        assert first.jobs.running and first.lease.is_leader
+        assert not second.jobs.running and not second.lease.is_leader
+        assert first.local_jobs.running and second.local_jobs.running
+        manual = await second.trigger_collection()
+        assert manual["status"] == "skipped"
+        assert first.lease.holder_id in manual["error"]
+
+        await first.stop_scheduler()
+        await asyncio.sleep(0.1)
+
+        assert second.jobs.running and second.lease.is_leader
+        assert not first.local_jobs.running
+        await second.stop_scheduler()
+
+    def test_process_local_jobs_outside_lease(self, task_scheduler):
+        """Test jobs on per-process memory are not registered under the lease"""
+        for name in ("popular_search_snapshot", "autocomplete_rebuild"):
+            assert name in task_scheduler.local_jobs.jobs
+            assert name not in task_scheduler.jobs.jobs
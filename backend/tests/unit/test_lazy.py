@@ -0,0 +1,73 @@
+"""
+Unit tests for lazy initialization.
+
+Tests cover:
+- LazyProvider - Deferred creation, attribute forwarding, reset/override
+"""
+import threading
+
+import pytest
+
+from app.core.lazy import LazyProvider
+
+
+class _Service:
+    created = 0
+
+    def __init__(self):
+        type(self).created += 1
+        self.value = 1
+
+    def ping(self):
+        return "pong"
+
+
+@pytest.fixture(autouse=True)
+def reset_counter():
+    _Service.created = 0
+
+
+@pytest.mark.unit
+class TestLazyProvider:
+    """Tests for LazyProvider"""
+
+    def test_not_created_until_used(self):
+        """Test the factory runs on first attribute access only"""
+        provider = LazyProvider(_Service)
+        assert _Service.created == 0
+        assert not provider.initialized
+
+        assert provider.ping() == "pong"
+        assert provider.value == 1
+        assert _Service.created == 1
+        assert provider.initialized
+        assert provider.init_seconds is not None
+
+    def test_setattr_forwards_to_instance(self):
+        """Test attribute assignment reaches the wrapped instance"""
+        provider = LazyProvider(_Service)
+        provider.value = 5
+
+        assert provider.get().value == 5
+
+    def test_concurrent_first_use_creates_once(self):
+        """Test concurrent first use still runs the factory once"""
+        provider = LazyProvider(_Service)
+        threads = [threading.Thread(target=provider.get) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert _Service.created == 1
+
+    def test_reset_and_override(self):
+        """Test reset recreates the instance and override replaces it"""
+        provider = LazyProvider(_Service)
+        first = provider.get()
+        provider.reset()
+        assert provider.get() is not first
+
+        replacement = _Service()
+        provider.override(replacement)
+        assert provider.get() is replacement
@@ -0,0 +1,105 @@
+"""
+Unit tests for the database leader lease.
+
+Tests cover:
+- LeaderLease - Exclusive acquisition, renewal, expiry failover, release
+- hold_lease - Mutual exclusion across holders, waiting, release on exit
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services.leader_lease import LeaderLease, LeaseBusy, hold_lease
+
+
+@pytest.fixture
+def make_lease(test_db: Session):
+    def factory(holder_id: str) -> LeaderLease:
+        return LeaderLease(
+            "collection_scheduler", ttl_seconds=60, holder_id=holder_id,
+            session_factory=test_db._test_sessionmaker
+        )
+    return factory
+
+
+@pytest.mark.unit
+class TestLeaderLease:
+    """Tests for LeaderLease"""
+
+    def test_only_one_holder(self, make_lease):
+        """Test the first process acquires the lease and others are refused"""
+        a, b = make_lease("host-a:1"), make_lease("host-b:2")
+
+        assert a.try_acquire() is True
+        assert b.try_acquire() is False
+        assert a.current_holder()["holder_id"] == "host-a:1"
+
+    def test_renewal_extends_expiry(self, make_lease):
+        """Test the holder renews and keeps its original acquisition time"""
+        a = make_lease("host-a:1")
+        now = datetime.utcnow()
+        a.try_acquire(now)
+        acquired_at = a.current_holder()["acquired_at"]
+
+        assert a.try_acquire(now + timedelta(seconds=30)) is True
+        holder = a.current_holder()
+        assert holder["acquired_at"] == acquired_at
+        assert holder["expires_at"] == (now + timedelta(seconds=90)).isoformat()
+
+    def test_failover_after_expiry(self, make_lease):
+        """Test another process takes over once the holder stops renewing"""
+        a, b = make_lease("host-a:1"), make_lease("host-b:2")
+        now = datetime.utcnow()
+        a.try_acquire(now)
+
+        assert b.try_acquire(now + timedelta(seconds=30)) is False
+        assert b.try_acquire(now + timedelta(seconds=61)) is True
+        # The old holder learns it lost the lease on its next renewal
+        assert a.try_acquire(now + timedelta(seconds=62)) is False
+        assert a.is_leader is False
+
+    def test_release_allows_immediate_takeover(self, make_lease):
+        """Test a released lease can be acquired without waiting for the TTL"""
+        a, b = make_lease("host-a:1"), make_lease("host-b:2")
+        a.try_acquire()
+        a.release()
+
+        assert b.try_acquire() is True
+
+
+@pytest.mark.unit
+class TestHoldLease:
+    """Tests for hold_lease"""
+
+    @pytest.mark.asyncio
+    async def test_busy_while_held_and_released_on_exit(self, make_lease):
+        """Test a second holder is refused while the block runs and can acquire afterwards"""
+        a, b = make_lease("host-a:1"), make_lease("host-b:2")
+
+        async with hold_lease(a, renew_seconds=10):
+            with pytest.raises(LeaseBusy, match="host-a:1"):
+                async with hold_lease(b, renew_seconds=10):
+                    pass
+
+        assert a.is_leader is False
+        assert b.try_acquire() is True
+
+    @pytest.mark.asyncio
+    async def test_wait_until_released(self, make_lease):
+        """Test a waiting holder enters once the current holder exits"""
+        a, b = make_lease("host-a:1"), make_lease("host-b:2")
+        order = []
+
+        async def second():
+            async with hold_lease(b, renew_seconds=0.01, wait=True):
+                order.append("b")
+
+        async with hold_lease(a, renew_seconds=10):
+            waiting = asyncio.create_task(second())
+            await asyncio.sleep(0.05)
+            order.append("a")
+        await asyncio.wait_for(waiting, timeout=1)
+
+        assert order == ["a", "b"]
@@ -0,0 +1,153 @@
+"""
+Unit tests for streaming popular-search tracking.
+
+Tests cover:
+- SpaceSaving - Heavy-hitter guarantees under eviction
+- PopularSearchTracker - Day windows, snapshots merged across processes
+- backfill - Seeding snapshots from search_history
+"""
+import random
+import pytest
+from collections import Counter
+from datetime import date, datetime, timedelta
+from sqlalchemy.orm import Session
+
+from app.models.behavior import SearchHistory
+from app.models.search_stats import PopularSearchSnapshot
+from app.services.popular_searches import SpaceSaving, PopularSearchTracker, backfill, normalize_query
+
+
+@pytest.mark.unit
+class TestSpaceSaving:
+    """Tests for SpaceSaving sketch"""
+
+    def test_exact_below_capacity(self):
+        """Test counts are exact while distinct items fit"""
+        sketch = SpaceSaving(capacity=10)
+        for item in ["a", "b", "a", "c", "a", "b"]:
+            sketch.offer(item)
+
+        assert sketch.top(2) == [("a", 3, 0), ("b", 2, 0)]
+
+    def test_heavy_hitters_survive_eviction(self):
+        """Test frequent items stay tracked with a long tail of rare items"""
+        rng = random.Random(0)
+        stream = ["llm"] * 500 + ["rag"] * 300 + ["agent"] * 200
+        stream += [f"rare-{i}" for i in range(5000)]
+        rng.shuffle(stream)
+
+        sketch = SpaceSaving(capacity=50)
+        for item in stream:
+            sketch.offer(item)
+
+        top = sketch.top(3)
+        assert [item for item, _, _ in top] == ["llm", "rag", "agent"]
+        truth = Counter(stream)
+        for item, count, error in top:
+            assert count - error <= truth[item] <= count
+        assert len(sketch) == 50
+
+
+@pytest.mark.unit
+class TestPopularSearchTracker:
+    """Tests for PopularSearchTracker"""
+
+    def test_normalize_query(self):
+        """Test width/case/whitespace folding"""
+        assert normalize_query("  ＬＬＭ   Agent ") == "llm agent"
+
+    def test_window_and_contains(self, test_db: Session):
+        """Test day windows and substring filtering"""
+        tracker = PopularSearchTracker(capacity=20, max_days=30)
+        tracker.ensure_loaded(test_db)
+        old = datetime.now() - timedelta(days=5)
+        for _ in range(3):
+            tracker.record("Transformer", when=old)
+        tracker.record("transformer")
+        tracker.record("rag")
+
+        assert tracker.top(test_db, days=1) == [
+            {"query": "rag", "count": 1},
+            {"query": "transformer", "count": 1},
+        ]
+        assert tracker.top(test_db, days=7)[0] == {"query": "transformer", "count": 4}
+        assert tracker.top(test_db, days=7, contains="AG") == [{"query": "rag", "count": 1}]
+
+    def test_persist_and_restore(self, test_db: Session):
+        """Test sketches round-trip through snapshots"""
+        tracker = PopularSearchTracker(capacity=20, max_days=30)
+        tracker.ensure_loaded(test_db)
+        for query in ["llm", "llm", "diffusion"]:
+            tracker.record(query)
+
+        assert tracker.persist(test_db) == 2
+        assert test_db.query(PopularSearchSnapshot).filter(
+            PopularSearchSnapshot.bucket_date == date.today()
+        ).count() == 2
+
+        restored = PopularSearchTracker(capacity=20, max_days=30)
+        restored.record("llm")  # recorded before the first read
+        assert restored.top(test_db, days=1)[0] == {"query": "llm", "count": 3}
+
+    def test_processes_merge_counts(self, test_db: Session):
+        """Test each process adds its own counts without overwriting the others'"""
+        first = PopularSearchTracker(capacity=20, max_days=30)
+        second = PopularSearchTracker(capacity=20, max_days=30)
+        for query in ["llm", "llm", "rag"]:
+            first.record(query)
+        second.record("llm")
+
+        first.persist(test_db)
+        second.persist(test_db)
+        first.persist(test_db)
+
+        rows = dict(test_db.query(PopularSearchSnapshot.query, PopularSearchSnapshot.count).all())
+        assert rows == {"llm": 3, "rag": 1}
+        assert first.top(test_db, days=1) == second.top(test_db, days=1) == [
+            {"query": "llm", "count": 3},
+            {"query": "rag", "count": 1},
+        ]
+
+    def test_persist_trims_to_capacity(self, test_db: Session):
+        """Test each day keeps only the highest-count terms"""
+        tracker = PopularSearchTracker(capacity=2, max_days=30)
+        for query in ["a", "a", "a", "b", "b"]:
+            tracker.record(query)
+        tracker.persist(test_db)
+        other = PopularSearchTracker(capacity=2, max_days=30)
+        other.record("c")
+        other.persist(test_db)
+
+        assert sorted(row.query for row in test_db.query(PopularSearchSnapshot)) == ["a", "b"]
+
+    def test_backfill_from_history(self, test_db: Session):
+        """Test backfill seeds snapshots from search_history"""
+        test_db.add_all([
+            SearchHistory(user_id=1, query="Vector DB"),
+            SearchHistory(user_id=2, query="vector db"),
+            SearchHistory(user_id=3, query="embedding"),
+        ])
+        test_db.commit()
+
+        assert backfill(test_db) == 2
+
+        tracker = PopularSearchTracker(capacity=20, max_days=30)
+        top = tracker.top(test_db, days=7)[0]
+        assert top["query"].lower() == "vector db"
+        assert top["count"] == 2
+
+    def test_counts_only_committed_history(self, test_db: Session):
+        """Test single inserts are counted on commit, not on flush or rollback"""
+        from app.services.popular_searches import popular_searches
+        popular_searches.reset()
+        popular_searches.ensure_loaded(test_db)
+
+        test_db.add(SearchHistory(user_id=1, query="rolled back"))
+        test_db.flush()
+        test_db.rollback()
+        test_db.add(SearchHistory(user_id=1, query="kept"))
+        test_db.flush()
+        assert popular_searches.top(test_db, days=1) == []
+
+        test_db.commit()
+        assert popular_searches.top(test_db, days=1) == [{"query": "kept", "count": 1}]
@@ -0,0 +1,130 @@
+"""
+Unit tests for the query result cache.
+
+Tests cover:
+- QueryResultCache - LRU eviction, TTL expiry, version invalidation
+- corpus_version - Database version bumped by searchable card writes from any session
+"""
+import time
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.card import SourceType, TechCard
+from app.models.user import User
+from app.services.query_cache import QueryResultCache, corpus_version
+
+
+@pytest.mark.unit
+class TestQueryResultCache:
+    """Tests for QueryResultCache"""
+
+    def test_hit_and_miss(self):
+        """Test stored values are returned and counted"""
+        cache = QueryResultCache(max_entries=10, ttl_seconds=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first"""
+        cache = QueryResultCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL"""
+        cache = QueryResultCache(max_entries=10, ttl_seconds=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert cache.stats["stale"] == 1
+
+    def test_version_invalidation(self):
+        """Test a version bump invalidates existing and in-flight results"""
+        cache = QueryResultCache(max_entries=10, ttl_seconds=60)
+        cache.set("a", 1)
+        version = cache.version
+        cache.invalidate()
+
+        assert cache.get("a") is None
+
+        # 计算期间语料发生变化的结果不写入
+        cache.set("b", 2, version=version)
+        assert cache.get("b") is None
+
+    def test_explicit_version(self):
+        """Test entries written at one corpus version miss at another"""
+        cache = QueryResultCache(max_entries=10, ttl_seconds=60)
+        cache.set("a", 1, version=3)
+
+        assert cache.get("a", version=3) == 1
+        assert cache.get("a", version=4) is None
+
+
+@pytest.mark.unit
+class TestCorpusVersion:
+    """Tests for the shared corpus version"""
+
+    def test_card_flush_bumps_version(self, test_db: Session):
+        """Test each flush that writes cards bumps the version once"""
+        before = corpus_version(test_db)
+        test_db.add_all([
+            TechCard(title=f"Card {i}", source=SourceType.GITHUB, original_url=f"https://github.com/t/{i}")
+            for i in range(3)
+        ])
+        test_db.commit()
+        assert corpus_version(test_db) == before + 1
+
+        other = test_db._test_sessionmaker()
+        try:
+            card = other.query(TechCard).first()
+            card.title = "Renamed"
+            other.commit()
+        finally:
+            other.close()
+        assert corpus_version(test_db) == before + 2
+
+    def test_metric_updates_keep_version(self, test_db: Session):
+        """Test updating only metrics (stars, quality score) leaves the version alone"""
+        card = TechCard(title="Metrics", source=SourceType.GITHUB, original_url="https://github.com/t/metrics")
+        test_db.add(card)
+        test_db.commit()
+        before = corpus_version(test_db)
+
+        card.stars = 1234
+        card.quality_score = 8.5
+        test_db.commit()
+        assert corpus_version(test_db) == before
+
+        card.chinese_tags = ["rust"]
+        test_db.commit()
+        assert corpus_version(test_db) == before + 1
+
+    def test_card_delete_bumps_version(self, test_db: Session):
+        """Test deleting a card bumps the version"""
+        card = TechCard(title="Gone", source=SourceType.GITHUB, original_url="https://github.com/t/gone")
+        test_db.add(card)
+        test_db.commit()
+        before = corpus_version(test_db)
+
+        test_db.delete(card)
+        test_db.commit()
+        assert corpus_version(test_db) == before + 1
+
+    def test_other_writes_keep_version(self, test_db: Session):
+        """Test flushes without cards leave the version alone"""
+        before = corpus_version(test_db)
+        test_db.add(User(username="reader", email="reader@example.com", hashed_password="x"))
+        test_db.commit()
+
+        assert corpus_version(test_db) == before
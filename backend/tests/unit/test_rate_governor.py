@@ -0,0 +1,111 @@
+"""
+Unit tests for the per-host rate-limit governor.
+
+Tests cover:
+- bucket_for - GitHub search/core/graphql and per-host buckets
+- TokenBucket.reserve - Spacing requests and refusing long waits
+- TokenBucket.observe - X-RateLimit-* and Retry-After headers
+- RequestGovernor.request - Queueing concurrent requests and retrying after 429
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.services.scrapers import rate_governor
+from app.services.scrapers.rate_governor import (
+    RateLimited, RatePolicy, RequestGovernor, TokenBucket, bucket_for,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = 200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@pytest.mark.unit
+class TestBuckets:
+    """Tests for bucket_for and TokenBucket"""
+
+    def test_bucket_for(self):
+        """Test URLs map to the upstream's rate-limit buckets"""
+        assert bucket_for("https://api.github.com/search/repositories?q=x") == "github:search"
+        assert bucket_for("https://api.github.com/repos/a/b") == "github:core"
+        assert bucket_for("https://api.github.com/graphql") == "github:graphql"
+        assert bucket_for("https://huggingface.co/api/models") == "huggingface"
+        assert bucket_for("http://export.arxiv.org/api/query") == "arxiv"
+        assert bucket_for("https://zenn.dev/api/articles") == "zenn"
+        assert bucket_for("https://example.com/x") == "example.com"
+
+    def test_reserve_spaces_requests(self):
+        """Test one request every 3 seconds once the burst is used"""
+        bucket = TokenBucket("arxiv", RatePolicy(1 / 3, 1))
+
+        assert bucket.reserve(100.0, max_wait=60) == 0
+        assert bucket.reserve(100.0, max_wait=60) == pytest.approx(3)
+        assert bucket.reserve(101.0, max_wait=60) == pytest.approx(5)
+        with pytest.raises(RateLimited):
+            bucket.reserve(101.0, max_wait=4)
+        assert bucket.requests == 3
+
+    def test_observe_rate_limit_headers(self):
+        """Test exhausted GitHub quota pauses the bucket until reset"""
+        bucket = TokenBucket("github:search", RatePolicy(10 / 60, 10))
+        reset = int(time.time()) + 30
+
+        assert bucket.observe(FakeResponse(200, {"X-RateLimit-Limit": "10", "X-RateLimit-Remaining": "4",
+                                                 "X-RateLimit-Reset": str(reset)}), 0.0) is None
+        assert bucket.tokens == 4
+        pause = bucket.observe(FakeResponse(403, {"X-RateLimit-Remaining": "0",
+                                                  "X-RateLimit-Reset": str(reset)}), 0.0)
+
+        assert pause == pytest.approx(31, abs=1.5)
+        assert bucket.throttled == 1
+        assert bucket.get_status(0.0)["server"] == {"limit": None, "remaining": 0, "reset": reset}
+        with pytest.raises(RateLimited):
+            bucket.reserve(1.0, max_wait=10)
+
+    def test_observe_retry_after(self):
+        """Test 429 with Retry-After pauses; a plain 403 is not treated as throttling"""
+        bucket = TokenBucket("zenn", RatePolicy(1.0, 3))
+
+        assert bucket.observe(FakeResponse(403), 0.0) is None
+        assert bucket.observe(FakeResponse(429, {"Retry-After": "7"}), 0.0) == 7
+        assert bucket.reserve(0.0, max_wait=60) == 7
+
+
+@pytest.mark.unit
+class TestRequestGovernor:
+    """Tests for RequestGovernor.request"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_are_spaced(self, monkeypatch):
+        """Test concurrent requests to one host are queued at the policy rate"""
+        sent = []
+
+        def request(method, url, **kwargs):
+            sent.append(time.monotonic())
+            return FakeResponse()
+
+        monkeypatch.setattr(rate_governor.requests, "request", request)
+        governor = RequestGovernor({"zenn": RatePolicy(20.0, 1)})
+
+        await asyncio.gather(*(governor.get("https://zenn.dev/api/articles") for _ in range(3)))
+
+        gaps = [b - a for a, b in zip(sorted(sent), sorted(sent)[1:])]
+        assert len(sent) == 3
+        assert all(gap >= 0.04 for gap in gaps)
+        assert governor.get_status()["zenn"]["requests"] == 3
+
+    @pytest.mark.asyncio
+    async def test_retries_after_429(self, monkeypatch):
+        """Test a throttled request is retried once after Retry-After"""
+        responses = [FakeResponse(429, {"Retry-After": "0"}), FakeResponse(200)]
+        monkeypatch.setattr(rate_governor.requests, "request", lambda method, url, **kwargs: responses.pop(0))
+        governor = RequestGovernor({"huggingface": RatePolicy(100.0, 5)})
+
+        response = await governor.get("https://huggingface.co/api/models")
+
+        assert response.status_code == 200
+        assert governor.get_status()["huggingface"]["throttled"] == 1
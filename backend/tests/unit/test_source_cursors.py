@@ -0,0 +1,284 @@
+"""
+Unit tests for incremental per-source collection cursors.
+
+Tests cover:
+- parse_timestamp / high_water_mark - Upstream timestamp formats
+- SourceCursorStore - Forward-only advance, overlap window, reset
+- fetch_incremental / advance_cursor - Requests only newer items; the cursor moves after the save
+- HuggingFaceScraper.get_recently_modified - Pages until the cursor, popularity filter
+- ZennScraper.get_articles_since - Pages until the cursor however far back it is
+- GitHubScraper - Only the pushed: condition follows the cursor; min_stars is part of every query
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services.source_cursors import (
+    SourceCursorStore, advance_cursor, fetch_incremental, high_water_mark, parse_timestamp
+)
+
+
+@pytest.fixture
+def store(test_db: Session) -> SourceCursorStore:
+    return SourceCursorStore(session_factory=test_db._test_sessionmaker)
+
+
+@pytest.mark.unit
+class TestParseTimestamp:
+    """Tests for timestamp parsing"""
+
+    def test_formats_normalized_to_naive_utc(self):
+        """Test ISO 8601 with offsets and RFC 2822 dates parse to naive UTC"""
+        expected = datetime(2026, 10, 19, 3, 0)
+
+        assert parse_timestamp("2026-10-19T03:00:00Z") == expected
+        assert parse_timestamp("2026-10-19T12:00:00+09:00") == expected
+        assert parse_timestamp("Mon, 19 Oct 2026 03:00:00 GMT") == expected
+        assert parse_timestamp("") is None
+        assert parse_timestamp("not a date") is None
+
+    def test_high_water_mark(self):
+        """Test the newest parseable timestamp wins"""
+        items = [
+            {"published_at": "2026-10-18T00:00:00Z"},
+            {"published_at": "2026-10-19T12:00:00+09:00"},
+            {"published_at": None},
+        ]
+
+        assert high_water_mark(items, "published_at") == datetime(2026, 10, 19, 3, 0)
+        assert high_water_mark([], "published_at") is None
+
+
+@pytest.mark.unit
+class TestSourceCursorStore:
+    """Tests for SourceCursorStore"""
+
+    def test_advance_only_moves_forward(self, store):
+        """Test the cursor never goes backwards"""
+        assert store.advance("zenn:articles", datetime(2026, 10, 19, 3, 0))
+        assert not store.advance("zenn:articles", datetime(2026, 10, 18))
+        assert store.advance("zenn:articles", datetime(2026, 10, 19, 4, 0))
+
+        assert store.get("zenn:articles") == datetime(2026, 10, 19, 4, 0)
+
+    def test_since_subtracts_overlap(self, store, monkeypatch):
+        """Test requests start slightly before the cursor"""
+        from app.core.config import settings
+
+        monkeypatch.setattr(settings, "source_cursor_overlap_minutes", 10)
+        store.advance("github:python", datetime(2026, 10, 19, 3, 0))
+
+        assert store.since("github:python") == datetime(2026, 10, 19, 2, 50)
+        assert store.since("github:go") is None
+
+    def test_reset(self, store):
+        """Test resetting a cursor restores the full window"""
+        store.advance("a", datetime(2026, 10, 19))
+        store.advance("b", datetime(2026, 10, 19))
+
+        assert store.reset("a") == 1
+        assert [c["name"] for c in store.get_status()] == ["b"]
+
+
+@pytest.mark.unit
+class TestFetchIncremental:
+    """Tests for fetch_incremental"""
+
+    @pytest.mark.asyncio
+    async def test_first_run_full_then_incremental(self, store):
+        """Test the first run fetches the full window and later runs pass the cursor"""
+        calls = []
+
+        async def fetch(since):
+            calls.append(since)
+            if since is None:
+                return [{"last_modified": "2026-10-19T03:00:00Z"}, {"last_modified": "2026-10-01T00:00:00Z"}]
+            return []
+
+        first, mark = await fetch_incremental("huggingface:models:*", fetch, "last_modified", store)
+        assert store.get("huggingface:models:*") is None
+        assert advance_cursor("huggingface:models:*", mark, store)
+        second, empty_mark = await fetch_incremental("huggingface:models:*", fetch, "last_modified", store)
+
+        assert len(first) == 2 and second == []
+        assert calls[0] is None
+        assert calls[1] is not None and calls[1] < datetime(2026, 10, 19, 3, 0)
+        # An empty (or failed) fetch leaves the cursor where it was
+        assert empty_mark is None
+        assert not advance_cursor("huggingface:models:*", empty_mark, store)
+        assert store.get("huggingface:models:*") == datetime(2026, 10, 19, 3, 0)
+
+    @pytest.mark.asyncio
+    async def test_failed_save_keeps_cursor(self, test_db: Session, monkeypatch):
+        """Test a collector that fails before committing refetches the same items next run"""
+        from app.services import data_collector as collector_module
+        from app.services.data_collector import DataCollector
+        from app.services.source_cursors import source_cursors
+
+        monkeypatch.setattr(source_cursors, "session_factory", test_db._test_sessionmaker)
+        source_cursors.advance("arxiv:*", datetime(2026, 10, 1))
+        collector = DataCollector()
+
+        async def papers(**kwargs):
+            return [{"title": "Paper", "url": "https://arxiv.org/abs/1", "published": "2026-10-19T03:00:00Z"}]
+
+        def broken_session():
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr(collector.arxiv_scraper, "get_recent_papers", papers)
+        monkeypatch.setattr(collector_module, "SessionLocal", broken_session)
+        assert await collector.collect_arxiv_data() == 0
+        assert source_cursors.get("arxiv:*") == datetime(2026, 10, 1)
+
+
+class _FakeResponse:
+    status_code = 200
+
+    def __init__(self, body, headers=None):
+        self.body = body
+        self.headers = headers or {}
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+
+def _model(name: str, modified: str, downloads: int = 1000, likes: int = 0):
+    return {"modelId": name, "lastModified": modified, "downloads": downloads, "likes": likes}
+
+
+@pytest.mark.unit
+class TestHuggingFaceRecentlyModified:
+    """Tests for HuggingFace incremental listing"""
+
+    @pytest.fixture
+    def pages(self, monkeypatch):
+        """Serves pages by URL; records the requested URLs"""
+        from app.services.scrapers import huggingface
+
+        served = {}
+        requested = []
+
+        async def get(url, params=None, **kwargs):
+            requested.append(url)
+            body, next_url = served[url]
+            headers = {"Link": f'<{next_url}>; rel="next"'} if next_url else {}
+            return _FakeResponse(body, headers)
+
+        monkeypatch.setattr(huggingface.http_cache, "get", get)
+        return served, requested
+
+    @pytest.mark.asyncio
+    async def test_pages_until_cursor(self, pages):
+        """Test listing follows the next link until reaching modified_since"""
+        from app.services.scrapers.huggingface import HuggingFaceScraper
+
+        served, requested = pages
+        scraper = HuggingFaceScraper()
+        served[scraper.models_url] = ([_model("a", "2026-10-19T05:00:00Z"), _model("b", "2026-10-19T04:00:00Z")],
+                                      "https://huggingface.co/api/models?cursor=2")
+        served["https://huggingface.co/api/models?cursor=2"] = (
+            [_model("c", "2026-10-19T03:30:00Z"), _model("old", "2026-10-18T00:00:00Z")],
+            "https://huggingface.co/api/models?cursor=3",
+        )
+
+        items = await scraper.get_recently_modified("models", modified_since=datetime(2026, 10, 19, 3, 0))
+
+        assert [item["title"] for item in items] == ["a", "b", "c"]
+        assert len(requested) == 2
+
+    @pytest.mark.asyncio
+    async def test_filters_unpopular(self, pages, monkeypatch):
+        """Test items below both popularity thresholds are dropped"""
+        from app.core.config import settings
+        from app.services.scrapers.huggingface import HuggingFaceScraper
+
+        monkeypatch.setattr(settings, "huggingface_min_downloads", 100)
+        monkeypatch.setattr(settings, "huggingface_min_likes", 5)
+        served, _ = pages
+        scraper = HuggingFaceScraper()
+        served[scraper.models_url] = ([
+            _model("downloaded", "2026-10-19T05:00:00Z", downloads=500),
+            _model("liked", "2026-10-19T05:00:00Z", downloads=0, likes=10),
+            _model("unused", "2026-10-19T05:00:00Z", downloads=3, likes=0),
+        ], None)
+
+        items = await scraper.get_recently_modified("models", modified_since=datetime(2026, 10, 19))
+
+        assert [item["title"] for item in items] == ["downloaded", "liked"]
+
+
+@pytest.mark.unit
+class TestZennArticlesSince:
+    """Tests for Zenn incremental listing"""
+
+    @pytest.mark.asyncio
+    async def test_pages_until_cursor(self, monkeypatch):
+        """Test listing keeps paging past a long backlog so the advanced cursor leaves no gap"""
+        from app.services.scrapers import zenn
+
+        pages = 8
+        requested = []
+
+        async def get(url, params=None, **kwargs):
+            page = params["page"]
+            requested.append(page)
+            articles = [{"title": f"Article {page}", "path": f"/a/{page}",
+                         "published_at": f"2026-10-19T{12 - page:02d}:00:00+09:00"}]
+            if page == pages:
+                articles.append({"title": "Old", "path": "/a/old", "published_at": "2026-10-01T00:00:00Z"})
+            return _FakeResponse({"articles": articles, "next_page": page + 1})
+
+        monkeypatch.setattr(zenn.http_cache, "get", get)
+        articles = await zenn.ZennScraper().get_articles_since(datetime(2026, 10, 18))
+
+        assert len(articles) == pages
+        assert requested == list(range(1, pages + 1))
+
+
+@pytest.mark.unit
+class TestGitHubIncrementalQueries:
+    """Tests for the GitHub search queries with a cursor"""
+
+    @pytest.mark.asyncio
+    async def test_created_queries_keep_rolling_window(self, monkeypatch):
+        """Test only pushed: uses the cursor; created: keeps the day window so new repos get later chances"""
+        from app.services.scrapers.github import GitHubScraper
+
+        scraper = GitHubScraper()
+        queries = []
+
+        async def search(params):
+            queries.append(params["q"])
+            return []
+
+        monkeypatch.setattr(scraper, "_search_repos", search)
+        cursor = datetime(2026, 10, 19, 3, 0)
+        await scraper.get_daily_trending_repos(language="python", pushed_since=cursor)
+        await scraper.get_ai_python_repos(pushed_since=cursor)
+
+        for query in queries:
+            assert "created:>2026-10-19T03" not in query
+        assert any("pushed:>2026-10-19T03:00:00Z" in query for query in queries)
+
+    @pytest.mark.asyncio
+    async def test_min_stars_in_every_query(self, monkeypatch):
+        """Test the star threshold is applied by the search, so the cursor only covers qualifying repos"""
+        from app.services.scrapers.github import GitHubScraper
+
+        scraper = GitHubScraper()
+        queries = []
+
+        async def search(params):
+            queries.append(params["q"])
+            return []
+
+        monkeypatch.setattr(scraper, "_search_repos", search)
+        cursor = datetime(2026, 10, 19, 3, 0)
+        await scraper.get_daily_trending_repos(language="python", pushed_since=cursor, min_stars=50)
+        await scraper.get_ai_python_repos(pushed_since=cursor, min_stars=50)
+
+        assert queries and all("stars:>=50" in query for query in queries)
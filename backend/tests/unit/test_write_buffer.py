@@ -0,0 +1,144 @@
+"""
+Unit tests for write-behind buffer.
+
+Tests cover:
+- BufferedWriter - Queueing, size-triggered and explicit bulk flushes, post-commit hooks
+"""
+import pytest
+from datetime import datetime
+from sqlalchemy.orm import Session
+
+from app.services.write_buffer import BufferedWriter
+from app.models.behavior import UserRecommendation
+
+
+def _row(card_id: int) -> dict:
+    return {
+        "user_id": 1,
+        "card_id": card_id,
+        "score": 50,
+        "reason": "test",
+        "is_clicked": 0,
+        "created_at": datetime.now()
+    }
+
+
+@pytest.fixture
+def writer(test_db: Session) -> BufferedWriter:
+    writer = BufferedWriter(UserRecommendation, max_batch=3)
+    writer.session_factory = test_db._test_sessionmaker
+    writer.background = False
+    return writer
+
+
+@pytest.mark.unit
+class TestBufferedWriter:
+    """Tests for BufferedWriter"""
+
+    def test_add_does_not_write(self, writer: BufferedWriter, test_db: Session):
+        """Test rows stay queued below the batch threshold"""
+        writer.add(_row(1))
+
+        assert writer.pending() == 1
+        assert test_db.query(UserRecommendation).count() == 0
+
+    def test_flush_writes_all(self, writer: BufferedWriter, test_db: Session):
+        """Test explicit flush drains the buffer in batches"""
+        writer.add_many([_row(i) for i in range(2)])
+        writer.add_many([_row(i) for i in range(2, 7)])  # crosses threshold
+
+        writer.flush()
+
+        assert writer.pending() == 0
+        assert test_db.query(UserRecommendation).count() == 7
+        assert writer.stats["written"] == 7
+
+    def test_size_threshold_triggers_flush(self, writer: BufferedWriter, test_db: Session):
+        """Test reaching max_batch flushes without an explicit call"""
+        writer.add_many([_row(i) for i in range(3)])
+
+        assert writer.pending() == 0
+        assert test_db.query(UserRecommendation).count() == 3
+
+    def test_overflow_drops_oldest(self, writer: BufferedWriter):
+        """Test buffer is bounded when the database is unavailable"""
+        writer.max_batch = 100
+        writer.max_buffer = 5
+
+        writer.add_many([_row(i) for i in range(8)])
+
+        assert writer.pending() == 5
+        assert writer.stats["dropped"] == 3
+
+    def test_failed_flush_requeues(self, writer: BufferedWriter):
+        """Test rows are kept when the insert fails"""
+        factory = writer.session_factory
+
+        def broken_session():
+            session = factory()
+
+            def execute(*args, **kwargs):
+                raise RuntimeError("db down")
+
+            session.execute = execute
+            return session
+
+        writer.session_factory = broken_session
+        writer.add(_row(1))
+
+        assert writer.flush() == 0
+        assert writer.pending() == 1
+        assert writer.stats["errors"] == 1
+
+        writer.session_factory = factory
+        assert writer.flush() == 1
+
+    def test_requeue_respects_max_buffer(self, writer: BufferedWriter):
+        """Test rows queued during a failed flush cannot push the buffer past max_buffer"""
+        writer.max_batch = 100
+        writer.max_buffer = 5
+        factory = writer.session_factory
+
+        def broken_session():
+            session = factory()
+
+            def execute(*args, **kwargs):
+                # New rows arrive while the failing insert is in flight
+                writer.add_many([_row(i) for i in range(10, 15)])
+                raise RuntimeError("db down")
+
+            session.execute = execute
+            return session
+
+        writer.session_factory = broken_session
+        writer.add_many([_row(i) for i in range(3)])
+
+        assert writer.flush() == 0
+        assert writer.pending() == 5
+        assert writer.stats["dropped"] == 3
+        with writer._lock:
+            assert [row["card_id"] for row in writer._buffer] == [10, 11, 12, 13, 14]
+
+    def test_after_commit_skips_failed_batches(self, writer: BufferedWriter):
+        """Test after_commit sees each row once even when a flush is retried"""
+        committed = []
+        writer.after_commit = committed.extend
+        factory = writer.session_factory
+
+        def failing_commit():
+            session = factory()
+
+            def commit():
+                raise RuntimeError("db locked")
+
+            session.commit = commit
+            return session
+
+        writer.session_factory = failing_commit
+        writer.add(_row(1))
+        assert writer.flush() == 0
+        assert committed == []
+
+        writer.session_factory = factory
+        assert writer.flush() == 1
+        assert [row["card_id"] for row in committed] == [1]
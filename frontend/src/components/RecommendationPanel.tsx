@@ -3,6 +3,7 @@ import { Card, Button, Empty, Spin, Space, Typography, message } from 'antd'
 import { ReloadOutlined, BulbOutlined, SettingOutlined } from '@ant-design/icons'
 import { useLanguage } from '../contexts/LanguageContext'
 import RecommendationCard from './RecommendationCard'
+import { trackBehavior } from '../utils/behaviorTracker'
 
 const { Title, Text } = Typography
 
@@ -38,6 +39,7 @@ export const RecommendationPanel: React.FC<RecommendationPanelProps> = ({
   const [loading, setLoading] = useState(false)
   const [userTags, setUserTags] = useState<string[]>([])
   const [excludedIds, setExcludedIds] = useState<number[]>([])
+  const [refreshCursor, setRefreshCursor] = useState<string | null>(null)
 
   // 加载推荐
   const loadRecommendations = async (refresh = false) => {
@@ -46,20 +48,21 @@ export const RecommendationPanel: React.FC<RecommendationPanelProps> = ({
       let url = `/api/v1/recommendations?user_id=${userId}&limit=${limit}`
 
       if (refresh && excludedIds.length > 0) {
-        // 刷新模式：排除已显示的
-        const response = await fetch('/api/v1/recommendations/refresh', {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({
-            user_id: userId,
-            exclude_ids: excludedIds,
-            limit
-          })
+        // 刷新模式：用服务端游标继续翻页，并始终带上已显示的ID
+        // （游标失效时——其他 worker、重启、过期——服务端据此重新排序，不会重复已看过的卡片）
+        const params = new URLSearchParams({ user_id: String(userId), limit: String(limit) })
+        if (refreshCursor) {
+          params.append('cursor', refreshCursor)
+        }
+        excludedIds.forEach(id => params.append('exclude_ids', String(id)))
+        const response = await fetch(`/api/v1/recommendations/refresh?${params.toString()}`, {
+          method: 'POST'
         })
 
         if (response.ok) {
           const data = await response.json()
           setRecommendations(data.recommendations || [])
+          setRefreshCursor(data.cursor || null)
 
           // 更新排除列表
           const newIds = data.recommendations.map((r: RecommendationData) => r.card.id)
@@ -76,6 +79,7 @@ export const RecommendationPanel: React.FC<RecommendationPanelProps> = ({
           // 初始化排除列表
           const ids = data.recommendations.map((r: RecommendationData) => r.card.id)
           setExcludedIds(ids)
+          setRefreshCursor(null)
         }
       }
     } catch (error) {
@@ -93,20 +97,12 @@ export const RecommendationPanel: React.FC<RecommendationPanelProps> = ({
 
   // 处理卡片点击
   const handleCardClick = async (cardId: number) => {
-    // 记录行为
-    try {
-      await fetch('/api/v1/behavior/log', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          user_id: userId,
-          action: 'click',
-          card_id: cardId
-        })
-      })
-    } catch (error) {
-      console.error('Failed to log behavior:', error)
-    }
+    // 记录行为（批量上报）
+    trackBehavior({
+      user_id: userId,
+      action: 'click',
+      card_id: cardId
+    })
 
     // 触发回调
     onCardClick && onCardClick(cardId)
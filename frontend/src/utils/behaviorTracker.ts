@@ -0,0 +1,82 @@
+// 用户行为批量上报
+// 点击/浏览等高频事件先进入本地队列，按数量或时间批量发送到 /behavior/log/batch；
+// 页面隐藏或关闭时使用 sendBeacon 发送剩余事件，避免丢失。
+
+const API_BASE_URL = import.meta.env.VITE_API_URL || '';
+const BATCH_ENDPOINT = `${API_BASE_URL}/api/v1/behavior/log/batch`;
+
+const MAX_BATCH_SIZE = 50;
+const FLUSH_INTERVAL_MS = 5000;
+
+export interface BehaviorEvent {
+  user_id: number;
+  action: 'click' | 'favorite' | 'unfavorite' | 'search' | 'view' | 'share';
+  card_id?: number;
+  query?: string;
+  duration?: number;
+  search_mode?: string;
+  metadata?: string;
+  timestamp?: string;
+}
+
+let queue: BehaviorEvent[] = [];
+let flushTimer: ReturnType<typeof setTimeout> | null = null;
+
+const scheduleFlush = () => {
+  if (flushTimer === null) {
+    flushTimer = setTimeout(() => {
+      flushTimer = null;
+      flushBehaviors();
+    }, FLUSH_INTERVAL_MS);
+  }
+};
+
+export const trackBehavior = (event: BehaviorEvent) => {
+  queue.push({ ...event, timestamp: event.timestamp || new Date().toISOString() });
+
+  if (queue.length >= MAX_BATCH_SIZE) {
+    flushBehaviors();
+  } else {
+    scheduleFlush();
+  }
+};
+
+export const flushBehaviors = async (useBeacon = false) => {
+  if (queue.length === 0) {
+    return;
+  }
+
+  const events = queue;
+  queue = [];
+  const body = JSON.stringify({ events });
+
+  if (useBeacon && typeof navigator !== 'undefined' && navigator.sendBeacon) {
+    // sendBeacon 以 text/plain 发送，后端按 JSON 解析
+    if (navigator.sendBeacon(BATCH_ENDPOINT, body)) {
+      return;
+    }
+  }
+
+  try {
+    await fetch(BATCH_ENDPOINT, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body,
+      keepalive: true,
+    });
+  } catch (error) {
+    console.error('Failed to send behavior batch:', error);
+    // 放回队列，下次再发
+    queue = events.concat(queue).slice(-MAX_BATCH_SIZE * 10);
+    scheduleFlush();
+  }
+};
+
+if (typeof window !== 'undefined') {
+  window.addEventListener('pagehide', () => flushBehaviors(true));
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') {
+      flushBehaviors(true);
+    }
+  });
+}